@@ -20,6 +20,10 @@ from api_routes.signal_monitoring import signal_monitoring_bp
 # from api_routes.analytics import analytics_bp  # Módulo não existe
 from api_routes.scheduler_management import scheduler_management_bp
 from api_routes.restart_system import restart_system_bp
+from api_routes.stream import stream_bp
+from api_routes.metrics import metrics_bp
+from core.response_cache import cached_response
+from core.signal_event_log import get_signal_event_log
 
 def create_app():
     """Factory function para criar a aplicação Flask"""
@@ -92,6 +96,8 @@ def register_api_routes(app_instance, bot_instance):
     # app_instance.register_blueprint(analytics_bp, url_prefix='/api/analytics')  # Módulo não existe
     app_instance.register_blueprint(scheduler_management_bp, url_prefix='/api')
     app_instance.register_blueprint(restart_system_bp)  # Já tem url_prefix='/api/restart-system' definido no blueprint
+    app_instance.register_blueprint(stream_bp, url_prefix='/api')
+    app_instance.register_blueprint(metrics_bp)  # /metrics na raiz (padrão do Prometheus)
     
     # Rota raiz
     @app_instance.route('/')
@@ -112,22 +118,24 @@ def register_api_routes(app_instance, bot_instance):
     def api_health():
         health_status = {"status": "healthy", "service": "crypto-signals-api"}
         
-        # Verificar conectividade com PostgreSQL
+        # Verificar conectividade com PostgreSQL (pelo pool compartilhado)
         try:
-            from core.db_config import DatabaseConfig
-            db_config = DatabaseConfig()
-            with db_config.get_db_connection() as conn:
-                with conn.cursor() as cursor:
-                    cursor.execute("SELECT 1")
-                    health_status["database"] = "connected"
+            from core.db_config import db_config
+            database_health = db_config.health_check()
+            if database_health['healthy']:
+                health_status["database"] = "connected"
+            else:
+                health_status["database"] = f"error: {database_health.get('error')}"
+                health_status["status"] = "degraded"
+            if 'pool' in database_health:
+                health_status["database_pool"] = database_health['pool']
         except Exception as e:
             health_status["database"] = f"error: {str(e)}"
             health_status["status"] = "degraded"
         
         # Verificar Redis
         try:
-            from core.db_config import DatabaseConfig
-            db_config = DatabaseConfig()
+            from core.db_config import db_config
             if db_config.redis_client:
                 db_config.redis_client.ping()
                 health_status["redis"] = "connected"
@@ -323,31 +331,19 @@ def register_api_routes(app_instance, bot_instance):
             return {"error": f"Erro ao obter estatísticas: {str(e)}"}, 500
     
     # NOVO: Endpoint público para sinais (sem autenticação)
+    # Sinais vêm do log de eventos (inclui os ainda não compactados no CSV)
+    public_signals_log = get_signal_event_log(os.path.join(os.path.dirname(__file__), 'sinais_lista.csv'))
+    
     @app_instance.route('/api/signals/public', methods=['GET'])
+    @cached_response(public_signals_log.version)
     def get_public_signals():
         """Endpoint público para obter sinais sem autenticação"""
         try:
-            import csv
-            import os
             from flask import jsonify
             
-            # Caminho para o arquivo CSV
-            signals_file = os.path.join(os.path.dirname(__file__), 'sinais_lista.csv')
-            
-            if not os.path.exists(signals_file):
-                return jsonify({
-                    'success': False,
-                    'error': 'Arquivo de sinais não encontrado'
-                }), 404
-            
-            # Ler o CSV usando o módulo csv nativo
-            signals = []
-            with open(signals_file, 'r', encoding='utf-8') as file:
-                reader = csv.DictReader(file)
-                for row in reader:
-                    # Filtrar apenas sinais PREMIUM e ELITE
-                    if row.get('signal_class') in ['PREMIUM', 'ELITE']:
-                        signals.append(row)
+            # Filtrar apenas sinais PREMIUM e ELITE (linhas no mesmo formato do CSV)
+            signals = [row for row in public_signals_log.snapshot_rows()
+                       if row.get('signal_class') in ['PREMIUM', 'ELITE']]
             
             return jsonify({
                 'success': True,
@@ -1,5 +1,6 @@
 from flask import Blueprint, jsonify
 from core.binance_client import BinanceClient
+from core.ticker_snapshot import ticker_snapshot
 import os
 
 binance_prices_bp = Blueprint('binance_prices', __name__)
@@ -9,7 +10,7 @@ use_binance = os.getenv('USE_BINANCE_API', 'true').lower() == 'true'
 
 if use_binance:
     try:
-        binance_client = BinanceClient()
+        binance_client = BinanceClient(priority='dashboard')
         print("✅ BinanceClient carregado para preços em tempo real")
     except Exception as e:
         print(f"⚠️ Erro ao carregar BinanceClient: {e}")
@@ -37,7 +38,16 @@ def get_symbol_price(symbol):
                 'price': None
             }), 503
         
-        # Buscar preço atual via API da Binance
+        # Preço do snapshot compartilhado; símbolos fora dele vão direto à API
+        price = ticker_snapshot.get_price(symbol.upper())
+        if price is not None:
+            return jsonify({
+                'success': True,
+                'symbol': symbol,
+                'price': price,
+                'timestamp': None
+            })
+        
         response = binance_client.make_request(f'/fapi/v1/ticker/price?symbol={symbol}')
         
         if response and 'price' in response:
@@ -79,7 +89,15 @@ def get_multiple_prices():
                 'prices': {}
             }), 503
         
-        # Buscar todos os preços via API da Binance
+        # Preços do snapshot compartilhado (API apenas se o snapshot estiver vazio)
+        prices = ticker_snapshot.get_prices()
+        if prices:
+            return jsonify({
+                'success': True,
+                'prices': prices,
+                'count': len(prices)
+            })
+        
         response = binance_client.make_request('/fapi/v1/ticker/price')
         
         if response and isinstance(response, list):
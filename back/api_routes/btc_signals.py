@@ -1,8 +1,11 @@
 # API Routes para Sistema BTC de Confirmação de Sinais
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, jsonify, request, current_app
 from middleware.auth_middleware import jwt_required, get_current_user
 from core.database import Database
 from core.btc_signal_manager import BTCSignalManager
+from core.confirmed_signals_view import ConfirmedSignalsView
+from core.response_cache import cached_response
+from core.fast_json import json_response
 from core.signal_confirmation_system import SignalConfirmationSystem
 from core.binance_client import BinanceClient
 from core.btc_correlation_analyzer import BTCCorrelationAnalyzer
@@ -24,13 +27,14 @@ def init_btc_signals_routes(db_instance: Database, btc_manager: BTCSignalManager
     btc_signal_manager = btc_manager
     
     # Inicializar sistemas auxiliares
-    binance_client = BinanceClient()
+    binance_client = BinanceClient(priority='dashboard')
     confirmation_system = SignalConfirmationSystem(binance_client)
     btc_analyzer = BTCCorrelationAnalyzer(binance_client)
     
     print("✅ Rotas BTC Signals inicializadas!")
 
 @btc_signals_bp.route('/pending', methods=['GET'])
+@cached_response('btc_signals')
 def get_pending_signals():
     """Retorna lista de sinais aguardando confirmação - Rota pública para dashboard"""
     try:
@@ -215,7 +219,7 @@ def get_daily_signals_status():
                 },
                 'system_info': {
                     'pending_signals': len(btc_signal_manager.get_pending_signals()),
-                    'total_confirmed': len(btc_signal_manager.get_confirmed_signals()),
+                    'total_confirmed': len(btc_signal_manager.confirmed_view),
                     'total_rejected': len(btc_signal_manager.get_rejected_signals())
                 }
             }
@@ -269,6 +273,7 @@ def get_rejected_signals():
         }), 500
 
 @btc_signals_bp.route('/confirmed', methods=['GET'])
+@cached_response(lambda: btc_signal_manager.confirmed_view.current_version() if btc_signal_manager else None)
 def get_confirmed_signals():
     """Retorna lista de sinais confirmados (Público para dashboard, Admin para painel)"""
     try:
@@ -307,26 +312,31 @@ def get_confirmed_signals():
         limit = request.args.get('limit', type=int)
         if limit is not None:
             limit = min(limit, 500)  # Máximo 500 registros se especificado
-        
-        # Obter sinais confirmados (todos se não especificado limite)
-        confirmed_signals = btc_signal_manager.get_confirmed_signals(limit=limit)
+        cursor = request.args.get('cursor')
+        if cursor:
+            try:
+                ConfirmedSignalsView.decode_cursor(cursor)
+            except ValueError:
+                return jsonify({'success': False, 'message': 'Cursor inválido'}), 400
         
         if admin_format:
             # Formato completo para admin
-            return jsonify({
-                'success': True,
-                'data': {
-                    'confirmed_signals': confirmed_signals,
-                    'count': len(confirmed_signals),
-                    'limit': limit,
-                    'last_updated': datetime.now().strftime('%d/%m/%Y %H:%M:%S')
+            def build(confirmed_signals, next_cursor, version):
+                return {
+                    'success': True,
+                    'data': {
+                        'confirmed_signals': confirmed_signals,
+                        'count': len(confirmed_signals),
+                        'limit': limit,
+                        'next_cursor': next_cursor,
+                        'version': version,
+                        'last_updated': datetime.now().strftime('%d/%m/%Y %H:%M:%S')
+                    }
                 }
-            })
         else:
             # Formato completo para dashboard público (incluindo todos os campos necessários)
-            formatted_signals = []
-            for signal in confirmed_signals:
-                formatted_signals.append({
+            def build(confirmed_signals, next_cursor, version):
+                return [{
                     'id': signal.get('id'),
                     'symbol': signal.get('symbol'),
                     'type': signal.get('type'),
@@ -343,9 +353,18 @@ def get_confirmed_signals():
                     'confirmation_attempts': signal.get('confirmation_attempts', 0),
                     'btc_correlation': signal.get('btc_correlation', 0),
                     'btc_trend': signal.get('btc_trend', 'NEUTRAL')
-                })
-            
-            return jsonify(formatted_signals)
+                } for signal in confirmed_signals]
+        
+        # Sinais confirmados da visão materializada; JSON reaproveitado até a próxima versão
+        body, version, next_cursor = btc_signal_manager.confirmed_view.serialized_page(
+            'admin' if admin_format else 'public', build, limit=limit, cursor=cursor,
+            dumps=current_app.json.dumps
+        )
+        response = current_app.response_class(body, status=200, mimetype='application/json')
+        response.headers['X-Data-Version'] = str(version)
+        if next_cursor:
+            response.headers['X-Next-Cursor'] = next_cursor
+        return response
         
     except Exception as e:
         print(f"❌ Erro ao obter sinais confirmados: {e}")
@@ -358,6 +377,7 @@ def get_confirmed_signals():
 
 
 @btc_signals_bp.route('/metrics', methods=['GET'])
+@cached_response('btc_signals', ttl=15)
 def get_btc_metrics():
     """Retorna métricas do sistema BTC - Rota pública para cards do dashboard"""
     try:
@@ -378,39 +398,13 @@ def get_btc_metrics():
         # Obter dados de preço do BTC
         btc_price_data = btc_analyzer.get_btc_price_data()
         
-        # Converter todos os valores para tipos serializáveis
-        def make_serializable(obj):
-            """Converte objetos para tipos serializáveis JSON"""
-            import numpy as np
-            import pandas as pd
-            
-            if isinstance(obj, dict):
-                return {k: make_serializable(v) for k, v in obj.items()}
-            elif isinstance(obj, list):
-                return [make_serializable(item) for item in obj]
-            elif isinstance(obj, tuple):
-                return [make_serializable(item) for item in obj]
-            elif isinstance(obj, (np.integer, np.floating)):
-                return obj.item()
-            elif isinstance(obj, np.ndarray):
-                return obj.tolist()
-            elif isinstance(obj, (np.bool_, bool)):
-                return bool(obj)
-            elif isinstance(obj, (pd.Timestamp, datetime)):
-                return obj.strftime('%d/%m/%Y %H:%M:%S') if hasattr(obj, 'strftime') else str(obj)
-            elif hasattr(obj, 'item'):  # outros tipos numpy
-                return obj.item()
-            elif isinstance(obj, (int, float, str, type(None))):
-                return obj
-            else:
-                return str(obj)
-        
-        return jsonify({
+        # NumPy, pandas e datetimes são convertidos direto na serialização
+        return json_response({
             'success': True,
             'data': {
-                'confirmation_metrics': make_serializable(confirmation_metrics),
-                'btc_analysis': make_serializable(btc_analysis),
-                'btc_price_data': make_serializable(btc_price_data),
+                'confirmation_metrics': confirmation_metrics,
+                'btc_analysis': btc_analysis,
+                'btc_price_data': btc_price_data,
                 'system_status': {
                     'btc_manager_active': bool(btc_signal_manager.is_monitoring),
                     'last_updated': datetime.now().strftime('%d/%m/%Y %H:%M:%S')
@@ -2,6 +2,12 @@ from flask import Blueprint, jsonify, current_app
 import os
 import pandas as pd
 from datetime import datetime
+from core.persistence_queue import persistence_queue
+from core.db_pool import postgres_pools
+from core.http_pool import supabase_clients
+from core.response_cache import response_cache
+from core.event_bus import event_bus
+from core.event_stream_server import event_stream_server
 
 debug_bp = Blueprint('debug', __name__)
 
@@ -65,6 +71,15 @@ def system_status():
         try:
             users = bot_instance.db.get_all_users()
             status['database']['users_count'] = len(users) if users else 0
+            status['database']['storage'] = bot_instance.db.get_storage_stats()
+            status['database']['auth_token_index'] = bot_instance.db.token_index.get_stats()
+            status['database']['persistence_queue'] = persistence_queue.get_stats()
+            status['response_cache'] = response_cache.get_stats()
+            status['event_stream'] = {'bus': event_bus.get_stats(), 'server': event_stream_server.get_stats()}
+            status['database']['pools'] = {
+                'postgres': postgres_pools.get_stats(),
+                'supabase': supabase_clients.get_stats()
+            }
             status['database']['connection'] = 'ok'
         except Exception as e:
             status['database']['connection'] = 'error'
@@ -3,6 +3,8 @@ from datetime import datetime
 import pytz
 import traceback
 
+from core.response_cache import cached_response
+
 market_status_bp = Blueprint('market_status', __name__)
 
 # Instâncias globais (serão inicializadas no app principal)
@@ -57,6 +59,7 @@ def get_market_status():
     }
 
 @market_status_bp.route('/market-status', methods=['GET'])
+@cached_response(ttl=5)
 def market_status():
     """Retorna status dos mercados e dados completos do BTC"""
     try:
@@ -0,0 +1,14 @@
+from flask import Blueprint, Response
+
+from core.metrics import metrics
+
+metrics_bp = Blueprint('metrics', __name__)
+
+PROMETHEUS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+@metrics_bp.route('/metrics', methods=['GET'])
+def prometheus_metrics():
+    """Métricas do processo no formato de texto do Prometheus (para scrape)"""
+    return Response(metrics.render(), mimetype=None, content_type=PROMETHEUS_CONTENT_TYPE,
+                    headers={'Cache-Control': 'no-store'})
@@ -293,39 +293,24 @@ def delete_signals_manually():
                 logger.info("🗑️ Deletando todos os sinais...")
                 # Usar método do gerenciador para limpar todos os sinais
                 import os
-                import pandas as pd
                 
-                signals_file = gerenciador.signals_file
-                if os.path.exists(signals_file):
-                    df = pd.read_csv(signals_file)
-                    deleted_count = len(df)
-                    
-                    # Criar DataFrame vazio com as mesmas colunas
-                    empty_df = pd.DataFrame(columns=df.columns)
-                    empty_df.to_csv(signals_file, index=False)
-                    
-                    results.append({
-                        'type': 'all_signals',
-                        'success': True,
-                        'deleted_count': deleted_count,
-                        'message': f'Todos os {deleted_count} sinais foram deletados'
-                    })
-                else:
-                    results.append({
-                        'type': 'all_signals',
-                        'success': True,
-                        'deleted_count': 0,
-                        'message': 'Arquivo de sinais não encontrado - nenhum sinal para deletar'
-                    })
+                deleted_count = gerenciador.clear_signals()
+                results.append({
+                    'type': 'all_signals',
+                    'success': True,
+                    'deleted_count': deleted_count,
+                    'message': f'Todos os {deleted_count} sinais foram deletados'
+                })
                 
                 # Também deletar do Supabase
                 try:
-                    from supabase import create_client, Client
+                    from supabase import Client
+                    from core.http_pool import get_supabase_client
                     supabase_url = os.getenv('SUPABASE_URL')
                     supabase_key = os.getenv('SUPABASE_ANON_KEY')
                     
                     if supabase_url and supabase_key:
-                        supabase: Client = create_client(supabase_url, supabase_key)
+                        supabase: Client = get_supabase_client(supabase_url, supabase_key)
                         
                         # Buscar todos os sinais
                         all_signals = supabase.table('signals').select('id').execute()
@@ -376,33 +361,16 @@ def delete_signals_manually():
             status = criteria.get('status', 'OPEN')
             try:
                 logger.info(f"🗑️ Deletando sinais com status: {status}...")
-                import os
-                import pandas as pd
                 
-                signals_file = gerenciador.signals_file
-                if os.path.exists(signals_file):
-                    df = pd.read_csv(signals_file)
-                    signals_to_delete = df[df['status'] == status]
-                    deleted_count = len(signals_to_delete)
-                    
-                    # Manter apenas sinais que NÃO têm o status especificado
-                    df_cleaned = df[df['status'] != status]
-                    df_cleaned.to_csv(signals_file, index=False)
-                    
-                    results.append({
-                        'type': 'by_status',
-                        'success': True,
-                        'deleted_count': deleted_count,
-                        'criteria': {'status': status},
-                        'message': f'{deleted_count} sinais com status "{status}" foram deletados'
-                    })
-                else:
-                    results.append({
-                        'type': 'by_status',
-                        'success': True,
-                        'deleted_count': 0,
-                        'message': 'Arquivo de sinais não encontrado'
-                    })
+                # Manter apenas sinais que NÃO têm o status especificado
+                deleted_count = gerenciador.remover_sinais_por_status(status)
+                results.append({
+                    'type': 'by_status',
+                    'success': True,
+                    'deleted_count': deleted_count,
+                    'criteria': {'status': status},
+                    'message': f'{deleted_count} sinais com status "{status}" foram deletados'
+                })
                     
             except Exception as e:
                 results.append({
@@ -423,33 +391,16 @@ def delete_signals_manually():
             
             try:
                 logger.info(f"🗑️ Deletando sinais do símbolo: {symbol}...")
-                import os
-                import pandas as pd
                 
-                signals_file = gerenciador.signals_file
-                if os.path.exists(signals_file):
-                    df = pd.read_csv(signals_file)
-                    signals_to_delete = df[df['symbol'] == symbol]
-                    deleted_count = len(signals_to_delete)
-                    
-                    # Manter apenas sinais que NÃO são do símbolo especificado
-                    df_cleaned = df[df['symbol'] != symbol]
-                    df_cleaned.to_csv(signals_file, index=False)
-                    
-                    results.append({
-                        'type': 'by_symbol',
-                        'success': True,
-                        'deleted_count': deleted_count,
-                        'criteria': {'symbol': symbol},
-                        'message': f'{deleted_count} sinais do símbolo "{symbol}" foram deletados'
-                    })
-                else:
-                    results.append({
-                        'type': 'by_symbol',
-                        'success': True,
-                        'deleted_count': 0,
-                        'message': 'Arquivo de sinais não encontrado'
-                    })
+                # Manter apenas sinais que NÃO são do símbolo especificado
+                deleted_count = gerenciador.remover_sinais_por_simbolo(symbol)
+                results.append({
+                    'type': 'by_symbol',
+                    'success': True,
+                    'deleted_count': deleted_count,
+                    'criteria': {'symbol': symbol},
+                    'message': f'{deleted_count} sinais do símbolo "{symbol}" foram deletados'
+                })
                     
             except Exception as e:
                 results.append({
@@ -10,6 +10,7 @@ from middleware.auth_middleware import jwt_required, get_current_user
 from core.signal_monitoring_system import SignalMonitoringSystem
 from core.binance_client import BinanceClient
 from core.database import Database
+from core.response_cache import cached_response
 import traceback
 from datetime import datetime
 
@@ -119,6 +120,7 @@ def get_active_signals():
         }), 500
 
 @signal_monitoring_bp.route('/signals/simulation', methods=['GET'])
+@cached_response('monitored_signals')
 def get_simulation_data():
     """
     Retorna dados de simulação financeira dos sinais monitorados - Rota pública
@@ -132,64 +134,9 @@ def get_simulation_data():
                 'message': 'Sistema de monitoramento não inicializado'
             }), 500
         
-        # Obter sinais monitorados
-        monitored_signals = monitoring_system.get_monitored_signals()
-        expired_signals = monitoring_system.get_expired_signals()
-        
-        # Formatar dados de simulação
-        simulation_data = []
-        
-        # Processar sinais ativos
-        for signal in monitored_signals:
-            simulation_data.append({
-                'id': signal.get('id'),
-                'symbol': signal.get('symbol'),
-                'signal_type': signal.get('signal_type'),
-                'status': 'MONITORING',
-                'entry_price': signal.get('entry_price'),
-                'current_price': signal.get('current_price'),
-                'days_monitored': signal.get('days_monitored'),
-                'simulation': {
-                    'investment': signal.get('simulation_investment', 1000),
-                    'current_value': signal.get('simulation_current_value', 1000),
-                    'pnl_usd': signal.get('simulation_pnl_usd', 0),
-                    'pnl_percentage': signal.get('simulation_pnl_percentage', 0),
-                    'max_value_reached': signal.get('simulation_max_value_reached', 1000),
-                    'target_value': signal.get('simulation_target_value', 4000),
-                    'position_size': signal.get('simulation_position_size', 0)
-                },
-                'leverage': {
-                    'max_leverage': signal.get('max_leverage'),
-                    'current_profit': signal.get('current_profit', 0),
-                    'max_profit_reached': signal.get('max_profit_reached', 0)
-                }
-            })
-        
-        # Processar sinais expirados (últimos 50)
-        for signal in expired_signals[-50:]:
-            simulation_data.append({
-                'id': signal.get('id'),
-                'symbol': signal.get('symbol'),
-                'signal_type': signal.get('signal_type'),
-                'status': signal.get('status', 'EXPIRED'),
-                'entry_price': signal.get('entry_price'),
-                'current_price': signal.get('current_price'),
-                'days_monitored': signal.get('days_monitored'),
-                'simulation': {
-                    'investment': signal.get('simulation_investment', 1000),
-                    'current_value': signal.get('simulation_current_value', 1000),
-                    'pnl_usd': signal.get('simulation_pnl_usd', 0),
-                    'pnl_percentage': signal.get('simulation_pnl_percentage', 0),
-                    'max_value_reached': signal.get('simulation_max_value_reached', 1000),
-                    'target_value': signal.get('simulation_target_value', 4000),
-                    'position_size': signal.get('simulation_position_size', 0)
-                },
-                'leverage': {
-                    'max_leverage': signal.get('max_leverage'),
-                    'current_profit': signal.get('current_profit', 0),
-                    'max_profit_reached': signal.get('max_profit_reached', 0)
-                }
-            })
+        # Registros montados direto dos sinais em memória (ativos + últimos 50 expirados)
+        simulation_data = monitoring_system.get_simulation_records(expired_limit=50)
+        active_count = sum(1 for s in simulation_data if s['status'] == 'MONITORING')
         
         # Ordenar por valor atual (maior primeiro)
         simulation_data.sort(key=lambda x: x['simulation']['current_value'], reverse=True)
@@ -208,7 +155,7 @@ def get_simulation_data():
                 'signals': simulation_data,
                 'statistics': {
                     'total_signals': len(simulation_data),
-                    'active_signals': len(monitored_signals),
+                    'active_signals': active_count,
                     'completed_signals': len(completed_signals),
                     'success_rate': round(success_rate, 2),
                     'total_investment': total_investment,
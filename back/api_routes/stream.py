@@ -0,0 +1,84 @@
+from flask import Blueprint, Response, jsonify, request
+import os
+import threading
+
+from core.event_bus import event_bus
+
+stream_bp = Blueprint('stream', __name__)
+
+# Cada cliente SSE ocupa uma thread do servidor WSGI enquanto estiver conectado;
+# para milhares de clientes use o servidor de eventos (core/event_stream_server.py)
+MAX_CLIENTS = int(os.getenv('EVENT_STREAM_MAX_CLIENTS', '50'))
+HEARTBEAT_SECONDS = float(os.getenv('EVENT_STREAM_HEARTBEAT', '15'))
+
+_clients_lock = threading.Lock()
+_active_clients = 0
+
+
+def parse_topics(raw):
+    """Converte ?topics=signals,monitoring em lista (None = todos)"""
+    topics = [topic.strip() for topic in (raw or '').split(',') if topic.strip()]
+    return topics or None
+
+
+def parse_last_event_id(raw):
+    """Last-Event-ID enviado pelo EventSource ao reconectar"""
+    try:
+        return int(raw) if raw not in (None, '') else None
+    except (TypeError, ValueError):
+        return None
+
+
+def sse_stream(subscription, heartbeat=HEARTBEAT_SECONDS, should_stop=None):
+    """Gera os frames SSE de uma inscrição até o cliente desconectar"""
+    yield "retry: 5000\n: conectado\n\n"
+    while not subscription.closed and not (should_stop and should_stop()):
+        events = subscription.wait(heartbeat)
+        if events:
+            yield ''.join(event.to_sse() for event in events)
+        else:
+            yield ": ping\n\n"
+
+
+@stream_bp.route('/stream', methods=['GET'])
+def stream_events():
+    """Canal de eventos (Server-Sent Events) com deltas de sinais e preços"""
+    global _active_clients
+    with _clients_lock:
+        if _active_clients >= MAX_CLIENTS:
+            response = jsonify({'error': 'Limite de conexões de stream atingido'})
+            response.status_code = 503
+            response.headers['Retry-After'] = '30'
+            return response
+        _active_clients += 1
+
+    last_event_id = parse_last_event_id(request.headers.get('Last-Event-ID') or request.args.get('last_event_id'))
+    subscription = event_bus.subscribe(parse_topics(request.args.get('topics')), last_event_id)
+
+    released = threading.Event()
+
+    def release():
+        # Chamado ao fechar a resposta, mesmo se o gerador nunca chegou a rodar
+        global _active_clients
+        if released.is_set():
+            return
+        released.set()
+        event_bus.unsubscribe(subscription)
+        with _clients_lock:
+            _active_clients -= 1
+
+    response = Response(sse_stream(subscription), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
+    response.call_on_close(release)
+    return response
+
+
+@stream_bp.route('/stream/stats', methods=['GET'])
+def stream_stats():
+    """Estatísticas do barramento de eventos"""
+    with _clients_lock:
+        active = _active_clients
+    return jsonify({'success': True, 'wsgi_clients': active, 'max_clients': MAX_CLIENTS,
+                    'bus': event_bus.get_stats()})
@@ -17,7 +17,7 @@ if use_binance:
     try:
         from core.binance_client import BinanceClient
         from core.technical_analysis import TechnicalAnalysis
-        binance_client = BinanceClient()
+        binance_client = BinanceClient(priority='dashboard')
         technical_analysis = TechnicalAnalysis(db_instance)
         print("✅ Componentes Binance carregados com sucesso")
     except Exception as e:
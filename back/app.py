@@ -29,6 +29,7 @@ from core.binance_client import BinanceClient
 from core.technical_analysis import TechnicalAnalysis
 from core.gerenciar_sinais import GerenciadorSinais
 from core.telegram_notifier import TelegramNotifier
+from core.persistence_queue import persistence_queue
 # Corrigir esta linha - importar a função em vez da classe
 from core.email_service import send_email
 
@@ -109,6 +110,8 @@ def stop_nodejs_backend():
 
 # Register the cleanup function to be called on exit
 atexit.register(stop_nodejs_backend)
+# Gravar o que restou na fila de persistência (o resto fica no journal)
+atexit.register(persistence_queue.stop)
 
 def run_bot_scanning():
     """Função para rodar o scan de mercado do bot periodicamente."""
@@ -39,6 +39,8 @@ from api_routes.signal_monitoring import signal_monitoring_bp, init_signal_monit
 from api_routes.restart_system import restart_system_bp
 from api_routes.binance_prices import binance_prices_bp
 from api_routes.scheduler_management import scheduler_management_bp
+from api_routes.stream import stream_bp
+from core.response_cache import cached_response
 
 # Configurar CORS
 CORS(server, resources={
@@ -88,7 +90,7 @@ class KryptonBotSupabase:
             self.db = Database()
             
             # Inicializar clientes
-            self.binance_client = BinanceClient()
+            self.binance_client = BinanceClient(priority='confirmation')  # Usado pelo monitoramento de sinais
             self.telegram = TelegramNotifier()
             
             # Inicializar análise técnica com instância do banco
@@ -265,6 +267,7 @@ def create_app():
     server.register_blueprint(customers_bp, url_prefix='/api/customers')
     server.register_blueprint(binance_prices_bp)
     server.register_blueprint(scheduler_management_bp)
+    server.register_blueprint(stream_bp, url_prefix='/api')
     try:
         server.register_blueprint(restart_system_bp)
         print("✅ Blueprint restart_system registrado com sucesso")
@@ -482,11 +485,13 @@ def create_app():
     
     # NOVO: Endpoint público para sinais (sem autenticação)
     @server.route('/api/signals/public', methods=['GET'])
+    @cached_response('signals', ttl=60)
     def get_public_signals():
         """Endpoint público para obter sinais sem autenticação diretamente do banco"""
         try:
             from datetime import datetime, timedelta
-            from supabase import create_client, Client
+            from supabase import Client
+            from core.http_pool import get_supabase_client
             
             # Inicializar cliente Supabase
             supabase_url = os.getenv('SUPABASE_URL')
@@ -499,7 +504,7 @@ def create_app():
                     'message': 'Configuração do banco de dados não encontrada'
                 }), 500
             
-            supabase: Client = create_client(supabase_url, supabase_key)
+            supabase: Client = get_supabase_client(supabase_url, supabase_key)
             
             # Buscar sinais diretamente do banco de dados (baseado no horário de São Paulo)
             try:
@@ -623,6 +628,11 @@ def main():
     # Criar aplicação
     app = create_app()
     
+    # Canal de eventos em tempo real para muitos clientes (SSE/WebSocket em porta própria)
+    if os.getenv('EVENT_STREAM_SERVER', 'false').lower() == 'true':
+        from core.event_stream_server import event_stream_server
+        event_stream_server.start()
+    
     # Configurações do servidor
     port = int(os.getenv('FLASK_PORT', 5000))
     host = os.getenv('FLASK_HOST', '0.0.0.0')
@@ -0,0 +1,773 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark Suite - Benchmarks offline e reproduzíveis dos caminhos críticos
+Roda contra candles de fixture (sintéticos com semente fixa ou gravados pelo
+core/candle_archive.py) servidos por uma exchange falsa local, sem rede nem
+credenciais reais, e grava os resultados em JSON para comparar commits.
+
+Grupos:
+    scan          scan_market ponta a ponta (100/300/600 pares, cache frio e quente,
+                  análise em lote e em pipeline com o pool de processos)
+    cache         KlinesCache get/set com 1/4/8 threads disputando o lock
+    indicators    analyze_trend_df, analyze_entry_df e calculate_support_resistance_levels
+    confirmation  um ciclo do loop de confirmação com 10/100/1000 sinais pendentes
+    database      operações da Database nos backends csv e sqlite
+
+Uso:
+    python benchmark_suite.py                        # suíte completa → data/benchmarks/<data>_<commit>.json
+    python benchmark_suite.py --quick --only scan,cache
+    python benchmark_suite.py --compare data/benchmarks/anterior.json
+    python benchmark_suite.py --archive data/candles # candles gravados em vez dos sintéticos
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import argparse
+import contextlib
+import io
+import json
+import logging
+import platform
+import statistics
+import subprocess
+import tempfile
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+import pandas as pd
+
+from config import server
+from core import async_binance_client, binance_client
+from core.backtest_engine import ReplayTechnicalAnalysis
+from core.batch_indicators import OHLCV_COLUMNS
+from core.btc_signal_manager import BTCSignalManager
+from core.candle_archive import CandleArchive, load_archive
+from core.database import Database
+from core.kline_stream import INTERVAL_MS
+from core.klines_cache import KlinesCache
+from core.rate_limiter import WeightRateLimiter
+from core.request_coalescer import request_coalescer
+from core.ticker_snapshot import ticker_snapshot
+
+SUITE_VERSION = 1
+BENCHMARK_SEED = 20240101
+FIXTURE_HOURS = 24 * 30  # 720 candles 1h / 180 candles 4h por par
+DEFAULT_OUTPUT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'benchmarks')
+GROUPS = ('scan', 'cache', 'indicators', 'confirmation', 'database')
+# Caminhos do scan_market: 'pipelined' é o padrão de produção em máquinas com
+# mais de um núcleo; 'batch' analisa no processo principal; 'threads' é o legado
+SCAN_MODES = ('batch', 'pipelined')
+
+# Tamanhos da suíte completa e da rápida (--quick, usada no teste)
+FULL_SIZES = {
+    'scan_pairs': (100, 300, 600),
+    'cache_threads': (1, 4, 8),
+    'cache_operations': 40_000,
+    'indicator_frames': 100,
+    'confirmation_pending': (10, 100, 1000),
+    'database_rows': (200,),
+    'repeat': 3
+}
+QUICK_SIZES = {
+    'scan_pairs': (20,),
+    'cache_threads': (1, 4),
+    'cache_operations': 4_000,
+    'indicator_frames': 10,
+    'confirmation_pending': (10,),
+    'database_rows': (20,),
+    'repeat': 2
+}
+
+
+# ----------------------------------------------------------------------
+# Fixture de candles
+# ----------------------------------------------------------------------
+
+def fixture_candles(pair_count: int, hours: int = FIXTURE_HOURS, seed: int = BENCHMARK_SEED,
+                    archive_dir: Optional[str] = None) -> Dict[str, Dict[str, Any]]:
+    """BTCUSDT + `pair_count` pares com candles 1h/4h
+
+    Com `archive_dir` usa os candles gravados pelo CandleArchive (os
+    `pair_count` primeiros pares em ordem alfabética); senão gera o passeio
+    aleatório do test_backtest_engine com semente fixa.
+    """
+    if archive_dir:
+        candles = load_archive(CandleArchive(archive_dir))
+        if 'BTCUSDT' not in candles:
+            raise ValueError(f"Arquivo {archive_dir} não tem BTCUSDT 1h/4h")
+        others = sorted(symbol for symbol in candles if symbol != 'BTCUSDT')[:pair_count]
+        return {symbol: candles[symbol] for symbol in ['BTCUSDT'] + others}
+
+    from test_backtest_engine import synthetic_candles
+    return synthetic_candles(symbol_count=pair_count, hours=hours, seed=seed)
+
+
+def _subset(candles: Dict[str, Dict[str, Any]], pair_count: int) -> Dict[str, Dict[str, Any]]:
+    symbols = ['BTCUSDT'] + [symbol for symbol in candles if symbol != 'BTCUSDT'][:pair_count]
+    return {symbol: candles[symbol] for symbol in symbols}
+
+
+# ----------------------------------------------------------------------
+# Exchange falsa
+# ----------------------------------------------------------------------
+
+class FakeExchangeServer:
+    """Servidor HTTP local com os endpoints REST da Binance Futures usados pelo sistema
+
+    /fapi/v1/time, exchangeInfo, leverageBracket, ticker/24hr e klines
+    (limit, startTime/endTime) respondidos a partir dos candles de fixture.
+    `latency` simula o tempo de rede de cada requisição.
+    """
+
+    def __init__(self, candles: Dict[str, Dict[str, Any]], latency: float = 0.0, leverage: int = 75):
+        self.candles = candles
+        self.latency = latency
+        self.leverage = leverage
+        self.requests: Dict[str, int] = {}
+        self.lock = threading.Lock()
+        self.httpd: Optional[ThreadingHTTPServer] = None
+        self.thread: Optional[threading.Thread] = None
+        self.tickers = self._build_tickers()
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _build_tickers(self) -> List[Dict[str, str]]:
+        tickers = []
+        for symbol, series in self.candles.items():
+            hourly = series['1h']
+            window = slice(max(0, len(hourly['close']) - 24), None)
+            last, first = float(hourly['close'][-1]), float(hourly['open'][window][0])
+            volume = float(np.sum(hourly['volume'][window]))
+            tickers.append({
+                'symbol': symbol,
+                'lastPrice': str(last),
+                'openPrice': str(first),
+                'highPrice': str(float(np.max(hourly['high'][window]))),
+                'lowPrice': str(float(np.min(hourly['low'][window]))),
+                'volume': str(volume),
+                'quoteVolume': str(volume * last),
+                'priceChangePercent': str(round((last - first) / first * 100, 3))
+            })
+        return tickers
+
+    def klines(self, symbol: str, interval: str, limit: int, start_time: Optional[int] = None,
+               end_time: Optional[int] = None) -> List[List[Any]]:
+        series = self.candles.get(symbol, {}).get(interval)
+        if series is None:
+            return []
+        open_times = series['open_time']
+        start = int(np.searchsorted(open_times, start_time)) if start_time is not None else 0
+        end = int(np.searchsorted(open_times, end_time, side='right')) if end_time is not None else len(open_times)
+        start = start if start_time is not None else max(start, end - limit)
+        end = min(end, start + limit)
+        interval_ms = INTERVAL_MS[interval]
+        return [
+            [int(open_times[i]), str(series['open'][i]), str(series['high'][i]), str(series['low'][i]),
+             str(series['close'][i]), str(series['volume'][i]), int(open_times[i]) + interval_ms - 1,
+             '0', 100, '0', '0', '0']
+            for i in range(start, end)
+        ]
+
+    def respond(self, path: str, query: Dict[str, str]) -> Tuple[int, Any]:
+        with self.lock:
+            self.requests[path] = self.requests.get(path, 0) + 1
+        if path == '/fapi/v1/time':
+            return 200, {'serverTime': int(time.time() * 1000)}
+        if path == '/fapi/v1/exchangeInfo':
+            return 200, {'symbols': [
+                {'symbol': symbol, 'status': 'TRADING', 'contractType': 'PERPETUAL',
+                 'baseAsset': symbol[:-4], 'quoteAsset': 'USDT'}
+                for symbol in self.candles
+            ]}
+        if path == '/fapi/v1/leverageBracket':
+            brackets = [{'symbol': symbol, 'brackets': [{'bracket': 1, 'initialLeverage': self.leverage}]}
+                        for symbol in self.candles]
+            if 'symbol' in query:
+                return 200, [b for b in brackets if b['symbol'] == query['symbol']]
+            return 200, brackets
+        if path == '/fapi/v1/ticker/24hr':
+            if 'symbol' in query:
+                return 200, next((t for t in self.tickers if t['symbol'] == query['symbol']), {})
+            return 200, self.tickers
+        if path == '/fapi/v1/klines':
+            return 200, self.klines(
+                query.get('symbol', ''), query.get('interval', '1h'), int(query.get('limit', 500)),
+                int(query['startTime']) if 'startTime' in query else None,
+                int(query['endTime']) if 'endTime' in query else None
+            )
+        return 404, {'code': -1121, 'msg': f'Endpoint {path} não simulado'}
+
+    def start(self) -> str:
+        exchange = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'  # keep-alive, como na Binance
+
+            def do_GET(self):
+                parsed = urlparse(self.path)
+                query = {key: values[-1] for key, values in parse_qs(parsed.query).items()}
+                if exchange.latency:
+                    time.sleep(exchange.latency)
+                status, payload = exchange.respond(parsed.path, query)
+                body = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.send_header('X-MBX-USED-WEIGHT-1M', '1')
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.httpd.daemon_threads = True
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self.base_url
+
+    def stop(self) -> None:
+        if self.httpd is not None:
+            self.httpd.shutdown()
+            self.httpd.server_close()
+            self.httpd = None
+
+    def total_requests(self) -> int:
+        with self.lock:
+            return sum(self.requests.values())
+
+
+@contextlib.contextmanager
+def offline_exchange(candles: Dict[str, Dict[str, Any]], latency: float = 0.0,
+                     env: Optional[Dict[str, str]] = None) -> Iterator[FakeExchangeServer]:
+    """Aponta os clientes Binance criados dentro do bloco para a exchange falsa
+
+    Streams, arquivo de candles, Telegram e fila write-behind ficam
+    desligados; o orçamento de peso é ilimitado para medir só o código.
+    """
+    exchange = FakeExchangeServer(candles, latency)
+    base_url = exchange.start()
+    overrides = {
+        'USE_BINANCE_API': 'true',
+        'BINANCE_API_KEY': 'benchmark-key',
+        'BINANCE_SECRET_KEY': 'benchmark-secret',
+        'USE_KLINE_STREAM': 'false',
+        'USE_TICKER_STREAM': 'false',
+        'USE_CANDLE_ARCHIVE': 'false',
+        'USE_PROCESS_POOL_ANALYSIS': 'false',
+        'USE_WRITE_BEHIND_QUEUE': 'false',
+        **(env or {})
+    }
+    saved_env = {key: os.environ.get(key) for key in overrides}
+    futures_config = server.config['BINANCE_FUTURES']
+    saved_config = (futures_config['api_url'], server.config.get('TELEGRAM_TOKEN'))
+    saved_limiters = (binance_client.binance_rate_limiter, async_binance_client.binance_rate_limiter)
+    saved_ticker = (ticker_snapshot._rest_client, ticker_snapshot.updated_at, ticker_snapshot.last_attempt)
+    unlimited = WeightRateLimiter(weight_limit=10 ** 9)
+
+    os.environ.update(overrides)
+    futures_config['api_url'] = base_url
+    server.config['TELEGRAM_TOKEN'] = None
+    binance_client.binance_rate_limiter = async_binance_client.binance_rate_limiter = unlimited
+    ticker_snapshot._rest_client = None
+    reset_shared_state()
+    try:
+        yield exchange
+    finally:
+        exchange.stop()
+        for key, value in saved_env.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+        futures_config['api_url'], server.config['TELEGRAM_TOKEN'] = saved_config
+        binance_client.binance_rate_limiter, async_binance_client.binance_rate_limiter = saved_limiters
+        ticker_snapshot._rest_client, ticker_snapshot.updated_at, ticker_snapshot.last_attempt = saved_ticker
+        reset_shared_state()
+
+
+def reset_shared_state(btc_analyzer: Optional[Any] = None) -> None:
+    """Descarta respostas reaproveitadas, o snapshot de ticker e as análises BTC em cache
+
+    Equivale ao estado no início de um ciclo de produção (minutos depois do
+    anterior): a próxima leitura de cada dado vai à exchange.
+    """
+    with request_coalescer.lock:
+        request_coalescer.calls.clear()
+    ticker_snapshot.updated_at = ticker_snapshot.last_attempt = 0.0
+    if btc_analyzer is not None:
+        btc_analyzer.btc_cache['last_update'] = 0
+        btc_analyzer.correlation_cache['last_update'] = 0
+        btc_analyzer.correlation_cache['correlations'] = {}
+
+
+# ----------------------------------------------------------------------
+# Medição
+# ----------------------------------------------------------------------
+
+def summarize(times: Sequence[float]) -> Dict[str, float]:
+    """Estatísticas no estilo do pytest-benchmark (segundos)"""
+    return {
+        'rounds': len(times),
+        'min': min(times),
+        'max': max(times),
+        'mean': statistics.fmean(times),
+        'median': statistics.median(times),
+        'stdev': statistics.stdev(times) if len(times) > 1 else 0.0
+    }
+
+
+def measure(function: Callable[[Any], Any], setup: Optional[Callable[[], Any]] = None,
+            repeat: int = 3, warmup: int = 1) -> Tuple[Dict[str, float], Any]:
+    """Executa `function(setup())` `warmup` + `repeat` vezes; só a função é cronometrada
+
+    Returns:
+        Tuple (estatísticas, retorno da última execução)
+    """
+    result = None
+    times = []
+    for round_index in range(warmup + repeat):
+        state = setup() if setup else None
+        start = time.perf_counter()
+        result = function(state)
+        elapsed = time.perf_counter() - start
+        if round_index >= warmup:
+            times.append(elapsed)
+    return summarize(times), result
+
+
+def _result(name: str, params: Dict[str, Any], stats: Dict[str, float], **extra: Any) -> Dict[str, Any]:
+    return {'name': name, 'params': params, 'stats': stats, 'extra': extra}
+
+
+@contextlib.contextmanager
+def _quiet() -> Iterator[None]:
+    """Suprime os prints do sistema durante a medição"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        yield
+
+
+# ----------------------------------------------------------------------
+# Benchmarks
+# ----------------------------------------------------------------------
+
+def bench_scan_market(candles: Dict[str, Dict[str, Any]], pair_counts: Sequence[int], repeat: int,
+                      latency: float = 0.0, modes: Sequence[str] = SCAN_MODES) -> List[Dict[str, Any]]:
+    """scan_market completo: seleção de pares, klines pela exchange falsa, análise, pontuação e BTC
+
+    Cada modo roda com um TechnicalAnalysis novo; o pool de processos do modo
+    'pipelined' é iniciado na rodada de aquecimento e encerrado ao final.
+    """
+    from core.analysis_pool import analysis_pool
+    from core.technical_analysis import TechnicalAnalysis
+
+    results = []
+    for pair_count in pair_counts:
+        subset = _subset(candles, pair_count)
+        for mode in modes:
+            if mode not in ('threads', 'batch', 'pipelined'):
+                raise ValueError(f"Modo de scan desconhecido: {mode} (opções: threads, batch, pipelined)")
+            with tempfile.TemporaryDirectory() as directory, offline_exchange(subset, latency) as exchange:
+                with _quiet():
+                    analyzer = TechnicalAnalysis(Database(base_dir=directory))
+                analyzer.config['max_pairs'] = pair_count
+                analyzer.config['batch_analysis'] = mode != 'threads'
+                analyzer.config['process_pool_analysis'] = mode == 'pipelined'
+                manager = analyzer.btc_signal_manager
+
+                def cold():
+                    for cache in (analyzer.cache_manager.klines_1h, analyzer.cache_manager.klines_4h,
+                                  analyzer.cache_manager.klines_1d):
+                        cache.clear()
+                    analyzer.top_pairs = []
+                    manager.pending_signals = []
+                    reset_shared_state(manager.btc_analyzer)
+                    return exchange.total_requests()
+
+                def warm():
+                    manager.pending_signals = []
+                    return exchange.total_requests()
+
+                def scan(requests_before):
+                    with _quiet():
+                        analyzer.scan_market()
+                    return exchange.total_requests() - requests_before
+
+                try:
+                    for cache, setup in (('cold', cold), ('warm', warm)):
+                        stats, requests = measure(scan, setup, repeat=repeat)
+                        results.append(_result(
+                            'scan_market', {'pairs': pair_count, 'cache': cache, 'mode': mode}, stats,
+                            exchange_requests=requests, pending_signals=len(manager.pending_signals),
+                            pairs_per_second=pair_count / stats['median'] if stats['median'] else None
+                        ))
+                finally:
+                    analysis_pool.shutdown()
+    return results
+
+
+def bench_klines_cache(candles: Dict[str, Dict[str, Any]], thread_counts: Sequence[int], operations: int,
+                       repeat: int, symbols: int = 100, write_ratio: float = 0.2) -> List[Dict[str, Any]]:
+    """get/set concorrentes no KlinesCache (80% leituras de 100 candles, 20% gravações)"""
+    names = [symbol for symbol in candles][:symbols]
+    frames = {symbol: pd.DataFrame({col: candles[symbol]['1h'][col][-300:] for col in
+                                    ('open_time',) + tuple(OHLCV_COLUMNS)}) for symbol in names}
+    results = []
+    for thread_count in thread_counts:
+        per_thread = operations // thread_count
+
+        def setup():
+            cache = KlinesCache(default_ttl=3600)
+            for symbol in names:
+                cache.set(symbol, '1h', frames[symbol].iloc[:200], 200)
+            return cache
+
+        def run(cache):
+            def worker(index):
+                rng = np.random.default_rng(BENCHMARK_SEED + index)
+                picks = rng.integers(0, len(names), per_thread)
+                writes = rng.random(per_thread) < write_ratio
+                offsets = rng.integers(200, 300, per_thread)
+                for pick, write, offset in zip(picks.tolist(), writes.tolist(), offsets.tolist()):
+                    symbol = names[pick]
+                    if write:
+                        cache.set(symbol, '1h', frames[symbol].iloc[offset - 100:offset], 100)
+                    else:
+                        cache.get(symbol, '1h', 100)
+
+            threads = [threading.Thread(target=worker, args=(index,)) for index in range(thread_count)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        stats, _ = measure(run, setup, repeat=repeat)
+        total = per_thread * thread_count
+        results.append(_result('klines_cache', {'threads': thread_count, 'operations': total}, stats,
+                               operations_per_second=total / stats['median']))
+    return results
+
+
+def bench_indicators(candles: Dict[str, Dict[str, Any]], frame_count: int, repeat: int) -> List[Dict[str, Any]]:
+    """Análises por DataFrame de 100 candles: cálculo completo e atualização incremental"""
+    analyzer = ReplayTechnicalAnalysis()
+    symbols = [symbol for symbol in candles][:frame_count]
+    trend = [pd.DataFrame({col: candles[s]['4h'][col][-100:] for col in ('open_time',) + tuple(OHLCV_COLUMNS)})
+             for s in symbols]
+    entry = [pd.DataFrame({col: candles[s]['1h'][col][-100:] for col in ('open_time',) + tuple(OHLCV_COLUMNS)})
+             for s in symbols]
+    cases = {
+        ('analyze_trend_df', 'full'): lambda i: analyzer.analyze_trend_df(trend[i]),
+        ('analyze_trend_df', 'incremental'): lambda i: analyzer.analyze_trend_df(trend[i], symbols[i], '4h'),
+        ('analyze_entry_df', 'full'): lambda i: analyzer.analyze_entry_df(entry[i]),
+        ('analyze_entry_df', 'incremental'): lambda i: analyzer.analyze_entry_df(entry[i], symbols[i], '1h'),
+        ('calculate_support_resistance_levels', 'full'): lambda i: analyzer.calculate_support_resistance_levels(
+            entry[i], float(entry[i]['close'].iloc[-1]))
+    }
+    results = []
+    for (name, mode), call in cases.items():
+        def run(_):
+            with _quiet():
+                for index in range(len(symbols)):
+                    call(index)
+
+        stats, _ = measure(run, repeat=repeat)
+        results.append(_result(name, {'frames': len(symbols), 'mode': mode}, stats,
+                               per_call_us=stats['median'] / len(symbols) * 1e6))
+    return results
+
+
+class BenchmarkSignalManager(BTCSignalManager):
+    """BTCSignalManager cujas decisões finais só são contadas
+
+    O ciclo medido é a verificação de cada pendente (klines pela exchange
+    falsa, ticker, alinhamento BTC e histórico); as gravações de confirmados
+    são medidas à parte no grupo database.
+    """
+
+    def __init__(self, db_instance: Database):
+        super().__init__(db_instance)
+        self.decisions = {'confirm': 0, 'reject': 0, 'expire': 0}
+
+    def _confirm_signal(self, signal, reasons) -> None:
+        self.decisions['confirm'] += 1
+
+    def _reject_signal(self, signal, reasons) -> None:
+        self.decisions['reject'] += 1
+
+    def _expire_signal(self, signal) -> None:
+        self.decisions['expire'] += 1
+
+
+def bench_confirmation_cycle(candles: Dict[str, Dict[str, Any]], pending_counts: Sequence[int], repeat: int,
+                             latency: float = 0.0) -> List[Dict[str, Any]]:
+    """_run_confirmation_cycle com N sinais pendentes (dois tipos por par)"""
+    results = []
+    for pending_count in pending_counts:
+        subset = _subset(candles, (pending_count + 1) // 2)
+        symbols = [symbol for symbol in subset if symbol != 'BTCUSDT']
+        with tempfile.TemporaryDirectory() as directory, offline_exchange(subset, latency) as exchange:
+            with _quiet():
+                manager = BenchmarkSignalManager(Database(base_dir=directory))
+
+            def setup():
+                manager.pending_signals = []
+                manager.decisions = dict.fromkeys(manager.decisions, 0)
+                with _quiet():
+                    for index in range(pending_count):
+                        symbol = symbols[index // 2]
+                        price = float(subset[symbol]['1h']['close'][-1])
+                        signal_type = 'COMPRA' if index % 2 == 0 else 'VENDA'
+                        manager.add_pending_signal({
+                            'symbol': symbol, 'type': signal_type, 'entry_price': price,
+                            'target_price': price * (1.06 if signal_type == 'COMPRA' else 0.94),
+                            'projection_percentage': 6.0, 'quality_score': 70.0, 'signal_class': 'PREMIUM'
+                        })
+                reset_shared_state(manager.btc_analyzer)
+                return exchange.total_requests()
+
+            def cycle(requests_before):
+                with _quiet():
+                    manager._run_confirmation_cycle()
+                return exchange.total_requests() - requests_before
+
+            stats, requests = measure(cycle, setup, repeat=repeat)
+            results.append(_result('confirmation_cycle', {'pending': pending_count}, stats,
+                                   exchange_requests=requests, decisions=dict(manager.decisions),
+                                   per_signal_ms=stats['median'] / pending_count * 1000))
+    return results
+
+
+def bench_database(row_counts: Sequence[int], repeat: int,
+                   backends: Sequence[str] = ('csv', 'sqlite')) -> List[Dict[str, Any]]:
+    """Gravação e leitura de sinais/tickers da Database em um diretório temporário"""
+    results = []
+    for backend in backends:
+        for rows in row_counts:
+            timings: Dict[str, List[float]] = {}
+
+            def timed(operation, function):
+                start = time.perf_counter()
+                function()
+                timings.setdefault(operation, []).append(time.perf_counter() - start)
+
+            saved_backend = os.environ.get('DATABASE_BACKEND')
+            os.environ['DATABASE_BACKEND'] = backend
+            try:
+                for _ in range(repeat):
+                    with tempfile.TemporaryDirectory() as directory, _quiet():
+                        db = Database(base_dir=directory)
+                        signals = [{
+                            'symbol': f'C{index}USDT', 'type': 'COMPRA' if index % 2 else 'VENDA',
+                            'entry_price': 10.0 + index, 'entry_time': f'2025-01-02 {index % 24:02d}:00:00',
+                            'target_price': 11.0 + index, 'projection_percentage': 6.0, 'signal_class': 'PREMIUM',
+                            'status': 'OPEN', 'quality_score': 70.0
+                        } for index in range(rows)]
+                        closing = signals[::10]
+                        timed('add_signal', lambda: [db.add_signal(dict(s), save_remote=False) for s in signals])
+                        timed('get_all_signals', db.get_all_signals)
+                        timed('get_signal_by_symbol',
+                              lambda: [db.get_signal_by_symbol(s['symbol']) for s in signals[::max(1, rows // 20)]])
+                        timed('update_signal_status', lambda: [
+                            db.update_signal_status(s['symbol'], s['entry_time'], 'CLOSED', exit_price=1.0)
+                            for s in closing
+                        ])
+                        timed('add_ticker', lambda: [db.add_ticker({'symbol': s['symbol'], 'baseAsset': 'C',
+                                                                    'quoteAsset': 'USDT'}) for s in signals[:50]])
+                        timed('get_all_tickers', db.get_all_tickers)
+                        if db.storage is not None:
+                            db.storage.close()
+            finally:
+                if saved_backend is None:
+                    os.environ.pop('DATABASE_BACKEND', None)
+                else:
+                    os.environ['DATABASE_BACKEND'] = saved_backend
+
+            for operation, times in timings.items():
+                results.append(_result('database', {'backend': backend, 'operation': operation, 'rows': rows},
+                                       summarize(times)))
+    return results
+
+
+# ----------------------------------------------------------------------
+# Execução, gravação e comparação
+# ----------------------------------------------------------------------
+
+def _git_revision() -> Dict[str, Any]:
+    directory = os.path.dirname(os.path.abspath(__file__))
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=directory, capture_output=True,
+                                text=True, timeout=10).stdout.strip()
+        dirty = bool(subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=directory,
+                                    capture_output=True, text=True, timeout=30).stdout.strip())
+        return {'commit': commit or 'unknown', 'dirty': dirty}
+    except (OSError, subprocess.SubprocessError):
+        return {'commit': 'unknown', 'dirty': None}
+
+
+def run_suite(groups: Sequence[str] = GROUPS, quick: bool = False, archive_dir: Optional[str] = None,
+              repeat: Optional[int] = None, latency: float = 0.0,
+              scan_pairs: Optional[Sequence[int]] = None,
+              scan_modes: Sequence[str] = SCAN_MODES) -> Dict[str, Any]:
+    """Executa os grupos escolhidos e devolve o documento de resultados"""
+    sizes = dict(QUICK_SIZES if quick else FULL_SIZES)
+    if scan_pairs:
+        sizes['scan_pairs'] = tuple(scan_pairs)
+    rounds = repeat or sizes['repeat']
+    needed = max([0] + (list(sizes['scan_pairs']) if 'scan' in groups else [])
+                 + [(n + 1) // 2 for n in sizes['confirmation_pending']] + [sizes['indicator_frames'], 100])
+    candles = fixture_candles(needed, archive_dir=archive_dir)
+
+    started = time.perf_counter()
+    results: List[Dict[str, Any]] = []
+    for group in groups:
+        print(f"⏱️ Grupo {group}...")
+        if group == 'scan':
+            results += bench_scan_market(candles, sizes['scan_pairs'], rounds, latency, scan_modes)
+        elif group == 'cache':
+            results += bench_klines_cache(candles, sizes['cache_threads'], sizes['cache_operations'], rounds)
+        elif group == 'indicators':
+            results += bench_indicators(candles, sizes['indicator_frames'], rounds)
+        elif group == 'confirmation':
+            results += bench_confirmation_cycle(candles, sizes['confirmation_pending'], rounds, latency)
+        elif group == 'database':
+            results += bench_database(sizes['database_rows'], rounds)
+        else:
+            raise ValueError(f"Grupo desconhecido: {group} (opções: {', '.join(GROUPS)})")
+
+    return {
+        'suite': 'benchmark_suite',
+        'version': SUITE_VERSION,
+        'meta': {
+            **_git_revision(),
+            'created_at': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'pandas': pd.__version__,
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'quick': quick,
+            'fixture': {'source': archive_dir or 'synthetic', 'seed': BENCHMARK_SEED, 'pairs': len(candles) - 1,
+                        'hours': FIXTURE_HOURS},
+            'exchange_latency': latency,
+            'elapsed_seconds': round(time.perf_counter() - started, 2)
+        },
+        'results': results
+    }
+
+
+def result_key(result: Dict[str, Any]) -> str:
+    """Identificador estável de um benchmark: nome + parâmetros ordenados"""
+    params = ','.join(f"{key}={value}" for key, value in sorted(result['params'].items()))
+    return f"{result['name']}[{params}]"
+
+
+def save_results(document: Dict[str, Any], path: Optional[str] = None) -> str:
+    """Grava o JSON (padrão: data/benchmarks/<data>_<commit>.json) e devolve o caminho"""
+    if path is None:
+        stamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        path = os.path.join(DEFAULT_OUTPUT_DIR, f"{stamp}_{document['meta']['commit']}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as file:
+        json.dump(document, file, indent=2, ensure_ascii=False)
+    return path
+
+
+def load_results(path: str) -> Dict[str, Any]:
+    with open(path, encoding='utf-8') as file:
+        return json.load(file)
+
+
+def compare_results(baseline: Dict[str, Any], current: Dict[str, Any],
+                    threshold: float = 0.10) -> List[Dict[str, Any]]:
+    """Compara medianas por benchmark
+
+    Returns:
+        Linhas {'key', 'baseline', 'current', 'ratio', 'status'} com status
+        'regression' / 'improvement' quando a razão passa de 1 ± threshold,
+        'stable' caso contrário e 'new' / 'removed' sem correspondente.
+    """
+    before = {result_key(r): r['stats']['median'] for r in baseline['results']}
+    after = {result_key(r): r['stats']['median'] for r in current['results']}
+    rows = []
+    for key in list(after) + [key for key in before if key not in after]:
+        old, new = before.get(key), after.get(key)
+        if old is None or new is None:
+            rows.append({'key': key, 'baseline': old, 'current': new, 'ratio': None,
+                         'status': 'new' if old is None else 'removed'})
+            continue
+        ratio = new / old if old > 0 else float('inf')
+        status = 'regression' if ratio > 1 + threshold else 'improvement' if ratio < 1 - threshold else 'stable'
+        rows.append({'key': key, 'baseline': old, 'current': new, 'ratio': ratio, 'status': status})
+    return rows
+
+
+def print_results(document: Dict[str, Any]) -> None:
+    meta = document['meta']
+    print(f"\n📊 Benchmarks @ {meta['commit']}{' (alterado)' if meta['dirty'] else ''} | "
+          f"Python {meta['python']} | {meta['cpu_count']} CPU(s) | {meta['elapsed_seconds']}s")
+    for result in document['results']:
+        stats = result['stats']
+        extra = ' '.join(f"{key}={value:.1f}" if isinstance(value, float) else f"{key}={value}"
+                         for key, value in result['extra'].items())
+        print(f"   {result_key(result):<75} mediana {stats['median'] * 1000:>10.2f}ms "
+              f"± {stats['stdev'] * 1000:.2f} {extra}")
+
+
+def print_comparison(rows: List[Dict[str, Any]]) -> None:
+    icons = {'regression': '🔴', 'improvement': '🟢', 'stable': '⚪', 'new': '🆕', 'removed': '➖'}
+    print("\n🔍 Comparação com a execução de referência (mediana):")
+    for row in rows:
+        if row['ratio'] is None:
+            print(f"   {icons[row['status']]} {row['key']}")
+        else:
+            print(f"   {icons[row['status']]} {row['key']:<75} {row['baseline'] * 1000:>10.2f}ms → "
+                  f"{row['current'] * 1000:>10.2f}ms ({row['ratio']:.2f}x)")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='Benchmarks offline do scan, confirmação, cache e banco')
+    parser.add_argument('--only', help=f"Grupos separados por vírgula ({', '.join(GROUPS)})")
+    parser.add_argument('--quick', action='store_true', help='Tamanhos reduzidos (verificação rápida)')
+    parser.add_argument('--repeat', type=int, help='Rodadas medidas por benchmark')
+    parser.add_argument('--pairs', help='Tamanhos do scan separados por vírgula (padrão 100,300,600)')
+    parser.add_argument('--modes', help=f"Modos do scan separados por vírgula (padrão {','.join(SCAN_MODES)})")
+    parser.add_argument('--latency', type=float, default=0.0, help='Latência simulada da exchange (s)')
+    parser.add_argument('--archive', help='Diretório do CandleArchive com candles gravados')
+    parser.add_argument('--output', help='Arquivo JSON de saída')
+    parser.add_argument('--compare', help='JSON de referência para comparar')
+    parser.add_argument('--threshold', type=float, default=0.10, help='Variação tolerada na comparação')
+    args = parser.parse_args(argv)
+
+    # Logs por requisição (urllib3/asyncio/BinanceClient) distorcem as medições
+    for name in ('urllib3', 'asyncio', 'BinanceClient'):
+        logging.getLogger(name).setLevel(logging.WARNING)
+    groups = [group.strip() for group in args.only.split(',')] if args.only else list(GROUPS)
+    pairs = [int(value) for value in args.pairs.split(',')] if args.pairs else None
+    modes = [mode.strip() for mode in args.modes.split(',')] if args.modes else SCAN_MODES
+    print("🧪 === BENCHMARK SUITE ===")
+    document = run_suite(groups, quick=args.quick, archive_dir=args.archive, repeat=args.repeat,
+                         latency=args.latency, scan_pairs=pairs, scan_modes=modes)
+    print_results(document)
+    print(f"💾 Resultados: {save_results(document, args.output)}")
+
+    if args.compare:
+        rows = compare_results(load_results(args.compare), document, args.threshold)
+        print_comparison(rows)
+        return 1 if any(row['status'] == 'regression' for row in rows) else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
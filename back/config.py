@@ -22,6 +22,10 @@ if not os.getenv('FLASK_ENV'):
 # Configurar Flask com pasta static correta
 server = Flask(__name__, static_folder='static', static_url_path='')
 
+# Serialização JSON rápida (orjson com fallback para json) em jsonify
+from core.fast_json import install_json_provider
+install_json_provider(server)
+
 
 
 # Configurações de segurança
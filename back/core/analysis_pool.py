@@ -0,0 +1,368 @@
+# -*- coding: utf-8 -*-
+"""
+Analysis Pool - Estágio de análise do scan em processos separados
+Os candles de cada lote de símbolos são copiados uma única vez para um bloco de
+memória compartilhada; processos persistentes avançam o estado incremental dos
+indicadores, calculam suporte/resistência e padrões de candle (CPU, sem disputar
+o GIL) e devolvem apenas registros pequenos (e o novo estado) para a pontuação
+feita no processo principal.
+"""
+
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import shared_memory
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .incremental_indicators import IndicatorState, indicator_engine
+
+OHLCV_COLUMNS = ('open', 'high', 'low', 'close', 'volume')
+
+# open_time segue no bloco (NaN quando ausente) para o estado incremental dos indicadores
+FRAME_COLUMNS = ('open_time',) + OHLCV_COLUMNS
+
+# Layout de um símbolo no bloco: (symbol, offset, candles de tendência, candles de entrada)
+LayoutEntry = Tuple[str, int, int, int]
+
+# EMA/MACD/RSI/ATR (tendência, entrada) por símbolo, calculados pelo motor incremental
+SeriesIndicators = Dict[str, Tuple[Dict[str, float], Dict[str, float]]]
+
+# Estado incremental (tendência, entrada) por símbolo; None = ainda não semeado
+SeriesStates = Dict[str, Tuple[Optional[IndicatorState], Optional[IndicatorState]]]
+
+_worker_analyzer = None
+
+
+def _get_worker_analyzer():
+    """Instância de TechnicalAnalysis usada só pelos métodos puros de análise
+
+    Os métodos chamados (analyze_*_df, analyze_*_batch, suporte/resistência e
+    padrões de candle) não usam banco, API nem threads, então o __init__
+    completo não é executado nos processos de análise.
+    """
+    global _worker_analyzer
+    if _worker_analyzer is None:
+        from .technical_analysis import TechnicalAnalysis
+        _worker_analyzer = TechnicalAnalysis.__new__(TechnicalAnalysis)
+    return _worker_analyzer
+
+
+def pack_frames(frames: Dict[str, Tuple[pd.DataFrame, pd.DataFrame]]) -> Tuple[shared_memory.SharedMemory, List[LayoutEntry]]:
+    """Copia os candles OHLCV dos símbolos para um novo bloco de memória compartilhada
+
+    Cada símbolo ocupa as colunas de FRAME_COLUMNS contíguas do DataFrame de
+    tendência seguidas das do DataFrame de entrada.
+    """
+    layout: List[LayoutEntry] = []
+    offset = 0
+    for symbol, (trend_df, entry_df) in frames.items():
+        layout.append((symbol, offset, len(trend_df), len(entry_df)))
+        offset += len(FRAME_COLUMNS) * (len(trend_df) + len(entry_df))
+
+    shm = shared_memory.SharedMemory(create=True, size=max(offset, 1) * 8)
+    block = np.ndarray((offset,), dtype=np.float64, buffer=shm.buf)
+    for (symbol, start, trend_len, entry_len), (trend_df, entry_df) in zip(layout, frames.values()):
+        position = start
+        for df, length in ((trend_df, trend_len), (entry_df, entry_len)):
+            for col in FRAME_COLUMNS:
+                # open_time em ms cabe exatamente em float64 (< 2**53)
+                block[position:position + length] = df[col].to_numpy(dtype=np.float64) if col in df.columns else np.nan
+                position += length
+    del block
+    return shm, layout
+
+
+def unpack_frames(block: np.ndarray, layout: List[LayoutEntry]) -> Dict[str, Tuple[pd.DataFrame, pd.DataFrame]]:
+    """Reconstrói os DataFrames (cópias) a partir do bloco compartilhado"""
+    frames = {}
+    for symbol, start, trend_len, entry_len in layout:
+        position = start
+        pair = []
+        for length in (trend_len, entry_len):
+            columns = {}
+            for col in FRAME_COLUMNS:
+                values = block[position:position + length].copy()
+                position += length
+                if col == 'open_time':
+                    if length == 0 or np.isnan(values).any():
+                        continue
+                    values = values.astype(np.int64)
+                columns[col] = values
+            pair.append(pd.DataFrame(columns))
+        frames[symbol] = (pair[0], pair[1])
+    return frames
+
+
+def advance_states(frames: Dict[str, Tuple[pd.DataFrame, pd.DataFrame]],
+                   states: SeriesStates) -> Tuple[SeriesIndicators, SeriesStates]:
+    """Avança o estado incremental de cada símbolo com seus candles
+
+    Símbolos sem estado são semeados aqui (a parte cara), fora do processo principal.
+    """
+    indicators: SeriesIndicators = {}
+    advanced: SeriesStates = {}
+    for symbol, (trend_df, entry_df) in frames.items():
+        trend_state, entry_state = states.get(symbol, (None, None))
+        trend_state, trend_values = indicator_engine.advance(trend_state, trend_df)
+        entry_state, entry_values = indicator_engine.advance(entry_state, entry_df)
+        indicators[symbol] = (trend_values, entry_values)
+        advanced[symbol] = (trend_state, entry_state)
+    return indicators, advanced
+
+
+def analyze_frames(frames: Dict[str, Tuple[pd.DataFrame, pd.DataFrame]], vectorized: bool = True,
+                   indicators: Optional[SeriesIndicators] = None,
+                   states: Optional[SeriesStates] = None) -> List[Dict[str, Any]]:
+    """Calcula as análises de tendência/entrada e os padrões de cada símbolo
+
+    `indicators` substitui EMA/MACD/RSI/ATR calculados sobre a janela pelos do
+    estado incremental do processo principal (mesmos valores da análise por símbolo).
+    Com `states` os indicadores saem do estado incremental avançado aqui, e cada
+    registro leva o novo estado em 'indicator_states' para o processo principal guardar.
+
+    Returns:
+        Lista de {'symbol', 'trend_analysis', 'entry_analysis', 'patterns'} no
+        formato aceito por TechnicalAnalysis._evaluate_signal
+    """
+    analyzer = _get_worker_analyzer()
+    records = []
+    advanced: Optional[SeriesStates] = None
+    if states is not None:
+        indicators, advanced = advance_states(frames, states)
+
+    if vectorized:
+        groups: Dict[Tuple[int, int], List[str]] = {}
+        for symbol, (trend_df, entry_df) in frames.items():
+            groups.setdefault((len(trend_df), len(entry_df)), []).append(symbol)
+
+        for symbols in groups.values():
+            trend_analyses = analyzer.analyze_trend_batch(
+                [frames[symbol][0] for symbol in symbols],
+                [indicators[symbol][0] for symbol in symbols] if indicators else None
+            )
+            entry_analyses, patterns = analyzer.analyze_entry_batch(
+                [frames[symbol][1] for symbol in symbols],
+                [indicators[symbol][1] for symbol in symbols] if indicators else None
+            )
+            for index, symbol in enumerate(symbols):
+                records.append({
+                    'symbol': symbol,
+                    'trend_analysis': trend_analyses[index],
+                    'entry_analysis': entry_analyses[index],
+                    'patterns': patterns[index]
+                })
+        return _attach_states(records, advanced)
+
+    for symbol, (trend_df, entry_df) in frames.items():
+        current_price = float(entry_df['close'].iloc[-1])
+        levels = analyzer.calculate_support_resistance_levels(entry_df, current_price)
+        trend_indicators, entry_indicators = indicators[symbol] if indicators else (None, None)
+        records.append({
+            'symbol': symbol,
+            'trend_analysis': analyzer.analyze_trend_df(trend_df, indicators=trend_indicators),
+            'entry_analysis': analyzer.analyze_entry_df(entry_df, indicators=entry_indicators),
+            'patterns': {
+                'support_distance': float(levels['support_distance']),
+                'resistance_distance': float(levels['resistance_distance']),
+                'candle_scores': {
+                    signal_type: float(analyzer._analyze_candlestick_patterns(entry_df, signal_type))
+                    for signal_type in ('COMPRA', 'VENDA')
+                }
+            }
+        })
+    return _attach_states(records, advanced)
+
+
+def _attach_states(records: List[Dict[str, Any]], advanced: Optional[SeriesStates]) -> List[Dict[str, Any]]:
+    if advanced is not None:
+        for record in records:
+            record['indicator_states'] = advanced[record['symbol']]
+    return records
+
+
+def analyze_shared_chunk(shm_name: str, size: int, layout: List[LayoutEntry], vectorized: bool = True,
+                         indicators: Optional[SeriesIndicators] = None,
+                         states: Optional[SeriesStates] = None) -> Tuple[List[Dict[str, Any]], float]:
+    """Ponto de entrada dos processos de análise
+
+    Returns:
+        Tuple (registros, segundos de CPU gastos no processo)
+    """
+    start = time.process_time()
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        block = np.ndarray((size,), dtype=np.float64, buffer=shm.buf)
+        frames = unpack_frames(block, layout)
+        del block
+    finally:
+        shm.close()
+    records = analyze_frames(frames, vectorized, indicators, states)
+    return records, time.process_time() - start
+
+
+def _preload_worker() -> None:
+    """Importa as dependências pesadas uma vez por processo"""
+    _get_worker_analyzer()
+
+
+class AnalysisProcessPool:
+    """
+    Pool persistente de processos para o estágio de análise do scan
+
+    Cada lote enviado recebe seu próprio bloco de memória compartilhada, liberado
+    quando o lote termina. Se o pool não puder ser usado (ambiente sem
+    multiprocessing, processo de análise encerrado), o lote é analisado no
+    próprio processo para que o scan nunca perca pares.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, start_method: Optional[str] = None):
+        """Inicializa o pool (os processos são criados no primeiro lote)
+
+        Args:
+            max_workers: Processos de análise (padrão: ANALYSIS_WORKERS ou núcleos da máquina)
+            start_method: Método de criação dos processos (padrão: ANALYSIS_POOL_START_METHOD
+                          ou forkserver quando disponível)
+        """
+        self.max_workers = max_workers or int(os.getenv('ANALYSIS_WORKERS', str(os.cpu_count() or 1)))
+        available = multiprocessing.get_all_start_methods()
+        self.start_method = start_method or os.getenv(
+            'ANALYSIS_POOL_START_METHOD', 'forkserver' if 'forkserver' in available else 'spawn'
+        )
+
+        self.executor: Optional[ProcessPoolExecutor] = None
+        self.lock = threading.Lock()
+
+        self.stats = {
+            'chunks_submitted': 0,
+            'symbols_analyzed': 0,
+            'bytes_shared': 0,
+            'worker_cpu_seconds': 0.0,
+            'local_fallbacks': 0,
+            'pool_restarts': 0
+        }
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self.lock:
+            if self.executor is None:
+                context = multiprocessing.get_context(self.start_method)
+                if self.start_method == 'forkserver':
+                    context.set_forkserver_preload(['numpy', 'pandas', 'core.analysis_pool'])
+                self.executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=context,
+                    initializer=_preload_worker
+                )
+                print(f"🧵 Pool de análise iniciado: {self.max_workers} processos ({self.start_method})")
+            return self.executor
+
+    def _reset_executor(self) -> None:
+        with self.lock:
+            if self.executor is not None:
+                self.executor.shutdown(wait=False, cancel_futures=True)
+                self.executor = None
+                self.stats['pool_restarts'] += 1
+
+    def _run_locally(self, frames: Dict[str, Tuple[pd.DataFrame, pd.DataFrame]], vectorized: bool,
+                     indicators: Optional[SeriesIndicators] = None,
+                     states: Optional[SeriesStates] = None) -> Future:
+        future: Future = Future()
+        try:
+            future.set_result(analyze_frames(frames, vectorized, indicators, states))
+        except Exception as e:
+            future.set_exception(e)
+        self.stats['local_fallbacks'] += 1
+        return future
+
+    def submit(self, frames: Dict[str, Tuple[pd.DataFrame, pd.DataFrame]], vectorized: bool = True,
+               indicators: Optional[SeriesIndicators] = None,
+               states: Optional[SeriesStates] = None) -> Future:
+        """Envia um lote de símbolos para análise
+
+        `indicators` ou `states` (opcionais) seguem com o lote: são objetos
+        pequenos, enviados por pickle junto com o layout do bloco compartilhado.
+        Com `states` os processos avançam o estado incremental e o devolvem nos
+        registros ('indicator_states').
+
+        Returns:
+            Future com a lista de registros de analyze_frames
+        """
+        if not frames:
+            future: Future = Future()
+            future.set_result([])
+            return future
+
+        try:
+            shm, layout = pack_frames(frames)
+        except Exception as e:
+            print(f"⚠️ Memória compartilhada indisponível ({e}) - analisando no processo principal")
+            return self._run_locally(frames, vectorized, indicators, states)
+
+        size = shm.size // 8
+        result: Future = Future()
+
+        def _release() -> None:
+            shm.close()
+            shm.unlink()
+
+        def _on_done(worker_future: Future) -> None:
+            _release()
+            try:
+                records, cpu_seconds = worker_future.result()
+            except BrokenProcessPool:
+                print("⚠️ Pool de análise interrompido - analisando lote no processo principal")
+                self._reset_executor()
+                local = self._run_locally(frames, vectorized, indicators, states)
+                if local.exception() is not None:
+                    result.set_exception(local.exception())
+                else:
+                    result.set_result(local.result())
+                return
+            except Exception as e:
+                result.set_exception(e)
+                return
+
+            with self.lock:
+                self.stats['symbols_analyzed'] += len(records)
+                self.stats['worker_cpu_seconds'] += cpu_seconds
+            result.set_result(records)
+
+        try:
+            worker_future = self._get_executor().submit(analyze_shared_chunk, shm.name, size, layout, vectorized,
+                                                           indicators, states)
+        except Exception as e:
+            _release()
+            print(f"⚠️ Pool de análise indisponível ({e}) - analisando no processo principal")
+            self._reset_executor()
+            return self._run_locally(frames, vectorized, indicators, states)
+
+        with self.lock:
+            self.stats['chunks_submitted'] += 1
+            self.stats['bytes_shared'] += shm.size
+        worker_future.add_done_callback(_on_done)
+        return result
+
+    def shutdown(self) -> None:
+        """Encerra os processos de análise"""
+        with self.lock:
+            if self.executor is not None:
+                self.executor.shutdown(wait=True, cancel_futures=True)
+                self.executor = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Retorna estatísticas do pool"""
+        with self.lock:
+            return {
+                **self.stats,
+                'max_workers': self.max_workers,
+                'running': self.executor is not None
+            }
+
+
+# Instância global para uso em outros módulos
+analysis_pool = AnalysisProcessPool()
@@ -0,0 +1,313 @@
+# -*- coding: utf-8 -*-
+"""
+Async Binance Client - Cliente asyncio para dados de mercado da Binance Futures
+Mesma interface de leitura do BinanceClient (get_klines, get_24h_ticker_data,
+get_exchange_info, get_leverage_brackets) com concorrência limitada, para que a
+fase de busca do scan seja um único gather em vez de threads bloqueadas.
+"""
+
+import asyncio
+import time
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from .binance_client import BinanceClient
+from .metrics import BINANCE_REQUEST_ERRORS, BINANCE_REQUEST_SECONDS, BINANCE_WEIGHT_WAIT_SECONDS
+from .rate_limiter import binance_rate_limiter, endpoint_weight
+from .request_coalescer import request_coalescer
+
+try:
+    import aiohttp
+    AIOHTTP_AVAILABLE = True
+except ImportError:
+    aiohttp = None
+    AIOHTTP_AVAILABLE = False
+
+
+class AsyncBinanceClient:
+    """
+    Cliente asyncio da Binance Futures
+
+    Reaproveita credenciais, sincronização de tempo e assinatura de um
+    BinanceClient e compartilha o mesmo orçamento global de peso. Deve ser
+    usado como gerenciador de contexto assíncrono dentro de um event loop:
+
+        async with AsyncBinanceClient(binance) as client:
+            klines = await client.get_klines('BTCUSDT', '1h', 100)
+    """
+
+    def __init__(self, sync_client: Optional[BinanceClient] = None, priority: Optional[str] = None,
+                 max_concurrency: int = 20, timeout: float = 30.0):
+        """Inicializa o cliente assíncrono
+
+        Args:
+            sync_client: BinanceClient com credenciais/configuração (cria um se None)
+            priority: Fila de prioridade no orçamento de peso (usa a do sync_client se None)
+            max_concurrency: Máximo de requisições simultâneas
+            timeout: Timeout total de cada requisição em segundos
+        """
+        self.sync_client = sync_client or BinanceClient(priority=priority or 'scan')
+        self.priority = priority or self.sync_client.priority
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.rate_limiter = binance_rate_limiter
+        self.logger = self.sync_client.logger
+
+        self.session = None
+        self.semaphore: Optional[asyncio.Semaphore] = None
+        self.in_flight = 0
+        self.pending: Dict[Tuple, asyncio.Future] = {}
+
+        self.stats = {
+            'requests': 0,
+            'coalesced': 0,
+            'errors': 0,
+            'max_in_flight': 0,
+            'rate_limit_wait_seconds': 0.0
+        }
+
+    @property
+    def use_binance_api(self) -> bool:
+        return AIOHTTP_AVAILABLE and getattr(self.sync_client, 'use_binance_api', False)
+
+    async def __aenter__(self) -> 'AsyncBinanceClient':
+        await self.open()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.close()
+
+    async def open(self) -> None:
+        """Cria a sessão aiohttp (pool de conexões keep-alive) no loop atual"""
+        if self.session is not None or not AIOHTTP_AVAILABLE:
+            return
+        connector = aiohttp.TCPConnector(limit=self.max_concurrency, keepalive_timeout=30)
+        self.session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=self.timeout)
+        )
+        self.semaphore = asyncio.Semaphore(self.max_concurrency)
+
+    async def close(self) -> None:
+        """Fecha a sessão e suas conexões"""
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    async def _acquire_weight(self, weight: int, lane: str) -> None:
+        """Aguarda orçamento de peso sem bloquear o event loop"""
+        while True:
+            wait = self.rate_limiter.try_acquire(weight, lane)
+            if wait <= 0:
+                return
+            self.stats['rate_limit_wait_seconds'] += wait
+            BINANCE_WEIGHT_WAIT_SECONDS.observe(wait, client='async')
+            await asyncio.sleep(wait)
+
+    async def make_request(self, endpoint: str, method: str = 'GET', params: Optional[Dict] = None,
+                           auth: bool = False, priority: Optional[str] = None) -> Optional[Any]:
+        """Faz requisição assíncrona respeitando concorrência e orçamento de peso"""
+        if not self.use_binance_api:
+            return None
+        if self.session is None:
+            await self.open()
+
+        if method != 'GET' or auth:
+            return await self._send_request(endpoint, method, params, auth, priority)
+
+        # GETs públicos idênticos: resultado recente do agrupador global ou
+        # a mesma tarefa em andamento neste event loop
+        key = request_coalescer.make_key(endpoint, params)
+        found, result = request_coalescer.peek(key)
+        if found:
+            self.stats['coalesced'] += 1
+            return result
+
+        pending = self.pending.get(key)
+        if pending is not None:
+            self.stats['coalesced'] += 1
+            return await asyncio.shield(pending)
+
+        future = asyncio.get_running_loop().create_future()
+        self.pending[key] = future
+        try:
+            result = await self._send_request(endpoint, method, params, auth, priority)
+            request_coalescer.remember(key, result)
+            future.set_result(result)
+            return result
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Evita aviso de exceção não consumida quando ninguém aguardava
+            future.exception()
+            raise
+        finally:
+            del self.pending[key]
+
+    async def _send_request(self, endpoint: str, method: str, params: Optional[Dict],
+                            auth: bool, priority: Optional[str]) -> Optional[Any]:
+        """Executa a requisição com retries (sem agrupamento)"""
+        max_retries = 3
+        retry_delay = 1
+        weight = endpoint_weight(endpoint, params)
+        lane = priority or self.priority
+        url = f"{self.sync_client.base_url}{endpoint}"
+        path = endpoint.split('?', 1)[0]
+
+        async with self.semaphore:
+            self.in_flight += 1
+            self.stats['max_in_flight'] = max(self.stats['max_in_flight'], self.in_flight)
+            try:
+                for attempt in range(max_retries):
+                    try:
+                        await self._acquire_weight(weight, lane)
+
+                        headers = {'X-MBX-APIKEY': self.sync_client.api_key} if auth else {}
+                        request_params = dict(params or {})
+                        if auth:
+                            request_params.setdefault('recvWindow', 10000)
+                            request_params['timestamp'] = self.sync_client.get_timestamp()
+                            request_params['signature'] = self.sync_client._generate_signature(request_params)
+                        request_params = {key: str(value) for key, value in request_params.items()}
+
+                        self.stats['requests'] += 1
+                        request_start = time.perf_counter()
+                        if method == 'GET':
+                            request = self.session.get(url, params=request_params, headers=headers)
+                        else:
+                            request = self.session.post(url, json=request_params, headers=headers)
+
+                        async with request as response:
+                            BINANCE_REQUEST_SECONDS.observe(time.perf_counter() - request_start,
+                                                            endpoint=path, client='async')
+                            self.rate_limiter.update_from_headers(response.headers)
+
+                            if response.status == 200:
+                                return await response.json()
+                            BINANCE_REQUEST_ERRORS.inc(endpoint=path, reason=str(response.status))
+                            if response.status in (429, 418):
+                                retry_after = int(response.headers.get('Retry-After', retry_delay))
+                                self.logger.warning(f"Rate limit atingido ({response.status}). Suspendendo requisições por {retry_after}s")
+                                self.rate_limiter.penalize(retry_after)
+                            else:
+                                text = await response.text()
+                                self.logger.error(f"Erro na API: {response.status} - {text}")
+                                if attempt == max_retries - 1:
+                                    self.stats['errors'] += 1
+                                    return None
+                                await asyncio.sleep(retry_delay * (attempt + 1))
+
+                    except asyncio.TimeoutError:
+                        BINANCE_REQUEST_ERRORS.inc(endpoint=path, reason='timeout')
+                        self.logger.error(f"Timeout na requisição para {endpoint}")
+                        await asyncio.sleep(retry_delay * (attempt + 1))
+                    except Exception as e:
+                        BINANCE_REQUEST_ERRORS.inc(endpoint=path, reason='exception')
+                        self.logger.error(f"Erro na requisição: {e}")
+                        if attempt < max_retries - 1:
+                            await asyncio.sleep(retry_delay * (attempt + 1))
+
+                self.stats['errors'] += 1
+                return None
+            finally:
+                self.in_flight -= 1
+
+    async def get_exchange_info(self) -> Optional[Dict]:
+        """Get exchange information with validation"""
+        if not self.use_binance_api:
+            return {}
+
+        data = await self.make_request('/fapi/v1/exchangeInfo')
+        if not data or 'symbols' not in data:
+            self.logger.error("Invalid exchange info response")
+            return {}
+        return data
+
+    async def get_leverage_brackets(self, symbol: Optional[str] = None) -> Dict[str, List[Dict[str, Any]]]:
+        """Obtém informações sobre alavancagem dos pares"""
+        if not self.use_binance_api:
+            return {}
+
+        params: Dict[str, Any] = {}
+        if symbol is not None:
+            params['symbol'] = str(symbol)
+
+        response = await self.make_request('/fapi/v1/leverageBracket', params=params, auth=True)
+        if not response:
+            self.logger.error("Resposta inválida de leverage brackets")
+            return {}
+
+        try:
+            return BinanceClient._parse_leverage_brackets(response, symbol)
+        except Exception as e:
+            self.logger.error(f"Erro ao obter leverage brackets: {e}")
+            return {}
+
+    async def get_24h_ticker_data(self, symbols: List[str]) -> Dict[str, Dict]:
+        """Obtém dados de volume e variação 24h dos pares"""
+        if not self.use_binance_api:
+            return {}
+
+        response = await self.make_request('/fapi/v1/ticker/24hr')
+        if not response:
+            return {}
+
+        try:
+            return BinanceClient._parse_24h_ticker(response, symbols)
+        except Exception as e:
+            self.logger.error(f"Erro ao obter dados 24h: {e}")
+            return {}
+
+    async def get_klines(self, symbol: str, interval: str = '1h', limit: int = 100) -> List[Dict[str, Any]]:
+        """Obtém dados históricos (klines) para um símbolo"""
+        if not self.use_binance_api:
+            return []
+
+        params = {'symbol': symbol, 'interval': interval, 'limit': limit}
+        response = await self.make_request('/fapi/v1/klines', 'GET', params)
+        if not response:
+            return []
+
+        try:
+            return BinanceClient._parse_klines(response)
+        except Exception as e:
+            self.logger.error(f"Erro ao obter klines para {symbol}: {e}")
+            return []
+
+    async def get_klines_many(self, requests: List[Tuple[str, str, int]]) -> Dict[Tuple[str, str], List[Dict[str, Any]]]:
+        """Busca várias séries de klines em um único gather
+
+        Args:
+            requests: Lista de (symbol, interval, limit)
+
+        Returns:
+            Dict {(symbol, interval): klines}
+        """
+        results = await asyncio.gather(
+            *(self.get_klines(symbol, interval, limit) for symbol, interval, limit in requests)
+        )
+        return {
+            (symbol, interval): klines
+            for (symbol, interval, _), klines in zip(requests, results)
+        }
+
+    async def iter_klines_many(self, requests: List[Tuple[str, str, int]]
+                               ) -> AsyncIterator[Tuple[Tuple[str, str], List[Dict[str, Any]]]]:
+        """Como get_klines_many, mas entrega cada série assim que chega (ordem de conclusão)
+
+        Permite que o consumidor processe as primeiras séries enquanto as
+        demais ainda estão em voo.
+
+        Yields:
+            ((symbol, interval), klines)
+        """
+        async def fetch(symbol: str, interval: str, limit: int):
+            return (symbol, interval), await self.get_klines(symbol, interval, limit)
+
+        for next_result in asyncio.as_completed([fetch(*request) for request in requests]):
+            yield await next_result
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Retorna estatísticas do cliente"""
+        return {**self.stats, 'in_flight': self.in_flight, 'max_concurrency': self.max_concurrency}
@@ -0,0 +1,230 @@
+# -*- coding: utf-8 -*-
+"""
+Auth Token Index - Índice em memória dos tokens de autenticação
+Mapa token → (user_id, expiração) com um min-heap de expirações para remover
+tokens vencidos; cada requisição autenticada é validada em O(1) sem pandas e
+sem ler o arquivo de tokens. Opcionalmente usa o Redis do DatabaseConfig para
+que vários processos compartilhem os mesmos tokens.
+"""
+
+import heapq
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+REDIS_KEY_PREFIX = 'auth_token:'
+
+
+def _to_timestamp(value: Any) -> float:
+    """Converte expires_at (datetime ou ISO) para timestamp; inválido conta como expirado"""
+    if isinstance(value, datetime):
+        return value.timestamp()
+    if isinstance(value, (int, float)):
+        return float(value)
+    try:
+        return datetime.fromisoformat(str(value).strip()).timestamp()
+    except (TypeError, ValueError):
+        return 0.0
+
+
+class AuthTokenIndex:
+    """
+    Índice de tokens de autenticação
+
+    Sem Redis, o índice é carregado do armazenamento e atualizado a cada escrita
+    (save/store/remove); quem o usa confere as entradas com o armazenamento
+    (sync/load) para enxergar logouts feitos por outros processos. Com Redis,
+    cada token é uma chave com TTL e o Redis é a fonte da verdade (logout em um
+    processo vale para todos).
+    """
+
+    def __init__(self, redis_client: Any = None, clock: Callable[[], float] = time.time):
+        """Inicializa o índice
+
+        Args:
+            redis_client: Cliente Redis (ex.: DatabaseConfig.redis_client) ou None
+            clock: Função de tempo (injetável para testes)
+        """
+        self.redis_client = redis_client
+        self.clock = clock
+
+        self.tokens: Dict[str, Tuple[str, float]] = {}
+        self.user_tokens: Dict[str, Set[str]] = {}
+        self.expiry_heap: List[Tuple[float, str]] = []
+        self.loaded = False
+        self.lock = threading.Lock()
+
+        self.stats = {
+            'lookups': 0,
+            'hits': 0,
+            'misses': 0,
+            'expired_evicted': 0,
+            'redis_errors': 0
+        }
+
+    # ------------------------------------------------------------------
+    # Escrita
+    # ------------------------------------------------------------------
+
+    def load(self, records: Iterable[Dict[str, Any]]) -> int:
+        """Carrega os tokens persistidos (registros com token, user_id e expires_at)
+
+        Substitui o conteúdo local, então também serve para recarregar o índice.
+        """
+        with self.lock:
+            self.tokens = {}
+            self.user_tokens = {}
+            self.expiry_heap = []
+            for record in records:
+                if record.get('token'):
+                    self._put_locked(str(record['token']), str(record.get('user_id')),
+                                     _to_timestamp(record.get('expires_at')))
+            self._evict_expired_locked(self.clock())
+            self.loaded = True
+            loaded = dict(self.tokens)
+
+        if self.redis_client is not None:
+            # Tokens emitidos antes do Redis também precisam valer
+            now = self.clock()
+            try:
+                for token, (user_id, expires_ts) in loaded.items():
+                    self.redis_client.set(f"{REDIS_KEY_PREFIX}{token}", user_id,
+                                          ex=max(int(expires_ts - now), 1), nx=True)
+            except Exception as e:
+                self.stats['redis_errors'] += 1
+                print(f"⚠️ Erro ao carregar tokens no Redis: {e}")
+        return len(loaded)
+
+    def put(self, token: str, user_id: Any, expires_at: Any, replace_user_tokens: bool = True) -> None:
+        """Registra um token (por padrão substituindo os tokens anteriores do usuário)"""
+        user_id = str(user_id)
+        expires_ts = _to_timestamp(expires_at)
+        with self.lock:
+            if replace_user_tokens:
+                for old_token in list(self.user_tokens.get(user_id, ())):
+                    self._discard_locked(old_token)
+            self._put_locked(token, user_id, expires_ts)
+
+        if self.redis_client is not None:
+            ttl = int(expires_ts - self.clock())
+            try:
+                if ttl > 0:
+                    self.redis_client.setex(f"{REDIS_KEY_PREFIX}{token}", ttl, user_id)
+            except Exception as e:
+                self.stats['redis_errors'] += 1
+                print(f"⚠️ Erro ao salvar token no Redis: {e}")
+
+    def remove(self, token: str) -> None:
+        """Remove um token (logout ou expiração)"""
+        with self.lock:
+            self._discard_locked(token)
+        if self.redis_client is not None:
+            try:
+                self.redis_client.delete(f"{REDIS_KEY_PREFIX}{token}")
+            except Exception as e:
+                self.stats['redis_errors'] += 1
+                print(f"⚠️ Erro ao remover token do Redis: {e}")
+
+    def sync(self, token: str, record: Optional[Dict[str, Any]]) -> None:
+        """Alinha a entrada local com o registro do armazenamento (None = token removido)"""
+        with self.lock:
+            if record is None:
+                self._discard_locked(token)
+                return
+            entry = (str(record.get('user_id')), _to_timestamp(record.get('expires_at')))
+            if self.tokens.get(token) != entry:
+                self._put_locked(token, *entry)
+
+    def _put_locked(self, token: str, user_id: str, expires_ts: float) -> None:
+        self._discard_locked(token)
+        self.tokens[token] = (user_id, expires_ts)
+        self.user_tokens.setdefault(user_id, set()).add(token)
+        heapq.heappush(self.expiry_heap, (expires_ts, token))
+
+    def _discard_locked(self, token: str) -> None:
+        # A entrada do heap fica para trás e é ignorada quando chegar ao topo
+        entry = self.tokens.pop(token, None)
+        if entry is not None:
+            tokens = self.user_tokens.get(entry[0])
+            if tokens is not None:
+                tokens.discard(token)
+                if not tokens:
+                    del self.user_tokens[entry[0]]
+
+    def _evict_expired_locked(self, now: float) -> List[str]:
+        evicted = []
+        while self.expiry_heap and self.expiry_heap[0][0] <= now:
+            expires_ts, token = heapq.heappop(self.expiry_heap)
+            entry = self.tokens.get(token)
+            if entry is not None and entry[1] == expires_ts:
+                self._discard_locked(token)
+                evicted.append(token)
+        self.stats['expired_evicted'] += len(evicted)
+        return evicted
+
+    # ------------------------------------------------------------------
+    # Leitura
+    # ------------------------------------------------------------------
+
+    def lookup(self, token: str) -> Optional[str]:
+        """Retorna o user_id de um token válido (None se ausente ou expirado)"""
+        self.stats['lookups'] += 1
+
+        if self.redis_client is not None:
+            try:
+                value = self.redis_client.get(f"{REDIS_KEY_PREFIX}{token}")
+                if value is None:
+                    self.stats['misses'] += 1
+                    return None
+                self.stats['hits'] += 1
+                return value.decode('utf-8') if isinstance(value, bytes) else str(value)
+            except Exception as e:
+                # Redis fora: usar o índice local
+                self.stats['redis_errors'] += 1
+                print(f"⚠️ Erro ao consultar token no Redis: {e}")
+
+        with self.lock:
+            self._evict_expired_locked(self.clock())
+            entry = self.tokens.get(token)
+        if entry is None:
+            self.stats['misses'] += 1
+            return None
+        self.stats['hits'] += 1
+        return entry[0]
+
+    def contains(self, token: str) -> bool:
+        """Indica se o token está no índice local (mesmo que expirado)"""
+        with self.lock:
+            return token in self.tokens
+
+    def pop_expired(self) -> List[str]:
+        """Remove do índice e retorna os tokens vencidos (para limpar o armazenamento)"""
+        with self.lock:
+            return self._evict_expired_locked(self.clock())
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Retorna estatísticas do índice"""
+        with self.lock:
+            lookups = self.stats['lookups']
+            return {
+                **self.stats,
+                'tokens': len(self.tokens),
+                'users': len(self.user_tokens),
+                'heap_size': len(self.expiry_heap),
+                'backend': 'redis' if self.redis_client is not None else 'memory',
+                'hit_rate': self.stats['hits'] / lookups * 100 if lookups > 0 else 0
+            }
+
+
+def create_auth_token_index() -> AuthTokenIndex:
+    """Cria o índice usando o Redis do DatabaseConfig quando AUTH_TOKEN_REDIS=true"""
+    redis_client = None
+    if os.getenv('AUTH_TOKEN_REDIS', 'false').lower() == 'true':
+        try:
+            from .db_config import DatabaseConfig
+            redis_client = DatabaseConfig().redis_client
+        except ImportError as e:
+            print(f"⚠️ Redis indisponível para tokens ({e}) - usando índice em memória")
+    return AuthTokenIndex(redis_client=redis_client)
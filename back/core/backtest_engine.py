@@ -0,0 +1,748 @@
+# -*- coding: utf-8 -*-
+"""
+Backtest Engine - Replay histórico do pipeline TechnicalAnalysis + BTCSignalManager
+Lê candles 1h/4h de arquivos locais e passa cada hora fechada pela mesma
+pontuação, alvo e regras de confirmação usadas ao vivo, com um relógio simulado
+no lugar de datetime.now(). Os sinais confirmados são acompanhados na
+SignalTable do SignalMonitoringSystem (lucro alavancado, simulação de $1.000,
+conclusão e expiração). Os indicadores de um par vêm de uma única passada do
+IncrementalIndicatorEngine pela série (o mesmo estado persistente do scan ao
+vivo, uma linha por hora), sem nenhuma chamada de rede.
+"""
+
+import argparse
+import contextlib
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import pytz
+from numpy.lib.stride_tricks import sliding_window_view
+
+from .batch_indicators import OHLCV_COLUMNS
+from .btc_correlation_analyzer import BTCCorrelationAnalyzer
+from .btc_signal_manager import BTCSignalManager, ConfirmationReason, PendingSignal
+from .fast_json import dumps_bytes
+from .incremental_indicators import indicator_engine
+from .kline_stream import INTERVAL_MS
+from .signal_monitoring_system import MonitoredSignal, SignalMonitoringSystem
+from .signal_table import DATETIME_FORMAT, STATUS_MONITORING, SignalRow
+from .technical_analysis import TechnicalAnalysis
+
+# Série de candles: colunas NumPy alinhadas (open_time em ms + OHLCV)
+CANDLE_FIELDS = ('open_time',) + OHLCV_COLUMNS
+CandleSeries = Dict[str, np.ndarray]
+
+# Colunas de BacktestEngine.score_symbol (pontuação por hora fechada, sem limites)
+SCORE_FIELDS = ('close_ms', 'entry_price', 'is_buy', 'trend', 'entry', 'rsi', 'pattern',
+                'trend_strength', 'atr_ratio', 'rsi_value')
+
+SAO_PAULO_TZ = pytz.timezone('America/Sao_Paulo')
+DAILY_RESET_HOUR = 21  # Restart diário às 21:00 (SignalCleanup)
+
+
+# ----------------------------------------------------------------------
+# Dados
+# ----------------------------------------------------------------------
+
+def load_candles(directory: str, symbols: Optional[Iterable[str]] = None,
+                 intervals: Tuple[str, ...] = ('1h', '4h')) -> Dict[str, Dict[str, CandleSeries]]:
+    """Carrega arquivos <SYMBOL>_<interval>.csv (open_time,open,high,low,close,volume)
+
+    Returns:
+        Dict símbolo → intervalo → colunas ordenadas por open_time
+    """
+    wanted = set(symbols) if symbols else None
+    candles: Dict[str, Dict[str, CandleSeries]] = {}
+    for name in sorted(os.listdir(directory)):
+        stem, extension = os.path.splitext(name)
+        symbol, _, interval = stem.rpartition('_')
+        if extension != '.csv' or interval not in intervals or (wanted and symbol not in wanted):
+            continue
+        frame = pd.read_csv(os.path.join(directory, name), usecols=list(CANDLE_FIELDS))
+        frame = frame.sort_values('open_time').drop_duplicates('open_time')
+        series = {col: frame[col].to_numpy(dtype=np.float64) for col in OHLCV_COLUMNS}
+        series['open_time'] = frame['open_time'].to_numpy(dtype=np.int64)
+        candles.setdefault(symbol, {})[interval] = series
+    return candles
+
+
+def save_candles(directory: str, symbol: str, interval: str, series: CandleSeries) -> str:
+    """Grava uma série no formato lido por load_candles"""
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"{symbol}_{interval}.csv")
+    pd.DataFrame({col: series[col] for col in CANDLE_FIELDS}).to_csv(path, index=False)
+    return path
+
+
+def window_arrays(series: CandleSeries, window: int, first: int = 0,
+                  last: Optional[int] = None) -> Dict[str, np.ndarray]:
+    """Matrizes OHLCV (janelas × candles) das janelas que terminam nos candles first..last
+
+    A janela da linha k termina no candle `window - 1 + first + k`; as
+    matrizes são visões da série (sem cópia).
+    """
+    stop = None if last is None else last + 1
+    return {col: sliding_window_view(series[col], window)[first:stop] for col in OHLCV_COLUMNS}
+
+
+def last_closed_index(close_times: np.ndarray, now_ms: int) -> int:
+    """Índice do último candle fechado até now_ms (-1 se nenhum)"""
+    return int(np.searchsorted(close_times, now_ms, side='right')) - 1
+
+
+class SimulatedClock:
+    """Relógio do replay (milissegundos desde epoch, como open_time da Binance)"""
+
+    def __init__(self, now_ms: int = 0):
+        self.now_ms = int(now_ms)
+
+    def set(self, now_ms: int) -> None:
+        self.now_ms = int(now_ms)
+
+    def now(self) -> datetime:
+        """Horário simulado em São Paulo (com timezone)"""
+        return datetime.fromtimestamp(self.now_ms / 1000, SAO_PAULO_TZ)
+
+    def naive(self) -> datetime:
+        """Horário simulado de São Paulo sem timezone (formato da SignalTable)"""
+        return self.now().replace(tzinfo=None)
+
+
+# ----------------------------------------------------------------------
+# Componentes do pipeline com o relógio simulado
+# ----------------------------------------------------------------------
+
+class ReplayTechnicalAnalysis(TechnicalAnalysis):
+    """TechnicalAnalysis apenas com pontuação e alvo (sem cliente, banco ou threads)"""
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        self.config = {**self.SCORING_CONFIG, **(config or {})}
+
+
+class ReplayBTCAnalyzer(BTCCorrelationAnalyzer):
+    """Análise BTC consolidada (4H + 1H) no horário simulado
+
+    Os indicadores do BTC vêm de uma passada do motor incremental pela série
+    (como o estado persistente do analisador ao vivo); a análise de cada par de
+    candles fechados usa as mesmas regras de tendência/momentum/volatilidade do
+    analisador ao vivo e é memorizada.
+    """
+
+    def __init__(self, clock: SimulatedClock, series: Optional[Dict[str, CandleSeries]], window: int,
+                 memo: Optional[Dict[Tuple[str, int], Dict[str, Any]]] = None):
+        super().__init__(None)
+        self.clock = clock
+        self.window = window
+        self.series: Dict[str, CandleSeries] = {}
+        self.close_times: Dict[str, np.ndarray] = {}
+        self.indicators: Dict[str, Dict[str, np.ndarray]] = {}
+        self._memo: Dict[Tuple[str, int], Dict[str, Any]] = {} if memo is None else memo
+        self._current_positions: Tuple[int, int] = (-1, -1)
+        self._current: Dict[str, Any] = {}
+
+        for timeframe in ('4h', '1h'):
+            data = (series or {}).get(timeframe)
+            if data is None or len(data['close']) < window:
+                continue
+            self.series[timeframe] = data
+            self.close_times[timeframe] = data['open_time'] + INTERVAL_MS[timeframe]
+            self.indicators[timeframe] = indicator_engine.replay(data['high'], data['low'], data['close'])
+
+    def _timeframe_analysis(self, timeframe: str, position: int) -> Dict[str, Any]:
+        """Análise de um timeframe no candle `position` (memorizada por candle)"""
+        analysis = self._memo.get((timeframe, position))
+        if analysis is None:
+            data = self.series[timeframe]
+            start = position - self.window + 1
+            df = pd.DataFrame({col: data[col][start:position + 1] for col in OHLCV_COLUMNS})
+            indicators = {name: float(values[position]) for name, values in self.indicators[timeframe].items()}
+            analysis = self._memo[(timeframe, position)] = self._analyze_btc_dataframe(df, timeframe, indicators)
+        return analysis
+
+    def get_current_btc_analysis(self) -> Dict[str, Any]:
+        """Análise consolidada com os candles fechados até o horário simulado"""
+        if len(self.series) < 2:
+            return self._get_default_btc_analysis()
+
+        positions = tuple(last_closed_index(self.close_times[tf], self.clock.now_ms) for tf in ('4h', '1h'))
+        if min(positions) < self.window - 1:
+            return self._get_default_btc_analysis()
+
+        if positions != self._current_positions:
+            self._current = self._consolidate_btc_analysis(
+                self._timeframe_analysis('4h', positions[0]),
+                self._timeframe_analysis('1h', positions[1])
+            )
+            self._current_positions = positions
+        return self._current
+
+    def calculate_symbol_btc_correlation(self, symbol: str, timeframe: str = '1h', periods: int = 100) -> float:
+        """Correlação não é usada na pontuação nem na confirmação: valor neutro"""
+        return 0.5
+
+
+class ReplaySignalManager(BTCSignalManager):
+    """BTCSignalManager com relógio simulado e dados de mercado do replay
+
+    Sem cliente Binance, banco, Telegram ou fila de gravação: confirmações
+    abrem uma posição no monitoramento do engine e rejeições/expirações são
+    apenas registradas.
+    """
+
+    def __init__(self, engine: 'BacktestEngine', config: Optional[Dict[str, Any]] = None):
+        self.engine = engine
+        self.config = {**self.DEFAULT_CONFIG, **(config or {})}
+        self.btc_analyzer = engine.btc_analyzer
+        self.pending_signals: List[PendingSignal] = []
+        self.confirmed_signals: List[Dict[str, Any]] = []
+        self.rejected_signals: List[Dict[str, Any]] = []
+        self.daily_confirmed_signals: set = set()
+        self.last_reset_date = datetime.now().date()
+        self.is_monitoring = False
+        self.notifier = None
+
+    def _now(self) -> datetime:
+        return self.engine.clock.now()
+
+    def _get_current_symbol_data(self, symbol: str) -> Optional[Dict[str, Any]]:
+        return self.engine.symbol_data(symbol)
+
+    def _confirm_signal(self, signal: PendingSignal, reasons: List[str]) -> None:
+        self.daily_confirmed_signals.add((signal['symbol'], signal['type']))
+        self.confirmed_signals.append({
+            'id': signal['id'],
+            'symbol': signal['symbol'],
+            'type': signal['type'],
+            'signal_class': signal['signal_class'],
+            'quality_score': signal['quality_score'],
+            'confirmation_attempts': signal['confirmation_attempts'],
+            'confirmation_reasons': reasons,
+            'confirmed_at': self._now()
+        })
+        self.engine.open_position(signal)
+
+    def _reject_signal(self, signal: PendingSignal, reasons: List[str]) -> None:
+        self.rejected_signals.append({
+            'id': signal['id'],
+            'symbol': signal['symbol'],
+            'type': signal['type'],
+            'signal_class': signal['signal_class'],
+            'quality_score': signal['quality_score'],
+            'confirmation_attempts': signal['confirmation_attempts'],
+            'rejection_reasons': reasons,
+            'rejected_at': self._now()
+        })
+
+
+class ReplayMonitoringSystem(SignalMonitoringSystem):
+    """SignalMonitoringSystem alimentado pelos candles do replay
+
+    A cada candle fechado as posições são atualizadas primeiro com o extremo
+    favorável (máxima na COMPRA, mínima na VENDA), para detectar o objetivo
+    atingido dentro da hora, e depois com o fechamento.
+    """
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        super().__init__(binance_client=None, database=None)
+        self.config.update(config or {})
+
+    def _leverage_info(self, symbol: str) -> Dict[str, Any]:
+        """Alavancagem padrão do LeverageDetector (sem consultar a API)"""
+        detector = self.leverage_detector
+        if symbol not in detector.leverage_cache:
+            detector.leverage_cache[symbol] = detector._get_default_leverage(symbol)
+            detector.cache_timestamp[symbol] = float('inf')
+        return detector.get_leverage_info(symbol)
+
+    def open_position(self, signal: PendingSignal, confirmed_at: datetime, price: Optional[float]) -> int:
+        """Equivalente a add_signal_to_monitoring com horário e preço do replay"""
+        leverage_info = self._leverage_info(signal['symbol'])
+        stamp = confirmed_at.strftime(DATETIME_FORMAT)
+        row = self.table.add(MonitoredSignal(
+            id=signal['id'],
+            symbol=signal['symbol'],
+            signal_type=signal['type'],
+            entry_price=float(signal['entry_price']),
+            target_price=float(signal['target_price']),
+            created_at=signal['created_at'].strftime(DATETIME_FORMAT),
+            confirmed_at=stamp,
+            max_leverage=leverage_info['max_leverage'],
+            required_percentage=leverage_info['required_percentage'],
+            last_updated=stamp
+        ))
+        if price:
+            self.table.update_prices(np.array([row]), np.array([price]), confirmed_at)
+        return row
+
+    def replay_candle(self, rows: np.ndarray, favorable: np.ndarray, closes: np.ndarray, now: datetime) -> None:
+        """Aplica um candle fechado às posições ativas e encerra concluídas/expiradas"""
+        self.table.update_prices(rows, favorable, now)
+        self._check_completed_signals()
+        active = rows[self.table.column('status_code')[rows] == STATUS_MONITORING]
+        self.table.update_prices(active, closes[np.isin(rows, active)], now)
+        self._check_expired_signals()
+
+    def _publish_signal_closed(self, signal: SignalRow):
+        """Replay não publica no barramento de eventos"""
+
+
+# ----------------------------------------------------------------------
+# Engine
+# ----------------------------------------------------------------------
+
+class BacktestEngine:
+    """
+    Replay histórico do scanner, da confirmação BTC e do monitoramento
+
+    1. Candidatos: para cada par, as janelas de `window` candles que terminam
+       em cada hora fechada são analisadas em lote (analyze_trend_arrays /
+       analyze_entry_arrays) com os indicadores do estado incremental e
+       pontuadas (score_symbol); os limites de qualidade e o alvo são
+       aplicados por TechnicalAnalysis._build_candidate.
+    2. Relógio: avança em passos de `check_interval`; a cada passo os candles
+       fechados desde o anterior atualizam as posições, o ciclo real de
+       confirmação (_run_confirmation_cycle) roda sobre os pendentes e os
+       candidatos da hora entram por add_pending_signal.
+    3. Monitoramento: posições confirmadas na SignalTable, encerradas por
+       objetivo atingido ou após `monitoring_days`.
+
+    Sem candles intra-hora, as verificações dentro da mesma hora veem os
+    mesmos candles fechados (ao vivo o último candle ainda está em formação).
+    """
+
+    def __init__(self, candles: Dict[str, Dict[str, CandleSeries]],
+                 analysis_config: Optional[Dict[str, Any]] = None,
+                 confirmation_config: Optional[Dict[str, Any]] = None,
+                 monitoring_config: Optional[Dict[str, Any]] = None,
+                 window: int = 100, btc_symbol: str = 'BTCUSDT', verbose: bool = False,
+                 scored: Optional[Dict[str, np.ndarray]] = None,
+                 btc_cache: Optional[Dict[Tuple[str, int], Dict[str, Any]]] = None):
+        """Inicializa o engine
+
+        Args:
+            candles: Dict símbolo → intervalo → série (ver load_candles)
+            analysis_config: Sobrescreve TechnicalAnalysis.SCORING_CONFIG
+            confirmation_config: Sobrescreve BTCSignalManager.DEFAULT_CONFIG
+            monitoring_config: Sobrescreve a configuração do SignalMonitoringSystem
+            window: Candles por análise (mesmo limite de get_klines)
+            btc_symbol: Par usado na análise BTC (também é analisado como os demais)
+            verbose: Mostrar os logs do pipeline (silenciados por padrão)
+            scored: Pontuações já calculadas por símbolo (ver score_symbol)
+            btc_cache: Análises BTC por candle compartilhadas entre replays dos mesmos candles
+        """
+        self.candles = candles
+        self.window = window
+        self.verbose = verbose
+        self.clock = SimulatedClock()
+        self.scored: Dict[str, np.ndarray] = dict(scored or {})
+
+        with self._output():
+            self.analysis = ReplayTechnicalAnalysis(analysis_config)
+            self.entry_tf = self.analysis.config['entry_timeframe']
+            self.trend_tf = self.analysis.config['trend_timeframe']
+            self.btc_analyzer = ReplayBTCAnalyzer(self.clock, candles.get(btc_symbol), window, btc_cache)
+            self.manager = ReplaySignalManager(self, confirmation_config)
+            self.monitoring = ReplayMonitoringSystem(monitoring_config)
+
+        # Horários de fechamento dos candles de entrada por símbolo
+        self.close_times = {
+            symbol: series[self.entry_tf]['open_time'] + INTERVAL_MS[self.entry_tf]
+            for symbol, series in candles.items() if self.entry_tf in series
+        }
+        self.stats = {'candidates': 0, 'pending_added': 0, 'duplicates_ignored': 0,
+                      'confirmation_cycles': 0, 'candles_replayed': 0}
+
+    @contextlib.contextmanager
+    def _output(self):
+        """Silencia os prints do pipeline (milhares por replay) fora do modo verbose"""
+        if self.verbose:
+            yield
+            return
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            yield
+
+    # ------------------------------------------------------------------
+    # Candidatos (vetorizado por símbolo)
+    # ------------------------------------------------------------------
+
+    def score_symbol(self, symbol: str) -> np.ndarray:
+        """Pontuação de todas as horas fechadas de um par (uma linha por hora, colunas SCORE_FIELDS)
+
+        Independe dos limites de qualidade/alvo, então pode ser calculada uma
+        vez e reaproveitada por vários replays (ver core/parameter_sweep.py).
+        EMA/MACD/RSI/ATR vêm de IncrementalIndicatorEngine.replay, um estado por
+        série desde o primeiro candle (como o scan ao vivo, que não recalcula
+        cada janela do zero); momentum, níveis e padrões usam a janela.
+        """
+        series = self.candles.get(symbol, {})
+        entry, trend = series.get(self.entry_tf), series.get(self.trend_tf)
+        window = self.window
+        if entry is None or trend is None or len(entry['close']) < window or len(trend['close']) < window:
+            return np.empty((0, len(SCORE_FIELDS)))
+
+        # Janela k de entrada termina no candle window-1+k; tendência: último 4h fechado
+        entry_close = self.close_times[symbol][window - 1:]
+        trend_close = trend['open_time'] + INTERVAL_MS[self.trend_tf]
+        trend_rows = np.searchsorted(trend_close, entry_close, side='right') - window
+        steps = np.flatnonzero(trend_rows >= 0)
+        if len(steps) == 0:
+            return np.empty((0, len(SCORE_FIELDS)))
+
+        first, last = int(steps[0]), int(steps[-1])
+        trend_first, trend_last = int(trend_rows[first]), int(trend_rows[last])
+        # Linha r das janelas termina no candle r + window - 1
+        trend_values = indicator_engine.replay(trend['high'], trend['low'], trend['close'])
+        entry_values = indicator_engine.replay(entry['high'], entry['low'], entry['close'])
+        trend_analyses = self.analysis.analyze_trend_arrays(
+            window_arrays(trend, window, trend_first, trend_last),
+            {name: values[trend_first + window - 1:trend_last + window] for name, values in trend_values.items()})
+        entry_analyses, patterns = self.analysis.analyze_entry_arrays(
+            window_arrays(entry, window, first, last),
+            {name: values[first + window - 1:last + window] for name, values in entry_values.items()})
+        closes = entry['close'][window - 1:]
+
+        scored = np.empty((len(steps), len(SCORE_FIELDS)))
+        for k, (step, trend_row) in enumerate(zip(steps.tolist(), (trend_rows[steps] - trend_first).tolist())):
+            trend_analysis = trend_analyses[trend_row]
+            entry_analysis = entry_analyses[step - first]
+            signal_type = 'COMPRA' if trend_analysis['is_uptrend'] else 'VENDA'
+            scores = self.analysis._calculate_signal_scores(trend_analysis, entry_analysis, signal_type, None,
+                                                            patterns[step - first])
+            scored[k] = (entry_close[step], closes[step], signal_type == 'COMPRA', scores['trend'],
+                         scores['entry'], scores['rsi'], scores['pattern'], trend_analysis['trend_strength'],
+                         entry_analysis['atr_ratio'], entry_analysis['rsi'])
+        return scored
+
+    def symbol_candidates(self, symbol: str, start_ms: Optional[int] = None,
+                          end_ms: Optional[int] = None) -> List[Tuple[int, Dict[str, Any]]]:
+        """Pré-sinais (horário de fechamento, sinal) de um par que passam na pontuação"""
+        scored = self.scored.get(symbol)
+        if scored is None:
+            scored = self.scored[symbol] = self.score_symbol(symbol)
+        columns = {name: scored[:, index] for index, name in enumerate(SCORE_FIELDS)}
+
+        valid = (columns['trend'] + columns['entry'] + columns['rsi'] + columns['pattern']
+                 >= self.analysis.config['quality_score_minimum'])
+        if start_ms is not None:
+            valid &= columns['close_ms'] >= start_ms
+        if end_ms is not None:
+            valid &= columns['close_ms'] <= end_ms
+
+        candidates = []
+        for row in scored[valid].tolist():
+            values = dict(zip(SCORE_FIELDS, row))
+            scores = {key: values[key] for key in ('trend', 'entry', 'rsi', 'pattern')}
+            entry_price = values['entry_price']
+            candidate = self.analysis._build_candidate(
+                'COMPRA' if values['is_buy'] else 'VENDA', scores, entry_price,
+                {'trend_strength': values['trend_strength']}, {'atr_ratio': values['atr_ratio']}
+            )
+            if candidate is None:
+                continue
+            candidates.append((int(values['close_ms']), {
+                'symbol': symbol,
+                'type': candidate['type'],
+                'entry_price': entry_price,
+                'target_price': candidate['target_price'],
+                'projection_percentage': candidate['projection_percentage'],
+                'quality_score': candidate['quality_score'],
+                'signal_class': candidate['signal_class'],
+                'rsi': values['rsi_value'],
+                'trend_score': scores['trend'],
+                'entry_score': scores['entry'],
+                'rsi_score': scores['rsi'],
+                'pattern_score': scores['pattern'],
+                'trend_timeframe': self.trend_tf,
+                'entry_timeframe': self.entry_tf
+            }))
+        return candidates
+
+    def generate_candidates(self, start_ms: Optional[int] = None,
+                            end_ms: Optional[int] = None) -> Dict[int, List[Dict[str, Any]]]:
+        """Pré-sinais de todos os pares agrupados pelo horário da varredura"""
+        by_time: Dict[int, List[Dict[str, Any]]] = {}
+        for symbol in sorted(self.candles):
+            for close_ms, signal in self.symbol_candidates(symbol, start_ms, end_ms):
+                by_time.setdefault(close_ms, []).append(signal)
+        self.stats['candidates'] = sum(len(signals) for signals in by_time.values())
+        return by_time
+
+    # ------------------------------------------------------------------
+    # Dados de mercado no horário simulado
+    # ------------------------------------------------------------------
+
+    def symbol_data(self, symbol: str) -> Optional[Dict[str, Any]]:
+        """Substituto de BTCSignalManager._get_current_symbol_data (últimos 5 candles fechados)"""
+        close_times = self.close_times.get(symbol)
+        if close_times is None:
+            return None
+        position = last_closed_index(close_times, self.clock.now_ms)
+        if position < 4:
+            return None
+
+        series = self.candles[symbol][self.entry_tf]
+        klines = [
+            {'open_time': int(series['open_time'][i]), **{col: float(series[col][i]) for col in OHLCV_COLUMNS}}
+            for i in range(position - 4, position + 1)
+        ]
+        day = slice(max(0, position - 23), position + 1)
+        volume_24h = float(np.dot(series['close'][day], series['volume'][day]))
+        return {
+            'klines': klines,
+            'ticker': {'volume': volume_24h, 'lastPrice': klines[-1]['close']},
+            'current_price': klines[-1]['close'],
+            'volume_24h': volume_24h
+        }
+
+    def _candle_at(self, symbol: str, close_ms: int) -> int:
+        close_times = self.close_times.get(symbol)
+        if close_times is None:
+            return -1
+        position = int(np.searchsorted(close_times, close_ms))
+        return position if position < len(close_times) and close_times[position] == close_ms else -1
+
+    def open_position(self, signal: PendingSignal) -> None:
+        """Chamado na confirmação: abre a posição com o último fechamento conhecido"""
+        data = self.symbol_data(signal['symbol'])
+        self.monitoring.open_position(signal, self.clock.naive(), data['current_price'] if data else None)
+
+    def _replay_close(self, close_ms: int) -> None:
+        """Aplica o candle que fechou em close_ms a todas as posições ativas"""
+        table = self.monitoring.table
+        rows = table.active_rows()
+        if len(rows) == 0:
+            return
+        symbols = table.objects['symbol']
+        directions = table.column('direction')[rows].tolist()
+        favorable = np.full(len(rows), np.nan)
+        closes = np.full(len(rows), np.nan)
+        for k, row in enumerate(rows.tolist()):
+            symbol = symbols[row]
+            position = self._candle_at(symbol, close_ms)
+            if position < 0:
+                continue
+            series = self.candles[symbol][self.entry_tf]
+            favorable[k] = series['high'][position] if directions[k] == 1 else series['low'][position]
+            closes[k] = series['close'][position]
+        self.clock.set(close_ms)
+        self.monitoring.replay_candle(rows, favorable, closes, self.clock.naive())
+        self.stats['candles_replayed'] += 1
+
+    @staticmethod
+    def _next_reset_ms(now_ms: int) -> int:
+        """Próximo restart diário (21:00 em São Paulo) depois de now_ms"""
+        local = datetime.fromtimestamp(now_ms / 1000, SAO_PAULO_TZ)
+        reset = SAO_PAULO_TZ.localize(datetime(local.year, local.month, local.day, DAILY_RESET_HOUR))
+        if reset <= local:
+            reset = SAO_PAULO_TZ.localize(datetime(local.year, local.month, local.day) + timedelta(days=1,
+                                                                                                  hours=DAILY_RESET_HOUR))
+        return int(reset.timestamp() * 1000)
+
+    # ------------------------------------------------------------------
+    # Execução
+    # ------------------------------------------------------------------
+
+    def run(self, start_ms: Optional[int] = None, end_ms: Optional[int] = None) -> Dict[str, Any]:
+        """Executa o replay e retorna o resumo (ver summary)"""
+        started = time.time()
+        with self._output():
+            candidates = self.generate_candidates(start_ms, end_ms)
+            scan_times = np.array(sorted(candidates), dtype=np.int64)
+            all_closes = np.unique(np.concatenate(list(self.close_times.values()))) if self.close_times else \
+                np.empty(0, dtype=np.int64)
+            if end_ms is not None:
+                all_closes = all_closes[all_closes <= end_ms]
+            if len(scan_times) and len(all_closes):
+                self._simulate(candidates, scan_times, all_closes)
+        elapsed = time.time() - started
+        return self.summary(elapsed)
+
+    def _simulate(self, candidates: Dict[int, List[Dict[str, Any]]], scan_times: np.ndarray,
+                  all_closes: np.ndarray) -> None:
+        tick_ms = int(self.manager.config['check_interval'] * 1000)
+        end_ms = int(all_closes[-1])
+        now = int(scan_times[0])
+        last_ms = now - 1  # Eventos já processados até aqui (inclusive)
+        next_reset = self._next_reset_ms(now)
+        scan_position = 0
+
+        while now <= end_ms:
+            # Sem pendentes: pular direto para a próxima varredura ou candle fechado
+            if not self.manager.pending_signals:
+                upcoming = []
+                if scan_position < len(scan_times):
+                    upcoming.append(int(scan_times[scan_position]))
+                if self.monitoring.table.count():
+                    following = int(np.searchsorted(all_closes, last_ms, side='right'))
+                    if following < len(all_closes):
+                        upcoming.append(int(all_closes[following]))
+                if not upcoming:
+                    break
+                now = max(now, min(upcoming))
+
+            # 1. Candles fechados desde o passo anterior (monitoramento)
+            if self.monitoring.table.count():
+                first = int(np.searchsorted(all_closes, last_ms, side='right'))
+                stop = int(np.searchsorted(all_closes, now, side='right'))
+                for close_ms in all_closes[first:stop].tolist():
+                    self._replay_close(close_ms)
+
+            # 2. Restart diário (libera (símbolo, tipo) confirmados no dia)
+            self.clock.set(now)
+            if now >= next_reset:
+                self.manager.reset_daily_confirmed_signals()
+                next_reset = self._next_reset_ms(now)
+
+            # 3. Ciclo de confirmação sobre os pendentes
+            if self.manager.pending_signals:
+                self.manager._run_confirmation_cycle()
+                self.stats['confirmation_cycles'] += 1
+
+            # 4. Varreduras das horas fechadas até agora
+            while scan_position < len(scan_times) and scan_times[scan_position] <= now:
+                scan_ms = int(scan_times[scan_position])
+                self.clock.set(scan_ms)
+                btc_trend = self.btc_analyzer.get_current_btc_analysis().get('trend', 'NEUTRAL')
+                for signal in candidates[scan_ms]:
+                    pending_before = len(self.manager.pending_signals)
+                    self.manager.add_pending_signal({
+                        **signal,
+                        'timestamp': self.clock.now().strftime(DATETIME_FORMAT),
+                        'btc_trend': btc_trend
+                    })
+                    if len(self.manager.pending_signals) > pending_before:
+                        self.stats['pending_added'] += 1
+                    else:
+                        self.stats['duplicates_ignored'] += 1
+                scan_position += 1
+            self.clock.set(now)
+
+            last_ms = now
+            now += tick_ms
+
+    # ------------------------------------------------------------------
+    # Resultados
+    # ------------------------------------------------------------------
+
+    def summary(self, elapsed: float = 0.0) -> Dict[str, Any]:
+        """Funil de sinais, estatísticas do monitoramento e resultado por classe"""
+        rejected = self.manager.rejected_signals
+        expired = sum(1 for r in rejected if r['rejection_reasons'] == [ConfirmationReason.TIMEOUT_EXPIRED])
+        table = self.monitoring.table
+        records = table.records(np.concatenate([table.closed_rows(), table.active_rows()]))
+        signal_class = {c['id']: c['signal_class'] for c in self.manager.confirmed_signals}
+
+        by_class: Dict[str, Dict[str, Any]] = {}
+        for record in records:
+            group = by_class.setdefault(signal_class.get(record['id'], 'N/A'),
+                                        {'confirmed': 0, 'completed': 0, 'expired': 0, 'monitoring': 0,
+                                         'pnl_usd': 0.0})
+            group['confirmed'] += 1
+            group[record['status'].lower()] += 1
+            group['pnl_usd'] += record['simulation_pnl_usd']
+        for group in by_class.values():
+            evaluated = group['completed'] + group['expired']
+            group['success_rate'] = round(group['completed'] / evaluated * 100, 2) if evaluated else 0.0
+            group['pnl_usd'] = round(group['pnl_usd'], 2)
+
+        # Curva de P&L dos trades encerrados (ordem de encerramento) e maior queda a partir de um topo
+        closed_pnl = np.array([r['simulation_pnl_usd'] for r in records if r['status'] != 'MONITORING'])
+        equity = np.concatenate([[0.0], np.cumsum(closed_pnl)])
+        max_drawdown = float(np.max(np.maximum.accumulate(equity) - equity))
+
+        statistics = self.monitoring.get_system_statistics()
+        for key in ('system_status', 'last_update'):
+            statistics.pop(key, None)
+
+        return {
+            'signals': {
+                'candidates': self.stats['candidates'],
+                'pending_added': self.stats['pending_added'],
+                'duplicates_ignored': self.stats['duplicates_ignored'],
+                'confirmed': len(self.manager.confirmed_signals),
+                'rejected': len(rejected) - expired,
+                'expired': expired,
+                'still_pending': len(self.manager.pending_signals)
+            },
+            'monitoring': statistics,
+            'by_class': by_class,
+            'performance': {
+                'closed_trades': len(closed_pnl),
+                'total_pnl_usd': round(float(equity[-1]), 2),
+                'max_drawdown_usd': round(max_drawdown, 2)
+            },
+            'trades': [{key: value for key, value in record.items() if key != 'price_history'}
+                       for record in records],
+            'config': {
+                'analysis': dict(self.analysis.config),
+                'confirmation': dict(self.manager.config),
+                'monitoring': dict(self.monitoring.config),
+                'window': self.window
+            },
+            'replay': {**self.stats, 'symbols': len(self.candles), 'elapsed_seconds': round(elapsed, 3)}
+        }
+
+
+def load_source(data: Optional[str], archive: Optional[str],
+                symbols: Optional[Iterable[str]] = None) -> Dict[str, Dict[str, CandleSeries]]:
+    """Candles de uma pasta de CSVs ou do arquivo mapeado em memória (sem cópia)"""
+    if archive:
+        from .candle_archive import CandleArchive, load_archive
+        return load_archive(CandleArchive(archive), symbols)
+    return load_candles(data, symbols)
+
+
+def _parse_date(value: Optional[str]) -> Optional[int]:
+    if not value:
+        return None
+    moment = SAO_PAULO_TZ.localize(datetime.strptime(value, '%d/%m/%Y'))
+    return int(moment.timestamp() * 1000)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Linha de comando: python -m core.backtest_engine --data <pasta de candles> (ou --archive <pasta>)"""
+    parser = argparse.ArgumentParser(description='Replay histórico do pipeline de sinais')
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('--data', help='Pasta com <SYMBOL>_<interval>.csv')
+    source.add_argument('--archive', help='Pasta do arquivo de candles (ver core/candle_archive.py)')
+    parser.add_argument('--symbols', nargs='*', help='Pares a incluir (padrão: todos)')
+    parser.add_argument('--start', help='Data inicial dd/mm/aaaa (horário de São Paulo)')
+    parser.add_argument('--end', help='Data final dd/mm/aaaa (horário de São Paulo)')
+    parser.add_argument('--output', help='Arquivo JSON com o resultado completo')
+    parser.add_argument('--verbose', action='store_true', help='Mostrar os logs do pipeline')
+    args = parser.parse_args(argv)
+
+    print(f"📂 Carregando candles de {args.data or args.archive}...")
+    candles = load_source(args.data, args.archive, args.symbols)
+    if not candles:
+        print("❌ Nenhum arquivo de candles encontrado")
+        return 1
+
+    engine = BacktestEngine(candles, verbose=args.verbose)
+    result = engine.run(_parse_date(args.start), _parse_date(args.end))
+
+    signals, stats = result['signals'], result['monitoring']
+    print(f"⏱️ Replay de {result['replay']['symbols']} pares em {result['replay']['elapsed_seconds']:.1f}s")
+    print(f"📊 Candidatos: {signals['candidates']} | Pendentes: {signals['pending_added']} | "
+          f"Confirmados: {signals['confirmed']} | Rejeitados: {signals['rejected']} | Expirados: {signals['expired']}")
+    print(f"🎯 Taxa de sucesso: {stats.get('overall_success_rate', 0)}% "
+          f"({stats.get('successful_signals', 0)}/{stats.get('total_evaluated_signals', 0)}) | "
+          f"Dias médios até o alvo: {stats.get('average_days_to_success', 0)}")
+    for signal_class, group in result['by_class'].items():
+        print(f"   {signal_class}: {group['confirmed']} confirmados, {group['success_rate']}% de sucesso, "
+              f"P&L ${group['pnl_usd']:.2f}")
+
+    if args.output:
+        with open(args.output, 'wb') as file:
+            file.write(dumps_bytes(result, datetime_format=DATETIME_FORMAT, strict=False, indent=True))
+        print(f"💾 Resultado salvo em {args.output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
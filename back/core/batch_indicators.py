@@ -0,0 +1,223 @@
+# -*- coding: utf-8 -*-
+"""
+Batch Indicators - Indicadores técnicos vetorizados para vários símbolos
+Empilha os candles de todos os pares em matrizes (símbolos × candles) e calcula
+EMA/MACD/RSI/ATR, volume, momentum, suporte/resistência e padrões de candle do
+último candle de cada símbolo em poucas passadas NumPy.
+"""
+
+from typing import Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+OHLCV_COLUMNS = ('open', 'high', 'low', 'close', 'volume')
+
+
+class BatchIndicatorCalculator:
+    """
+    Calculadora vetorizada de indicadores
+
+    As recursões percorrem o eixo dos candles uma única vez, operando sobre
+    vetores com um elemento por símbolo. As fórmulas e os períodos mínimos são
+    os mesmos da biblioteca `ta` (e de IncrementalIndicatorEngine.compute).
+    """
+
+    def __init__(self, ema_windows: Tuple[int, ...] = (20, 50), macd_fast: int = 12,
+                 macd_slow: int = 26, macd_signal: int = 9, rsi_window: int = 14,
+                 atr_window: int = 14):
+        """Inicializa a calculadora
+
+        Args:
+            ema_windows: Períodos das EMAs calculadas
+            macd_fast: Período da EMA rápida do MACD
+            macd_slow: Período da EMA lenta do MACD
+            macd_signal: Período da linha de sinal do MACD
+            rsi_window: Período do RSI
+            atr_window: Período do ATR
+        """
+        self.ema_windows = tuple(ema_windows)
+        self.macd_fast_window = macd_fast
+        self.macd_slow_window = macd_slow
+        self.macd_signal_window = macd_signal
+        self.rsi_window = rsi_window
+        self.atr_window = atr_window
+
+    @staticmethod
+    def stack(frames: List[pd.DataFrame]) -> Dict[str, np.ndarray]:
+        """Empilha DataFrames de mesmo tamanho em matrizes (símbolos × candles)"""
+        return {
+            col: np.vstack([frame[col].to_numpy(dtype=np.float64) for frame in frames])
+            for col in OHLCV_COLUMNS
+        }
+
+    def indicators(self, arrays: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+        """Calcula EMA/MACD/RSI/ATR do último candle de cada símbolo"""
+        highs, lows, closes = arrays['high'], arrays['low'], arrays['close']
+        n_candles = closes.shape[1]
+
+        emas = {window: closes[:, 0].copy() for window in self.ema_windows}
+        ema_alphas = {window: 2.0 / (window + 1) for window in self.ema_windows}
+        alpha_fast = 2.0 / (self.macd_fast_window + 1)
+        alpha_slow = 2.0 / (self.macd_slow_window + 1)
+        alpha_signal = 2.0 / (self.macd_signal_window + 1)
+        alpha_rsi = 1.0 / self.rsi_window
+
+        macd_fast = closes[:, 0].copy()
+        macd_slow = closes[:, 0].copy()
+        macd_signal = np.full(closes.shape[0], np.nan)
+        rsi_up = np.zeros(closes.shape[0])
+        rsi_down = np.zeros(closes.shape[0])
+
+        # True range e ganhos/perdas de todos os candles em uma passada
+        prev_closes = closes[:, :-1]
+        true_range = np.empty_like(closes)
+        true_range[:, 0] = highs[:, 0] - lows[:, 0]
+        true_range[:, 1:] = np.maximum.reduce([
+            highs[:, 1:] - lows[:, 1:],
+            np.abs(highs[:, 1:] - prev_closes),
+            np.abs(lows[:, 1:] - prev_closes)
+        ])
+        diffs = np.diff(closes, axis=1)
+        gains = np.where(diffs > 0, diffs, 0.0)
+        losses = np.where(diffs < 0, -diffs, 0.0)
+
+        for i in range(1, n_candles):
+            close = closes[:, i]
+            for window in self.ema_windows:
+                emas[window] = (1 - ema_alphas[window]) * emas[window] + ema_alphas[window] * close
+            macd_fast = (1 - alpha_fast) * macd_fast + alpha_fast * close
+            macd_slow = (1 - alpha_slow) * macd_slow + alpha_slow * close
+            rsi_up = (1 - alpha_rsi) * rsi_up + alpha_rsi * gains[:, i - 1]
+            rsi_down = (1 - alpha_rsi) * rsi_down + alpha_rsi * losses[:, i - 1]
+
+            # Linha de sinal começa no primeiro valor válido do MACD
+            if i == self.macd_slow_window - 1:
+                macd_signal = macd_fast - macd_slow
+            elif i >= self.macd_slow_window:
+                macd_signal = (1 - alpha_signal) * macd_signal + alpha_signal * (macd_fast - macd_slow)
+
+        values: Dict[str, np.ndarray] = {}
+        for window in self.ema_windows:
+            values[f'ema{window}'] = emas[window] if n_candles >= window else np.full_like(emas[window], np.nan)
+
+        if n_candles >= self.macd_slow_window:
+            values['macd'] = macd_fast - macd_slow
+            signal_ready = n_candles - self.macd_slow_window + 1 >= self.macd_signal_window
+            values['macd_signal'] = macd_signal if signal_ready else np.full_like(macd_signal, np.nan)
+        else:
+            values['macd'] = np.full(closes.shape[0], np.nan)
+            values['macd_signal'] = np.full(closes.shape[0], np.nan)
+        values['macd_diff'] = values['macd'] - values['macd_signal']
+
+        if n_candles >= self.rsi_window:
+            with np.errstate(divide='ignore', invalid='ignore'):
+                rsi = 100.0 - 100.0 / (1.0 + rsi_up / rsi_down)
+            values['rsi'] = np.where(rsi_down == 0, 100.0, rsi)
+        else:
+            values['rsi'] = np.full(closes.shape[0], np.nan)
+
+        # ATR: média simples dos primeiros `window` TRs e depois suavização de Wilder
+        if n_candles >= self.atr_window:
+            atr = true_range[:, :self.atr_window].mean(axis=1)
+            for i in range(self.atr_window, n_candles):
+                atr = (atr * (self.atr_window - 1) + true_range[:, i]) / self.atr_window
+            values['atr'] = atr
+        else:
+            values['atr'] = np.zeros(closes.shape[0])
+
+        values['close'] = closes[:, -1].copy()
+        return values
+
+    @staticmethod
+    def momentum(arrays: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+        """Variação de preço (3 candles) e razão de volume (média 5 / média 20)"""
+        closes, volumes = arrays['close'], arrays['volume']
+        n_symbols, n_candles = closes.shape
+
+        if n_candles >= 3:
+            price_change = (closes[:, -1] - closes[:, -3]) / closes[:, -3]
+        else:
+            price_change = np.zeros(n_symbols)
+
+        if n_candles >= 20:
+            volume_ratio = volumes[:, -5:].mean(axis=1) / volumes[:, -20:].mean(axis=1)
+        else:
+            volume_ratio = np.ones(n_symbols)
+
+        return {'price_change': price_change, 'volume_ratio': volume_ratio}
+
+    @staticmethod
+    def support_resistance(arrays: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+        """Distâncias (%) até o suporte/resistência mais próximos do último fechamento
+
+        Mesma regra de TechnicalAnalysis.calculate_support_resistance_levels:
+        máximas/mínimas locais em janela centrada de 5 candles.
+        """
+        highs, lows, closes = arrays['high'], arrays['low'], arrays['close']
+        n_symbols, n_candles = closes.shape
+        current_price = closes[:, -1]
+
+        if n_candles < 20:
+            return {
+                'support_distance': np.full(n_symbols, 2.0),
+                'resistance_distance': np.full(n_symbols, 2.0)
+            }
+
+        # Candles centrais i = 2..n-3 e sua janela [i-2, i+2]
+        center_highs = highs[:, 2:-2]
+        center_lows = lows[:, 2:-2]
+        is_resistance = (
+            (center_highs == sliding_window_view(highs, 5, axis=1).max(axis=2)) &
+            (center_highs > highs[:, 1:-3]) & (center_highs > highs[:, 3:-1])
+        )
+        is_support = (
+            (center_lows == sliding_window_view(lows, 5, axis=1).min(axis=2)) &
+            (center_lows < lows[:, 1:-3]) & (center_lows < lows[:, 3:-1])
+        )
+
+        price = current_price[:, None]
+        resistance = np.where(is_resistance & (center_highs > price), center_highs, np.inf).min(axis=1)
+        support = np.where(is_support & (center_lows < price), center_lows, -np.inf).max(axis=1)
+        resistance = np.where(np.isinf(resistance), current_price * 1.02, resistance)
+        support = np.where(np.isinf(support), current_price * 0.98, support)
+
+        return {
+            'support_distance': np.abs(current_price - support) / current_price * 100,
+            'resistance_distance': np.abs(resistance - current_price) / current_price * 100
+        }
+
+    @staticmethod
+    def candlestick_scores(arrays: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+        """Pontuação do padrão do último candle para COMPRA e VENDA
+
+        Mesma regra de TechnicalAnalysis._analyze_candlestick_patterns.
+        """
+        n_symbols, n_candles = arrays['close'].shape
+        if n_candles < 3:
+            return {'COMPRA': np.zeros(n_symbols), 'VENDA': np.zeros(n_symbols)}
+
+        last_open = arrays['open'][:, -1]
+        last_close = arrays['close'][:, -1]
+        last_high = arrays['high'][:, -1]
+        last_low = arrays['low'][:, -1]
+
+        body_size = np.abs(last_close - last_open)
+        candle_range = last_high - last_low
+        is_doji = body_size < candle_range * 0.3
+        lower_shadow = np.minimum(last_close, last_open) - last_low
+        upper_shadow = last_high - np.maximum(last_close, last_open)
+
+        buy_score = np.where(lower_shadow > body_size * 2, 10.0, np.where(is_doji, 5.0, 0.0))
+        sell_score = np.where(upper_shadow > body_size * 2, 10.0, np.where(is_doji, 5.0, 0.0))
+        flat = candle_range == 0
+
+        return {
+            'COMPRA': np.where(flat, 0.0, buy_score),
+            'VENDA': np.where(flat, 0.0, sell_score)
+        }
+
+
+# Instância global para uso em outros módulos
+batch_calculator = BatchIndicatorCalculator()
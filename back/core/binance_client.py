@@ -7,9 +7,17 @@ import os
 from datetime import datetime
 from config import server
 from logging import Logger
+from .rate_limiter import binance_rate_limiter, endpoint_weight
+from .http_pool import http_pool
+from .request_coalescer import request_coalescer
+from .metrics import BINANCE_REQUEST_ERRORS, BINANCE_REQUEST_SECONDS, BINANCE_WEIGHT_WAIT_SECONDS
 
 class BinanceClient:
-    def __init__(self):
+    def __init__(self, priority: str = 'scan'):
+        # Fila de prioridade no orçamento global de peso (confirmation > scan > dashboard)
+        self.priority = priority
+        self.rate_limiter = binance_rate_limiter
+        
         # Verificar se deve usar a API da Binance
         use_binance_env = os.getenv('USE_BINANCE_API', 'true')
         self.use_binance_api = use_binance_env.lower() == 'true'
@@ -58,7 +66,8 @@ class BinanceClient:
             success = False
             for attempt in range(5):
                 try:
-                    server_time = requests.get(f"{self.base_url}/fapi/v1/time", timeout=10).json()
+                    self.rate_limiter.acquire(endpoint_weight('/fapi/v1/time'), self.priority)
+                    server_time = http_pool.get(f"{self.base_url}/fapi/v1/time", timeout=10).json()
                     if 'serverTime' not in server_time:
                         self.logger.warning(f"Resposta inválida do servidor de tempo: {server_time}")
                         time.sleep(1)
@@ -138,19 +147,43 @@ class BinanceClient:
             hashlib.sha256
         ).hexdigest()
 
-    def make_request(self, endpoint: str, method: str = 'GET', params: Optional[Dict] = None, auth: bool = False) -> Optional[Dict]:
-        """Faz requisição para API Binance com rate limiting otimizado"""
+    def make_request(self, endpoint: str, method: str = 'GET', params: Optional[Dict] = None,
+                     auth: bool = False, priority: Optional[str] = None) -> Optional[Dict]:
+        """Faz requisição para API Binance respeitando o orçamento global de peso
+        
+        Args:
+            endpoint: Caminho do endpoint (pode conter query string)
+            method: GET ou POST
+            params: Parâmetros da requisição
+            auth: Se a requisição é assinada
+            priority: Fila de prioridade (usa a do cliente se None)
+        """
         if not self._check_api_enabled():
             return None
-            
+        
+        # GETs públicos idênticos e simultâneos compartilham uma única chamada HTTP
+        if method == 'GET' and not auth:
+            key = request_coalescer.make_key(endpoint, params)
+            return request_coalescer.do(
+                key, lambda: self._send_request(endpoint, method, params, auth, priority)
+            )
+        return self._send_request(endpoint, method, params, auth, priority)
+
+    def _send_request(self, endpoint: str, method: str, params: Optional[Dict],
+                      auth: bool, priority: Optional[str]) -> Optional[Dict]:
+        """Executa a requisição com retries (sem agrupamento)"""
         max_retries = 3
         retry_delay = 1
-        
-        # Rate limiting otimizado: reduzir delay entre requests
-        time.sleep(0.02)  # 20ms entre requests (era 50ms)
+        weight = endpoint_weight(endpoint, params)
+        lane = priority or self.priority
+        path = endpoint.split('?', 1)[0]  # Label sem query string (cardinalidade fixa)
         
         for attempt in range(max_retries):
             try:
+                # Aguardar orçamento de peso (compartilhado por todos os clientes)
+                with BINANCE_WEIGHT_WAIT_SECONDS.time(client='sync'):
+                    self.rate_limiter.acquire(weight, lane)
+                
                 url = f"{self.base_url}{endpoint}"
                 headers = {'X-MBX-APIKEY': self.api_key} if auth else {}
                 
@@ -163,23 +196,25 @@ class BinanceClient:
                     request_params['timestamp'] = self.get_timestamp()
                     request_params['signature'] = self._generate_signature(request_params)
                 
-                # Fazer a requisição com timeout maior
-                # No método make_request, linha ~165
-                if method == 'GET':
-                    response = requests.get(url, params=request_params, headers=headers, timeout=60)  # Aumentar de 30s para 60s
-                else:
-                    response = requests.post(url, json=request_params, headers=headers, timeout=60)
+                # Fazer a requisição pela sessão compartilhada (keep-alive)
+                with BINANCE_REQUEST_SECONDS.time(endpoint=path, client='sync'):
+                    if method == 'GET':
+                        response = http_pool.get(url, params=request_params, headers=headers, timeout=60)  # Aumentar de 30s para 60s
+                    else:
+                        response = http_pool.post(url, json=request_params, headers=headers, timeout=60)
                 
-                # Também otimizar o rate limiting
-                time.sleep(0.01)  # Reduzir de 0.02 para 0.01 (10ms)
+                # Sincronizar o orçamento com o peso usado informado pela Binance
+                self.rate_limiter.update_from_headers(response.headers)
                 
                 # Verificar resposta
                 if response.status_code == 200:
                     return response.json()
-                elif response.status_code == 429:  # Rate limit
+                BINANCE_REQUEST_ERRORS.inc(endpoint=path, reason=str(response.status_code))
+                if response.status_code in (429, 418):  # Rate limit / banimento temporário
                     retry_after = int(response.headers.get('Retry-After', retry_delay))
-                    self.logger.warning(f"Rate limit atingido. Aguardando {retry_after}s")
-                    time.sleep(retry_after)
+                    self.logger.warning(f"Rate limit atingido ({response.status_code}). Suspendendo requisições por {retry_after}s")
+                    # Pausa global: todas as instâncias aguardam no próximo acquire
+                    self.rate_limiter.penalize(retry_after)
                 elif response.status_code == 400 and 'Timestamp for this request' in response.text:
                     # Erro de timestamp, resincronizar e tentar novamente
                     self.logger.warning("Erro de timestamp detectado, resincronizando...")
@@ -192,9 +227,11 @@ class BinanceClient:
                     time.sleep(retry_delay * (attempt + 1))
                     
             except requests.exceptions.Timeout:
+                BINANCE_REQUEST_ERRORS.inc(endpoint=path, reason='timeout')
                 self.logger.error(f"Timeout na requisição para {endpoint}")
                 time.sleep(retry_delay * (attempt + 1))
             except Exception as e:
+                BINANCE_REQUEST_ERRORS.inc(endpoint=path, reason='exception')
                 self.logger.error(f"Erro na requisição: {e}")
                 if attempt < max_retries - 1:
                     time.sleep(retry_delay * (attempt + 1))
@@ -236,19 +273,24 @@ class BinanceClient:
                 self.logger.error("Resposta inválida de leverage brackets")
                 return {}
             
-            if symbol is not None:
-                brackets = response if isinstance(response, list) else [response]
-                return {symbol: brackets}
-            
-            return {
-                str(item['symbol']): item['brackets'] if isinstance(item['brackets'], list) else [item['brackets']]
-                for item in response
-            }
+            return self._parse_leverage_brackets(response, symbol)
             
         except Exception as e:
             self.logger.error(f"Erro ao obter leverage brackets: {e}")
             return {}
 
+    @staticmethod
+    def _parse_leverage_brackets(response: Any, symbol: Optional[str] = None) -> Dict[str, List[Dict[str, Any]]]:
+        """Converte a resposta de /fapi/v1/leverageBracket em {symbol: brackets}"""
+        if symbol is not None:
+            brackets = response if isinstance(response, list) else [response]
+            return {symbol: brackets}
+        
+        return {
+            str(item['symbol']): item['brackets'] if isinstance(item['brackets'], list) else [item['brackets']]
+            for item in response
+        }
+
     def get_all_usdt_perpetual_pairs(self) -> List[str]:
         """Obtém todos os pares USDT perpétuos ativos"""
         if not self._check_api_enabled():
@@ -283,20 +325,25 @@ class BinanceClient:
             if not response:
                 return {}
                 
-            return {
-                item['symbol']: {
-                    'volume': float(item['volume']) * float(item['lastPrice']),
-                    'priceChangePercent': float(item['priceChangePercent']),
-                    'volatility': abs(float(item['highPrice']) - float(item['lowPrice'])) / float(item['lastPrice']) * 100
-                }
-                for item in response
-                if item['symbol'] in symbols
-            }
+            return self._parse_24h_ticker(response, symbols)
             
         except Exception as e:
             self.logger.error(f"Erro ao obter dados 24h: {e}")
             return {}
             
+    @staticmethod
+    def _parse_24h_ticker(response: List[Dict[str, Any]], symbols: List[str]) -> Dict[str, Dict]:
+        """Extrai volume (USDT), variação e volatilidade 24h dos símbolos pedidos"""
+        return {
+            item['symbol']: {
+                'volume': float(item['volume']) * float(item['lastPrice']),
+                'priceChangePercent': float(item['priceChangePercent']),
+                'volatility': abs(float(item['highPrice']) - float(item['lowPrice'])) / float(item['lastPrice']) * 100
+            }
+            for item in response
+            if item['symbol'] in symbols
+        }
+            
     def filter_high_leverage_pairs(self, pairs: List[str]) -> List[str]:
         """Filtra pares com alavancagem >= 50x"""
         if not self._check_api_enabled():
@@ -361,8 +408,12 @@ class BinanceClient:
             self.logger.error(f"Erro ao selecionar top pares: {e}")
             return []
 
-    def get_klines(self, symbol, interval='1h', limit=100):
-        """Obtém dados históricos (klines) para um símbolo"""
+    def get_klines(self, symbol, interval='1h', limit=100, start_time=None, end_time=None):
+        """Obtém dados históricos (klines) para um símbolo
+        
+        start_time/end_time (ms) limitam o período, para paginar o histórico
+        (ver core/candle_archive.py)
+        """
         if not self._check_api_enabled():
             return []
             
@@ -373,26 +424,34 @@ class BinanceClient:
                 'interval': interval,
                 'limit': limit
             }
+            if start_time is not None:
+                params['startTime'] = int(start_time)
+            if end_time is not None:
+                params['endTime'] = int(end_time)
             
             response = self.make_request(endpoint, 'GET', params)
             
             if not response:
                 return []
             
-            # Converter para formato mais legível
-            klines_data = []
-            for kline in response:
-                klines_data.append({
-                    'open_time': kline[0],
-                    'open': float(kline[1]),
-                    'high': float(kline[2]),
-                    'low': float(kline[3]),
-                    'close': float(kline[4]),
-                    'volume': float(kline[5]),
-                    'close_time': kline[6]
-                })
-            
-            return klines_data
+            return self._parse_klines(response)
         except Exception as e:
             self.logger.error(f"Erro ao obter klines para {symbol}: {e}")
-            return []
\ No newline at end of file
+            return []
+
+    @staticmethod
+    def _parse_klines(response: List[List[Any]]) -> List[Dict[str, Any]]:
+        """Converte klines da API para formato mais legível"""
+        klines_data = []
+        for kline in response:
+            klines_data.append({
+                'open_time': kline[0],
+                'open': float(kline[1]),
+                'high': float(kline[2]),
+                'low': float(kline[3]),
+                'close': float(kline[4]),
+                'volume': float(kline[5]),
+                'close_time': kline[6]
+            })
+        
+        return klines_data
@@ -8,12 +8,12 @@ import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
 from typing import Dict, Optional, List, Any, Tuple
-from ta.trend import EMAIndicator, MACD
-from ta.momentum import RSIIndicator
-from ta.volatility import AverageTrueRange
+import os
 import time
 import traceback
 from .binance_client import BinanceClient
+from .candle_archive import candle_archive
+from .incremental_indicators import indicator_engine
 
 class BTCCorrelationAnalyzer:
     """
@@ -28,6 +28,9 @@ class BTCCorrelationAnalyzer:
         self.binance = binance_client
         self.btc_symbol = 'BTCUSDT'
         
+        # Arquivo local de candles fechados (correlação sem baixar o histórico)
+        self.candle_archive = candle_archive if os.getenv('USE_CANDLE_ARCHIVE', 'true').lower() == 'true' else None
+        
         # Cache para análises BTC
         self.btc_cache = {
             'last_update': 0,
@@ -190,9 +193,13 @@ class BTCCorrelationAnalyzer:
                 current_time - self.correlation_cache['last_update'] < self.correlation_cache['cache_duration']):
                 return self.correlation_cache['correlations'][cache_key]
             
-            # Obter dados
-            symbol_df = self._get_symbol_klines(symbol, timeframe, periods)
-            btc_df = self._get_btc_klines(timeframe, periods)
+            # Obter dados (arquivo local em dia ou API)
+            symbol_df = self._get_archived_klines(symbol, timeframe, periods)
+            if symbol_df is None:
+                symbol_df = self._get_symbol_klines(symbol, timeframe, periods)
+            btc_df = self._get_archived_klines(self.btc_symbol, timeframe, periods)
+            if btc_df is None:
+                btc_df = self._get_btc_klines(timeframe, periods)
             
             if symbol_df is None or btc_df is None:
                 return 0.5  # Correlação neutra como fallback
@@ -337,12 +344,30 @@ class BTCCorrelationAnalyzer:
                 if col in df.columns:
                     df[col] = pd.to_numeric(df[col], errors='coerce')
             
-            return df[numeric_columns].copy() if all(col in df.columns for col in numeric_columns) else None
+            # open_time identifica os candles já incorporados ao estado incremental
+            columns = (['open_time'] if 'open_time' in df.columns else []) + numeric_columns
+            return df[columns].copy() if all(col in df.columns for col in numeric_columns) else None
             
         except Exception as e:
             print(f"❌ Erro ao obter klines BTC: {e}")
             return None
     
+    def _get_archived_klines(self, symbol: str, timeframe: str, limit: int = 100) -> Optional[pd.DataFrame]:
+        """Últimos candles fechados do arquivo local (None se ausente ou desatualizado)"""
+        archive = getattr(self, 'candle_archive', None)
+        if archive is None:
+            return None
+        try:
+            if not archive.is_current(symbol, timeframe):
+                return None
+            records = archive.tail(symbol, timeframe, limit)
+            if len(records) < limit:
+                return None
+            return pd.DataFrame({col: records[col] for col in ('open', 'high', 'low', 'close', 'volume')})
+        except Exception as e:
+            print(f"❌ Erro ao ler klines arquivadas de {symbol}: {e}")
+            return None
+    
     def _get_symbol_klines(self, symbol: str, timeframe: str, limit: int = 100) -> Optional[pd.DataFrame]:
         """Obtém dados de klines de um símbolo"""
         try:
@@ -363,32 +388,31 @@ class BTCCorrelationAnalyzer:
             print(f"❌ Erro ao obter klines {symbol}: {e}")
             return None
     
-    def _analyze_btc_dataframe(self, df: pd.DataFrame, timeframe: str) -> Dict[str, Any]:
-        """Analisa DataFrame do BTC e retorna métricas técnicas"""
+    def _analyze_btc_dataframe(self, df: pd.DataFrame, timeframe: str,
+                               indicators: Optional[Dict[str, float]] = None) -> Dict[str, Any]:
+        """Analisa DataFrame do BTC e retorna métricas técnicas
+        
+        `indicators` permite informar EMA/MACD/RSI/ATR já calculados (ex.: backtest).
+        """
         try:
-            close_series = pd.Series(df['close'].values, dtype=float)
-            
-            # Indicadores técnicos
-            ema20 = EMAIndicator(close=close_series, window=20).ema_indicator()
-            ema50 = EMAIndicator(close=close_series, window=50).ema_indicator()
-            rsi = RSIIndicator(close=close_series, window=14).rsi()
-            macd = MACD(close=close_series)
-            atr = AverageTrueRange(high=df['high'], low=df['low'], close=df['close']).average_true_range()
+            # Indicadores técnicos (estado incremental por timeframe)
+            if indicators is None:
+                indicators = indicator_engine.update(self.btc_symbol, timeframe, df)
             
             current_price = df['close'].iloc[-1]
-            current_ema20 = ema20.iloc[-1]
-            current_ema50 = ema50.iloc[-1]
-            current_rsi = rsi.iloc[-1]
-            current_atr = atr.iloc[-1]
+            current_ema20 = indicators['ema20']
+            current_ema50 = indicators['ema50']
+            current_rsi = indicators['rsi']
+            current_atr = indicators['atr']
             
             # Análise de tendência
-            trend_analysis = self._analyze_btc_trend(df, ema20, ema50)
+            trend_analysis = self._analyze_btc_trend(df, current_ema20, current_ema50)
             
             # Análise de momentum
-            momentum_analysis = self._analyze_btc_momentum(df, rsi, macd)
+            momentum_analysis = self._analyze_btc_momentum(df, current_rsi, indicators)
             
             # Análise de volatilidade
-            volatility_analysis = self._analyze_btc_volatility(df, atr)
+            volatility_analysis = self._analyze_btc_volatility(df, current_atr)
             
             return {
                 'timeframe': timeframe,
@@ -407,12 +431,10 @@ class BTCCorrelationAnalyzer:
             print(f"❌ Erro na análise BTC DataFrame: {e}")
             return self._get_default_btc_analysis()
     
-    def _analyze_btc_trend(self, df: pd.DataFrame, ema20: pd.Series, ema50: pd.Series) -> Dict[str, Any]:
+    def _analyze_btc_trend(self, df: pd.DataFrame, current_ema20: float, current_ema50: float) -> Dict[str, Any]:
         """Analisa tendência do BTC"""
         try:
             current_price = df['close'].iloc[-1]
-            current_ema20 = ema20.iloc[-1]
-            current_ema50 = ema50.iloc[-1]
             
             # Determinar tendência
             if current_price > current_ema20 * 1.005 and current_ema20 > current_ema50 * 1.01:
@@ -439,13 +461,12 @@ class BTCCorrelationAnalyzer:
             print(f"❌ Erro na análise de tendência BTC: {e}")
             return {'trend': 'NEUTRAL', 'strength': 50, 'pivot_broken': False, 'ema_alignment': False}
     
-    def _analyze_btc_momentum(self, df: pd.DataFrame, rsi: pd.Series, macd: MACD) -> Dict[str, Any]:
+    def _analyze_btc_momentum(self, df: pd.DataFrame, current_rsi: float, macd: Dict[str, float]) -> Dict[str, Any]:
         """Analisa momentum do BTC"""
         try:
-            current_rsi = rsi.iloc[-1]
-            macd_line = macd.macd().iloc[-1]
-            macd_signal = macd.macd_signal().iloc[-1]
-            macd_histogram = macd.macd_diff().iloc[-1]
+            macd_line = macd['macd']
+            macd_signal = macd['macd_signal']
+            macd_histogram = macd['macd_diff']
             
             # Análise RSI
             if current_rsi > 70:
@@ -480,10 +501,9 @@ class BTCCorrelationAnalyzer:
                 'momentum_aligned': False
             }
     
-    def _analyze_btc_volatility(self, df: pd.DataFrame, atr: pd.Series) -> Dict[str, Any]:
+    def _analyze_btc_volatility(self, df: pd.DataFrame, current_atr: float) -> Dict[str, Any]:
         """Analisa volatilidade do BTC"""
         try:
-            current_atr = atr.iloc[-1]
             current_price = df['close'].iloc[-1]
             atr_percentage = (current_atr / current_price) * 100
             
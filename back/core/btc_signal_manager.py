@@ -4,9 +4,16 @@ from datetime import datetime, timedelta
 import time
 import threading
 import uuid
+import os
 import pytz
 from .database import Database
 from .binance_client import BinanceClient
+from .ticker_snapshot import ticker_snapshot
+from .persistence_queue import persistence_queue
+from .confirmed_signals_view import ConfirmedSignalsView
+from .response_cache import data_versions
+from .event_bus import publish_event
+from .metrics import CONFIRMATION_CYCLE_SECONDS, CONFIRMATION_PENDING
 from .btc_correlation_analyzer import BTCCorrelationAnalyzer
 from .telegram_notifier import TelegramNotifier
 from config import server
@@ -60,24 +67,27 @@ class PendingSignal(TypedDict):
 class BTCSignalManager:
     """Gerenciador central de sinais BTC e sistema de confirmação"""
     
+    # Configurações padrão do sistema de confirmação (também usadas pelo backtest)
+    DEFAULT_CONFIG = {
+        'confirmation_timeout': 14400,  # 4 horas em segundos
+        'check_interval': 300,          # 5 minutos
+        'max_confirmation_attempts': 12, # Máximo 12 tentativas (1 hora)
+        'min_breakout_percentage': 0.5,  # 0.5% mínimo para rompimento
+        'min_volume_increase': 1.2,      # 20% aumento mínimo no volume
+        'btc_alignment_threshold': 0.3   # Threshold para alinhamento BTC
+    }
+    
     def __init__(self, db_instance: Database):
         """Inicializa o gerenciador de sinais BTC"""
         print("₿ Inicializando BTCSignalManager...")
         
         # Dependências principais
         self.db = db_instance
-        self.binance = BinanceClient()
+        self.binance = BinanceClient(priority='confirmation')
         self.btc_analyzer = BTCCorrelationAnalyzer(self.binance)
         
         # Configurações do sistema
-        self.config = {
-            'confirmation_timeout': 14400,  # 4 horas em segundos
-            'check_interval': 300,          # 5 minutos
-            'max_confirmation_attempts': 12, # Máximo 12 tentativas (1 hora)
-            'min_breakout_percentage': 0.5,  # 0.5% mínimo para rompimento
-            'min_volume_increase': 1.2,      # 20% aumento mínimo no volume
-            'btc_alignment_threshold': 0.3   # Threshold para alinhamento BTC
-        }
+        self.config = dict(self.DEFAULT_CONFIG)
         
         # Estados dos sinais
         self.pending_signals: List[PendingSignal] = []
@@ -95,6 +105,17 @@ class BTCSignalManager:
         # Configurar notificações (opcional)
         self.notifier = self._setup_telegram_notifier()
         
+        # Gravação dos sinais confirmados via fila write-behind
+        self.use_write_behind = os.getenv('USE_WRITE_BEHIND_QUEUE', 'true').lower() == 'true'
+        self._gerenciador = None
+        if self.use_write_behind:
+            self._setup_persistence_queue()
+        
+        # Visão materializada dos confirmados (memória + Supabase incremental)
+        self.confirmed_view = ConfirmedSignalsView(
+            fetcher=lambda since: self._query_confirmed_signals(since=since)
+        )
+        
         # Carregar sinais confirmados existentes do CSV
         self._load_confirmed_signals_from_csv()
         
@@ -103,6 +124,48 @@ class BTCSignalManager:
         # Limpar sinais duplicados na inicialização
         self._cleanup_duplicate_signals()
     
+    def _now(self) -> datetime:
+        """Horário atual em São Paulo (o backtest substitui por um relógio simulado)"""
+        return datetime.now(pytz.timezone('America/Sao_Paulo'))
+    
+    def _get_gerenciador(self):
+        """Retorna o GerenciadorSinais reutilizado pelas gravações"""
+        if self._gerenciador is None:
+            from .gerenciar_sinais import GerenciadorSinais
+            self._gerenciador = GerenciadorSinais(self.db)
+        return self._gerenciador
+    
+    def _setup_persistence_queue(self) -> None:
+        """Registra os handlers de gravação em lote na fila de persistência"""
+        def save_local(batch: List[Dict[str, Any]]) -> None:
+            gerenciador = self._get_gerenciador()
+            saved = []
+            try:
+                # Erro real sobe para a fila tentar o lote de novo; na nova tentativa
+                # os sinais já gravados voltam como duplicata (False) e não repetem
+                for signal in batch:
+                    if gerenciador.save_formatted_signal(signal, save_remote=False, raise_errors=True):
+                        saved.append(signal)
+            finally:
+                if saved:
+                    # Supabase em um único insert, com retry próprio
+                    persistence_queue.enqueue_many('supabase_signal', saved)
+        
+        def save_remote(batch: List[Dict[str, Any]]) -> None:
+            self.db.save_signals_to_supabase(batch)
+        
+        persistence_queue.register_handler('signal', save_local)
+        persistence_queue.register_handler('supabase_signal', save_remote)
+    
+    def _persist_confirmed_signal(self, signal_data: Dict[str, Any]) -> None:
+        """Grava o sinal confirmado (enfileira quando a fila write-behind está ativa)"""
+        gerenciador = self._get_gerenciador()
+        if not self.use_write_behind:
+            gerenciador.save_signal(signal_data)
+            return
+        # Formatar agora para manter o horário real de entrada
+        persistence_queue.enqueue('signal', gerenciador.format_signal(signal_data))
+    
     def _cleanup_duplicate_signals(self) -> None:
         """Remove sinais duplicados da lista de pendentes"""
         try:
@@ -122,6 +185,7 @@ class BTCSignalManager:
                     print(f"🗑️ Removendo sinal duplicado: {signal['symbol']} ({signal['type']}) - ID: {signal['id'][:8]}")
             
             self.pending_signals = unique_signals
+            data_versions.bump('btc_signals')
             removed_count = original_count - len(unique_signals)
             
             if removed_count > 0:
@@ -178,6 +242,7 @@ class BTCSignalManager:
             
             # Atualizar data do último reset
             self.last_reset_date = datetime.now().date()
+            data_versions.bump('btc_signals')
             
             print("\n" + "="*60)
             print("🔄 RESET DO CONTROLE DE SINAIS CONFIRMADOS DIÁRIOS")
@@ -254,8 +319,7 @@ class BTCSignalManager:
             signal_id = str(uuid.uuid4())
             
             # Usar timezone de São Paulo para timestamps
-            sao_paulo_tz = pytz.timezone('America/Sao_Paulo')
-            now_sp = datetime.now(sao_paulo_tz)
+            now_sp = self._now()
             
             # Criar sinal pendente
             pending_signal: PendingSignal = {
@@ -283,6 +347,9 @@ class BTCSignalManager:
             
             # Adicionar à lista de pendentes
             self.pending_signals.append(pending_signal)
+            data_versions.bump('btc_signals')
+            publish_event('signals', 'pending_added', self._format_pending_signal(pending_signal),
+                          key=signal_id)
             
             print(f"⏳ Sinal {symbol} ({signal_type}) adicionado para confirmação (ID: {signal_id[:8]})")
             
@@ -305,43 +372,12 @@ class BTCSignalManager:
         while self.is_monitoring:
             try:
                 cycle_start = time.time()
-                # Usar timezone de São Paulo
-                sao_paulo_tz = pytz.timezone('America/Sao_Paulo')
-                current_time = datetime.now(sao_paulo_tz)
-                
-                if self.pending_signals:
-                    print(f"\n⏰ {current_time.strftime('%d/%m/%Y %H:%M:%S')}")
-                    print(f"🔍 Verificando {len(self.pending_signals)} sinais pendentes...")
-                    
-                    # Verificar cada sinal pendente
-                    signals_to_remove = []
-                    
-                    for signal in self.pending_signals:
-                        try:
-                            result = self._check_signal_confirmation(signal)
-                            
-                            if result['action'] == 'confirm':
-                                self._confirm_signal(signal, result['reasons'])
-                                signals_to_remove.append(signal)
-                            elif result['action'] == 'reject':
-                                self._reject_signal(signal, result['reasons'])
-                                signals_to_remove.append(signal)
-                            elif result['action'] == 'expire':
-                                self._expire_signal(signal)
-                                signals_to_remove.append(signal)
-                            # Se action == 'wait', continua pendente
-                            
-                        except Exception as e:
-                            print(f"❌ Erro ao verificar sinal {signal['symbol']}: {e}")
-                            continue
-                    
-                    # Remover sinais processados
-                    for signal in signals_to_remove:
-                        if signal in self.pending_signals:
-                            self.pending_signals.remove(signal)
+                self._run_confirmation_cycle()
                 
                 # Calcular tempo de espera
                 cycle_duration = time.time() - cycle_start
+                CONFIRMATION_CYCLE_SECONDS.observe(cycle_duration)
+                CONFIRMATION_PENDING.set(len(self.pending_signals))
                 wait_time = max(0, self.config['check_interval'] - cycle_duration)
                 
                 # Aguardar próximo ciclo
@@ -352,12 +388,55 @@ class BTCSignalManager:
                 traceback.print_exc()
                 self._interruptible_sleep(30)  # Aguardar 30s em caso de erro
     
+    def _run_confirmation_cycle(self) -> None:
+        """Executa um ciclo do loop de confirmação: verifica uma vez cada sinal pendente"""
+        # Usar timezone de São Paulo
+        current_time = self._now()
+        
+        if self.pending_signals:
+            print(f"\n⏰ {current_time.strftime('%d/%m/%Y %H:%M:%S')}")
+            print(f"🔍 Verificando {len(self.pending_signals)} sinais pendentes...")
+            
+            # Verificar cada sinal pendente
+            signals_to_remove = []
+            
+            for signal in self.pending_signals:
+                try:
+                    result = self._check_signal_confirmation(signal)
+                    
+                    if result['action'] == 'confirm':
+                        self._confirm_signal(signal, result['reasons'])
+                        signals_to_remove.append(signal)
+                    elif result['action'] == 'reject':
+                        self._reject_signal(signal, result['reasons'])
+                        signals_to_remove.append(signal)
+                    elif result['action'] == 'expire':
+                        self._expire_signal(signal)
+                        signals_to_remove.append(signal)
+                    else:
+                        # Se action == 'wait', continua pendente (envia só as tentativas)
+                        publish_event('signals', 'pending_updated', {
+                            'id': signal['id'],
+                            'confirmation_attempts': signal['confirmation_attempts']
+                        }, key=signal['id'])
+                    
+                except Exception as e:
+                    print(f"❌ Erro ao verificar sinal {signal['symbol']}: {e}")
+                    continue
+            
+            # Remover sinais processados
+            for signal in signals_to_remove:
+                if signal in self.pending_signals:
+                    self.pending_signals.remove(signal)
+            
+            # Tentativas e listas mudaram: invalidar respostas em cache
+            data_versions.bump('btc_signals')
+    
     def _check_signal_confirmation(self, signal: PendingSignal) -> Dict[str, Any]:
         """Verifica se um sinal deve ser confirmado, rejeitado ou continuar pendente"""
         try:
             # Usar timezone de São Paulo
-            sao_paulo_tz = pytz.timezone('America/Sao_Paulo')
-            current_time = datetime.now(sao_paulo_tz)
+            current_time = self._now()
             
             # Verificar se expirou
             if current_time > signal['expires_at']:
@@ -459,8 +538,7 @@ class BTCSignalManager:
             btc_analysis = self.btc_analyzer.get_current_btc_analysis()
             
             # Usar timezone de São Paulo para timestamps
-            sao_paulo_tz = pytz.timezone('America/Sao_Paulo')
-            current_time = datetime.now(sao_paulo_tz)
+            current_time = self._now()
             
             # Criar registro da verificação
             check_record = {
@@ -533,9 +611,8 @@ class BTCSignalManager:
         except Exception as e:
             print(f"❌ Erro ao registrar verificação: {e}")
             # Adicionar registro básico em caso de erro
-            sao_paulo_tz = pytz.timezone('America/Sao_Paulo')
             signal['confirmation_checks'].append({
-                'timestamp': datetime.now(sao_paulo_tz),
+                'timestamp': self._now(),
                 'attempt_number': signal['confirmation_attempts'],
                 'error': str(e),
                 'confirmations_count': len(confirmations),
@@ -572,16 +649,16 @@ class BTCSignalManager:
             if not klines_data:
                 return None
             
-            # Obter ticker 24h
-            ticker_data = self.binance.get_24h_ticker_data([symbol])
-            if not ticker_data or symbol not in ticker_data:
+            # Obter ticker 24h do snapshot compartilhado (sem baixar o mercado inteiro)
+            ticker = ticker_snapshot.get_ticker(symbol)
+            if not ticker:
                 return None
             
             return {
                 'klines': klines_data,
-                'ticker': ticker_data[symbol],
+                'ticker': ticker,
                 'current_price': float(klines_data[-1]['close']),
-                'volume_24h': float(ticker_data[symbol]['volume'])
+                'volume_24h': float(ticker['volume'])
             }
             
         except Exception as e:
@@ -738,11 +815,13 @@ class BTCSignalManager:
             
             # Adicionar à lista de confirmados
             self.confirmed_signals.append(confirmed_signal)
+            confirmed_card = self._format_confirmed_signal(confirmed_signal)
+            self.confirmed_view.upsert(confirmed_card)
+            publish_event('signals', 'signal_confirmed', {**confirmed_card, 'pending_id': signal['id']},
+                          key=signal['id'])
             
             # Salvar sinal confirmado no banco (usando o sistema existente)
-            from .gerenciar_sinais import GerenciadorSinais
-            gerenciador = GerenciadorSinais(self.db)
-            gerenciador.save_signal(confirmed_signal)
+            self._persist_confirmed_signal(confirmed_signal)
             print(f"✅ Sinal {signal['symbol']} salvo no banco com motivos: {', '.join(reasons)}")
             
             # NOVO: Adicionar automaticamente ao sistema de monitoramento
@@ -800,6 +879,12 @@ class BTCSignalManager:
             
             # Adicionar à lista de rejeitados
             self.rejected_signals.append(rejected_signal)
+            publish_event('signals', 'signal_rejected', {
+                'pending_id': signal['id'],
+                'symbol': signal['symbol'],
+                'type': signal['type'],
+                'rejection_reasons': reasons
+            }, key=signal['id'])
             
             # Salvar no banco como rejeitado
             self._save_rejected_signal_to_db(rejected_signal)
@@ -1065,12 +1150,6 @@ class BTCSignalManager:
                                    confirmed_signal: Dict[str, Any], reasons: List[str]) -> None:
         """Salva sinal confirmado no banco de dados"""
         try:
-            # Importar GerenciadorSinais
-            from .gerenciar_sinais import GerenciadorSinais
-            
-            # Criar instância do gerenciador
-            gerenciador = GerenciadorSinais(self.db)
-            
             # Preparar dados do sinal para salvamento
             signal_data = {
                 'id': confirmed_signal.get('id', original_signal['id']),
@@ -1091,7 +1170,7 @@ class BTCSignalManager:
             }
             
             # Salvar no banco de dados
-            gerenciador.save_signal(signal_data)
+            self._persist_confirmed_signal(signal_data)
             print(f"✅ Sinal {confirmed_signal['symbol']} salvo no banco com motivos: {', '.join(reasons)}")
             
         except Exception as e:
@@ -1109,9 +1188,10 @@ class BTCSignalManager:
             print(f"❌ Erro ao salvar sinal rejeitado no DB: {e}")
     
     # Métodos para API
-    def get_pending_signals(self) -> List[Dict[str, Any]]:
-        """Retorna lista de sinais pendentes para a API"""
-        return [{
+    @staticmethod
+    def _format_pending_signal(signal: PendingSignal) -> Dict[str, Any]:
+        """Converte um sinal pendente para o formato da API"""
+        return {
             'id': signal['id'],
             'symbol': signal['symbol'],
             'type': signal['type'],
@@ -1125,7 +1205,11 @@ class BTCSignalManager:
             'confirmation_attempts': signal['confirmation_attempts'],
             'btc_correlation': signal['btc_correlation'],
             'btc_trend': signal['btc_trend']
-        } for signal in self.pending_signals]
+        }
+    
+    def get_pending_signals(self) -> List[Dict[str, Any]]:
+        """Retorna lista de sinais pendentes para a API"""
+        return [self._format_pending_signal(signal) for signal in self.pending_signals]
     
     def get_rejected_signals(self, limit: int = 50) -> List[Dict[str, Any]]:
         """Retorna lista de sinais rejeitados para a API"""
@@ -1146,59 +1230,31 @@ class BTCSignalManager:
             'confirmation_attempts': signal['confirmation_attempts']
         } for signal in recent_rejected]
     
+    @staticmethod
+    def _format_confirmed_signal(signal: Dict[str, Any]) -> Dict[str, Any]:
+        """Converte um sinal confirmado em memória para o formato da API"""
+        return {
+            'id': signal.get('confirmation_id', signal.get('id', '')),
+            'symbol': signal['symbol'],
+            'type': signal['type'],
+            'entry_price': signal['entry_price'],
+            'target_price': signal['target_price'],
+            'projection_percentage': signal['projection_percentage'],
+            'quality_score': signal['quality_score'],
+            'signal_class': signal['signal_class'],
+            'created_at': signal.get('timestamp', signal.get('created_at', '')),
+            'confirmed_at': signal.get('confirmed_at', ''),
+            'confirmation_reasons': signal.get('confirmation_reasons', []),
+            'confirmation_attempts': signal.get('confirmation_attempts', 0),
+            'btc_correlation': signal.get('btc_correlation', 0),
+            'btc_trend': signal.get('btc_trend', 'NEUTRAL')
+        }
+    
     def get_confirmed_signals(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
-        """Retorna lista de sinais confirmados para a API (busca do Supabase + memória)"""
+        """Retorna lista de sinais confirmados para a API (visão materializada: Supabase + memória)"""
         try:
-            # Buscar sinais confirmados do Supabase
-            supabase_signals = self._get_confirmed_signals_from_supabase(limit)
-            
-            # Combinar com sinais em memória (para sinais recém-confirmados)
-            memory_signals = sorted(self.confirmed_signals, 
-                                  key=lambda x: x.get('confirmed_at', ''), reverse=True)
-            
-            # Aplicar limite aos sinais em memória se especificado
-            if limit is not None:
-                memory_signals = memory_signals[:limit]
-            
-            # Converter sinais em memória para o formato padrão
-            memory_formatted = [{
-                'id': signal.get('confirmation_id', signal.get('id', '')),
-                'symbol': signal['symbol'],
-                'type': signal['type'],
-                'entry_price': signal['entry_price'],
-                'target_price': signal['target_price'],
-                'projection_percentage': signal['projection_percentage'],
-                'quality_score': signal['quality_score'],
-                'signal_class': signal['signal_class'],
-                'created_at': signal.get('timestamp', signal.get('created_at', '')),
-                'confirmed_at': signal.get('confirmed_at', ''),
-                'confirmation_reasons': signal.get('confirmation_reasons', []),
-                'confirmation_attempts': signal.get('confirmation_attempts', 0),
-                'btc_correlation': signal.get('btc_correlation', 0),
-                'btc_trend': signal.get('btc_trend', 'NEUTRAL')
-            } for signal in memory_signals]
-            
-            # Combinar e remover duplicatas (priorizar Supabase)
-            all_signals = supabase_signals + memory_formatted
-            
-            # Remover duplicatas baseado no símbolo e tipo
-            seen = set()
-            unique_signals = []
-            for signal in all_signals:
-                key = (signal['symbol'], signal['type'])
-                if key not in seen:
-                    seen.add(key)
-                    unique_signals.append(signal)
-            
-            # Ordenar por data de confirmação (mais recente primeiro)
-            unique_signals.sort(key=lambda x: x.get('confirmed_at', ''), reverse=True)
-            
-            # Aplicar limite final se especificado
-            if limit is not None:
-                unique_signals = unique_signals[:limit]
-            
-            print(f"📊 Retornando {len(unique_signals)} sinais confirmados ({len(supabase_signals)} do Supabase, {len(memory_formatted)} da memória)")
-            return unique_signals
+            signals, _, _ = self.confirmed_view.page(limit)
+            return signals
             
         except Exception as e:
             print(f"❌ Erro ao buscar sinais confirmados: {e}")
@@ -1209,75 +1265,65 @@ class BTCSignalManager:
             if limit is not None:
                 recent_confirmed = recent_confirmed[:limit]
             
-            return [{
-                'id': signal.get('confirmation_id', signal.get('id', '')),
-                'symbol': signal['symbol'],
-                'type': signal['type'],
-                'entry_price': signal['entry_price'],
-                'target_price': signal['target_price'],
-                'projection_percentage': signal['projection_percentage'],
-                'quality_score': signal['quality_score'],
-                'signal_class': signal['signal_class'],
-                'created_at': signal.get('timestamp', signal.get('created_at', '')),
-                'confirmed_at': signal.get('confirmed_at', ''),
-                'confirmation_reasons': signal.get('confirmation_reasons', []),
-                'confirmation_attempts': signal.get('confirmation_attempts', 0),
-                'btc_correlation': signal.get('btc_correlation', 0),
-                'btc_trend': signal.get('btc_trend', 'NEUTRAL')
-            } for signal in recent_confirmed]
+            return [self._format_confirmed_signal(signal) for signal in recent_confirmed]
+    
+    def _query_confirmed_signals(self, limit: Optional[int] = None, since: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Busca no Supabase os sinais confirmados (após 'since', se informado); levanta em caso de erro"""
+        from .http_pool import get_supabase_client
+        
+        supabase_url = os.getenv('SUPABASE_URL')
+        supabase_key = os.getenv('SUPABASE_ANON_KEY')
+        
+        if not supabase_url or not supabase_key:
+            return []
+        
+        supabase = get_supabase_client(supabase_url, supabase_key)
+        
+        # Buscar sinais confirmados, ordenados por data de confirmação
+        query = supabase.table('signals').select('*').eq('status', 'CONFIRMED')
+        if since:
+            query = query.gt('confirmed_at', since)
+        query = query.order('confirmed_at', desc=True)
+        
+        if limit is not None:
+            query = query.limit(limit)
+        
+        result = query.execute()
+        
+        if not result.data:
+            return []
+        
+        # Converter para formato padrão
+        formatted_signals = []
+        for signal in result.data:
+            try:
+                formatted_signal = {
+                    'id': signal.get('id', ''),
+                    'symbol': signal.get('symbol', ''),
+                    'type': signal.get('type', ''),
+                    'entry_price': float(signal.get('entry_price', 0)),
+                    'target_price': float(signal.get('target_price', 0)),
+                    'projection_percentage': float(signal.get('projection_percentage', 0)),
+                    'quality_score': float(signal.get('quality_score', 0)),
+                    'signal_class': signal.get('signal_class', ''),
+                    'created_at': signal.get('created_at', ''),
+                    'confirmed_at': signal.get('confirmed_at', ''),
+                    'confirmation_reasons': signal.get('confirmation_reasons', ''),
+                    'confirmation_attempts': int(signal.get('confirmation_attempts', 0)),
+                    'btc_correlation': float(signal.get('btc_correlation', 0)),
+                    'btc_trend': signal.get('btc_trend', 'NEUTRAL')
+                }
+                formatted_signals.append(formatted_signal)
+            except Exception as e:
+                print(f"⚠️ Erro ao formatar sinal {signal.get('id', 'unknown')}: {e}")
+                continue
+        
+        return formatted_signals
     
     def _get_confirmed_signals_from_supabase(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
         """Busca sinais confirmados diretamente do Supabase"""
         try:
-            # Importar Supabase
-            import os
-            from supabase import create_client, Client
-            
-            supabase_url = os.getenv('SUPABASE_URL')
-            supabase_key = os.getenv('SUPABASE_ANON_KEY')
-            
-            if not supabase_url or not supabase_key:
-                print("⚠️ Supabase não configurado para buscar sinais confirmados")
-                return []
-            
-            supabase: Client = create_client(supabase_url, supabase_key)
-            
-            # Buscar sinais confirmados, ordenados por data de confirmação
-            query = supabase.table('signals').select('*').eq('status', 'CONFIRMED').order('confirmed_at', desc=True)
-            
-            if limit is not None:
-                query = query.limit(limit)
-            
-            result = query.execute()
-            
-            if not result.data:
-                return []
-            
-            # Converter para formato padrão
-            formatted_signals = []
-            for signal in result.data:
-                try:
-                    formatted_signal = {
-                        'id': signal.get('id', ''),
-                        'symbol': signal.get('symbol', ''),
-                        'type': signal.get('type', ''),
-                        'entry_price': float(signal.get('entry_price', 0)),
-                        'target_price': float(signal.get('target_price', 0)),
-                        'projection_percentage': float(signal.get('projection_percentage', 0)),
-                        'quality_score': float(signal.get('quality_score', 0)),
-                        'signal_class': signal.get('signal_class', ''),
-                        'created_at': signal.get('created_at', ''),
-                        'confirmed_at': signal.get('confirmed_at', ''),
-                        'confirmation_reasons': signal.get('confirmation_reasons', ''),
-                        'confirmation_attempts': int(signal.get('confirmation_attempts', 0)),
-                        'btc_correlation': float(signal.get('btc_correlation', 0)),
-                        'btc_trend': signal.get('btc_trend', 'NEUTRAL')
-                    }
-                    formatted_signals.append(formatted_signal)
-                except Exception as e:
-                    print(f"⚠️ Erro ao formatar sinal {signal.get('id', 'unknown')}: {e}")
-                    continue
-            
+            formatted_signals = self._query_confirmed_signals(limit)
             print(f"📊 Encontrados {len(formatted_signals)} sinais confirmados no Supabase")
             return formatted_signals
             
@@ -1339,6 +1385,7 @@ class BTCSignalManager:
             
             # Remover da lista de pendentes
             self.pending_signals.remove(signal)
+            data_versions.bump('btc_signals')
             
             return True
             
@@ -1401,6 +1448,7 @@ class BTCSignalManager:
             
             # Remover da lista de pendentes
             self.pending_signals.remove(signal)
+            data_versions.bump('btc_signals')
             
             return True
             
@@ -1504,6 +1552,7 @@ class BTCSignalManager:
                 
                 # Adicionar à lista de confirmados
                 self.confirmed_signals.extend(confirmed_with_reasons)
+                self.confirmed_view.load([self._format_confirmed_signal(signal) for signal in confirmed_with_reasons])
                 
                 print(f"📊 Carregados {len(confirmed_with_reasons)} sinais confirmados de hoje do CSV")
                 print(f"🔒 {len(self.daily_confirmed_signals)} tipos de sinais únicos já confirmados hoje")
@@ -0,0 +1,428 @@
+# -*- coding: utf-8 -*-
+"""
+Candle Archive - Arquivo local de candles em formato colunar mapeado em memória
+Cada (symbol, interval) é um arquivo de registros de largura fixa
+(open_time int64 + OHLCV float64, 48 bytes) ordenados por open_time. Novos
+candles fechados são anexados ao fim do arquivo (O(1)) e as leituras usam
+np.memmap, devolvendo visões dos registros sem cópia. Inclui o backfill
+paginado via /fapi/v1/klines e a verificação/reparo de lacunas, para que o
+scanner, o analisador de correlação e o backtest iniciem a partir do disco.
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from .kline_stream import INTERVAL_MS
+
+# Registro de um candle (little-endian, sem padding)
+RECORD_DTYPE = np.dtype([
+    ('open_time', '<i8'),
+    ('open', '<f8'),
+    ('high', '<f8'),
+    ('low', '<f8'),
+    ('close', '<f8'),
+    ('volume', '<f8')
+])
+RECORD_SIZE = RECORD_DTYPE.itemsize
+
+FILE_EXTENSION = '.candles'
+DEFAULT_ROOT = os.getenv('CANDLE_ARCHIVE_DIR', os.path.join(os.path.dirname(__file__), '..', 'data', 'candles'))
+MAX_KLINES_PER_REQUEST = 1500  # Limite de /fapi/v1/klines
+
+
+class CandleArchive:
+    """
+    Arquivo de candles fechados: <root>/<interval>/<SYMBOL>.candles
+
+    Escritas (append e merge) são serializadas por um lock; leituras mapeiam o
+    arquivo e reaproveitam o mapeamento enquanto o tamanho não muda. Como o
+    arquivo só cresce (merge troca o arquivo inteiro com os.replace), visões
+    devolvidas antes de uma escrita continuam válidas.
+    """
+
+    def __init__(self, root: str):
+        """Inicializa o arquivo (diretórios são criados na primeira escrita)
+
+        Args:
+            root: Pasta raiz do arquivo de candles
+        """
+        self.root = root
+        self.lock = threading.RLock()
+        self._maps: Dict[Tuple[str, str], Tuple[int, int, np.ndarray]] = {}
+
+        self.stats = {
+            'records_appended': 0,
+            'records_merged': 0,
+            'reads': 0,
+            'remaps': 0
+        }
+
+    # ------------------------------------------------------------------
+    # Leitura (mmap, sem cópia)
+    # ------------------------------------------------------------------
+
+    def path(self, symbol: str, interval: str) -> str:
+        return os.path.join(self.root, interval, f"{symbol.upper()}{FILE_EXTENSION}")
+
+    def _records(self, symbol: str, interval: str) -> np.ndarray:
+        """Todos os registros da série mapeados em memória (vazio se não houver arquivo)"""
+        key = (symbol.upper(), interval)
+        path = self.path(symbol, interval)
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return np.empty(0, dtype=RECORD_DTYPE)
+
+        count = stat.st_size // RECORD_SIZE  # Ignora registro parcial de uma escrita interrompida
+        cached = self._maps.get(key)
+        if cached is not None and cached[0] == stat.st_ino and len(cached[2]) == count:
+            return cached[2]
+        if count == 0:
+            return np.empty(0, dtype=RECORD_DTYPE)
+
+        records = np.memmap(path, dtype=RECORD_DTYPE, mode='r', shape=(count,))
+        self._maps[key] = (stat.st_ino, stat.st_size, records)
+        self.stats['remaps'] += 1
+        return records
+
+    def count(self, symbol: str, interval: str) -> int:
+        return len(self._records(symbol, interval))
+
+    def last_open_time(self, symbol: str, interval: str) -> Optional[int]:
+        records = self._records(symbol, interval)
+        return int(records['open_time'][-1]) if len(records) else None
+
+    def read(self, symbol: str, interval: str, start_ms: Optional[int] = None,
+             end_ms: Optional[int] = None) -> np.ndarray:
+        """Registros com start_ms <= open_time <= end_ms (visão do mmap, sem cópia)"""
+        records = self._records(symbol, interval)
+        self.stats['reads'] += 1
+        open_times = records['open_time']
+        first = 0 if start_ms is None else int(np.searchsorted(open_times, start_ms, side='left'))
+        stop = len(records) if end_ms is None else int(np.searchsorted(open_times, end_ms, side='right'))
+        return records[first:stop]
+
+    def tail(self, symbol: str, interval: str, limit: int) -> np.ndarray:
+        """Últimos `limit` registros (visão do mmap)"""
+        records = self._records(symbol, interval)
+        self.stats['reads'] += 1
+        return records[max(0, len(records) - limit):]
+
+    def series(self, symbol: str, interval: str, start_ms: Optional[int] = None,
+               end_ms: Optional[int] = None) -> Dict[str, np.ndarray]:
+        """Colunas open_time + OHLCV (formato de backtest_engine.load_candles, sem cópia)"""
+        records = self.read(symbol, interval, start_ms, end_ms)
+        return {field: records[field] for field in RECORD_DTYPE.names}
+
+    def klines(self, symbol: str, interval: str, limit: int) -> List[Dict[str, Any]]:
+        """Últimos `limit` candles no formato de BinanceClient.get_klines"""
+        return records_to_klines(self.tail(symbol, interval, limit), INTERVAL_MS[interval])
+
+    def is_current(self, symbol: str, interval: str, now_ms: Optional[int] = None) -> bool:
+        """True se o último candle fechado até agora já está no arquivo"""
+        last = self.last_open_time(symbol, interval)
+        if last is None:
+            return False
+        interval_ms = INTERVAL_MS[interval]
+        now_ms = int(time.time() * 1000) if now_ms is None else now_ms
+        return last >= (now_ms // interval_ms - 1) * interval_ms
+
+    def list_series(self) -> List[Tuple[str, str]]:
+        """(symbol, interval) presentes no arquivo"""
+        series = []
+        if not os.path.isdir(self.root):
+            return series
+        for interval in sorted(os.listdir(self.root)):
+            directory = os.path.join(self.root, interval)
+            if interval not in INTERVAL_MS or not os.path.isdir(directory):
+                continue
+            for name in sorted(os.listdir(directory)):
+                if name.endswith(FILE_EXTENSION):
+                    series.append((name[:-len(FILE_EXTENSION)], interval))
+        return series
+
+    # ------------------------------------------------------------------
+    # Escrita
+    # ------------------------------------------------------------------
+
+    def append(self, symbol: str, interval: str, klines: Any, closed_before_ms: Optional[int] = None) -> int:
+        """Anexa candles mais novos que o último registro (O(1): escrita no fim do arquivo)
+
+        Args:
+            klines: Lista de dicts de get_klines ou array RECORD_DTYPE
+            closed_before_ms: Só anexa candles fechados até este instante (ex.: agora)
+
+        Returns:
+            Número de registros anexados
+        """
+        records = to_records(klines)
+        if closed_before_ms is not None:
+            records = records[records['open_time'] + INTERVAL_MS[interval] <= closed_before_ms]
+        if len(records) == 0:
+            return 0
+
+        with self.lock:
+            last = self.last_open_time(symbol, interval)
+            if last is not None:
+                records = records[records['open_time'] > last]
+            # Mantém apenas a sequência estritamente crescente (sem open_time repetido)
+            if len(records) > 1:
+                records = records[np.concatenate([[True], np.diff(records['open_time']) > 0])]
+            if len(records) == 0:
+                return 0
+
+            path = self.path(symbol, interval)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, 'ab') as file:
+                size = file.tell()
+                if size % RECORD_SIZE:
+                    file.truncate(size - size % RECORD_SIZE)  # Descarta registro parcial
+                file.write(records.tobytes())
+            self.stats['records_appended'] += len(records)
+            return len(records)
+
+    def merge(self, symbol: str, interval: str, klines: Any) -> int:
+        """Insere candles em qualquer posição (backfill do passado, reparo de lacunas)
+
+        Regrava o arquivo inteiro (arquivo temporário + os.replace); registros já
+        arquivados prevalecem sobre os novos com o mesmo open_time.
+
+        Returns:
+            Número de registros novos
+        """
+        records = to_records(klines)
+        if len(records) == 0:
+            return 0
+
+        with self.lock:
+            existing = self._records(symbol, interval)
+            combined = np.concatenate([np.asarray(existing), records])
+            _, first_seen = np.unique(combined['open_time'], return_index=True)
+            merged = combined[first_seen]  # Ordenado por open_time, primeira ocorrência
+            added = len(merged) - len(existing)
+            if added == 0:
+                return 0
+
+            path = self.path(symbol, interval)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            temporary = f"{path}.tmp"
+            merged.tofile(temporary)
+            os.replace(temporary, path)
+            self.stats['records_merged'] += added
+            return added
+
+    # ------------------------------------------------------------------
+    # Integridade
+    # ------------------------------------------------------------------
+
+    def find_gaps(self, symbol: str, interval: str, start_ms: Optional[int] = None,
+                  end_ms: Optional[int] = None) -> List[Dict[str, int]]:
+        """Intervalos de candles ausentes entre registros consecutivos
+
+        Returns:
+            Lista de {'start', 'end' (open_time do primeiro/último ausente), 'missing'}
+        """
+        open_times = self.read(symbol, interval, start_ms, end_ms)['open_time']
+        interval_ms = INTERVAL_MS[interval]
+        steps = np.diff(open_times)
+        gaps = np.flatnonzero(steps > interval_ms)
+        return [
+            {
+                'start': int(open_times[i]) + interval_ms,
+                'end': int(open_times[i + 1]) - interval_ms,
+                'missing': int(steps[i] // interval_ms) - 1
+            }
+            for i in gaps.tolist()
+        ]
+
+    def check(self, series: Optional[Iterable[Tuple[str, str]]] = None) -> Dict[str, Dict[str, Any]]:
+        """Relatório de integridade por série: registros, período, lacunas e desalinhamentos"""
+        report = {}
+        for symbol, interval in (series or self.list_series()):
+            records = self._records(symbol, interval)
+            open_times = records['open_time']
+            interval_ms = INTERVAL_MS[interval]
+            steps = np.diff(open_times)
+            gaps = self.find_gaps(symbol, interval)
+            size = os.path.getsize(self.path(symbol, interval)) if os.path.exists(self.path(symbol, interval)) else 0
+            report[f"{symbol.upper()}_{interval}"] = {
+                'records': len(records),
+                'first_open_time': int(open_times[0]) if len(records) else None,
+                'last_open_time': int(open_times[-1]) if len(records) else None,
+                'gaps': len(gaps),
+                'missing_candles': sum(gap['missing'] for gap in gaps),
+                'unordered': int(np.count_nonzero(steps <= 0)),
+                'misaligned': int(np.count_nonzero(open_times % interval_ms)),
+                'partial_bytes': size % RECORD_SIZE,
+                'ok': not gaps and not np.any(steps <= 0) and size % RECORD_SIZE == 0
+            }
+        return report
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Retorna estatísticas do arquivo"""
+        return {**self.stats, 'root': self.root, 'mapped_series': len(self._maps)}
+
+
+# ----------------------------------------------------------------------
+# Conversões
+# ----------------------------------------------------------------------
+
+def to_records(klines: Any) -> np.ndarray:
+    """Lista de dicts de get_klines (ou array RECORD_DTYPE) → array RECORD_DTYPE ordenado"""
+    if isinstance(klines, np.ndarray) and klines.dtype == RECORD_DTYPE:
+        records = np.asarray(klines)
+    else:
+        records = np.empty(len(klines), dtype=RECORD_DTYPE)
+        for field in RECORD_DTYPE.names:
+            records[field] = [k[field] for k in klines]
+    if len(records) > 1 and np.any(np.diff(records['open_time']) < 0):
+        records = records[np.argsort(records['open_time'], kind='stable')]
+    return records
+
+
+def records_to_klines(records: np.ndarray, interval_ms: int) -> List[Dict[str, Any]]:
+    """Registros → dicts no formato de BinanceClient.get_klines (close_time = fim do candle)"""
+    columns = {field: records[field].tolist() for field in RECORD_DTYPE.names}
+    return [
+        {**{field: columns[field][i] for field in RECORD_DTYPE.names},
+         'close_time': columns['open_time'][i] + interval_ms - 1}
+        for i in range(len(records))
+    ]
+
+
+def load_archive(archive: CandleArchive, symbols: Optional[Iterable[str]] = None,
+                 intervals: Tuple[str, ...] = ('1h', '4h'), start_ms: Optional[int] = None,
+                 end_ms: Optional[int] = None) -> Dict[str, Dict[str, Dict[str, np.ndarray]]]:
+    """Séries do arquivo no formato de backtest_engine.load_candles (visões do mmap)"""
+    wanted = {symbol.upper() for symbol in symbols} if symbols else None
+    candles: Dict[str, Dict[str, Dict[str, np.ndarray]]] = {}
+    for symbol, interval in archive.list_series():
+        if interval not in intervals or (wanted and symbol not in wanted):
+            continue
+        series = archive.series(symbol, interval, start_ms, end_ms)
+        if len(series['open_time']):
+            candles.setdefault(symbol, {})[interval] = series
+    return candles
+
+
+# ----------------------------------------------------------------------
+# Backfill e reparo via /fapi/v1/klines
+# ----------------------------------------------------------------------
+
+def _fetch_range(client: Any, symbol: str, interval: str, start_ms: int, end_ms: int,
+                 page_limit: int = MAX_KLINES_PER_REQUEST) -> Iterator[List[Dict[str, Any]]]:
+    """Páginas de candles com open_time entre start_ms e end_ms (em ordem cronológica)"""
+    interval_ms = INTERVAL_MS[interval]
+    cursor = start_ms
+    while cursor <= end_ms:
+        page = client.get_klines(symbol, interval, page_limit, start_time=cursor, end_time=end_ms)
+        if not page:
+            return
+        yield page
+        cursor = int(page[-1]['open_time']) + interval_ms
+        if len(page) < page_limit:
+            return
+
+
+def backfill(client: Any, archive: CandleArchive, symbol: str, interval: str, start_ms: int,
+             end_ms: Optional[int] = None, page_limit: int = MAX_KLINES_PER_REQUEST) -> int:
+    """Completa o arquivo de start_ms até end_ms (padrão: último candle fechado)
+
+    Períodos depois do último registro são anexados; períodos antes do primeiro
+    registro são mesclados. Só candles fechados são gravados.
+
+    Returns:
+        Número de registros novos
+    """
+    interval_ms = INTERVAL_MS[interval]
+    now_ms = int(time.time() * 1000)
+    end_ms = min(end_ms if end_ms is not None else now_ms, now_ms - interval_ms)
+    start_ms = start_ms - start_ms % interval_ms
+
+    existing = archive.read(symbol, interval)
+    added = 0
+    if len(existing) and start_ms < int(existing['open_time'][0]):
+        older_end = min(end_ms, int(existing['open_time'][0]) - interval_ms)
+        for page in _fetch_range(client, symbol, interval, start_ms, older_end, page_limit):
+            added += archive.merge(symbol, interval, to_records(page))
+
+    last = archive.last_open_time(symbol, interval)
+    cursor = start_ms if last is None else max(start_ms, last + interval_ms)
+    for page in _fetch_range(client, symbol, interval, cursor, end_ms, page_limit):
+        added += archive.append(symbol, interval, page, closed_before_ms=now_ms)
+    return added
+
+
+def repair_gaps(client: Any, archive: CandleArchive, symbol: str, interval: str) -> Dict[str, int]:
+    """Busca os candles das lacunas encontradas por find_gaps
+
+    Lacunas da própria Binance (manutenção) continuam no relatório como 'remaining'.
+    """
+    gaps = archive.find_gaps(symbol, interval)
+    filled = 0
+    for gap in gaps:
+        for page in _fetch_range(client, symbol, interval, gap['start'], gap['end']):
+            filled += archive.merge(symbol, interval, to_records(page))
+    return {'gaps': len(gaps), 'filled': filled, 'remaining': len(archive.find_gaps(symbol, interval))}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Linha de comando: python -m core.candle_archive {backfill,check,repair}"""
+    parser = argparse.ArgumentParser(description='Arquivo local de candles')
+    parser.add_argument('command', choices=['backfill', 'check', 'repair'])
+    parser.add_argument('--root', default=DEFAULT_ROOT, help='Pasta do arquivo (padrão: CANDLE_ARCHIVE_DIR)')
+    parser.add_argument('--symbols', nargs='*', help='Pares (padrão: séries já arquivadas)')
+    parser.add_argument('--intervals', nargs='*', default=['1h', '4h'])
+    parser.add_argument('--start', help='Data inicial dd/mm/aaaa do backfill')
+    parser.add_argument('--days', type=int, default=365, help='Dias de histórico sem --start')
+    args = parser.parse_args(argv)
+
+    archive = CandleArchive(args.root)
+    if args.symbols:
+        series = [(symbol.upper(), interval) for symbol in args.symbols for interval in args.intervals]
+    else:
+        series = [(symbol, interval) for symbol, interval in archive.list_series() if interval in args.intervals]
+    if not series:
+        print("❌ Nenhuma série informada ou arquivada (use --symbols)")
+        return 1
+
+    if args.command == 'check':
+        report = archive.check(series)
+        for name, info in report.items():
+            status = "✅" if info['ok'] else "⚠️"
+            print(f"{status} {name}: {info['records']} candles, {info['gaps']} lacunas "
+                  f"({info['missing_candles']} ausentes), {info['unordered']} fora de ordem")
+        return 0 if all(info['ok'] for info in report.values()) else 2
+
+    from .backtest_engine import _parse_date
+    from .binance_client import BinanceClient
+    client = BinanceClient()
+    start_ms = _parse_date(args.start) if args.start else int((time.time() - args.days * 86400) * 1000)
+    started = time.time()
+    for symbol, interval in series:
+        try:
+            if args.command == 'backfill':
+                added = backfill(client, archive, symbol, interval, start_ms)
+                print(f"📥 {symbol} {interval}: +{added} candles ({archive.count(symbol, interval)} no arquivo)")
+            else:
+                result = repair_gaps(client, archive, symbol, interval)
+                print(f"🩹 {symbol} {interval}: {result['filled']} candles em {result['gaps']} lacunas, "
+                      f"{result['remaining']} restantes")
+        except Exception as e:
+            print(f"❌ Erro em {symbol} {interval}: {e}")
+    print(f"⏱️ {len(series)} séries em {time.time() - started:.1f}s")
+    return 0
+
+
+# Instância global para uso em outros módulos
+candle_archive = CandleArchive(DEFAULT_ROOT)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,293 @@
+# -*- coding: utf-8 -*-
+"""
+Confirmed Signals View - Visão materializada dos sinais confirmados
+Mantém em memória os sinais confirmados já deduplicados por (símbolo, tipo) e
+ordenados por confirmação. A visão é atualizada na hora em que um sinal é
+confirmado e, do banco, busca apenas as linhas mais novas que a marca d'água;
+cada mudança incrementa a versão, e o JSON serializado de cada página fica em
+cache até a próxima versão.
+"""
+
+import bisect
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import pytz
+
+from .fast_json import dumps as fast_dumps
+
+SAO_PAULO_TZ = pytz.timezone('America/Sao_Paulo')
+MAX_SERIALIZED_PAGES = 64
+DATE_FORMATS = ('%d/%m/%Y %H:%M:%S', '%Y-%m-%d %H:%M:%S', '%d/%m/%Y')
+
+# Busca linhas do banco confirmadas depois da marca d'água (None = todas)
+Fetcher = Callable[[Optional[str]], List[Dict[str, Any]]]
+
+
+def confirmed_timestamp(value: Any) -> float:
+    """Converte confirmed_at (ISO ou formato brasileiro, horário de São Paulo) em timestamp"""
+    if isinstance(value, datetime):
+        moment = value
+    else:
+        text = str(value or '').strip()
+        if not text:
+            return 0.0
+        moment = None
+        try:
+            moment = datetime.fromisoformat(text.replace('Z', '+00:00'))
+        except ValueError:
+            for date_format in DATE_FORMATS:
+                try:
+                    moment = datetime.strptime(text, date_format)
+                    break
+                except ValueError:
+                    continue
+        if moment is None:
+            return 0.0
+    if moment.tzinfo is None:
+        moment = SAO_PAULO_TZ.localize(moment)
+    return moment.timestamp()
+
+
+class ConfirmedSignalsView:
+    """
+    Sinais confirmados materializados para as rotas da API
+
+    Linhas do banco têm prioridade sobre as da memória quando confirmadas no
+    mesmo instante; fora isso vale a confirmação mais recente do par
+    (símbolo, tipo). A paginação usa cursores (posição do último item
+    retornado), então páginas seguintes não se deslocam quando entram sinais
+    novos no topo.
+    """
+
+    def __init__(self, fetcher: Optional[Fetcher] = None, refresh_interval: Optional[float] = None,
+                 full_refresh_interval: Optional[float] = None, clock: Callable[[], float] = time.time):
+        """Inicializa a visão (a primeira leitura carrega tudo do banco)
+
+        Args:
+            fetcher: Busca no banco as linhas posteriores à marca d'água
+            refresh_interval: Intervalo entre buscas incrementais em segundos
+                              (padrão: CONFIRMED_VIEW_REFRESH ou 30)
+            full_refresh_interval: Intervalo entre recargas completas, que
+                                   removem linhas apagadas no banco
+                                   (padrão: CONFIRMED_VIEW_FULL_REFRESH ou 3600)
+            clock: Função de tempo (injetável para testes)
+        """
+        self.fetcher = fetcher
+        self.refresh_interval = (refresh_interval if refresh_interval is not None
+                                 else float(os.getenv('CONFIRMED_VIEW_REFRESH', '30')))
+        self.full_refresh_interval = (full_refresh_interval if full_refresh_interval is not None
+                                      else float(os.getenv('CONFIRMED_VIEW_FULL_REFRESH', '3600')))
+        self.clock = clock
+
+        # (símbolo, tipo) → (sort_key, origem, registro)
+        self.entries: Dict[Tuple[str, str], Tuple[Tuple[float, str, str], str, Dict[str, Any]]] = {}
+        # Chaves de ordenação (-timestamp, símbolo, tipo), mais recentes primeiro
+        self.ordered: List[Tuple[float, str, str]] = []
+        self.version = 0
+        self.watermark: Optional[str] = None
+        self.watermark_ts = 0.0
+        self.last_refresh = 0.0
+        self.last_full_refresh = 0.0
+
+        self.serialized: Dict[Tuple, Tuple[str, Optional[str]]] = {}
+        self.lock = threading.RLock()
+        self.refresh_lock = threading.Lock()
+
+        self.stats = {
+            'reads': 0,
+            'serialized_hits': 0,
+            'serialized_misses': 0,
+            'incremental_refreshes': 0,
+            'full_refreshes': 0,
+            'rows_fetched': 0,
+            'refresh_errors': 0
+        }
+
+    # ------------------------------------------------------------------
+    # Escrita
+    # ------------------------------------------------------------------
+
+    def _upsert_locked(self, record: Dict[str, Any], source: str) -> bool:
+        key = (str(record.get('symbol', '')), str(record.get('type', '')))
+        sort_key = (-confirmed_timestamp(record.get('confirmed_at')), key[0], key[1])
+        current = self.entries.get(key)
+        if current is not None:
+            current_sort, current_source = current[0], current[1]
+            if sort_key > current_sort:
+                return False  # Já existe uma confirmação mais recente
+            if sort_key == current_sort and current_source == 'db' and source != 'db':
+                return False
+            self.ordered.pop(bisect.bisect_left(self.ordered, current_sort))
+        bisect.insort(self.ordered, sort_key)
+        self.entries[key] = (sort_key, source, dict(record))
+        return True
+
+    def _bump_version_locked(self) -> None:
+        self.version += 1
+        self.serialized.clear()
+
+    def upsert(self, record: Dict[str, Any], source: str = 'memory') -> bool:
+        """Inclui ou atualiza um sinal confirmado; retorna True se a visão mudou"""
+        with self.lock:
+            changed = self._upsert_locked(record, source)
+            if changed:
+                self._bump_version_locked()
+            return changed
+
+    def load(self, records: List[Dict[str, Any]], source: str = 'memory') -> int:
+        """Inclui vários sinais com uma única mudança de versão"""
+        with self.lock:
+            changed = sum(1 for record in records if self._upsert_locked(record, source))
+            if changed:
+                self._bump_version_locked()
+            return changed
+
+    def remove(self, symbol: str, signal_type: str) -> bool:
+        """Remove um sinal da visão"""
+        with self.lock:
+            current = self.entries.pop((symbol, signal_type), None)
+            if current is None:
+                return False
+            self.ordered.pop(bisect.bisect_left(self.ordered, current[0]))
+            self._bump_version_locked()
+            return True
+
+    def invalidate(self) -> None:
+        """Força uma recarga completa na próxima leitura"""
+        with self.lock:
+            self.last_full_refresh = 0.0
+            self.last_refresh = 0.0
+
+    # ------------------------------------------------------------------
+    # Atualização a partir do banco
+    # ------------------------------------------------------------------
+
+    def _advance_watermark_locked(self, rows: List[Dict[str, Any]]) -> None:
+        for row in rows:
+            row_ts = confirmed_timestamp(row.get('confirmed_at'))
+            if row_ts > self.watermark_ts:
+                self.watermark_ts = row_ts
+                self.watermark = row.get('confirmed_at')
+
+    def refresh(self, force: bool = False) -> bool:
+        """Busca no banco o que mudou desde a marca d'água; retorna True se consultou"""
+        if self.fetcher is None:
+            return False
+        now = self.clock()
+        full = force or now - self.last_full_refresh >= self.full_refresh_interval
+        if not full and now - self.last_refresh < self.refresh_interval:
+            return False
+        # Uma busca por vez; leitores concorrentes usam a versão atual
+        if not self.refresh_lock.acquire(blocking=False):
+            return False
+        try:
+            rows = self.fetcher(None if full else self.watermark)
+            with self.lock:
+                self.stats['rows_fetched'] += len(rows)
+                if full:
+                    # Recarga completa: descarta linhas do banco que não vieram mais
+                    self.stats['full_refreshes'] += 1
+                    fetched = {(str(r.get('symbol', '')), str(r.get('type', ''))) for r in rows}
+                    stale = [key for key, entry in self.entries.items()
+                             if entry[1] == 'db' and key not in fetched]
+                    for key in stale:
+                        self.ordered.pop(bisect.bisect_left(self.ordered, self.entries.pop(key)[0]))
+                    changed = bool(stale)
+                    self.watermark, self.watermark_ts = None, 0.0
+                    self.last_full_refresh = now
+                else:
+                    self.stats['incremental_refreshes'] += 1
+                    changed = False
+                changed = sum(1 for row in rows if self._upsert_locked(row, 'db')) > 0 or changed
+                self._advance_watermark_locked(rows)
+                self.last_refresh = now
+                if changed:
+                    self._bump_version_locked()
+            return True
+        except Exception as e:
+            with self.lock:
+                self.stats['refresh_errors'] += 1
+                self.last_refresh = now  # Não martelar o banco enquanto estiver fora
+            print(f"⚠️ Erro ao atualizar visão de sinais confirmados: {e}")
+            return False
+        finally:
+            self.refresh_lock.release()
+
+    # ------------------------------------------------------------------
+    # Leitura
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def encode_cursor(sort_key: Tuple[float, str, str]) -> str:
+        return f"{-sort_key[0]!r}|{sort_key[1]}|{sort_key[2]}"
+
+    @staticmethod
+    def decode_cursor(cursor: str) -> Tuple[float, str, str]:
+        timestamp, symbol, signal_type = cursor.split('|', 2)
+        return (-float(timestamp), symbol, signal_type)
+
+    def page(self, limit: Optional[int] = None, cursor: Optional[str] = None,
+             refresh: bool = True) -> Tuple[List[Dict[str, Any]], Optional[str], int]:
+        """Retorna (sinais, próximo cursor, versão), mais recentes primeiro"""
+        if refresh:
+            self.refresh()
+        with self.lock:
+            self.stats['reads'] += 1
+            start = bisect.bisect_right(self.ordered, self.decode_cursor(cursor)) if cursor else 0
+            end = len(self.ordered) if limit is None else min(start + max(limit, 0), len(self.ordered))
+            keys = self.ordered[start:end]
+            items = [dict(self.entries[(key[1], key[2])][2]) for key in keys]
+            next_cursor = self.encode_cursor(keys[-1]) if keys and end < len(self.ordered) else None
+            return items, next_cursor, self.version
+
+    def serialized_page(self, name: str, build: Callable[[List[Dict[str, Any]], Optional[str], int], Any],
+                        limit: Optional[int] = None, cursor: Optional[str] = None,
+                        dumps: Callable[[Any], str] = None) -> Tuple[str, int, Optional[str]]:
+        """Retorna (JSON, versão, próximo cursor) da página, reaproveitado até a próxima versão
+
+        Args:
+            name: Identifica o formato de resposta (uma rota pode ter vários)
+            build: Recebe (sinais, próximo cursor, versão) e monta o payload
+            limit: Tamanho da página (None = todos)
+            cursor: Cursor retornado pela página anterior
+            dumps: Serializador (padrão: fast_json.dumps)
+        """
+        self.refresh()
+        with self.lock:
+            cache_key = (name, limit, cursor, self.version)
+            cached = self.serialized.get(cache_key)
+            if cached is not None:
+                self.stats['serialized_hits'] += 1
+                return cached[0], self.version, cached[1]
+            self.stats['serialized_misses'] += 1
+            items, next_cursor, version = self.page(limit, cursor, refresh=False)
+            body = (dumps or (lambda payload: fast_dumps(payload, strict=False)))(build(items, next_cursor, version))
+            if len(self.serialized) >= MAX_SERIALIZED_PAGES:
+                self.serialized.clear()
+            self.serialized[cache_key] = (body, next_cursor)
+            return body, version, next_cursor
+
+    def current_version(self) -> int:
+        """Versão atual, atualizando antes a partir do banco se o intervalo venceu"""
+        self.refresh()
+        return self.version
+
+    def __len__(self) -> int:
+        with self.lock:
+            return len(self.entries)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Retorna estatísticas da visão"""
+        with self.lock:
+            return {
+                **self.stats,
+                'signals': len(self.entries),
+                'version': self.version,
+                'watermark': self.watermark,
+                'cached_pages': len(self.serialized),
+                'seconds_since_refresh': self.clock() - self.last_refresh if self.last_refresh else None
+            }
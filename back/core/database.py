@@ -1,7 +1,7 @@
 import pandas as pd
 # --- Início da Edição ---
 # Importar 'cast' do módulo typing
-from typing import Dict, Any, Optional, List, cast
+from typing import Dict, Any, Optional, List, Tuple, cast
 import math # Importar math para usar math.isnan
 import os
 from datetime import datetime, timedelta # Adicionado timedelta
@@ -9,6 +9,11 @@ import traceback
 import csv # Importa o módulo csv
 import numpy as np # Adicione esta importação para usar numpy.nan_to_num
 import uuid # Adicionado para gerar tokens únicos
+from .sqlite_storage import SQLiteStorage
+from .signal_event_log import SignalEventLog, get_signal_event_log, signal_key, split_signal_key
+from .auth_token_index import AuthTokenIndex, create_auth_token_index
+from .response_cache import data_versions
+from .metrics import DB_WRITE_SECONDS, timed
 
 def snake_to_camel_case(snake_str: str) -> str:
     """Converte uma string de snake_case para camelCase."""
@@ -17,15 +22,17 @@ def snake_to_camel_case(snake_str: str) -> str:
     return components[0] + ''.join(x.title() for x in components[1:])
 
 class Database:
-    def __init__(self):
+    def __init__(self, base_dir: Optional[str] = None):
+        """base_dir: diretório dos CSVs e do SQLite (padrão: back/; benchmarks usam um diretório temporário)"""
+        root = base_dir or os.path.join(os.path.dirname(__file__), '..')
         # Define os caminhos dos arquivos CSV
-        self.signals_list_file = os.path.join(os.path.dirname(__file__), '..', 'sinais_lista.csv')
-        self.signals_history_file = os.path.join(os.path.dirname(__file__), '..', 'signals_history.csv')
-        self.config_file = os.path.join(os.path.dirname(__file__), '..', 'config.csv')
-        self.users_file = os.path.join(os.path.dirname(__file__), '..', 'users.csv')
-        self.tickers_file = os.path.join(os.path.dirname(__file__), '..', 'tickers.csv') # Adicionado caminho para tickers.csv
-        self.password_reset_tokens_file = os.path.join(os.path.dirname(__file__), '..', 'password_reset_tokens.csv') # Novo arquivo para tokens de redefinição
-        self.auth_tokens_file = os.path.join(os.path.dirname(__file__), '..', 'auth_tokens.csv') # Adicionado caminho para auth_tokens.csv
+        self.signals_list_file = os.path.join(root, 'sinais_lista.csv')
+        self.signals_history_file = os.path.join(root, 'signals_history.csv')
+        self.config_file = os.path.join(root, 'config.csv')
+        self.users_file = os.path.join(root, 'users.csv')
+        self.tickers_file = os.path.join(root, 'tickers.csv') # Adicionado caminho para tickers.csv
+        self.password_reset_tokens_file = os.path.join(root, 'password_reset_tokens.csv') # Novo arquivo para tokens de redefinição
+        self.auth_tokens_file = os.path.join(root, 'auth_tokens.csv') # Adicionado caminho para auth_tokens.csv
 
         # Define os cabeçalhos para cada arquivo CSV
         self.files_to_check = {
@@ -51,6 +58,21 @@ class Database:
         # Garante que os arquivos existam
         self._ensure_files_exist()
 
+        # sinais_lista.csv pertence ao log de eventos (único escritor do arquivo)
+        self.signal_log: SignalEventLog = get_signal_event_log(self.signals_list_file)
+
+        # Backend de armazenamento: 'sqlite' (padrão, WAL indexado) ou 'csv' (legado)
+        self.backend = os.getenv('DATABASE_BACKEND', 'sqlite').lower()
+        self.sqlite_path = (
+            os.path.join(base_dir, 'data', 'trading_storage.db') if base_dir
+            else os.getenv('SQLITE_DB_PATH', os.path.join(root, 'data', 'trading_storage.db'))
+        )
+        self.storage: Optional[SQLiteStorage] = self._open_storage() if self.backend == 'sqlite' else None
+
+        # Índice de tokens de autenticação (carregado na primeira verificação)
+        self.token_index: AuthTokenIndex = create_auth_token_index()
+        self.auth_tokens_stamp: Optional[Tuple[int, int, int]] = None
+
         # Carrega configurações iniciais
         self.config = self._load_config()
 
@@ -67,9 +89,69 @@ class Database:
                     print(f"❌ Erro ao criar arquivo {file_path}: {e}")
                     traceback.print_exc()
 
+    def _csv_tables(self) -> Dict[str, str]:
+        """Mapeia as tabelas do SQLite para os arquivos CSV legados."""
+        return {
+            'signals': self.signals_list_file,
+            'signals_history': self.signals_history_file,
+            'config': self.config_file,
+            'users': self.users_file,
+            'tickers': self.tickers_file,
+            'password_reset_tokens': self.password_reset_tokens_file,
+            'auth_tokens': self.auth_tokens_file
+        }
+
+    def _open_storage(self) -> Optional[SQLiteStorage]:
+        """Abre o SQLite e importa os CSVs na primeira execução (volta ao CSV em caso de erro)."""
+        try:
+            storage = SQLiteStorage(self.sqlite_path)
+            if not storage.is_migrated():
+                imported = storage.migrate_from_csv(self._csv_tables())
+                print(f"✅ CSVs migrados para SQLite ({self.sqlite_path}): {imported}")
+            return storage
+        except Exception as e:
+            print(f"❌ Erro ao abrir SQLite ({self.sqlite_path}), usando CSV: {e}")
+            traceback.print_exc()
+            self.backend = 'csv'
+            return None
+
+    def migrate_csv_to_sqlite(self, force: bool = False) -> Dict[str, int]:
+        """Importa os CSVs legados para o SQLite (registros existentes são ignorados)."""
+        if self.storage is None:
+            print("⚠️ Backend SQLite desativado (DATABASE_BACKEND=csv)")
+            return {}
+        imported = self.storage.migrate_from_csv(self._csv_tables(), force=force)
+        self.config = self._load_config()
+        return imported
+
+    def get_storage_stats(self) -> Dict[str, Any]:
+        """Retorna o backend em uso e, no SQLite, as contagens por tabela."""
+        if self.storage is None:
+            return {'backend': 'csv'}
+        return {'backend': 'sqlite', **self.storage.get_stats()}
+
+    def _append_history_csv(self, signal_data: Dict[str, Any]) -> None:
+        """Acrescenta um sinal fechado ao signals_history.csv (sem reescrever o arquivo)."""
+        headers = self.files_to_check[self.signals_history_file]
+        if os.path.exists(self.signals_history_file) and os.path.getsize(self.signals_history_file) > 0:
+            with open(self.signals_history_file, 'r', newline='', encoding='utf-8') as f:
+                headers = next(csv.reader(f), headers)
+        with open(self.signals_history_file, 'a', newline='', encoding='utf-8') as f:
+            writer = csv.DictWriter(f, fieldnames=headers, extrasaction='ignore')
+            if os.path.getsize(self.signals_history_file) == 0:
+                writer.writeheader()
+            writer.writerow(signal_data)
+
     def _load_config(self) -> Dict[str, str]:
         """Carrega as configurações do arquivo config.csv."""
         config_data = {}
+        if self.storage is not None:
+            try:
+                return self.storage.get_config()
+            except Exception as e:
+                print(f"❌ Erro ao carregar configurações do SQLite: {e}")
+                traceback.print_exc()
+                return config_data
         if os.path.exists(self.config_file):
             try:
                 df = pd.read_csv(self.config_file)
@@ -97,10 +179,16 @@ class Database:
         """Obtém um valor de configuração pela chave."""
         return self.config.get(key)
 
+    @timed(DB_WRITE_SECONDS, operation='set_config')
     def set_config(self, key: str, value: str) -> None:
         """Define ou atualiza um valor de configuração e salva no arquivo."""
         self.config[key] = value
         try:
+            if self.storage is not None:
+                self.storage.set_config(key, value)
+                print(f"✅ Configuração '{key}' salva.")
+                return
+
             # Converte o dicionário de volta para DataFrame e salva
             # Explicitamente criar um pd.Index para as colunas para satisfazer o type checker
             df = pd.DataFrame(list(self.config.items()), columns=pd.Index(['key', 'value']))
@@ -110,8 +198,13 @@ class Database:
             print(f"❌ Erro ao salvar configuração no {self.config_file}: {e}")
             traceback.print_exc()
 
-    def add_signal(self, signal_data: Dict[str, Any]) -> bool: # Adicionado tipo de retorno bool
-        """Adiciona um novo sinal ao arquivo sinais_lista.csv e ao Supabase, verificando duplicatas por dia."""
+    @timed(DB_WRITE_SECONDS, operation='add_signal')
+    def add_signal(self, signal_data: Dict[str, Any], save_remote: bool = True, raise_errors: bool = False) -> bool: # Adicionado tipo de retorno bool
+        """Adiciona um novo sinal ao arquivo sinais_lista.csv e ao Supabase, verificando duplicatas por dia.
+
+        Com save_remote=False o Supabase fica por conta do chamador (fila de persistência).
+        Com raise_errors=True falhas de gravação são relançadas (só duplicata retorna False).
+        """
         try:
             # Padronizar tipos de sinal
             signal_type = signal_data.get('type', '').upper()
@@ -121,59 +214,49 @@ class Database:
                 signal_data['type'] = 'VENDA'
             
             # Tentar salvar no Supabase primeiro
-            supabase_success = self._save_to_supabase(signal_data)
+            supabase_success = self._save_to_supabase(signal_data) if save_remote else False
             if supabase_success:
                 print(f"✅ Sinal salvo no Supabase: {signal_data.get('symbol')}")
-            
-            # Cria um DataFrame com o novo sinal
-            new_signal_df = pd.DataFrame([signal_data])
-
-            # Converte a entry_time do novo sinal para datetime para comparação
-            new_signal_time = datetime.strptime(signal_data['entry_time'], '%Y-%m-%d %H:%M:%S')
-            new_signal_date = new_signal_time.date() # Extrai apenas a data (dia, mês, ano)
-
-            # Inicializa updated_df com o novo sinal por padrão
-            updated_df = new_signal_df
-
-            # Verifica se o arquivo existe e tem conteúdo
-            if os.path.exists(self.signals_list_file) and os.path.getsize(self.signals_list_file) > 0:
-                # Lê o arquivo existente
-                existing_df = pd.read_csv(self.signals_list_file)
-
-                # Converte a coluna entry_time do DataFrame existente para datetime
-                existing_df['entry_time'] = pd.to_datetime(existing_df['entry_time'])
-
-                # Verifica se já existe um sinal para este símbolo no dia atual
-                existing_signal_today = existing_df[
-                    (existing_df['symbol'] == signal_data['symbol']) &
-                    (existing_df['entry_time'].dt.date == new_signal_date) # Esta é a verificação chave
-                ]
-
-                if not existing_signal_today.empty:
-                    print(f"⚠️ Sinal duplicado para {signal_data.get('symbol')} no dia {new_signal_date}. Não adicionado.")
-                    return False # Sinal duplicado, não adiciona
-
-                # Adiciona o novo sinal ao DataFrame existente
-                # Garante que as colunas são consistentes antes de concatenar
-                # Preenche colunas ausentes no new_signal_df com NaN para evitar erros de concatenação
-                updated_df = pd.concat([existing_df, new_signal_df], ignore_index=True)
-            
-            # Garante que a coluna entry_time é datetime mesmo no primeiro sinal ou se o arquivo estava vazio
-            updated_df['entry_time'] = pd.to_datetime(updated_df['entry_time'])
 
-            # Salva o DataFrame atualizado de volta no arquivo
-            updated_df.to_csv(self.signals_list_file, index=False)
+            if self.storage is not None:
+                # Verificação de duplicata por dia feita no índice (symbol, entry_date)
+                if not self.storage.insert_signal(signal_data):
+                    print(f"⚠️ Sinal duplicado para {signal_data.get('symbol')} no dia {str(signal_data.get('entry_time'))[:10]}. Não adicionado.")
+                    return False
+                self.signal_log.create(signal_data)
+                print(f"✅ Sinal adicionado para {signal_data.get('symbol')}")
+                return True
+            
+            # Backend CSV: verificação de duplicata por dia no índice de entry_time do log
+            new_signal_date = datetime.strptime(signal_data['entry_time'], '%Y-%m-%d %H:%M:%S').date()
+            day_start = new_signal_date.strftime('%Y-%m-%d 00:00:00')
+            day_end = (new_signal_date + timedelta(days=1)).strftime('%Y-%m-%d 00:00:00')
+            existing_signal_today = [
+                record for record in self.signal_log.records_between(start=day_start, end=day_end)
+                if record.get('symbol') == signal_data['symbol']
+            ]
+
+            if existing_signal_today:
+                print(f"⚠️ Sinal duplicado para {signal_data.get('symbol')} no dia {new_signal_date}. Não adicionado.")
+                return False # Sinal duplicado, não adiciona
+
+            self.signal_log.create(signal_data)
             print(f"✅ Sinal adicionado para {signal_data.get('symbol')}")
             return True # Sinal adicionado com sucesso
 
         except Exception as e:
             print(f"❌ Erro ao adicionar sinal: {e}")
             traceback.print_exc()
+            if raise_errors:
+                raise
             return False
 
     def get_auth_token(self, token: str) -> Optional[Dict[str, Any]]:
         """Busca um token de autenticação no banco de dados"""
         try:
+            if self.storage is not None:
+                return self.storage.get_auth_token(token)
+
             if not os.path.exists(self.auth_tokens_file):
                 return None
                 
@@ -195,9 +278,17 @@ class Database:
             traceback.print_exc()
             return None
 
+    @timed(DB_WRITE_SECONDS, operation='remove_auth_token')
     def remove_auth_token(self, token: str) -> bool:
         """Remove um token de autenticação do banco de dados"""
         try:
+            if self.storage is not None:
+                self.token_index.remove(token)
+                if not self.storage.delete_auth_token(token):
+                    return False
+                print(f"✅ Token de autenticação removido: {token[:8]}...")
+                return True
+
             if not os.path.exists(self.auth_tokens_file):
                 return False
                 
@@ -210,6 +301,7 @@ class Database:
             
             # Salvar de volta
             df_filtered.to_csv(self.auth_tokens_file, index=False)
+            self.token_index.remove(token)
             print(f"✅ Token de autenticação removido: {token[:8]}...")
             return True
             
@@ -218,66 +310,73 @@ class Database:
             traceback.print_exc()
             return False
     
-    def _save_to_supabase(self, signal_data: Dict[str, Any]) -> bool:
-        """Salva o sinal no banco de dados Supabase"""
+    def _get_supabase_client(self):
+        """Retorna o cliente Supabase compartilhado ou None se não configurado/instalado"""
+        # Verificar se as variáveis de ambiente do Supabase estão configuradas
+        supabase_url = os.getenv('SUPABASE_URL')
+        supabase_key = os.getenv('SUPABASE_ANON_KEY')
+        
+        if not supabase_url or not supabase_key:
+            print("⚠️ Supabase não configurado, salvando apenas em CSV")
+            return None
+        
+        # Importar Supabase apenas quando necessário
         try:
-            # Verificar se as variáveis de ambiente do Supabase estão configuradas
-            supabase_url = os.getenv('SUPABASE_URL')
-            supabase_key = os.getenv('SUPABASE_ANON_KEY')
-            
-            if not supabase_url or not supabase_key:
-                print("⚠️ Supabase não configurado, salvando apenas em CSV")
-                return False
-            
-            # Importar Supabase apenas quando necessário
+            from .http_pool import get_supabase_client
+            # Cliente Supabase compartilhado (reutiliza conexões)
+            return get_supabase_client(supabase_url, supabase_key)
+        except ImportError:
+            print("⚠️ Biblioteca Supabase não instalada, salvando apenas em CSV")
+            return None
+
+    def _supabase_row(self, signal_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Prepara dados para o Supabase (apenas campos que existem na tabela)"""
+        from datetime import timezone
+        import pytz
+        
+        # Garantir timestamp UTC para created_at
+        entry_time_str = signal_data.get('entry_time')
+        if entry_time_str:
             try:
-                from supabase import create_client, Client
-            except ImportError:
-                print("⚠️ Biblioteca Supabase não instalada, salvando apenas em CSV")
-                return False
-            
-            # Criar cliente Supabase
-            supabase: Client = create_client(supabase_url, supabase_key)
-            
-            # Preparar dados para o Supabase (apenas campos que existem na tabela)
-            from datetime import timezone
-            import pytz
-            
-            # Garantir timestamp UTC para created_at
-            entry_time_str = signal_data.get('entry_time')
-            if entry_time_str:
-                try:
-                    # Converter entry_time para UTC se necessário
-                    if isinstance(entry_time_str, str):
-                        # Assumir que entry_time está em horário de São Paulo
-                        sao_paulo_tz = pytz.timezone('America/Sao_Paulo')
-                        entry_dt = datetime.strptime(entry_time_str, '%Y-%m-%d %H:%M:%S')
-                        entry_dt_sp = sao_paulo_tz.localize(entry_dt)
-                        entry_dt_utc = entry_dt_sp.astimezone(timezone.utc)
-                        created_at_utc = entry_dt_utc.isoformat()
-                    else:
-                        created_at_utc = datetime.now(timezone.utc).isoformat()
-                except Exception as e:
-                    print(f"⚠️ Erro ao converter entry_time: {e}")
+                # Converter entry_time para UTC se necessário
+                if isinstance(entry_time_str, str):
+                    # Assumir que entry_time está em horário de São Paulo
+                    sao_paulo_tz = pytz.timezone('America/Sao_Paulo')
+                    entry_dt = datetime.strptime(entry_time_str, '%Y-%m-%d %H:%M:%S')
+                    entry_dt_sp = sao_paulo_tz.localize(entry_dt)
+                    entry_dt_utc = entry_dt_sp.astimezone(timezone.utc)
+                    created_at_utc = entry_dt_utc.isoformat()
+                else:
                     created_at_utc = datetime.now(timezone.utc).isoformat()
-            else:
+            except Exception as e:
+                print(f"⚠️ Erro ao converter entry_time: {e}")
                 created_at_utc = datetime.now(timezone.utc).isoformat()
-            
-            supabase_data = {
-                'symbol': signal_data.get('symbol'),
-                'type': signal_data.get('type'),
-                'entry_price': float(signal_data.get('entry_price', 0)),
-                'target_price': float(signal_data.get('target_price', 0)),
-                'status': signal_data.get('status', 'OPEN'),
-                'entry_time': signal_data.get('entry_time'),
-                'created_at': created_at_utc,  # Garantir created_at em UTC
-                'quality_score': float(signal_data.get('quality_score', 0))
-            }
+        else:
+            created_at_utc = datetime.now(timezone.utc).isoformat()
+        
+        return {
+            'symbol': signal_data.get('symbol'),
+            'type': signal_data.get('type'),
+            'entry_price': float(signal_data.get('entry_price', 0)),
+            'target_price': float(signal_data.get('target_price', 0)),
+            'status': signal_data.get('status', 'OPEN'),
+            'entry_time': signal_data.get('entry_time'),
+            'created_at': created_at_utc,  # Garantir created_at em UTC
+            'quality_score': float(signal_data.get('quality_score', 0))
+        }
+
+    def _save_to_supabase(self, signal_data: Dict[str, Any]) -> bool:
+        """Salva o sinal no banco de dados Supabase"""
+        try:
+            supabase = self._get_supabase_client()
+            if supabase is None:
+                return False
             
             # Inserir no Supabase
-            result = supabase.table('signals').insert(supabase_data).execute()
+            result = supabase.table('signals').insert(self._supabase_row(signal_data)).execute()
             
             if result.data:
+                data_versions.bump('signals')
                 return True
             else:
                 print(f"⚠️ Falha ao salvar no Supabase: {result}")
@@ -288,35 +387,93 @@ class Database:
             traceback.print_exc()
             return False
 
+    def save_signals_to_supabase(self, signals: List[Dict[str, Any]]) -> int:
+        """
+        Insere vários sinais no Supabase em uma única requisição.
+        Retorna a quantidade inserida (0 se o Supabase não estiver configurado)
+        e levanta exceção em caso de falha, para que a fila de persistência refaça.
+        """
+        if not signals:
+            return 0
+        supabase = self._get_supabase_client()
+        if supabase is None:
+            return 0
+        
+        result = supabase.table('signals').insert([self._supabase_row(signal) for signal in signals]).execute()
+        if not result.data:
+            raise RuntimeError(f"Falha ao salvar lote no Supabase: {result}")
+        data_versions.bump('signals')
+        return len(result.data)
+
     def verify_auth_token(self, token: str) -> Optional[str]:
         """Verifica se um token de autenticação é válido e retorna o user_id"""
         try:
-            if os.path.exists(self.auth_tokens_file):
-                df = pd.read_csv(self.auth_tokens_file)
-                
-                # Buscar token
-                token_row = df[df['token'] == token]
-                
-                if len(token_row) > 0:
-                    token_data = token_row.iloc[0]
-                    expires_at = pd.to_datetime(token_data['expires_at'])
-                    
-                    # Verificar se não expirou
-                    if datetime.now() < expires_at:
-                        return str(token_data['user_id'])
-                    else:
-                        # Token expirado, remover
-                        self.remove_auth_token(token)
-                        
-            return None
-            
+            return self._lookup_token_user(token)
         except Exception as e:
             print(f"Erro ao verificar token de autenticação: {e}")
             return None
 
+    def _load_auth_tokens(self) -> List[Dict[str, Any]]:
+        """Lê todos os tokens persistidos (sem pandas)."""
+        if self.storage is not None:
+            return self.storage.get_auth_tokens()
+        if not os.path.exists(self.auth_tokens_file) or os.path.getsize(self.auth_tokens_file) == 0:
+            return []
+        with open(self.auth_tokens_file, 'r', newline='', encoding='utf-8') as f:
+            return list(csv.DictReader(f))
+
+    def _purge_auth_tokens(self, tokens: List[str]) -> None:
+        """Remove do armazenamento os tokens expirados retirados do índice."""
+        if not tokens:
+            return
+        if self.storage is not None:
+            for token in tokens:
+                self.storage.delete_auth_token(token)
+            return
+        expired = set(tokens)
+        records = [record for record in self._load_auth_tokens() if record.get('token') not in expired]
+        with open(self.auth_tokens_file, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.DictWriter(f, fieldnames=self.files_to_check[self.auth_tokens_file], extrasaction='ignore')
+            writer.writeheader()
+            writer.writerows(records)
+
+    def _auth_tokens_file_stamp(self) -> Optional[Tuple[int, int, int]]:
+        """Identidade do auth_tokens.csv (muda quando qualquer processo reescreve o arquivo)"""
+        try:
+            stat = os.stat(self.auth_tokens_file)
+        except OSError:
+            return None
+        return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+    def _lookup_token_user(self, token: str) -> Optional[str]:
+        """Retorna o user_id de um token válido usando o índice em memória (O(1)).
+
+        Sem Redis o índice é só deste processo: no SQLite cada consulta é
+        confirmada pela busca indexada do token e no CSV o índice é recarregado
+        quando o arquivo muda, para que logout/novo login em outro worker valha aqui.
+        """
+        shared = self.token_index.redis_client is not None
+        stamp = self._auth_tokens_file_stamp() if self.storage is None and not shared else None
+        if not self.token_index.loaded or stamp != self.auth_tokens_stamp:
+            count = self.token_index.load(self._load_auth_tokens())
+            self.auth_tokens_stamp = stamp
+            print(f"🔑 Índice de tokens carregado: {count} tokens ativos")
+
+        self._purge_auth_tokens(self.token_index.pop_expired())
+        if self.storage is not None and not shared:
+            self.token_index.sync(token, self.storage.get_auth_token(token))
+        return self.token_index.lookup(token)
+
+    @timed(DB_WRITE_SECONDS, operation='save_auth_token')
     def save_auth_token(self, token: str, user_id: int, expires_at: datetime):
         """Salva um token de autenticação no arquivo CSV"""
         try:
+            if self.storage is not None:
+                self.storage.save_auth_token(token, user_id, datetime.now().isoformat(), expires_at.isoformat())
+                self.token_index.put(token, user_id, expires_at)
+                print(f"✅ Token de autenticação salvo para usuário {user_id}")
+                return True
+
             # Lê o arquivo existente ou cria um DataFrame vazio
             try:
                 tokens_df = pd.read_csv(self.auth_tokens_file)
@@ -336,6 +493,7 @@ class Database:
             
             tokens_df = pd.concat([tokens_df, new_token_data], ignore_index=True)
             tokens_df.to_csv(self.auth_tokens_file, index=False)
+            self.token_index.put(token, user_id, expires_at)
             
             print(f"✅ Token de autenticação salvo para usuário {user_id}")
             return True
@@ -345,93 +503,82 @@ class Database:
             traceback.print_exc()
             return False # Indica que ocorreu um erro
 
+    @timed(DB_WRITE_SECONDS, operation='update_signal_status')
     def update_signal_status(self, symbol: str, entry_time: str, status: str, exit_price: Optional[float] = None, variation: Optional[float] = None, result: Optional[str] = None) -> None:
         """Atualiza o status de um sinal no sinais_lista.csv e move para signals_history.csv se fechado."""
         try:
-            if not os.path.exists(self.signals_list_file):
-                print(f"❌ Arquivo de sinais {self.signals_list_file} não encontrado.")
-                return
-
-            df = pd.read_csv(self.signals_list_file)
-
-            # Encontra a linha do sinal a ser atualizado
-            # Usamos symbol e entry_time para identificar unicamente o sinal
-            signal_index = df[(df['symbol'] == symbol) & (df['entry_time'] == entry_time)].index
-
-            if signal_index.empty:
-                print(f"❌ Sinal não encontrado para atualização: {symbol} @ {entry_time}")
-                return
-
-            # Atualiza os campos
-            df.loc[signal_index, 'status'] = status
-            if exit_price is not None:
-                df.loc[signal_index, 'exit_price'] = exit_price
-            if variation is not None:
-                df.loc[signal_index, 'variation'] = variation
-            if result is not None:
-                df.loc[signal_index, 'result'] = result
-
-            # Se o status for 'CLOSED', move o sinal para o histórico
+            key = signal_key(symbol, entry_time)
+            fields = {'exit_price': exit_price, 'variation': variation, 'result': result}
+            fields = {name: value for name, value in fields.items() if value is not None}
+
+            if self.storage is not None:
+                if not self.storage.update_signal_status(symbol, entry_time, status, fields):
+                    print(f"❌ Sinal não encontrado para atualização: {symbol} @ {entry_time}")
+                    return
+            else:
+                signal = self.signal_log.get(key)
+                if signal is None:
+                    print(f"❌ Sinal não encontrado para atualização: {symbol} @ {entry_time}")
+                    return
+                if status == 'CLOSED':
+                    self._append_history_csv({**signal, **fields, 'status': status})
+
+            # sinais_lista.csv acompanha o armazenamento (fechados saem da lista de ativos)
             if status == 'CLOSED':
-                closed_signal = df.loc[signal_index].copy()
-
-                # Adiciona ao arquivo de histórico
-                if os.path.exists(self.signals_history_file) and os.path.getsize(self.signals_history_file) > 0:
-                    history_df = pd.read_csv(self.signals_history_file)
-                    # Garante que as colunas do histórico correspondem
-                    # Pode ser necessário mapear colunas se forem diferentes
-                    # Exemplo simples:
-                    # history_df = pd.concat([history_df, closed_signal[history_df.columns]], ignore_index=True)
-                    # Para garantir que todas as colunas esperadas no history_df estejam presentes no closed_signal
-                    # e vice-versa, preenchendo com NaN se necessário.
-                    # Primeiro, garanta que as colunas do closed_signal correspondam às do history_df
-                    # e adicione colunas ausentes com NaN
-                    for col in history_df.columns:
-                        if col not in closed_signal.columns:
-                            closed_signal[col] = np.nan
-                    # Em seguida, selecione apenas as colunas que existem no history_df
-                    closed_signal_for_history = closed_signal[history_df.columns]
-                    history_df = pd.concat([history_df, closed_signal_for_history], ignore_index=True)
-                else:
-                    # Se o arquivo de histórico não existe ou está vazio, cria um novo com o sinal fechado
-                    # Assegura que as colunas do closed_signal são um subconjunto ou mapeáveis para as do history
-                    history_headers = self.files_to_check[self.signals_history_file] # Usar self.files_to_check
-                    for col in history_headers:
-                        if col not in closed_signal.columns:
-                            closed_signal[col] = np.nan
-                    history_df = closed_signal[history_headers]
-
-                history_df.to_csv(self.signals_history_file, index=False)
+                self.signal_log.purge([key])
                 print(f"✅ Sinal {symbol} movido para histórico.")
-
-                # Remove o sinal do arquivo de sinais ativos
-                df = df.drop(index=signal_index.to_list()) # Alterado para usar index=signal_index.to_list()
-                print(f"✅ Sinal {symbol} removido da lista de sinais ativos.")
-
-            # Salva o DataFrame atualizado de volta no sinais_lista.csv
-            df.to_csv(self.signals_list_file, index=False)
+            else:
+                self.signal_log.update(key, {**fields, 'status': status})
             print(f"✅ Status do sinal {symbol} atualizado para '{status}'.")
 
         except Exception as e:
             print(f"❌ Erro ao atualizar status do sinal: {e}")
             traceback.print_exc()
 
-    def get_all_signals(self) -> List[Dict[str, Any]]:
-        """Retorna todos os sinais do sinais_lista.csv."""
-        if not os.path.exists(self.signals_list_file) or os.path.getsize(self.signals_list_file) == 0:
-            return []
+    def delete_signals(self, keys: List[str]) -> int:
+        """Remove do SQLite os sinais limpos do log (chaves symbol|entry_time).
+
+        Sem isso o índice (symbol, entry_date) continuaria recusando um sinal novo
+        do mesmo símbolo no mesmo dia. No backend CSV o log já é o armazenamento.
+        Erros sobem para que o log não seja limpo sem o SQLite.
+        """
+        if self.storage is None or not keys:
+            return 0
+        return self.storage.delete_signals([split_signal_key(key) for key in keys])
+
+    def close_signals(self, keys: List[str], fields: Dict[str, Any]) -> int:
+        """Marca como CLOSED no SQLite os sinais fechados pelo log.
+
+        Como no log (e no sinais_lista.csv), a linha continua em signals e segue
+        bloqueando outro sinal do mesmo símbolo no mesmo dia.
+        """
+        if self.storage is None:
+            return 0
+        closed = 0
         try:
-            df = pd.read_csv(self.signals_list_file)
-            # Converte o DataFrame para uma lista de dicionários
-            # Substitui NaN por None para melhor representação em JSON
-            return df.replace({np.nan: None}).to_dict(orient='records')
+            for key in keys:
+                symbol, entry_time = split_signal_key(key)
+                closed += self.storage.update_signal_status(symbol, entry_time, 'CLOSED', fields, archive=False)
         except Exception as e:
-            print(f"❌ Erro ao carregar sinais: {e}")
+            print(f"❌ Erro ao fechar sinais no SQLite: {e}")
             traceback.print_exc()
-            return []
+        return closed
+
+    def get_all_signals(self) -> List[Dict[str, Any]]:
+        """Retorna todos os sinais do sinais_lista.csv."""
+        if self.storage is not None:
+            try:
+                return self.storage.get_signals()
+            except Exception as e:
+                print(f"❌ Erro ao carregar sinais: {e}")
+                traceback.print_exc()
+                return []
+        return self.signal_log.records()
 
     def get_signal_by_symbol(self, symbol: str) -> Optional[Dict[str, Any]]:
         """Retorna um sinal específico pelo símbolo."""
+        if self.storage is not None:
+            return self.storage.get_signal_by_symbol(symbol)
         signals = self.get_all_signals()
         for signal in signals:
             if signal.get('symbol') == symbol:
@@ -440,6 +587,13 @@ class Database:
 
     def get_all_users(self) -> List[Dict[str, Any]]:
         """Retorna todos os usuários do users.csv."""
+        if self.storage is not None:
+            try:
+                return self.storage.get_users()
+            except Exception as e:
+                print(f"❌ Erro ao carregar usuários: {e}")
+                traceback.print_exc()
+                return []
         if not os.path.exists(self.users_file) or os.path.getsize(self.users_file) == 0:
             return []
         try:
@@ -457,6 +611,8 @@ class Database:
 
     def get_user_by_username(self, username: str) -> Optional[Dict[str, Any]]:
         """Retorna um usuário pelo nome de usuário."""
+        if self.storage is not None:
+            return self.storage.get_user('username', username)
         users = self.get_all_users()
         for user in users:
             if user.get('username') == username:
@@ -465,6 +621,8 @@ class Database:
 
     def get_user_by_email(self, email: str) -> Optional[Dict[str, Any]]:
         """Retorna um usuário pelo e-mail."""
+        if self.storage is not None:
+            return self.storage.get_user('email', email)
         users = self.get_all_users()
         for user in users:
             if user.get('email') == email:
@@ -473,17 +631,32 @@ class Database:
 
     def get_user_by_id(self, user_id: str) -> Optional[Dict[str, Any]]:
         """Retorna um usuário pelo ID."""
+        if self.storage is not None:
+            return self.storage.get_user('id', user_id)
         users = self.get_all_users()
         for user in users:
             if user.get('id') == user_id:
                 return user
         return None
 
+    @timed(DB_WRITE_SECONDS, operation='add_user')
     def add_user(self, user_data: Dict[str, Any]) -> bool:
         """Adiciona um novo usuário ao users.csv."""
         try:
             # Garante que o ID é uma string
             user_data['id'] = str(user_data.get('id', uuid.uuid4())) # Gera um novo UUID se não fornecido
+
+            if self.storage is not None:
+                conflict = self.storage.insert_user(user_data)
+                if conflict == 'username':
+                    print(f"⚠️ Usuário '{user_data['username']}' já existe.")
+                    return False
+                if conflict == 'id':
+                    print(f"⚠️ ID de usuário '{user_data['id']}' já existe.")
+                    return False
+                print(f"✅ Usuário '{user_data['username']}' adicionado.")
+                return True
+
             new_user_df = pd.DataFrame([user_data])
 
             if os.path.exists(self.users_file) and os.path.getsize(self.users_file) > 0:
@@ -532,10 +705,18 @@ class Database:
             traceback.print_exc()
             return False
 
+    @timed(DB_WRITE_SECONDS, operation='update_user_password')
     def update_user_password(self, user_id: str, new_password_hash: str) -> bool:
         """Atualiza a senha de um usuário pelo ID."""
         try:
             # DEBUG DB: Tentando atualizar senha para user_id: '{user_id}' (type: {type(user_id)})" # Removed debug print
+            if self.storage is not None:
+                if not self.storage.update_user_password(user_id, new_password_hash):
+                    print(f"❌ Usuário com ID '{user_id}' não encontrado para atualização de senha.")
+                    return False
+                print(f"✅ Senha do usuário com ID '{user_id}' atualizada com sucesso.")
+                return True
+
             if not os.path.exists(self.users_file):
                 print(f"❌ Arquivo de usuários {self.users_file} não encontrado.")
                 return False
@@ -579,6 +760,11 @@ class Database:
                 'expiration_time': expiration_time,
                 'used': False
             }
+            if self.storage is not None:
+                self.storage.insert_reset_token(user_id, token, expiration_time)
+                print(f"✅ Token de redefinição de senha criado para o usuário {user_id}.")
+                return token
+
             new_token_df = pd.DataFrame([token_data])
 
             if os.path.exists(self.password_reset_tokens_file) and os.path.getsize(self.password_reset_tokens_file) > 0:
@@ -601,22 +787,28 @@ class Database:
         Retorna os dados do token se válido, caso contrário, None.
         """
         try:
-            if not os.path.exists(self.password_reset_tokens_file) or os.path.getsize(self.password_reset_tokens_file) == 0:
-                return None
+            if self.storage is not None:
+                token_data = self.storage.get_unused_reset_token(token)
+                if token_data is None:
+                    print(f"❌ Token '{token}' não encontrado ou já utilizado.")
+                    return None
+            else:
+                if not os.path.exists(self.password_reset_tokens_file) or os.path.getsize(self.password_reset_tokens_file) == 0:
+                    return None
 
-            df = pd.read_csv(self.password_reset_tokens_file)
-            # Garante que a coluna 'used' é booleana
-            df['used'] = df['used'].astype(bool)
-            # Garante que a coluna 'user_id' é tratada como string
-            df['user_id'] = df['user_id'].astype(str) # Adicionada esta linha
+                df = pd.read_csv(self.password_reset_tokens_file)
+                # Garante que a coluna 'used' é booleana
+                df['used'] = df['used'].astype(bool)
+                # Garante que a coluna 'user_id' é tratada como string
+                df['user_id'] = df['user_id'].astype(str) # Adicionada esta linha
 
-            token_record = df[(df['token'] == token) & (df['used'] == False)]
+                token_record = df[(df['token'] == token) & (df['used'] == False)]
 
-            if token_record.empty:
-                print(f"❌ Token '{token}' não encontrado ou já utilizado.")
-                return None
+                if token_record.empty:
+                    print(f"❌ Token '{token}' não encontrado ou já utilizado.")
+                    return None
 
-            token_data = token_record.iloc[0].to_dict()
+                token_data = token_record.iloc[0].to_dict()
             expiration_time = datetime.strptime(token_data['expiration_time'], '%Y-%m-%d %H:%M:%S')
 
             if datetime.now() > expiration_time:
@@ -634,6 +826,13 @@ class Database:
         Marca um token de redefinição de senha como usado.
         """
         try:
+            if self.storage is not None:
+                if not self.storage.mark_reset_token_used(token):
+                    print(f"❌ Token '{token}' não encontrado para marcar como usado.")
+                    return False
+                print(f"✅ Token '{token}' marcado como usado.")
+                return True
+
             if not os.path.exists(self.password_reset_tokens_file):
                 print(f"❌ Arquivo de tokens de redefinição de senha {self.password_reset_tokens_file} não encontrado.")
                 return False
@@ -656,6 +855,13 @@ class Database:
 
     def get_all_tickers(self) -> List[Dict[str, Any]]:
         """Retorna todos os tickers do tickers.csv."""
+        if self.storage is not None:
+            try:
+                return self.storage.get_tickers()
+            except Exception as e:
+                print(f"❌ Erro ao carregar tickers: {e}")
+                traceback.print_exc()
+                return []
         if not os.path.exists(self.tickers_file) or os.path.getsize(self.tickers_file) == 0:
             return []
         try:
@@ -666,9 +872,17 @@ class Database:
             traceback.print_exc()
             return []
 
+    @timed(DB_WRITE_SECONDS, operation='add_ticker')
     def add_ticker(self, ticker_data: Dict[str, Any]) -> bool:
         """Adiciona um novo ticker ao tickers.csv."""
         try:
+            if self.storage is not None:
+                if not self.storage.insert_ticker(ticker_data):
+                    print(f"⚠️ Ticker '{ticker_data['symbol']}' já existe.")
+                    return False
+                print(f"✅ Ticker '{ticker_data['symbol']}' adicionado.")
+                return True
+
             new_ticker_df = pd.DataFrame([ticker_data])
 
             if os.path.exists(self.tickers_file) and os.path.getsize(self.tickers_file) > 0:
@@ -688,9 +902,17 @@ class Database:
             traceback.print_exc()
             return False
 
+    @timed(DB_WRITE_SECONDS, operation='delete_ticker')
     def delete_ticker(self, symbol: str) -> bool:
         """Deleta um ticker do tickers.csv pelo símbolo."""
         try:
+            if self.storage is not None:
+                if not self.storage.delete_ticker(symbol):
+                    print(f"❌ Ticker '{symbol}' não encontrado para exclusão.")
+                    return False
+                print(f"✅ Ticker '{symbol}' excluído com sucesso.")
+                return True
+
             if not os.path.exists(self.tickers_file):
                 print(f"❌ Arquivo de tickers {self.tickers_file} não encontrado.")
                 return False
@@ -721,6 +943,13 @@ class Database:
         Armazena um token de autenticação para um usuário com um tempo de expiração.
         Remove tokens antigos para o mesmo usuário para garantir apenas um token ativo por vez.
         """
+        if self.storage is not None:
+            created_at = datetime.now()
+            expires_at = created_at + timedelta(minutes=expires_in_minutes)
+            self.storage.save_auth_token(token, user_id, created_at.isoformat(), expires_at.isoformat())
+            self.token_index.put(token, user_id, expires_at)
+            return True
+
         try:
             tokens_df = pd.read_csv(self.auth_tokens_file)
         except pd.errors.EmptyDataError:
@@ -741,6 +970,7 @@ class Database:
         }])
         tokens_df = pd.concat([tokens_df, new_token_data], ignore_index=True)
         tokens_df.to_csv(self.auth_tokens_file, index=False)
+        self.token_index.put(token, user_id, expires_at)
         return True
     
     def get_user_by_token(self, token: str):
@@ -748,46 +978,16 @@ class Database:
         Recupera os dados do usuário com base em um token de autenticação, verificando a expiração.
         Retorna os dados do usuário se o token for válido e não expirado, caso contrário, None.
         """
-        # print(f"DEBUG DB: get_user_by_token chamado com token: {token}") # Removido
         try:
-            tokens_df = pd.read_csv(self.auth_tokens_file)
-            # print(f"DEBUG DB: auth_tokens.csv lido. Conteúdo:\n{tokens_df}") # Removido
-        except pd.errors.EmptyDataError:
-            # print("DEBUG DB: auth_tokens.csv está vazio.") # Removido
-            return None
-        except FileNotFoundError:
-            # print("DEBUG DB: auth_tokens.csv não encontrado.") # Removido
-            return None
+            user_id = self._lookup_token_user(token)
         except Exception as e:
-            print(f"❌ Erro ao ler auth_tokens.csv: {e}") # Mantido para erros críticos
+            print(f"❌ Erro ao verificar token de autenticação: {e}") # Mantido para erros críticos
             traceback.print_exc()
             return None
 
-        now = datetime.now()
-        # print(f"DEBUG DB: Hora atual para verificação de expiração: {now}") # Removido
-        
-        # Garante que 'expires_at' é do tipo datetime para comparação
-        tokens_df['expires_at'] = pd.to_datetime(tokens_df['expires_at'])
-
-        # Filtrar pelo token e garantir que não está expirado
-        valid_tokens = tokens_df[
-            (tokens_df['token'] == token) &
-            (tokens_df['expires_at'] > now)
-        ]
-        # print(f"DEBUG DB: Tokens válidos encontrados após filtragem:\n{valid_tokens}") # Removido
-
-        if not valid_tokens.empty:
-            token_record = valid_tokens.iloc[0]
-            user_id = str(token_record['user_id']) # Converte explicitamente para string
-            # print(f"DEBUG DB: Token válido encontrado. user_id associado: {user_id} (type: {type(user_id)})") # Removido
-            
-            user_data = self.get_user_by_id(user_id)
-            # print(f"DEBUG DB: Resultado de get_user_by_id para user_id {user_id}: {user_data}") # Removido
-            return user_data 
-        else:
-            # print(f"DEBUG DB: Nenhum token válido encontrado para '{token}' ou token expirado.") # Removido
-            pass # Não é necessário imprimir nada aqui se o token não for encontrado/válido
-        return None
+        if user_id is None:
+            return None
+        return self.get_user_by_id(user_id)
 
     def save_signal_to_database(self, signal_data):
         """
@@ -1,10 +1,10 @@
 import os
 import redis
-import psycopg2
 from psycopg2.extras import RealDictCursor
 from typing import Optional, Dict, Any, List
 import logging
 from contextlib import contextmanager
+from .db_pool import get_postgres_pool
 
 class DatabaseConfig:
     """Configuração e conexão com PostgreSQL e Redis"""
@@ -39,20 +39,25 @@ class DatabaseConfig:
     
     @contextmanager
     def get_db_connection(self):
-        """Context manager para conexão com PostgreSQL"""
+        """Context manager para conexão com PostgreSQL (emprestada do pool compartilhado)"""
+        if self.database_url.startswith('postgresql://'):
+            try:
+                with get_postgres_pool(self.database_url).connection() as conn:
+                    yield conn
+            except Exception as e:
+                self.logger.error(f"❌ Erro de conexão com banco: {e}")
+                raise
+            return
+        
         conn = None
         try:
-            if self.database_url.startswith('postgresql://'):
-                conn = psycopg2.connect(self.database_url)
-                yield conn
-            else:
-                # Fallback para SQLite (desenvolvimento)
-                import sqlite3
-                db_path = self.database_url.replace('sqlite:///', '')
-                os.makedirs(os.path.dirname(db_path), exist_ok=True)
-                conn = sqlite3.connect(db_path)
-                conn.row_factory = sqlite3.Row
-                yield conn
+            # Fallback para SQLite (desenvolvimento)
+            import sqlite3
+            db_path = self.database_url.replace('sqlite:///', '')
+            os.makedirs(os.path.dirname(db_path), exist_ok=True)
+            conn = sqlite3.connect(db_path)
+            conn.row_factory = sqlite3.Row
+            yield conn
         except Exception as e:
             self.logger.error(f"❌ Erro de conexão com banco: {e}")
             if conn:
@@ -62,6 +67,18 @@ class DatabaseConfig:
             if conn:
                 conn.close()
     
+    def health_check(self) -> Dict[str, Any]:
+        """Testa o banco (pelo pool no PostgreSQL) e retorna métricas do pool"""
+        if self.database_url.startswith('postgresql://'):
+            pool = get_postgres_pool(self.database_url)
+            return {**pool.health_check(), 'pool': pool.get_stats()}
+        try:
+            with self.get_db_connection() as conn:
+                conn.execute('SELECT 1')
+            return {'healthy': True}
+        except Exception as e:
+            return {'healthy': False, 'error': str(e)}
+
     def execute_query(self, query: str, params: tuple = None) -> List[Dict[str, Any]]:
         """Executa query SELECT e retorna resultados"""
         try:
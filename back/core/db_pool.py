@@ -0,0 +1,278 @@
+# -*- coding: utf-8 -*-
+"""
+DB Pool - Pool de conexões PostgreSQL compartilhado pelo processo
+Conexões DB-API reutilizadas entre requisições em vez de um psycopg2.connect
+por consulta: checkout com espera limitada quando o pool está cheio, teste
+(SELECT 1) de conexões ociosas antes de entregá-las, descarte de conexões
+quebradas e métricas de uso. A fábrica de conexões é injetável, então o pool
+pode ser testado com sqlite3 ou com um Postgres local.
+"""
+
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+
+class PoolTimeoutError(Exception):
+    """Nenhuma conexão ficou livre dentro do tempo de espera"""
+
+
+class ConnectionPool:
+    """
+    Pool thread-safe de conexões DB-API
+
+    Semelhante ao psycopg2.pool.ThreadedConnectionPool, mas quem pede uma
+    conexão com o pool cheio espera (até checkout_timeout) em vez de receber
+    PoolError, e conexões paradas há mais de health_check_interval são
+    testadas antes do uso. Ao devolver, a transação aberta é desfeita; quem
+    escreve deve fazer commit dentro do bloco.
+    """
+
+    def __init__(self, connect: Callable[[], Any], min_size: Optional[int] = None,
+                 max_size: Optional[int] = None, checkout_timeout: Optional[float] = None,
+                 health_check_interval: Optional[float] = None, health_query: str = 'SELECT 1',
+                 name: str = 'postgres', clock: Callable[[], float] = time.monotonic):
+        """Inicializa o pool (as conexões mínimas são abertas sob demanda)
+
+        Args:
+            connect: Fábrica de conexões (ex.: lambda: psycopg2.connect(url))
+            min_size: Conexões ociosas mantidas (padrão: DB_POOL_MIN ou 1)
+            max_size: Conexões simultâneas (padrão: DB_POOL_MAX ou 10)
+            checkout_timeout: Espera máxima por uma conexão (padrão: DB_POOL_TIMEOUT ou 10s)
+            health_check_interval: Ociosidade a partir da qual a conexão é testada
+                                   (padrão: DB_POOL_HEALTH_INTERVAL ou 30s)
+            health_query: Consulta usada no teste
+            name: Nome usado nos logs e métricas
+            clock: Função de tempo (injetável para testes)
+        """
+        self.connect = connect
+        self.min_size = min_size if min_size is not None else int(os.getenv('DB_POOL_MIN', '1'))
+        self.max_size = max_size or int(os.getenv('DB_POOL_MAX', '10'))
+        self.checkout_timeout = (checkout_timeout if checkout_timeout is not None
+                                 else float(os.getenv('DB_POOL_TIMEOUT', '10')))
+        self.health_check_interval = (health_check_interval if health_check_interval is not None
+                                      else float(os.getenv('DB_POOL_HEALTH_INTERVAL', '30')))
+        self.health_query = health_query
+        self.name = name
+        self.clock = clock
+
+        # Conexões ociosas: (conexão, instante em que foi devolvida)
+        self.idle: List[Tuple[Any, float]] = []
+        self.in_use = 0
+        self.slots = threading.BoundedSemaphore(self.max_size)
+        self.lock = threading.Lock()
+        self.closed = False
+
+        self.stats = {
+            'checkouts': 0,
+            'connections_created': 0,
+            'connections_discarded': 0,
+            'health_checks': 0,
+            'health_check_failures': 0,
+            'timeouts': 0,
+            'total_wait_ms': 0.0,
+            'max_wait_ms': 0.0
+        }
+
+    # ------------------------------------------------------------------
+    # Conexões
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _is_closed(conn: Any) -> bool:
+        # psycopg2 expõe 'closed' (0 = aberta); outros drivers podem não ter
+        return bool(getattr(conn, 'closed', 0))
+
+    def _ping(self, conn: Any) -> bool:
+        self.stats['health_checks'] += 1
+        try:
+            cursor = conn.cursor()
+            try:
+                cursor.execute(self.health_query)
+                cursor.fetchone()
+            finally:
+                cursor.close()
+            conn.rollback()
+            return True
+        except Exception as e:
+            self.stats['health_check_failures'] += 1
+            print(f"⚠️ Pool {self.name}: conexão ociosa falhou no teste ({e}) - reconectando")
+            return False
+
+    def _discard(self, conn: Any) -> None:
+        self.stats['connections_discarded'] += 1
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def _new_connection(self) -> Any:
+        conn = self.connect()
+        with self.lock:
+            self.stats['connections_created'] += 1
+        return conn
+
+    def getconn(self) -> Any:
+        """Empresta uma conexão (devolver com putconn)"""
+        start = time.perf_counter()
+        if not self.slots.acquire(timeout=self.checkout_timeout):
+            with self.lock:
+                self.stats['timeouts'] += 1
+            raise PoolTimeoutError(
+                f"Pool {self.name}: nenhuma conexão livre em {self.checkout_timeout:.0f}s "
+                f"({self.max_size} em uso)"
+            )
+        try:
+            while True:
+                with self.lock:
+                    if self.closed:
+                        raise RuntimeError(f"Pool {self.name} fechado")
+                    conn, idle_since = self.idle.pop() if self.idle else (None, 0.0)
+                if conn is None:
+                    conn = self._new_connection()
+                    break
+                if self._is_closed(conn):
+                    self._discard(conn)
+                    continue
+                if self.clock() - idle_since >= self.health_check_interval and not self._ping(conn):
+                    self._discard(conn)
+                    continue
+                break
+        except BaseException:
+            self.slots.release()
+            raise
+
+        wait_ms = (time.perf_counter() - start) * 1000
+        with self.lock:
+            self.in_use += 1
+            self.stats['checkouts'] += 1
+            self.stats['total_wait_ms'] += wait_ms
+            self.stats['max_wait_ms'] = max(self.stats['max_wait_ms'], wait_ms)
+        return conn
+
+    def putconn(self, conn: Any, discard: bool = False) -> None:
+        """Devolve uma conexão; a transação aberta é desfeita e conexões quebradas são fechadas"""
+        try:
+            if not discard and not self._is_closed(conn):
+                try:
+                    conn.rollback()
+                except Exception:
+                    discard = True
+            else:
+                discard = True
+
+            with self.lock:
+                self.in_use -= 1
+                keep = not discard and not self.closed
+                if keep:
+                    self.idle.append((conn, self.clock()))
+            if not keep:
+                self._discard(conn)
+        finally:
+            self.slots.release()
+
+    @contextmanager
+    def connection(self) -> Iterator[Any]:
+        """Context manager que empresta e devolve uma conexão"""
+        conn = self.getconn()
+        broken = False
+        try:
+            yield conn
+        except Exception:
+            # Se nem o rollback funciona a conexão não volta para o pool
+            try:
+                conn.rollback()
+            except Exception:
+                broken = True
+            raise
+        finally:
+            self.putconn(conn, discard=broken)
+
+    # ------------------------------------------------------------------
+    # Manutenção
+    # ------------------------------------------------------------------
+
+    def warm_up(self) -> int:
+        """Abre as conexões mínimas; retorna quantas ficaram ociosas"""
+        while True:
+            with self.lock:
+                if len(self.idle) + self.in_use >= self.min_size or self.closed:
+                    return len(self.idle)
+            conn = self._new_connection()
+            with self.lock:
+                self.idle.append((conn, self.clock()))
+
+    def health_check(self) -> Dict[str, Any]:
+        """Executa a consulta de teste em uma conexão do pool"""
+        start = time.perf_counter()
+        try:
+            with self.connection() as conn:
+                if not self._ping(conn):
+                    raise RuntimeError('consulta de teste falhou')
+            return {'healthy': True, 'latency_ms': round((time.perf_counter() - start) * 1000, 2)}
+        except Exception as e:
+            return {'healthy': False, 'error': str(e),
+                    'latency_ms': round((time.perf_counter() - start) * 1000, 2)}
+
+    def close_all(self) -> None:
+        """Fecha as conexões ociosas; as emprestadas são fechadas ao serem devolvidas"""
+        with self.lock:
+            self.closed = True
+            idle, self.idle = self.idle, []
+        for conn, _ in idle:
+            self._discard(conn)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Retorna métricas do pool"""
+        with self.lock:
+            checkouts = self.stats['checkouts']
+            created = self.stats['connections_created']
+            return {
+                **self.stats,
+                'name': self.name,
+                'in_use': self.in_use,
+                'idle': len(self.idle),
+                'max_size': self.max_size,
+                'avg_wait_ms': self.stats['total_wait_ms'] / checkouts if checkouts else 0.0,
+                'reuse_rate': (checkouts - created) / checkouts * 100 if checkouts > 0 else 0
+            }
+
+
+class ConnectionPoolRegistry:
+    """Um pool por DATABASE_URL, compartilhado por todas as instâncias de DatabaseConfig"""
+
+    def __init__(self):
+        self.pools: Dict[str, ConnectionPool] = {}
+        self.lock = threading.Lock()
+
+    def get_pool(self, database_url: str) -> ConnectionPool:
+        """Retorna (criando se preciso) o pool PostgreSQL da URL"""
+        with self.lock:
+            pool = self.pools.get(database_url)
+            if pool is None:
+                import psycopg2
+                pool = ConnectionPool(lambda: psycopg2.connect(database_url))
+                self.pools[database_url] = pool
+            return pool
+
+    def close_all(self) -> None:
+        with self.lock:
+            pools, self.pools = list(self.pools.values()), {}
+        for pool in pools:
+            pool.close_all()
+
+    def get_stats(self) -> List[Dict[str, Any]]:
+        with self.lock:
+            pools = list(self.pools.values())
+        return [pool.get_stats() for pool in pools]
+
+
+# Instância global para uso em outros módulos
+postgres_pools = ConnectionPoolRegistry()
+
+
+def get_postgres_pool(database_url: Optional[str] = None) -> ConnectionPool:
+    """Atalho para o pool da DATABASE_URL"""
+    return postgres_pools.get_pool(database_url or os.getenv('DATABASE_URL', ''))
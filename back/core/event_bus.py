@@ -0,0 +1,225 @@
+# -*- coding: utf-8 -*-
+"""
+Event Bus - Pub/sub interno para atualizações enviadas por push ao frontend
+Scanner, loop de confirmação e loop de monitoramento publicam deltas (apenas o
+que mudou) em tópicos; cada cliente conectado (SSE ou WebSocket) tem uma fila
+limitada. Deltas do mesmo tipo e chave ainda não entregues são mesclados, e um
+cliente que fica para trás perde a fila e recebe um evento 'resync' para
+buscar o estado completo pela API REST, sem atrasar o publicador.
+"""
+
+import itertools
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Any, Callable, Deque, Dict, Iterable, List, Optional, Tuple
+
+from .fast_json import dumps
+
+RESYNC_EVENT = 'resync'
+
+
+class BusEvent:
+    """Evento publicado; a serialização é feita uma vez e compartilhada entre clientes"""
+
+    __slots__ = ('seq', 'topic', 'type', 'data', 'key', 'published_at', '_sse', '_json')
+
+    def __init__(self, seq: int, topic: str, event_type: str, data: Dict[str, Any],
+                 key: Optional[str] = None, published_at: Optional[float] = None):
+        self.seq = seq
+        self.topic = topic
+        self.type = event_type
+        self.data = data
+        self.key = key
+        self.published_at = published_at if published_at is not None else time.time()
+        self._sse: Optional[str] = None
+        self._json: Optional[str] = None
+
+    def to_json(self) -> str:
+        """Mensagem completa (formato WebSocket)"""
+        if self._json is None:
+            self._json = dumps({'id': self.seq, 'topic': self.topic, 'type': self.type, 'data': self.data},
+                               strict=False)
+        return self._json
+
+    def to_sse(self) -> str:
+        """Frame Server-Sent Events (o id permite retomar com Last-Event-ID)"""
+        if self._sse is None:
+            payload = dumps({'topic': self.topic, 'data': self.data}, strict=False)
+            self._sse = f"id: {self.seq}\nevent: {self.type}\ndata: {payload}\n\n"
+        return self._sse
+
+
+class Subscription:
+    """
+    Fila de um cliente
+
+    Eventos com chave (ex.: atualização de preço de um sinal) substituem o
+    último pendente da mesma chave quando ele é do mesmo tipo, mesclando os
+    campos; tipos diferentes (signal_added seguido de signal_update ou
+    signal_closed) ficam em sequência. Se a fila encher, ela é descartada e o
+    cliente recebe um único 'resync'.
+    """
+
+    def __init__(self, topics: Optional[Iterable[str]] = None, max_pending: int = 256,
+                 notify: Optional[Callable[[], None]] = None):
+        self.topics = set(topics) if topics else None
+        self.max_pending = max_pending
+        self.pending: 'OrderedDict[int, BusEvent]' = OrderedDict()
+        # (tópico, chave) → posição do último evento pendente dessa chave
+        self.key_slots: Dict[Tuple[str, str], int] = {}
+        self.lagged = False
+        self.closed = False
+        self.lock = threading.Lock()
+        self.ready = threading.Event()
+        self.notify = notify or self.ready.set
+        self.last_seq = 0
+
+        self.stats = {'delivered': 0, 'coalesced': 0, 'resyncs': 0}
+
+    def wants(self, topic: str) -> bool:
+        return self.topics is None or topic in self.topics
+
+    def offer(self, event: BusEvent) -> None:
+        """Entrega um evento sem bloquear (chamado pelo publicador)"""
+        with self.lock:
+            if self.closed or self.lagged:
+                return
+            key_slot = (event.topic, event.key) if event.key is not None else None
+            slot = self.key_slots.get(key_slot) if key_slot is not None else None
+            previous = self.pending.get(slot) if slot is not None else None
+            if previous is not None and previous.type == event.type:
+                # Mesclar delta ainda não entregue: mesma posição, campos mais novos
+                self.pending[slot] = BusEvent(event.seq, event.topic, event.type,
+                                              {**previous.data, **event.data}, event.key, event.published_at)
+                self.stats['coalesced'] += 1
+            elif len(self.pending) >= self.max_pending:
+                self.pending.clear()
+                self.key_slots.clear()
+                self.lagged = True
+                self.stats['resyncs'] += 1
+            else:
+                self.pending[event.seq] = event
+                if key_slot is not None:
+                    self.key_slots[key_slot] = event.seq
+        self.notify()
+
+    def mark_lagged(self) -> None:
+        with self.lock:
+            self.pending.clear()
+            self.key_slots.clear()
+            self.lagged = True
+            self.stats['resyncs'] += 1
+        self.notify()
+
+    def drain(self) -> List[BusEvent]:
+        """Retira os eventos pendentes (um 'resync' se o cliente ficou para trás)"""
+        with self.lock:
+            self.ready.clear()
+            if self.lagged:
+                self.lagged = False
+                events = [BusEvent(self.last_seq, 'system', RESYNC_EVENT,
+                                   {'reason': 'slow_consumer', 'last_id': self.last_seq})]
+            else:
+                events = list(self.pending.values())
+                self.pending.clear()
+                self.key_slots.clear()
+                self.stats['delivered'] += len(events)
+            if events:
+                self.last_seq = max(self.last_seq, max(event.seq for event in events))
+            return events
+
+    def wait(self, timeout: float) -> List[BusEvent]:
+        """Aguarda eventos por até timeout segundos (transporte com threads)"""
+        if not self.pending and not self.lagged:
+            self.ready.wait(timeout)
+        return self.drain()
+
+
+class EventBus:
+    """Barramento de eventos com histórico curto para reconexão (Last-Event-ID)"""
+
+    def __init__(self, history_size: Optional[int] = None, max_pending: Optional[int] = None):
+        """Inicializa o barramento
+
+        Args:
+            history_size: Eventos mantidos para reconexão (padrão: EVENT_BUS_HISTORY ou 1000)
+            max_pending: Fila máxima por cliente (padrão: EVENT_STREAM_CLIENT_BUFFER ou 256)
+        """
+        self.history: Deque[BusEvent] = deque(maxlen=history_size or int(os.getenv('EVENT_BUS_HISTORY', '1000')))
+        self.max_pending = max_pending or int(os.getenv('EVENT_STREAM_CLIENT_BUFFER', '256'))
+        self.subscribers: Tuple[Subscription, ...] = ()
+        self.sequence = itertools.count(1)
+        self.lock = threading.Lock()
+
+        self.stats = {'published': 0, 'fanout': 0, 'subscribed_total': 0}
+
+    def publish(self, topic: str, event_type: str, data: Dict[str, Any], key: Optional[str] = None) -> BusEvent:
+        """Publica um evento para todos os inscritos no tópico (nunca bloqueia no cliente)"""
+        with self.lock:
+            event = BusEvent(next(self.sequence), topic, event_type, data, key)
+            self.history.append(event)
+            subscribers = self.subscribers
+            self.stats['published'] += 1
+        delivered = 0
+        for subscription in subscribers:
+            if subscription.wants(topic):
+                subscription.offer(event)
+                delivered += 1
+        with self.lock:
+            self.stats['fanout'] += delivered
+        return event
+
+    def subscribe(self, topics: Optional[Iterable[str]] = None, last_event_id: Optional[int] = None,
+                  notify: Optional[Callable[[], None]] = None) -> Subscription:
+        """Registra um cliente; com last_event_id reenvia o que ele perdeu (ou pede resync)"""
+        subscription = Subscription(topics, self.max_pending, notify)
+        with self.lock:
+            if last_event_id is not None:
+                subscription.last_seq = last_event_id
+                missed = [event for event in self.history if event.seq > last_event_id]
+                oldest = self.history[0].seq if self.history else None
+                if oldest is not None and last_event_id < oldest - 1:
+                    subscription.lagged = True  # Histórico não cobre a lacuna
+                else:
+                    for event in missed:
+                        if subscription.wants(event.topic):
+                            subscription.pending[event.seq] = event
+            self.subscribers = self.subscribers + (subscription,)
+            self.stats['subscribed_total'] += 1
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with subscription.lock:
+            subscription.closed = True
+            subscription.pending.clear()
+        subscription.notify()
+        with self.lock:
+            self.subscribers = tuple(s for s in self.subscribers if s is not subscription)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Retorna estatísticas do barramento"""
+        with self.lock:
+            subscribers = self.subscribers
+            return {
+                **self.stats,
+                'subscribers': len(subscribers),
+                'history': len(self.history),
+                'last_id': self.history[-1].seq if self.history else 0,
+                'pending_max': max((len(s.pending) for s in subscribers), default=0),
+                'coalesced': sum(s.stats['coalesced'] for s in subscribers),
+                'resyncs': sum(s.stats['resyncs'] for s in subscribers)
+            }
+
+
+# Instância global para uso em outros módulos
+event_bus = EventBus()
+
+
+def publish_event(topic: str, event_type: str, data: Dict[str, Any], key: Optional[str] = None) -> None:
+    """Publica no barramento global sem deixar erros chegarem ao publicador"""
+    try:
+        event_bus.publish(topic, event_type, data, key)
+    except Exception as e:
+        print(f"⚠️ Erro ao publicar evento {topic}/{event_type}: {e}")
@@ -0,0 +1,282 @@
+# -*- coding: utf-8 -*-
+"""
+Event Stream Server - Servidor asyncio para o canal de eventos em tempo real
+O Waitress atende com poucas threads, e cada cliente SSE prende uma delas.
+Este servidor (aiohttp, em uma thread própria) atende SSE em /api/stream e
+WebSocket em /api/ws a partir do mesmo barramento de eventos, com uma
+corrotina por cliente em vez de uma thread, para milhares de conexões.
+"""
+
+import asyncio
+import os
+import threading
+from typing import Any, Dict, Optional
+
+from .event_bus import EventBus, Subscription, event_bus
+
+try:
+    from aiohttp import WSMsgType, web
+    AIOHTTP_AVAILABLE = True
+except ImportError:
+    web = None
+    WSMsgType = None
+    AIOHTTP_AVAILABLE = False
+
+
+def _parse_topics(raw: Optional[str]):
+    topics = [topic.strip() for topic in (raw or '').split(',') if topic.strip()]
+    return topics or None
+
+
+def _parse_last_event_id(raw: Optional[str]) -> Optional[int]:
+    try:
+        return int(raw) if raw not in (None, '') else None
+    except (TypeError, ValueError):
+        return None
+
+
+class _AsyncWakeup:
+    """Acorda a corrotina do cliente a partir da thread do publicador
+
+    Só agenda um call_soon_threadsafe por vez, então uma rajada de eventos
+    custa um único despertar por cliente.
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop):
+        self.loop = loop
+        self.event = asyncio.Event()
+        self.scheduled = False
+        self.lock = threading.Lock()
+
+    def notify(self) -> None:
+        with self.lock:
+            if self.scheduled:
+                return
+            self.scheduled = True
+        try:
+            self.loop.call_soon_threadsafe(self._wake)
+        except RuntimeError:
+            pass  # Loop encerrado
+
+    def _wake(self) -> None:
+        with self.lock:
+            self.scheduled = False
+        self.event.set()
+
+    async def wait(self, timeout: float) -> None:
+        try:
+            await asyncio.wait_for(self.event.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        self.event.clear()
+
+
+class EventStreamServer:
+    """Servidor SSE/WebSocket alimentado pelo EventBus"""
+
+    def __init__(self, bus: Optional[EventBus] = None, host: Optional[str] = None, port: Optional[int] = None,
+                 max_clients: Optional[int] = None, heartbeat: Optional[float] = None):
+        """Inicializa o servidor (não abre a porta até start())
+
+        Args:
+            bus: Barramento de eventos (padrão: event_bus global)
+            host: Endereço (padrão: EVENT_STREAM_HOST ou 0.0.0.0)
+            port: Porta (padrão: EVENT_STREAM_PORT ou 5001)
+            max_clients: Conexões simultâneas (padrão: EVENT_STREAM_SERVER_MAX_CLIENTS ou 5000)
+            heartbeat: Intervalo dos pings em segundos (padrão: EVENT_STREAM_HEARTBEAT ou 15)
+        """
+        self.bus = bus or event_bus
+        self.host = host or os.getenv('EVENT_STREAM_HOST', '0.0.0.0')
+        self.port = port if port is not None else int(os.getenv('EVENT_STREAM_PORT', '5001'))
+        self.max_clients = max_clients or int(os.getenv('EVENT_STREAM_SERVER_MAX_CLIENTS', '5000'))
+        self.heartbeat = heartbeat or float(os.getenv('EVENT_STREAM_HEARTBEAT', '15'))
+
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.runner = None
+        self.thread: Optional[threading.Thread] = None
+        self.started = threading.Event()
+        self.is_running = False
+        self.clients = 0
+
+        self.stats = {'sse_connections': 0, 'ws_connections': 0, 'rejected': 0, 'messages_sent': 0}
+
+    # ------------------------------------------------------------------
+    # Ciclo de vida
+    # ------------------------------------------------------------------
+
+    def start(self) -> bool:
+        """Inicia o servidor em uma thread própria"""
+        if not AIOHTTP_AVAILABLE:
+            print("⚠️ aiohttp não disponível - servidor de eventos desabilitado")
+            return False
+        if self.is_running:
+            return False
+        self.is_running = True
+        self.thread = threading.Thread(target=self._run, name="EventStreamServer", daemon=True)
+        self.thread.start()
+        self.started.wait(timeout=10)
+        return self.is_running
+
+    def stop(self) -> None:
+        """Encerra o servidor e desconecta os clientes"""
+        if not self.is_running or self.loop is None:
+            return
+        self.is_running = False
+        try:
+            asyncio.run_coroutine_threadsafe(self._shutdown(), self.loop).result(timeout=10)
+        except Exception as e:
+            print(f"⚠️ Erro ao parar servidor de eventos: {e}")
+        if self.thread:
+            self.thread.join(timeout=5)
+        print("🛑 Servidor de eventos parado")
+
+    def _run(self) -> None:
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        try:
+            self.loop.run_until_complete(self._startup())
+            print(f"📡 Servidor de eventos em {self.host}:{self.port} (SSE /api/stream, WebSocket /api/ws)")
+            self.started.set()
+            self.loop.run_forever()
+        except Exception as e:
+            print(f"❌ Erro no servidor de eventos: {e}")
+            self.is_running = False
+            self.started.set()
+        finally:
+            self.loop.close()
+
+    def build_app(self):
+        app = web.Application()
+        app.router.add_get('/api/stream', self.handle_sse)
+        app.router.add_get('/api/ws', self.handle_ws)
+        app.router.add_get('/api/stream/stats', self.handle_stats)
+        return app
+
+    async def _startup(self) -> None:
+        self.runner = web.AppRunner(self.build_app())
+        await self.runner.setup()
+        await web.TCPSite(self.runner, self.host, self.port).start()
+
+    async def _shutdown(self) -> None:
+        if self.runner is not None:
+            await self.runner.cleanup()
+        self.loop.call_soon(self.loop.stop)
+
+    # ------------------------------------------------------------------
+    # Clientes
+    # ------------------------------------------------------------------
+
+    def _subscribe(self, request) -> Optional[tuple]:
+        if self.clients >= self.max_clients:
+            self.stats['rejected'] += 1
+            return None
+        wakeup = _AsyncWakeup(asyncio.get_running_loop())
+        last_event_id = _parse_last_event_id(request.headers.get('Last-Event-ID') or request.query.get('last_event_id'))
+        subscription = self.bus.subscribe(_parse_topics(request.query.get('topics')), last_event_id, wakeup.notify)
+        self.clients += 1
+        return subscription, wakeup
+
+    def _unsubscribe(self, subscription: Subscription) -> None:
+        self.bus.unsubscribe(subscription)
+        self.clients -= 1
+
+    def _busy_response(self):
+        return web.json_response({'error': 'Limite de conexões de stream atingido'}, status=503,
+                                 headers={'Retry-After': '30'})
+
+    async def handle_sse(self, request):
+        """Canal Server-Sent Events"""
+        subscribed = self._subscribe(request)
+        if subscribed is None:
+            return self._busy_response()
+        subscription, wakeup = subscribed
+        self.stats['sse_connections'] += 1
+
+        response = web.StreamResponse(headers={
+            'Content-Type': 'text/event-stream',
+            'Cache-Control': 'no-cache',
+            'Access-Control-Allow-Origin': '*',
+            'X-Accel-Buffering': 'no'
+        })
+        try:
+            await response.prepare(request)
+            await response.write(b"retry: 5000\n: conectado\n\n")
+            while self.is_running and not subscription.closed:
+                events = subscription.drain()
+                if not events:
+                    await wakeup.wait(self.heartbeat)
+                    events = subscription.drain()
+                if events:
+                    await response.write(''.join(event.to_sse() for event in events).encode('utf-8'))
+                    self.stats['messages_sent'] += len(events)
+                else:
+                    await response.write(b": ping\n\n")
+        except (ConnectionResetError, asyncio.CancelledError):
+            pass
+        finally:
+            self._unsubscribe(subscription)
+        return response
+
+    async def handle_ws(self, request):
+        """Canal WebSocket (mensagens JSON {id, topic, type, data})"""
+        subscribed = self._subscribe(request)
+        if subscribed is None:
+            return self._busy_response()
+        subscription, wakeup = subscribed
+        self.stats['ws_connections'] += 1
+
+        ws = web.WebSocketResponse(heartbeat=self.heartbeat)
+        reader = None
+        try:
+            await ws.prepare(request)
+            reader = asyncio.ensure_future(self._read_ws(ws, subscription))
+            while self.is_running and not ws.closed and not subscription.closed:
+                events = subscription.drain()
+                if not events:
+                    await wakeup.wait(self.heartbeat)
+                    continue
+                for event in events:
+                    await ws.send_str(event.to_json())
+                self.stats['messages_sent'] += len(events)
+        except (ConnectionResetError, asyncio.CancelledError):
+            pass
+        finally:
+            if reader is not None:
+                reader.cancel()
+            self._unsubscribe(subscription)
+            await ws.close()
+        return ws
+
+    async def _read_ws(self, ws, subscription: Subscription) -> None:
+        """Lê mensagens do cliente; {"topics": [...]} troca os tópicos assinados"""
+        async for message in ws:
+            if message.type == WSMsgType.TEXT:
+                try:
+                    payload = message.json()
+                    if isinstance(payload, dict) and 'topics' in payload:
+                        topics = payload.get('topics') or None
+                        subscription.topics = set(topics) if topics else None
+                except ValueError:
+                    pass
+            elif message.type in (WSMsgType.CLOSE, WSMsgType.ERROR):
+                break
+        subscription.closed = True
+        subscription.notify()
+
+    async def handle_stats(self, request):
+        return web.json_response({'success': True, **self.get_stats()},
+                                 headers={'Access-Control-Allow-Origin': '*'})
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Retorna estatísticas do servidor"""
+        return {
+            **self.stats,
+            'running': self.is_running,
+            'port': self.port,
+            'clients': self.clients,
+            'max_clients': self.max_clients
+        }
+
+
+# Instância global para uso em outros módulos
+event_stream_server = EventStreamServer()
@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+"""
+Fast JSON - Serialização rápida das respostas da API
+Usa orjson quando instalado (com json da biblioteca padrão como fallback) e
+converte direto para bytes tipos NumPy, pandas e datetimes, sem o passo de
+limpeza recursiva que as rotas faziam antes do jsonify.
+"""
+
+import dataclasses
+import json
+import os
+import uuid
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Callable, Optional
+
+import numpy as np
+from werkzeug.http import http_date
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = os.getenv('FAST_JSON_ENABLED', 'true').lower() == 'true'
+except ImportError:
+    orjson = None
+    ORJSON_AVAILABLE = False
+
+try:
+    from flask.json.provider import DefaultJSONProvider
+except ImportError:
+    DefaultJSONProvider = object
+
+# Formato de data usado nos cards do dashboard
+BR_DATETIME_FORMAT = '%d/%m/%Y %H:%M:%S'
+
+if ORJSON_AVAILABLE:
+    _ORJSON_OPTIONS = (orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+                       | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS)
+
+
+def _make_default(datetime_format: Optional[str], strict: bool) -> Callable[[Any], Any]:
+    """Conversor de tipos não nativos do JSON
+
+    Args:
+        datetime_format: strftime para datas (None = formato HTTP, como o Flask)
+        strict: Se False, tipos desconhecidos viram str em vez de erro
+    """
+    def default(obj: Any) -> Any:
+        if isinstance(obj, np.generic):
+            return obj.item()
+        if isinstance(obj, np.ndarray):
+            return obj.tolist()
+        if isinstance(obj, (datetime, date)):  # pd.Timestamp herda de datetime
+            return obj.strftime(datetime_format) if datetime_format else http_date(obj)
+        if isinstance(obj, (set, frozenset, tuple)):
+            return list(obj)
+        if isinstance(obj, (Decimal, uuid.UUID)):
+            return str(obj)
+        if dataclasses.is_dataclass(obj) and not isinstance(obj, type):
+            return dataclasses.asdict(obj)
+        if hasattr(obj, '__html__'):
+            return str(obj.__html__())
+        if hasattr(obj, 'item'):
+            return obj.item()
+        if strict:
+            raise TypeError(f"Objeto do tipo {type(obj).__name__} não é serializável em JSON")
+        return str(obj)
+    return default
+
+
+_DEFAULTS = {}
+
+
+def _get_default(datetime_format: Optional[str], strict: bool) -> Callable[[Any], Any]:
+    key = (datetime_format, strict)
+    default = _DEFAULTS.get(key)
+    if default is None:
+        default = _DEFAULTS[key] = _make_default(datetime_format, strict)
+    return default
+
+
+def dumps_bytes(obj: Any, datetime_format: Optional[str] = None, strict: bool = True,
+                sort_keys: bool = False, indent: bool = False) -> bytes:
+    """Serializa para bytes UTF-8
+
+    Args:
+        obj: Payload (dicts, listas, NumPy, pandas, datetimes, dataclasses)
+        datetime_format: strftime para datas (None = formato HTTP)
+        strict: Se False, tipos desconhecidos viram str
+        sort_keys: Ordena as chaves dos objetos
+        indent: Saída indentada (modo debug)
+    """
+    default = _get_default(datetime_format, strict)
+    if ORJSON_AVAILABLE:
+        options = _ORJSON_OPTIONS
+        if sort_keys:
+            options |= orjson.OPT_SORT_KEYS
+        if indent:
+            options |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=default, option=options)
+    return json.dumps(obj, default=default, ensure_ascii=False, sort_keys=sort_keys,
+                      indent=2 if indent else None,
+                      separators=None if indent else (',', ':')).encode('utf-8')
+
+
+def dumps(obj: Any, **kwargs: Any) -> str:
+    """Serializa para str (mesmos argumentos de dumps_bytes)"""
+    return dumps_bytes(obj, **kwargs).decode('utf-8')
+
+
+def loads(data: Any) -> Any:
+    return orjson.loads(data) if ORJSON_AVAILABLE else json.loads(data)
+
+
+def json_response(payload: Any, status: int = 200, datetime_format: Optional[str] = BR_DATETIME_FORMAT,
+                  strict: bool = False):
+    """Resposta Flask com o corpo já em bytes (datas no formato do dashboard)"""
+    from flask import current_app
+    return current_app.response_class(dumps_bytes(payload, datetime_format=datetime_format, strict=strict),
+                                      status=status, mimetype='application/json')
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """
+    Provedor JSON do Flask baseado em dumps_bytes
+
+    Com ele jsonify e current_app.json.dumps usam o caminho rápido. Mantém
+    a conversão de datas do Flask (formato HTTP) e a ordem das chaves como
+    as rotas montaram os dicts.
+    """
+
+    sort_keys = False
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        if kwargs:
+            # Argumentos específicos do json (cls, indent...): caminho da biblioteca padrão
+            return super().dumps(obj, **kwargs)
+        return dumps_bytes(obj, sort_keys=self.sort_keys).decode('utf-8')
+
+    def loads(self, s: Any, **kwargs: Any) -> Any:
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return loads(s)
+
+    def response(self, *args: Any, **kwargs: Any):
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        body = dumps_bytes(obj, sort_keys=self.sort_keys, indent=indent) + b"\n"
+        return self._app.response_class(body, mimetype=self.mimetype)
+
+
+def install_json_provider(app) -> None:
+    """Troca o provedor JSON do app Flask pelo FastJSONProvider"""
+    app.json_provider_class = FastJSONProvider
+    app.json = FastJSONProvider(app)
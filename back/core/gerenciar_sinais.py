@@ -7,6 +7,7 @@ import pytz  # Adicionar esta importação
 from typing import Dict, List, Optional, Union, Any
 from pandas import DataFrame, Series
 from .database import Database
+from .signal_event_log import SignalEventLog, get_signal_event_log
 
 class GerenciadorSinais:
     def __init__(self, db_instance):
@@ -26,6 +27,29 @@ class GerenciadorSinais:
             'quality_score', 'btc_correlation', 'btc_trend'
         ])
         self._empty_df = DataFrame(columns=self.SIGNAL_COLUMNS)
+        # Estado dos sinais (log de eventos compartilhado; sinais_lista.csv é o snapshot).
+        # O Database grava os sinais novos nesse mesmo log (único escritor do arquivo)
+        self.event_log: SignalEventLog = (getattr(db_instance, 'signal_log', None)
+                                          or get_signal_event_log(self.signals_file))
+
+    def _to_dataframe(self, records: List[Dict[str, Any]]) -> DataFrame:
+        """Monta um DataFrame a partir dos registros do log (entry_time como datetime)."""
+        if not records:
+            return self._empty_df.copy()
+        df = DataFrame(records)
+        df['entry_time'] = pd.to_datetime(df['entry_time'])
+        return df
+
+    @staticmethod
+    def _cutoff(moment: datetime) -> str:
+        """Formata um horário de corte no formato de entry_time."""
+        return moment.strftime('%Y-%m-%d %H:%M:%S')
+
+    def _purge(self, keys: List[str]) -> int:
+        """Remove sinais do log e do banco (o SQLite não pode reter sinais limpos da lista)."""
+        if hasattr(self.db, 'delete_signals'):
+            self.db.delete_signals(keys)
+        return self.event_log.purge(keys)
 
     def _get_signal_class(self, quality_score: float) -> Optional[str]:
         """Retorna a classificação do sinal baseado no quality_score"""
@@ -40,58 +64,72 @@ class GerenciadorSinais:
         else:
             return None  # Não retorna classificação para scores baixos
 
-    def save_signal(self, signal_data: Dict) -> bool:
+    def format_signal(self, signal_data: Dict) -> Dict[str, Any]:
+        """Monta o registro do sinal (horário de entrada, projeção e classe)"""
+        # Usar timezone correto
+        entry_time = datetime.now(self.timezone)
+
+        # Calcular porcentagem de projeção
+        entry_price = float(signal_data['entry_price'])
+        target_price = float(signal_data['target_price'])
+
+        if signal_data['type'] == 'COMPRA':
+            projection_percentage = ((target_price - entry_price) / entry_price) * 100
+        else:  # VENDA
+            projection_percentage = ((entry_price - target_price) / entry_price) * 100
+
+        # Formatar o sinal com todos os dados incluindo motivos de confirmação
+        return {
+            'symbol': signal_data['symbol'],
+            'type': signal_data['type'],
+            'entry_price': entry_price,
+            'entry_time': entry_time.strftime('%Y-%m-%d %H:%M:%S'),
+            'target_price': target_price,
+            'projection_percentage': round(projection_percentage, 2),
+            'signal_class': self._get_signal_class(float(signal_data.get('quality_score', 0))),
+            'status': 'OPEN',
+            # Adicionar campos de confirmação se existirem
+            'confirmed_at': signal_data.get('confirmed_at'),
+            'confirmation_reasons': signal_data.get('confirmation_reasons', []),
+            'confirmation_attempts': signal_data.get('confirmation_attempts', 0),
+            'quality_score': signal_data.get('quality_score', 0),
+            'btc_correlation': signal_data.get('btc_correlation'),
+            'btc_trend': signal_data.get('btc_trend')
+        }
+
+    def save_signal(self, signal_data: Dict, save_remote: bool = True) -> bool:
         try:
-            # Usar timezone correto
-            entry_time = datetime.now(self.timezone)
-            
-            # Calcular porcentagem de projeção
-            entry_price = float(signal_data['entry_price'])
-            target_price = float(signal_data['target_price'])
-            
-            if signal_data['type'] == 'COMPRA':
-                projection_percentage = ((target_price - entry_price) / entry_price) * 100
-            else:  # VENDA
-                projection_percentage = ((entry_price - target_price) / entry_price) * 100
-            
-            # Formatar o sinal com todos os dados incluindo motivos de confirmação
-            formatted_signal = {
-                'symbol': signal_data['symbol'],
-                'type': signal_data['type'],
-                'entry_price': entry_price,
-                'entry_time': entry_time.strftime('%Y-%m-%d %H:%M:%S'),
-                'target_price': target_price,
-                'projection_percentage': round(projection_percentage, 2),
-                'signal_class': self._get_signal_class(float(signal_data.get('quality_score', 0))),
-                'status': 'OPEN',
-                # Adicionar campos de confirmação se existirem
-                'confirmed_at': signal_data.get('confirmed_at'),
-                'confirmation_reasons': signal_data.get('confirmation_reasons', []),
-                'confirmation_attempts': signal_data.get('confirmation_attempts', 0),
-                'quality_score': signal_data.get('quality_score', 0),
-                'btc_correlation': signal_data.get('btc_correlation'),
-                'btc_trend': signal_data.get('btc_trend')
-            }
-            
-            result = self.db.add_signal(formatted_signal)
+            return self.save_formatted_signal(self.format_signal(signal_data), save_remote)
+        except Exception as e:
+            print(f"❌ Erro ao salvar sinal: {str(e)}")
+            return False
+
+    def save_formatted_signal(self, formatted_signal: Dict[str, Any], save_remote: bool = True,
+                              raise_errors: bool = False) -> bool:
+        """Grava um sinal já formatado (save_remote=False deixa o Supabase para a fila de persistência)
+
+        Com raise_errors=True falhas de gravação são relançadas para a fila
+        tentar de novo; False continua significando sinal duplicado.
+        """
+        try:
+            result = self.db.add_signal(formatted_signal, save_remote=save_remote, raise_errors=raise_errors)
             if result:
+                if self.event_log is not getattr(self.db, 'signal_log', None):
+                    self.event_log.create(formatted_signal)
                 print(f"✅ Sinal salvo com sucesso: {formatted_signal['symbol']}")
             return result
             
         except Exception as e:
             print(f"❌ Erro ao salvar sinal: {str(e)}")
+            if raise_errors:
+                raise
             return False
 
     def clean_scalping_signals(self):
         """Limpa todos os sinais de scalping à meia-noite"""
         try:
-            df = pd.read_csv(self.signals_file)
-            
             # Manter apenas sinais não-scalping
-            df = df[~df['is_scalping']]
-            
-            # Salvar arquivo atualizado
-            df.to_csv(self.signals_file, index=False)
+            self._purge(self.event_log.keys_where(lambda record: str(record.get('is_scalping')).lower() == 'true'))
             print("✨ Sinais de scalping limpos com sucesso")
             
         except Exception as e:
@@ -114,21 +152,6 @@ class GerenciadorSinais:
     def processar_sinais_abertos(self) -> DataFrame:
         """Processa sinais abertos baseado no horário atual de limpeza"""
         try:
-            df = pd.read_csv(self.signals_file)
-            
-            # Converter entry_time para datetime
-            df['entry_time'] = pd.to_datetime(df['entry_time'])
-            
-            # Converter colunas numéricas
-            numeric_cols = [
-                'entry_price', 'target_price', 'exit_price', 'variation',
-                'quality_score', 'trend_score', 'alignment_score', 'market_score',
-                'trend_strength', 'confluence_count', 'leverage'
-            ]
-            for col in numeric_cols:
-                if col in df.columns:
-                    df[col] = pd.to_numeric(df[col], errors='coerce')
-        
             # Determinar horário de corte baseado na hora atual (MODO PERMISSIVO)
             agora = datetime.now(self.timezone)  # Usar timezone
             
@@ -145,11 +168,21 @@ class GerenciadorSinais:
                 corte = ontem.replace(hour=21, minute=0, second=0, microsecond=0)
                 print(f"🌅 Modo madrugada: Exibindo sinais gerados após 21:00 de ontem")
             
-            # Filtrar sinais após o horário de corte e com status OPEN
-            result_df = df[
-                (df['entry_time'] >= corte) & 
-                (df['status'] == 'OPEN')
+            # Consulta por faixa no índice de entry_time (apenas sinais após o corte)
+            df = self._to_dataframe(self.event_log.records_between(start=self._cutoff(corte)))
+            
+            # Converter colunas numéricas
+            numeric_cols = [
+                'entry_price', 'target_price', 'exit_price', 'variation',
+                'quality_score', 'trend_score', 'alignment_score', 'market_score',
+                'trend_strength', 'confluence_count', 'leverage'
             ]
+            for col in numeric_cols:
+                if col in df.columns:
+                    df[col] = pd.to_numeric(df[col], errors='coerce')
+            
+            # Filtrar sinais com status OPEN
+            result_df = df[df['status'] == 'OPEN']
             
             print(f"📊 Filtro aplicado: {len(result_df)} sinais OPEN encontrados após {corte.strftime('%d/%m/%Y %H:%M')}")
             
@@ -174,14 +207,9 @@ class GerenciadorSinais:
 
     def gerar_relatorio(self) -> dict:
         try:
-            df = pd.read_csv(self.signals_file)
-            df['entry_time'] = pd.to_datetime(df['entry_time'])
-            
             cutoff = datetime.now() - timedelta(hours=24)
-            recentes = df[
-                (df['status'] == 'CLOSED') & 
-                (df['entry_time'] >= cutoff)
-            ]
+            df = self._to_dataframe(self.event_log.records_between(start=self._cutoff(cutoff)))
+            recentes = df[df['status'] == 'CLOSED'].copy()
             
             total = len(recentes)
             if total == 0:
@@ -206,20 +234,22 @@ class GerenciadorSinais:
     def atualizar_sinal(self, symbol: str, exit_price: float, variation: float) -> bool:
         """Atualiza um sinal com informações de saída"""
         try:
-            df = pd.read_csv(self.signals_file)
-            mask = (df['symbol'] == symbol) & (df['status'] == 'OPEN')
+            fields = {
+                'exit_price': str(exit_price),
+                'variation': str(variation),
+                'result': 'WIN' if variation > 0 else 'LOSS',
+                'exit_time': datetime.now(self.timezone).strftime('%Y-%m-%d %H:%M:%S')
+            }
+            with self.event_log.locked():
+                keys = self.event_log.open_keys(symbol)
+                closed = self.event_log.close_open(symbol, fields)
+            if closed and hasattr(self.db, 'close_signals'):
+                self.db.close_signals(keys, fields)
             
-            if not mask.any():
+            if not closed:
                 print(f"⚠️ Nenhum sinal aberto encontrado para {symbol}")
                 return False
                 
-            df.loc[mask, 'exit_price'] = str(exit_price)
-            df.loc[mask, 'variation'] = str(variation)
-            df.loc[mask, 'status'] = 'CLOSED'
-            df.loc[mask, 'result'] = 'WIN' if variation > 0 else 'LOSS'
-            df.loc[mask, 'exit_time'] = datetime.now(self.timezone).strftime('%Y-%m-%d %H:%M:%S')
-            
-            df.to_csv(self.signals_file, index=False)
             print(f"✅ Sinal atualizado: {symbol}")
             return True
             
@@ -241,38 +271,11 @@ class GerenciadorSinais:
     def limpar_sinais_abertos_do_dia_anterior(self) -> None:
         """Remove todos os sinais com status 'OPEN' do dia anterior."""
         try:
-            if not os.path.exists(self.signals_file):
-                print("⚠️ Arquivo de sinais não encontrado para limpeza.")
-                return
-
-            df = pd.read_csv(self.signals_file)
-            
-            # Converter entry_time para datetime
-            df['entry_time'] = pd.to_datetime(df['entry_time'])
-            
             # Define o início do dia atual
             hoje_inicio = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
             
-            # Manter apenas sinais que NÃO estão 'OPEN' OU que são de HOJE
-            df_cleaned = df[
-                (df['status'] != 'OPEN') | 
-                (df['entry_time'] >= hoje_inicio)
-            ].copy() # Use .copy() para evitar SettingWithCopyWarning
-
-            # Opcional: Migrar sinais 'OPEN' antigos para o histórico antes de deletar
-            # Se você quiser manter um registro dos sinais 'OPEN' que foram fechados pela limpeza diária
-            # old_open_signals = df[
-            #     (df['status'] == 'OPEN') & 
-            #     (df['entry_time'] < hoje_inicio)
-            # ].copy()
-            # if not old_open_signals.empty:
-            #     old_open_signals['status'] = 'CLEANED_DAILY' # Marcar como limpo pela rotina
-            #     old_open_signals['exit_time'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-            #     old_open_signals.to_csv(self.history_file, mode='a', header=not os.path.exists(self.history_file), index=False)
-            #     print(f"✨ {len(old_open_signals)} sinais 'OPEN' antigos migrados para histórico.")
-
-            # Salvar o DataFrame limpo de volta no arquivo de sinais
-            df_cleaned.to_csv(self.signals_file, index=False)
+            # Remover sinais 'OPEN' anteriores a hoje (faixa no índice de entry_time)
+            self._purge(self.event_log.keys_before(self._cutoff(hoje_inicio), status='OPEN'))
             print("✨ Sinais 'OPEN' do dia anterior limpos com sucesso.")
 
         except Exception as e:
@@ -282,37 +285,15 @@ class GerenciadorSinais:
     def limpar_sinais_antes_das_10h(self) -> None:
         """Remove todos os sinais OPEN gerados antes das 10:00 do dia atual."""
         try:
-            if not os.path.exists(self.signals_file):
-                print("⚠️ Arquivo de sinais não encontrado para limpeza.")
-                return
-
-            df = pd.read_csv(self.signals_file)
-            
-            # Converter entry_time para datetime
-            df['entry_time'] = pd.to_datetime(df['entry_time'])
-            
             # Definir o horário de corte (10:00 de hoje)
             hoje = datetime.now(self.timezone).replace(hour=10, minute=0, second=0, microsecond=0)
-            # Converter para timestamp do pandas sem timezone para comparação
-            hoje = pd.Timestamp(hoje.replace(tzinfo=None))
             
-            # Contar sinais que serão removidos
-            sinais_para_remover = df[
-                (df['status'] == 'OPEN') & 
-                (df['entry_time'] < hoje)
-            ]
-            
-            # Manter apenas sinais que NÃO estão 'OPEN' OU que foram gerados após as 10:00
-            df_cleaned = df[
-                (df['status'] != 'OPEN') | 
-                (df['entry_time'] >= hoje)
-            ].copy()
-    
-            # Salvar o DataFrame limpo
-            df_cleaned.to_csv(self.signals_file, index=False)
+            # Remover sinais OPEN anteriores ao corte (faixa no índice de entry_time)
+            removidos = self._purge(self.event_log.keys_before(self._cutoff(hoje), status='OPEN'))
+            restantes = sum(1 for record in self.event_log.records() if record.get('status') == 'OPEN')
             
-            print(f"✨ {len(sinais_para_remover)} sinais OPEN anteriores às 10:00 foram removidos.")
-            print(f"📊 {len(df_cleaned[df_cleaned['status'] == 'OPEN'])} sinais OPEN restantes (gerados após 10:00).")
+            print(f"✨ {removidos} sinais OPEN anteriores às 10:00 foram removidos.")
+            print(f"📊 {restantes} sinais OPEN restantes (gerados após 10:00).")
     
         except Exception as e:
             print(f"❌ Erro ao limpar sinais antes das 10:00: {e}")
@@ -321,37 +302,15 @@ class GerenciadorSinais:
     def limpar_sinais_antes_das_21h(self) -> None:
         """Remove todos os sinais OPEN gerados antes das 21:00 do dia atual."""
         try:
-            if not os.path.exists(self.signals_file):
-                print("⚠️ Arquivo de sinais não encontrado para limpeza.")
-                return
-
-            df = pd.read_csv(self.signals_file)
-            
-            # Converter entry_time para datetime
-            df['entry_time'] = pd.to_datetime(df['entry_time'])
-            
             # Definir o horário de corte (21:00 de hoje)
             hoje = datetime.now(self.timezone).replace(hour=21, minute=0, second=0, microsecond=0)
-            # Converter para timestamp do pandas sem timezone para comparação
-            hoje = pd.Timestamp(hoje.replace(tzinfo=None))
             
-            # Contar sinais que serão removidos
-            sinais_para_remover = df[
-                (df['status'] == 'OPEN') & 
-                (df['entry_time'] < hoje)
-            ]
+            # Remover sinais OPEN anteriores ao corte (faixa no índice de entry_time)
+            removidos = self._purge(self.event_log.keys_before(self._cutoff(hoje), status='OPEN'))
+            restantes = sum(1 for record in self.event_log.records() if record.get('status') == 'OPEN')
             
-            # Manter apenas sinais que NÃO estão 'OPEN' OU que foram gerados após as 21:00
-            df_cleaned = df[
-                (df['status'] != 'OPEN') | 
-                (df['entry_time'] >= hoje)
-            ].copy()
-    
-            # Salvar o DataFrame limpo
-            df_cleaned.to_csv(self.signals_file, index=False)
-            
-            print(f"✨ {len(sinais_para_remover)} sinais OPEN anteriores às 21:00 foram removidos.")
-            print(f"📊 {len(df_cleaned[df_cleaned['status'] == 'OPEN'])} sinais OPEN restantes (gerados após 21:00).")
+            print(f"✨ {removidos} sinais OPEN anteriores às 21:00 foram removidos.")
+            print(f"📊 {restantes} sinais OPEN restantes (gerados após 21:00).")
     
         except Exception as e:
             print(f"❌ Erro ao limpar sinais antes das 21:00: {e}")
@@ -360,20 +319,11 @@ class GerenciadorSinais:
     def limpar_sinais_antigos(self) -> None:
         """Remove sinais OPEN de dias anteriores."""
         try:
-            df = pd.read_csv(self.signals_file)
-            df['entry_time'] = pd.to_datetime(df['entry_time'])
-            
             # Define o início do dia atual
             hoje = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
             
             # Mantém apenas sinais de hoje ou sinais já fechados (CLOSED)
-            df_limpo = df[
-                (df['entry_time'] >= hoje) |
-                (df['status'] != 'OPEN')
-            ]
-            
-            # Salva o DataFrame limpo
-            df_limpo.to_csv(self.signals_file, index=False)
+            self._purge(self.event_log.keys_before(self._cutoff(hoje), status='OPEN'))
             print("✅ Sinais antigos removidos com sucesso")
             
         except Exception as e:
@@ -382,83 +332,61 @@ class GerenciadorSinais:
 
     def migrar_sinais(self) -> None:
         try:
-            if not os.path.exists(self.signals_file):
-                return
-            df = pd.read_csv(self.signals_file)
-            df['entry_time'] = pd.to_datetime(df['entry_time'])
             cutoff_date = datetime.now() - timedelta(days=30)
-            old_signals = df[df['entry_time'] < cutoff_date]
-            if not old_signals.empty:
-                old_signals.to_csv(self.history_file, mode='a', header=False, index=False)
-                df = df[df['entry_time'] >= cutoff_date]
-                df.to_csv(self.signals_file, index=False)
+            old_signals = self.event_log.records_between(end=self._cutoff(cutoff_date))
+            if old_signals:
+                with open(self.history_file, 'a', newline='', encoding='utf-8') as f:
+                    writer = csv.DictWriter(f, fieldnames=self.event_log.columns, extrasaction='ignore')
+                    writer.writerows(old_signals)
+                self._purge(self.event_log.keys_before(self._cutoff(cutoff_date), status=None))
         except Exception as e:
             print(f"❌ Erro ao migrar sinais: {e}")
 
     # Adicionar este método para limpar sinais manualmente
-    def clear_signals(self, status_to_clear: Optional[str] = None):
+    def clear_signals(self, status_to_clear: Optional[str] = None) -> int:
         """
         Limpa sinais do arquivo CSV.
         Se status_to_clear for None, limpa todos os sinais.
         Se for 'CLOSED' ou 'OPEN', limpa apenas sinais com esse status.
+        Retorna a quantidade de sinais removidos; erros sobem para o chamador.
         """
-        try:
-            if not os.path.exists(self.signals_file):
-                print(f"Arquivo de sinais não encontrado: {self.signals_file}")
-                # Criar um arquivo vazio com cabeçalhos se não existir
-                self._empty_df.to_csv(self.signals_file, index=False)
-                print(f"Arquivo de sinais vazio criado: {self.signals_file}")
-                return
-
-            df = pd.read_csv(self.signals_file)
+        if status_to_clear is None:
+            # Limpar todos os sinais
+            print("🧹 Limpando TODOS os sinais...")
+            cleaned_count = self._purge(self.event_log.keys_where(lambda record: True))
+        elif status_to_clear.upper() in ('CLOSED', 'OPEN'):
+            status = status_to_clear.upper()
+            print(f"🧹 Limpando sinais com status '{status}'...")
+            cleaned_count = self._purge(self.event_log.keys_where(lambda record: record.get('status') == status))
+        else:
+            print(f"⚠️ Status '{status_to_clear}' inválido para limpeza. Use 'CLOSED', 'OPEN' ou deixe vazio para limpar todos.")
+            return 0
 
-            initial_count = len(df)
-            cleaned_count = 0
-            df_cleaned = df.copy() # Começa com uma cópia do dataframe original
+        print(f"✅ Limpeza concluída. {cleaned_count} sinais removidos.")
+        return cleaned_count
 
-            if status_to_clear is None:
-                # Limpar todos os sinais
-                df_cleaned = self._empty_df.copy()
-                cleaned_count = initial_count
-                print("🧹 Limpando TODOS os sinais...")
-            elif status_to_clear.upper() == 'CLOSED':
-                # Manter apenas sinais que NÃO são 'CLOSED'
-                df_cleaned = df[df['status'] != 'CLOSED'].copy()
-                cleaned_count = initial_count - len(df_cleaned)
-                print("🧹 Limpando sinais com status 'CLOSED'...")
-            elif status_to_clear.upper() == 'OPEN':
-                 # Manter apenas sinais que NÃO são 'OPEN'
-                df_cleaned = df[df['status'] != 'OPEN'].copy()
-                cleaned_count = initial_count - len(df_cleaned)
-                print("🧹 Limpando sinais com status 'OPEN'...")
-            else:
-                print(f"⚠️ Status '{status_to_clear}' inválido para limpeza. Use 'CLOSED', 'OPEN' ou deixe vazio para limpar todos.")
-                return # Não salva se o status for inválido
+    def remover_sinais_por_simbolo(self, symbol: str) -> int:
+        """Remove todos os sinais de um símbolo e retorna a quantidade removida.
 
-            # Salvar arquivo atualizado
-            df_cleaned.to_csv(self.signals_file, index=False)
+        Erros sobem para o chamador (a rota de exclusão manual responde success=False).
+        """
+        return self._purge(self.event_log.keys_where(lambda record: record.get('symbol') == symbol))
 
-            print(f"✅ Limpeza concluída. {cleaned_count} sinais removidos.")
+    def remover_sinais_por_status(self, status: str) -> int:
+        """Remove todos os sinais com o status informado e retorna a quantidade removida.
 
-        except Exception as e:
-            print(f"❌ Erro ao limpar sinais: {e}")
+        Erros sobem para o chamador (a rota de exclusão manual responde success=False).
+        """
+        return self._purge(self.event_log.keys_where(lambda record: record.get('status') == status))
 
     def limpar_sinais_futuros(self) -> None:
         """Remove todos os sinais com datas futuras."""
         try:
-            df = pd.read_csv(self.signals_file)
-            df['entry_time'] = pd.to_datetime(df['entry_time'])
-            
-            agora = datetime.now()
-            
-            # Identificar sinais com datas futuras
-            sinais_futuros = df['entry_time'] > agora
+            # Faixa do índice de entry_time posterior ao horário atual
+            removidos = self._purge(self.event_log.keys_after(self._cutoff(datetime.now())))
             
-            if sinais_futuros.any():
-                # Manter apenas sinais com datas válidas
-                df = df[~sinais_futuros]
-                df.to_csv(self.signals_file, index=False)
-                print(f"✅ {sinais_futuros.sum()} sinais com datas futuras foram removidos")
+            if removidos:
+                print(f"✅ {removidos} sinais com datas futuras foram removidos")
             else:
                 print("✨ Nenhum sinal com data futura encontrado")
                 
@@ -469,19 +397,13 @@ class GerenciadorSinais:
     def load_signals_from_csv(self) -> List[Dict[str, Any]]:
         """Carrega todos os sinais do arquivo CSV"""
         try:
-            if not os.path.exists(self.signals_file):
-                print(f"⚠️ Arquivo de sinais não encontrado: {self.signals_file}")
-                return []
+            # Estado materializado do log de eventos (sem reler o CSV)
+            signals = self.event_log.records()
             
-            df = pd.read_csv(self.signals_file)
-            
-            if df.empty:
+            if not signals:
                 print("📭 Arquivo de sinais está vazio")
                 return []
             
-            # Converter DataFrame para lista de dicionários
-            signals = df.replace({pd.NA: None, float('nan'): None}).to_dict(orient='records')
-            
             # Processar confirmation_reasons para garantir formato correto
             for signal in signals:
                 reasons = signal.get('confirmation_reasons')
@@ -0,0 +1,249 @@
+# -*- coding: utf-8 -*-
+"""
+HTTP Pool - Sessões HTTP compartilhadas com keep-alive
+Uma requests.Session por host com pool de conexões dimensionado, política de
+retry no adaptador e contadores de conexões reutilizadas vs. abertas. Também
+mantém clientes Supabase reutilizáveis (cada um com seu próprio pool httpx).
+"""
+
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.util.retry import Retry
+
+# Conexões simultâneas por host (o restante usa DEFAULT_POOL_SIZE)
+HOST_POOL_LIMITS = {
+    'fapi.binance.com': 20,     # 10 threads do scan + confirmação/monitoramento/dashboard
+    'testnet.binancefuture.com': 20,
+    'api.telegram.org': 4
+}
+DEFAULT_POOL_SIZE = 10
+
+
+class _ConnectionCounter:
+    """Contadores compartilhados pelos pools de conexão"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.opened = 0
+
+    def increment(self) -> None:
+        with self.lock:
+            self.opened += 1
+
+
+def _counting_pool_classes(counter: _ConnectionCounter):
+    """Cria classes de pool urllib3 que contam conexões novas (handshakes)"""
+
+    class CountingHTTPConnectionPool(HTTPConnectionPool):
+        def _new_conn(self):
+            counter.increment()
+            return super()._new_conn()
+
+    class CountingHTTPSConnectionPool(HTTPSConnectionPool):
+        def _new_conn(self):
+            counter.increment()
+            return super()._new_conn()
+
+    return {'http': CountingHTTPConnectionPool, 'https': CountingHTTPSConnectionPool}
+
+
+class HTTPSessionPool:
+    """
+    Registro de sessões HTTP por host
+
+    Todas as requisições para o mesmo host usam a mesma sessão (e portanto as
+    mesmas conexões TCP/TLS). O adaptador repete apenas falhas de conexão e
+    respostas 5xx de métodos idempotentes; limites de taxa (429/418) ficam a
+    cargo de quem chama (ver core.rate_limiter).
+    """
+
+    def __init__(self, default_pool_size: int = DEFAULT_POOL_SIZE,
+                 host_limits: Optional[Dict[str, int]] = None, max_retries: int = 2):
+        """Inicializa o registro de sessões
+
+        Args:
+            default_pool_size: Conexões mantidas por host sem limite específico
+            host_limits: Conexões simultâneas por host
+            max_retries: Tentativas extras do adaptador para falhas de conexão/5xx
+        """
+        self.default_pool_size = default_pool_size
+        self.host_limits = dict(HOST_POOL_LIMITS if host_limits is None else host_limits)
+        self.max_retries = max_retries
+
+        self.sessions: Dict[str, requests.Session] = {}
+        self.lock = threading.Lock()
+        self.connections = _ConnectionCounter()
+        self.request_counts: Dict[str, int] = {}
+
+    def _build_session(self, host: str) -> requests.Session:
+        pool_size = self.host_limits.get(host, self.default_pool_size)
+        retry = Retry(
+            total=self.max_retries,
+            connect=self.max_retries,
+            read=0,
+            status=self.max_retries,
+            status_forcelist=(500, 502, 503, 504),
+            allowed_methods=frozenset(['GET', 'HEAD', 'OPTIONS']),
+            backoff_factor=0.3,
+            respect_retry_after_header=False,
+            raise_on_status=False
+        )
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size,
+                              max_retries=retry, pool_block=True)
+        adapter.poolmanager.pool_classes_by_scheme = _counting_pool_classes(self.connections)
+
+        session = requests.Session()
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        session.hooks['response'].append(lambda response, *args, **kwargs: self._count_request(host))
+        return session
+
+    def _count_request(self, host: str) -> None:
+        with self.lock:
+            self.request_counts[host] = self.request_counts.get(host, 0) + 1
+
+    def get_session(self, url: str) -> requests.Session:
+        """Retorna a sessão compartilhada do host da URL"""
+        host = urlparse(url).netloc or url
+        with self.lock:
+            session = self.sessions.get(host)
+            if session is None:
+                session = self._build_session(host)
+                self.sessions[host] = session
+            return session
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """Executa uma requisição pela sessão do host"""
+        return self.get_session(url).request(method, url, **kwargs)
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.request('POST', url, **kwargs)
+
+    def close(self) -> None:
+        """Fecha todas as sessões (conexões keep-alive)"""
+        with self.lock:
+            for session in self.sessions.values():
+                session.close()
+            self.sessions.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Retorna contadores de requisições e conexões"""
+        with self.lock:
+            total_requests = sum(self.request_counts.values())
+            opened = self.connections.opened
+            reused = max(0, total_requests - opened)
+            return {
+                'requests': total_requests,
+                'connections_opened': opened,
+                'connections_reused': reused,
+                'reuse_rate': reused / total_requests * 100 if total_requests > 0 else 0,
+                'requests_by_host': dict(self.request_counts),
+                'hosts': len(self.sessions)
+            }
+
+
+class SupabaseClientRegistry:
+    """Clientes Supabase reutilizáveis por (url, chave), com teste de saúde"""
+
+    def __init__(self, factory: Optional[Callable[[str, str], Any]] = None):
+        """Inicializa o registro
+
+        Args:
+            factory: Cria o cliente a partir de (url, chave) (padrão: supabase.create_client)
+        """
+        self.factory = factory
+        self.clients: Dict[tuple, Any] = {}
+        self.lock = threading.Lock()
+        self.stats = {
+            'clients_created': 0,
+            'clients_reused': 0,
+            'clients_invalidated': 0,
+            'health_checks': 0,
+            'health_check_failures': 0,
+            'last_health_ms': 0.0
+        }
+
+    @staticmethod
+    def _resolve(url: Optional[str], key: Optional[str]) -> tuple:
+        return url or os.getenv('SUPABASE_URL'), key or os.getenv('SUPABASE_ANON_KEY')
+
+    def get_client(self, url: Optional[str] = None, key: Optional[str] = None):
+        """Retorna cliente Supabase compartilhado (None se não configurado)
+
+        Args:
+            url: URL do projeto (padrão: SUPABASE_URL)
+            key: Chave de acesso (padrão: SUPABASE_ANON_KEY)
+        """
+        url, key = self._resolve(url, key)
+        if not url or not key:
+            return None
+
+        with self.lock:
+            client = self.clients.get((url, key))
+            if client is not None:
+                self.stats['clients_reused'] += 1
+                return client
+
+            factory = self.factory
+            if factory is None:
+                from supabase import create_client
+                factory = create_client
+            client = factory(url, key)
+            self.clients[(url, key)] = client
+            self.stats['clients_created'] += 1
+            return client
+
+    def invalidate(self, url: Optional[str] = None, key: Optional[str] = None) -> None:
+        """Descarta o cliente (o próximo get_client cria outro)"""
+        with self.lock:
+            if self.clients.pop(self._resolve(url, key), None) is not None:
+                self.stats['clients_invalidated'] += 1
+
+    def health_check(self, url: Optional[str] = None, key: Optional[str] = None,
+                     table: str = 'signals') -> Dict[str, Any]:
+        """Faz uma leitura mínima na tabela; em caso de falha o cliente é descartado"""
+        start = time.perf_counter()
+        try:
+            client = self.get_client(url, key)
+            if client is None:
+                return {'healthy': False, 'error': 'Supabase não configurado'}
+            client.table(table).select('id').limit(1).execute()
+            healthy, error = True, None
+        except Exception as e:
+            self.invalidate(url, key)
+            healthy, error = False, str(e)
+
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        with self.lock:
+            self.stats['health_checks'] += 1
+            self.stats['last_health_ms'] = elapsed_ms
+            if not healthy:
+                self.stats['health_check_failures'] += 1
+        result = {'healthy': healthy, 'latency_ms': round(elapsed_ms, 2)}
+        if error:
+            result['error'] = error
+        return result
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self.lock:
+            return {**self.stats, 'clients': len(self.clients)}
+
+
+# Instâncias globais para uso em outros módulos
+http_pool = HTTPSessionPool()
+supabase_clients = SupabaseClientRegistry()
+
+
+def get_supabase_client(url: Optional[str] = None, key: Optional[str] = None):
+    """Atalho para o cliente Supabase compartilhado"""
+    return supabase_clients.get_client(url, key)
@@ -0,0 +1,318 @@
+# -*- coding: utf-8 -*-
+"""
+Incremental Indicators - Motor de indicadores com estado recursivo
+Mantém o estado de EMA/MACD/RSI/ATR por (symbol, interval) e atualiza em O(1)
+quando um candle fecha, reproduzindo exatamente as fórmulas da biblioteca `ta`
+(EMAIndicator, MACD, RSIIndicator e AverageTrueRange com fillna=False).
+"""
+
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+NAN = float('nan')
+
+
+class IndicatorState:
+    """Estado recursivo dos indicadores após N candles fechados"""
+
+    __slots__ = (
+        'count', 'last_open_time', 'prev_close', 'emas', 'macd_fast', 'macd_slow',
+        'macd_signal', 'macd_count', 'rsi_up', 'rsi_down', 'tr_sum', 'atr'
+    )
+
+    def __init__(self, ema_windows: Tuple[int, ...]):
+        self.count = 0
+        self.last_open_time: Optional[int] = None
+        self.prev_close = NAN
+        self.emas = {window: NAN for window in ema_windows}
+        self.macd_fast = NAN
+        self.macd_slow = NAN
+        self.macd_signal = NAN
+        self.macd_count = 0
+        self.rsi_up = 0.0
+        self.rsi_down = 0.0
+        self.tr_sum = 0.0
+        self.atr = 0.0
+
+    def copy(self) -> 'IndicatorState':
+        clone = IndicatorState.__new__(IndicatorState)
+        for slot in self.__slots__:
+            setattr(clone, slot, getattr(self, slot))
+        clone.emas = dict(self.emas)
+        return clone
+
+
+class IncrementalIndicatorEngine:
+    """
+    Motor incremental de indicadores técnicos
+
+    O último candle do DataFrame é tratado como provisório (candle em formação):
+    seu efeito é calculado sobre uma cópia do estado, sem alterá-lo. Os candles
+    anteriores são incorporados ao estado uma única vez, quando fecham.
+    """
+
+    def __init__(self, ema_windows: Tuple[int, ...] = (20, 50), macd_fast: int = 12,
+                 macd_slow: int = 26, macd_signal: int = 9, rsi_window: int = 14,
+                 atr_window: int = 14):
+        """Inicializa o motor de indicadores
+
+        Args:
+            ema_windows: Períodos das EMAs calculadas
+            macd_fast: Período da EMA rápida do MACD
+            macd_slow: Período da EMA lenta do MACD
+            macd_signal: Período da linha de sinal do MACD
+            rsi_window: Período do RSI
+            atr_window: Período do ATR
+        """
+        self.ema_windows = tuple(ema_windows)
+        self.macd_fast_window = macd_fast
+        self.macd_slow_window = macd_slow
+        self.macd_signal_window = macd_signal
+        self.rsi_window = rsi_window
+        self.atr_window = atr_window
+
+        self.states: Dict[Tuple[str, str], IndicatorState] = {}
+        self.key_locks: Dict[Tuple[str, str], threading.Lock] = {}
+        self.lock = threading.Lock()
+
+        self.stats = {
+            'seeds': 0,
+            'incremental_updates': 0,
+            'candles_committed': 0,
+            'provisional_updates': 0,
+            'installed': 0
+        }
+
+    # ------------------------------------------------------------------
+    # Recursões (mesmas fórmulas da biblioteca ta)
+    # ------------------------------------------------------------------
+
+    def _step(self, state: IndicatorState, high: float, low: float, close: float) -> None:
+        """Incorpora um candle ao estado (modifica `state`)"""
+        if state.count == 0:
+            for window in state.emas:
+                state.emas[window] = close
+            state.macd_fast = close
+            state.macd_slow = close
+            true_range = high - low
+        else:
+            for window, value in state.emas.items():
+                alpha = 2.0 / (window + 1)
+                state.emas[window] = (1 - alpha) * value + alpha * close
+
+            alpha_fast = 2.0 / (self.macd_fast_window + 1)
+            alpha_slow = 2.0 / (self.macd_slow_window + 1)
+            state.macd_fast = (1 - alpha_fast) * state.macd_fast + alpha_fast * close
+            state.macd_slow = (1 - alpha_slow) * state.macd_slow + alpha_slow * close
+
+            # RSI: médias exponenciais de Wilder (alpha = 1/window) sobre ganhos/perdas
+            diff = close - state.prev_close
+            alpha_rsi = 1.0 / self.rsi_window
+            state.rsi_up = (1 - alpha_rsi) * state.rsi_up + alpha_rsi * (diff if diff > 0 else 0.0)
+            state.rsi_down = (1 - alpha_rsi) * state.rsi_down + alpha_rsi * (-diff if diff < 0 else 0.0)
+
+            true_range = max(high - low, abs(high - state.prev_close), abs(low - state.prev_close))
+
+        state.count += 1
+        state.prev_close = close
+
+        # Linha de sinal do MACD começa no primeiro valor válido do MACD
+        if state.count >= self.macd_slow_window:
+            macd_line = state.macd_fast - state.macd_slow
+            if state.macd_count == 0:
+                state.macd_signal = macd_line
+            else:
+                alpha_signal = 2.0 / (self.macd_signal_window + 1)
+                state.macd_signal = (1 - alpha_signal) * state.macd_signal + alpha_signal * macd_line
+            state.macd_count += 1
+
+        # ATR: média simples dos primeiros `window` TRs e depois suavização de Wilder
+        if state.count < self.atr_window:
+            state.tr_sum += true_range
+        elif state.count == self.atr_window:
+            state.tr_sum += true_range
+            state.atr = state.tr_sum / self.atr_window
+        else:
+            state.atr = (state.atr * (self.atr_window - 1) + true_range) / self.atr_window
+
+    def _values(self, state: IndicatorState) -> Dict[str, float]:
+        """Extrai os valores atuais aplicando os períodos mínimos da biblioteca ta"""
+        values: Dict[str, float] = {'close': state.prev_close}
+
+        for window, value in state.emas.items():
+            values[f'ema{window}'] = value if state.count >= window else NAN
+
+        if state.count >= self.macd_slow_window:
+            macd_line = state.macd_fast - state.macd_slow
+            macd_signal = state.macd_signal if state.macd_count >= self.macd_signal_window else NAN
+        else:
+            macd_line = macd_signal = NAN
+        values['macd'] = macd_line
+        values['macd_signal'] = macd_signal
+        values['macd_diff'] = macd_line - macd_signal
+
+        if state.count >= self.rsi_window:
+            values['rsi'] = 100.0 if state.rsi_down == 0 else 100.0 - 100.0 / (1.0 + state.rsi_up / state.rsi_down)
+        else:
+            values['rsi'] = NAN
+
+        values['atr'] = state.atr if state.count >= self.atr_window else 0.0
+        return values
+
+    # ------------------------------------------------------------------
+    # API pública
+    # ------------------------------------------------------------------
+
+    def _seed(self, highs: np.ndarray, lows: np.ndarray, closes: np.ndarray) -> IndicatorState:
+        """Cria estado a partir de uma série de candles fechados"""
+        state = IndicatorState(self.ema_windows)
+        for high, low, close in zip(highs.tolist(), lows.tolist(), closes.tolist()):
+            self._step(state, high, low, close)
+        return state
+
+    def compute(self, df: pd.DataFrame) -> Dict[str, float]:
+        """Calcula os indicadores do último candle sem guardar estado"""
+        highs = df['high'].to_numpy(dtype=float)
+        lows = df['low'].to_numpy(dtype=float)
+        closes = df['close'].to_numpy(dtype=float)
+
+        state = self._seed(highs, lows, closes)
+        return self._values(state)
+
+    def replay(self, highs: np.ndarray, lows: np.ndarray, closes: np.ndarray) -> Dict[str, np.ndarray]:
+        """Indicadores após cada candle de uma série, com um único estado (backtest)
+
+        Equivale a um `update` por candle fechado desde o início da série: a
+        linha i traz os valores com o candle i incorporado.
+        """
+        state = IndicatorState(self.ema_windows)
+        rows = []
+        for high, low, close in zip(highs.tolist(), lows.tolist(), closes.tolist()):
+            self._step(state, high, low, close)
+            rows.append(self._values(state))
+        if not rows:
+            return {}
+        return {name: np.array([row[name] for row in rows], dtype=np.float64) for name in rows[0]}
+
+    def advance(self, state: Optional[IndicatorState],
+                df: pd.DataFrame) -> Tuple[Optional[IndicatorState], Dict[str, float]]:
+        """Avança um estado com o DataFrame sem guardá-lo no motor
+
+        Base de `update`; também usada pelos processos de análise, que recebem o
+        estado do processo principal e devolvem o novo. `state` não é alterado.
+
+        Returns:
+            Tuple (novo estado ou None sem `open_time`, indicadores do último candle)
+        """
+        if 'open_time' not in df.columns or len(df) < 2:
+            return None, self.compute(df)
+
+        open_times = df['open_time'].to_numpy(dtype=np.int64)
+        highs = df['high'].to_numpy(dtype=float)
+        lows = df['low'].to_numpy(dtype=float)
+        closes = df['close'].to_numpy(dtype=float)
+        closed = len(df) - 1
+        start = None
+
+        if state is not None and state.last_open_time is not None:
+            # Localizar o último candle já incorporado ao estado; se ele não
+            # estiver nos dados (lacuna ou série diferente), reconstruir
+            position = int(np.searchsorted(open_times[:closed], state.last_open_time))
+            if position < closed and open_times[position] == state.last_open_time:
+                start = position + 1
+
+        if start is None:
+            state = self._seed(highs[:closed], lows[:closed], closes[:closed])
+            self.stats['seeds'] += 1
+        else:
+            state = state.copy()
+            for i in range(start, closed):
+                self._step(state, float(highs[i]), float(lows[i]), float(closes[i]))
+                self.stats['candles_committed'] += 1
+            self.stats['incremental_updates'] += 1
+
+        state.last_open_time = int(open_times[closed - 1])
+
+        # Candle em formação: atualização provisória sobre uma cópia do estado
+        provisional = state.copy()
+        self._step(provisional, float(highs[closed]), float(lows[closed]), float(closes[closed]))
+        self.stats['provisional_updates'] += 1
+        return state, self._values(provisional)
+
+    def _key_lock(self, key: Tuple[str, str]) -> threading.Lock:
+        with self.lock:
+            return self.key_locks.setdefault(key, threading.Lock())
+
+    def update(self, symbol: str, interval: str, df: pd.DataFrame) -> Dict[str, float]:
+        """Atualiza o estado de (symbol, interval) com o DataFrame e retorna os indicadores
+
+        O DataFrame precisa da coluna `open_time`; sem ela o cálculo é feito
+        integralmente (equivalente a `compute`). Todos os candles, exceto o
+        último, são considerados fechados.
+        """
+        if 'open_time' not in df.columns or len(df) < 2:
+            return self.compute(df)
+
+        key = (symbol, interval)
+        with self._key_lock(key):
+            state, values = self.advance(self.states.get(key), df)
+            self.states[key] = state
+        return values
+
+    def get_state(self, symbol: str, interval: str) -> Optional[IndicatorState]:
+        """Estado atual de (symbol, interval) (não é alterado depois de guardado)"""
+        return self.states.get((symbol, interval))
+
+    def install(self, symbol: str, interval: str, state: Optional[IndicatorState]) -> bool:
+        """Guarda um estado avançado fora do motor (ex.: pelos processos de análise)
+
+        Estados mais antigos que o atual são ignorados.
+        """
+        if state is None:
+            return False
+        key = (symbol, interval)
+        with self._key_lock(key):
+            current = self.states.get(key)
+            if (current is not None and current.last_open_time is not None
+                    and (state.last_open_time is None or state.last_open_time < current.last_open_time)):
+                return False
+            self.states[key] = state
+            self.stats['installed'] += 1
+        return True
+
+    def reset(self, symbol: Optional[str] = None, interval: Optional[str] = None) -> int:
+        """Descarta estados (todos ou filtrados por símbolo/intervalo)"""
+        with self.lock:
+            keys = [
+                key for key in self.states
+                if (symbol is None or key[0] == symbol) and (interval is None or key[1] == interval)
+            ]
+            for key in keys:
+                del self.states[key]
+                self.key_locks.pop(key, None)
+            return len(keys)
+
+    def retain(self, symbols) -> int:
+        """Descarta os estados de símbolos fora de `symbols` (ex.: pares que saíram da varredura)
+
+        Returns:
+            Número de estados removidos
+        """
+        keep = set(symbols)
+        with self.lock:
+            keys = [key for key in self.states if key[0] not in keep]
+            for key in keys:
+                del self.states[key]
+                self.key_locks.pop(key, None)
+            return len(keys)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Retorna estatísticas do motor"""
+        return {**self.stats, 'tracked_series': len(self.states)}
+
+
+# Instância global para uso em outros módulos
+indicator_engine = IncrementalIndicatorEngine()
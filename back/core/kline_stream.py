@@ -0,0 +1,490 @@
+# -*- coding: utf-8 -*-
+"""
+Kline Stream - Ingestão de candles via WebSocket da Binance Futures
+Mantém um armazenamento de candles em memória atualizado pelos streams
+combinados <symbol>@kline_<interval>, usando REST apenas para o backfill
+inicial e para reparar lacunas após uma desconexão.
+"""
+
+import json
+import threading
+import time
+import traceback
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+import websocket
+
+# Duração de cada intervalo em milissegundos
+INTERVAL_MS: Dict[str, int] = {
+    '1m': 60_000,
+    '3m': 180_000,
+    '5m': 300_000,
+    '15m': 900_000,
+    '30m': 1_800_000,
+    '1h': 3_600_000,
+    '2h': 7_200_000,
+    '4h': 14_400_000,
+    '6h': 21_600_000,
+    '8h': 28_800_000,
+    '12h': 43_200_000,
+    '1d': 86_400_000,
+}
+
+
+class KlineStream:
+    """
+    Assinante thread-safe dos streams de kline da Binance Futures
+
+    Cada (symbol, interval) tem um deque com os últimos candles no mesmo
+    formato retornado por BinanceClient.get_klines. Os streams são divididos
+    em conexões de no máximo `max_streams_per_connection` streams cada.
+    """
+
+    def __init__(self, rest_client: Any, intervals: Optional[List[str]] = None,
+                 ws_url: Optional[str] = None, history_size: int = 200,
+                 max_streams_per_connection: int = 200, reconnect_delay: float = 5.0,
+                 clock: Callable[[], float] = time.time, archive: Optional[Any] = None):
+        """Inicializa o stream de klines
+
+        Args:
+            rest_client: Cliente com get_klines(symbol, interval, limit) para backfill/reparo
+            intervals: Intervalos assinados para cada símbolo (padrão: 1h e 4h)
+            ws_url: URL base do WebSocket (padrão: ws_base_url do cliente REST)
+            history_size: Número máximo de candles mantidos por (symbol, interval)
+            max_streams_per_connection: Limite de streams por conexão WebSocket
+            reconnect_delay: Espera em segundos antes de reconectar
+            clock: Função de tempo (segundos) - injetável para testes
+            archive: CandleArchive opcional - candles fechados são gravados e o
+                     backfill inicial parte do disco (ver core/candle_archive.py)
+        """
+        self.rest_client = rest_client
+        self.intervals = intervals or ['1h', '4h']
+        self.ws_url = (ws_url or getattr(rest_client, 'ws_base_url', None)
+                       or 'wss://fstream.binance.com').rstrip('/')
+        self.history_size = history_size
+        self.max_streams_per_connection = max_streams_per_connection
+        self.reconnect_delay = reconnect_delay
+        self.clock = clock
+        self.archive = archive
+
+        self.symbols: List[str] = []
+        self.candles: Dict[Tuple[str, str], Deque[Dict[str, Any]]] = {}
+        self.last_event: Dict[Tuple[str, str], float] = {}
+        self.lock = threading.RLock()
+
+        self.is_running: bool = False
+        self._generation = 0  # Incrementado a cada troca de símbolos
+        self._connections: List[websocket.WebSocketApp] = []
+        self._threads: List[threading.Thread] = []
+        self._connected: Dict[int, bool] = {}
+        self._expected_connections = 0
+        self._disconnected_at: Dict[int, float] = {}
+        self._repair_lock = threading.Lock()
+
+        self.stats = {
+            'messages_received': 0,
+            'candles_closed': 0,
+            'reconnections': 0,
+            'rest_backfills': 0,
+            'archive_warm_starts': 0,
+            'candles_archived': 0,
+            'gap_repairs': 0,
+            'served_from_memory': 0,
+            'memory_misses': 0
+        }
+
+        print(f"📡 KlineStream inicializado para intervalos: {', '.join(self.intervals)}")
+
+    # ------------------------------------------------------------------
+    # Ciclo de vida
+    # ------------------------------------------------------------------
+
+    def start(self) -> bool:
+        """Inicia as conexões WebSocket para os símbolos configurados"""
+        with self.lock:
+            if self.is_running:
+                return False
+            self.is_running = True
+
+        self._open_connections()
+        self._start_backfill()
+        print(f"✅ KlineStream iniciado com {len(self.symbols)} símbolos")
+        return True
+
+    def stop(self) -> None:
+        """Encerra todas as conexões WebSocket"""
+        with self.lock:
+            self.is_running = False
+            self._generation += 1
+        self._close_connections()
+        print("🛑 KlineStream parado")
+
+    def set_symbols(self, symbols: List[str]) -> None:
+        """Define os símbolos assinados, reconectando se a lista mudou"""
+        new_symbols = sorted(set(s.upper() for s in symbols))
+
+        with self.lock:
+            if new_symbols == self.symbols:
+                return
+            self.symbols = new_symbols
+
+            # Descartar candles de símbolos que saíram da lista
+            for key in [k for k in self.candles if k[0] not in new_symbols]:
+                del self.candles[key]
+                self.last_event.pop(key, None)
+
+            running = self.is_running
+
+        if running:
+            print(f"🔄 KlineStream: atualizando assinaturas para {len(new_symbols)} símbolos")
+            self._close_connections()
+            self._open_connections()
+            self._start_backfill()
+
+    def _build_stream_batches(self) -> List[List[str]]:
+        """Divide os streams em lotes respeitando o limite por conexão"""
+        streams = [
+            f"{symbol.lower()}@kline_{interval}"
+            for symbol in self.symbols
+            for interval in self.intervals
+        ]
+        size = max(1, self.max_streams_per_connection)
+        return [streams[i:i + size] for i in range(0, len(streams), size)]
+
+    def _open_connections(self) -> None:
+        """Abre uma conexão (com reconexão automática) por lote de streams"""
+        with self.lock:
+            generation = self._generation = self._generation + 1
+            batches = self._build_stream_batches()
+            self._expected_connections = len(batches)
+
+        for index, batch in enumerate(batches):
+            thread = threading.Thread(
+                target=self._connection_loop,
+                args=(index, batch, generation),
+                name=f"KlineStream-{index}",
+                daemon=True
+            )
+            self._threads.append(thread)
+            thread.start()
+
+    def _close_connections(self) -> None:
+        """Fecha as conexões ativas e aguarda suas threads"""
+        with self.lock:
+            self._generation += 1
+            connections = list(self._connections)
+            threads = list(self._threads)
+            self._connections = []
+            self._threads = []
+            self._connected.clear()
+
+        for ws_app in connections:
+            try:
+                ws_app.close()
+            except Exception:
+                pass
+
+        for thread in threads:
+            if thread is not threading.current_thread():
+                thread.join(timeout=5)
+
+    def _connection_loop(self, index: int, streams: List[str], generation: int) -> None:
+        """Mantém uma conexão ativa enquanto a geração for a atual"""
+        url = f"{self.ws_url}/stream?streams={'/'.join(streams)}"
+
+        while self._is_current(generation):
+            ws_app = websocket.WebSocketApp(
+                url,
+                on_open=lambda ws: self._on_open(index, generation),
+                on_message=lambda ws, message: self.handle_message(message),
+                on_error=lambda ws, error: print(f"⚠️ KlineStream[{index}] erro: {error}"),
+                on_close=lambda ws, code, msg: self._on_close(index, generation)
+            )
+
+            with self.lock:
+                if not self._is_current(generation):
+                    break
+                self._connections.append(ws_app)
+
+            try:
+                ws_app.run_forever(ping_interval=180, ping_timeout=10)
+            except Exception as e:
+                print(f"❌ KlineStream[{index}] falha na conexão: {e}")
+
+            self._on_close(index, generation)
+            with self.lock:
+                if ws_app in self._connections:
+                    self._connections.remove(ws_app)
+
+            if self._is_current(generation):
+                self.stats['reconnections'] += 1
+                time.sleep(self.reconnect_delay)
+
+    def _is_current(self, generation: int) -> bool:
+        return self.is_running and generation == self._generation
+
+    def _on_open(self, index: int, generation: int) -> None:
+        """Marca conexão ativa e dispara reparo de lacunas em reconexões"""
+        with self.lock:
+            if generation != self._generation:
+                return
+            self._connected[index] = True
+            disconnected_at = self._disconnected_at.pop(index, None)
+
+        if disconnected_at is None:
+            return
+
+        threading.Thread(
+            target=self.repair_gaps,
+            args=(disconnected_at,),
+            name=f"KlineStream-repair-{index}",
+            daemon=True
+        ).start()
+
+    def _on_close(self, index: int, generation: int) -> None:
+        """Registra o instante da desconexão"""
+        with self.lock:
+            if generation != self._generation:
+                return
+            self._connected[index] = False
+            self._disconnected_at.setdefault(index, self.clock())
+
+    def is_connected(self) -> bool:
+        """Indica se todas as conexões esperadas estão abertas"""
+        with self.lock:
+            return (self.is_running and self._expected_connections > 0 and
+                    sum(1 for ok in self._connected.values() if ok) >= self._expected_connections)
+
+    # ------------------------------------------------------------------
+    # Armazenamento de candles
+    # ------------------------------------------------------------------
+
+    def handle_message(self, message: str) -> None:
+        """Processa uma mensagem do stream combinado"""
+        try:
+            payload = json.loads(message)
+            data = payload.get('data', payload)
+            if data.get('e') != 'kline':
+                return
+
+            kline = data['k']
+            candle = {
+                'open_time': int(kline['t']),
+                'open': float(kline['o']),
+                'high': float(kline['h']),
+                'low': float(kline['l']),
+                'close': float(kline['c']),
+                'volume': float(kline['v']),
+                'close_time': int(kline['T'])
+            }
+            key = (kline['s'].upper(), kline['i'])
+
+            with self.lock:
+                self.stats['messages_received'] += 1
+                if kline.get('x'):
+                    self.stats['candles_closed'] += 1
+                self._upsert(key, candle)
+                self.last_event[key] = self.clock()
+
+            if kline.get('x'):
+                self._archive_closed(key[0], key[1], [candle])
+
+        except Exception as e:
+            print(f"❌ KlineStream: erro ao processar mensagem: {e}")
+
+    def _upsert(self, key: Tuple[str, str], candle: Dict[str, Any]) -> None:
+        """Atualiza o candle corrente ou anexa um novo (chamar com lock)"""
+        store = self.candles.get(key)
+        if store is None:
+            store = self.candles[key] = deque(maxlen=self.history_size)
+
+        if not store or candle['open_time'] > store[-1]['open_time']:
+            store.append(candle)
+        elif candle['open_time'] == store[-1]['open_time']:
+            store[-1] = candle
+        else:
+            # Candle antigo fora de ordem: mesclar pelo open_time
+            self._merge(key, [candle])
+
+    def _merge(self, key: Tuple[str, str], klines: List[Dict[str, Any]]) -> None:
+        """Mescla candles (ex.: vindos do REST) mantendo ordem e unicidade (chamar com lock)"""
+        existing = self.candles.get(key, deque())
+        by_open_time = {c['open_time']: c for c in existing}
+        now_ms = self._now_ms()
+
+        # Candles já fechados vindos do REST são definitivos; o candle em
+        # formação do stream é mais recente que o do REST e é preservado
+        for candle in klines:
+            if candle['open_time'] not in by_open_time or candle['close_time'] < now_ms:
+                by_open_time[candle['open_time']] = candle
+
+        ordered = [by_open_time[t] for t in sorted(by_open_time)]
+        self.candles[key] = deque(ordered[-self.history_size:], maxlen=self.history_size)
+
+    def seed(self, symbol: str, interval: str, klines: List[Dict[str, Any]]) -> None:
+        """Alimenta o armazenamento com candles obtidos via REST"""
+        if not klines or interval not in self.intervals:
+            return
+        key = (symbol.upper(), interval)
+        with self.lock:
+            if key[0] not in self.symbols:
+                return
+            self._merge(key, klines)
+
+    def _now_ms(self) -> int:
+        return int(self.clock() * 1000)
+
+    def _archive_closed(self, symbol: str, interval: str, klines: List[Dict[str, Any]]) -> None:
+        """Grava no arquivo local os candles já fechados (append no fim do arquivo)"""
+        if self.archive is None:
+            return
+        try:
+            appended = self.archive.append(symbol, interval, klines, closed_before_ms=self._now_ms())
+            with self.lock:
+                self.stats['candles_archived'] += appended
+        except Exception as e:
+            print(f"❌ KlineStream: erro ao arquivar {symbol} {interval}: {e}")
+
+    def get_klines(self, symbol: str, interval: str, limit: int = 100) -> Optional[List[Dict[str, Any]]]:
+        """Retorna os últimos `limit` candles da memória ou None se indisponíveis
+
+        Só serve dados quando a conexão está ativa, o último candle cobre o
+        instante atual e a janela pedida é contígua (caso contrário há lacuna
+        pendente e o chamador usa REST).
+        """
+        key = (symbol.upper(), interval)
+        interval_ms = INTERVAL_MS.get(interval)
+
+        with self.lock:
+            store = self.candles.get(key)
+            if (not self.is_connected() or interval_ms is None or
+                    store is None or len(store) < limit or
+                    store[-1]['close_time'] < self._now_ms() - 1000 or
+                    store[-1]['open_time'] - store[-limit]['open_time'] != (limit - 1) * interval_ms):
+                # Desconectado, sem histórico suficiente, atrasado ou com lacuna
+                self.stats['memory_misses'] += 1
+                return None
+
+            self.stats['served_from_memory'] += 1
+            return [dict(c) for c in list(store)[-limit:]]
+
+    # ------------------------------------------------------------------
+    # Backfill e reparo de lacunas via REST
+    # ------------------------------------------------------------------
+
+    def _start_backfill(self) -> None:
+        """Executa o backfill inicial em segundo plano"""
+        threading.Thread(target=self.backfill, name="KlineStream-backfill", daemon=True).start()
+
+    def backfill(self) -> int:
+        """Busca o histórico dos pares que ainda não têm candles
+
+        Com arquivo local, o histórico vem do disco e o REST só busca os
+        candles fechados depois do último arquivado (nenhum, se o arquivo
+        estiver em dia: o candle em formação chega pelo stream).
+
+        Returns:
+            Número de (symbol, interval) preenchidos
+        """
+        with self.lock:
+            missing = [
+                (symbol, interval)
+                for symbol in self.symbols
+                for interval in self.intervals
+                if len(self.candles.get((symbol, interval), ())) < self.history_size // 2
+            ]
+
+        filled = 0
+        for symbol, interval in missing:
+            if not self.is_running:
+                break
+            try:
+                limit = self.history_size
+                archived = self.archive.klines(symbol, interval, self.history_size) if self.archive else None
+                if archived:
+                    self.seed(symbol, interval, archived)
+                    self.stats['archive_warm_starts'] += 1
+                    # Candles depois do último arquivado, incluindo o candle em formação
+                    interval_ms = INTERVAL_MS[interval]
+                    missed = self._now_ms() // interval_ms - archived[-1]['open_time'] // interval_ms
+                    if missed <= 1:
+                        filled += 1
+                        continue
+                    limit = int(min(missed + 1, self.history_size))
+
+                klines = self.rest_client.get_klines(symbol, interval, limit)
+                if klines:
+                    self.seed(symbol, interval, klines)
+                    self._archive_closed(symbol, interval, klines)
+                    filled += 1
+                    self.stats['rest_backfills'] += 1
+            except Exception as e:
+                print(f"❌ KlineStream: erro no backfill de {symbol} {interval}: {e}")
+
+        if missing:
+            print(f"📥 KlineStream: backfill concluído ({filled}/{len(missing)}, "
+                  f"{self.stats['archive_warm_starts']} do arquivo local)")
+        return filled
+
+    def repair_gaps(self, disconnected_at: float) -> int:
+        """Repara candles fechados durante uma desconexão
+
+        Como cada mensagem de kline traz o OHLCV acumulado do candle corrente,
+        só há perda quando um candle fechou enquanto a conexão estava caída.
+
+        Returns:
+            Número de (symbol, interval) reparados
+        """
+        if not self._repair_lock.acquire(blocking=False):
+            return 0  # Outro reparo em andamento já cobre todas as séries
+
+        now_ms = self._now_ms()
+        disconnected_ms = int(disconnected_at * 1000)
+        repaired = 0
+
+        try:
+            with self.lock:
+                keys = [k for k in self.candles if k[0] in self.symbols]
+
+            for key in keys:
+                symbol, interval = key
+                interval_ms = INTERVAL_MS.get(interval)
+                if interval_ms is None:
+                    continue
+
+                # Quantos candles fecharam enquanto a conexão estava caída
+                missed = now_ms // interval_ms - disconnected_ms // interval_ms
+                if missed <= 0:
+                    continue
+
+                limit = int(min(missed + 2, self.history_size))
+                klines = self.rest_client.get_klines(symbol, interval, limit)
+                if klines:
+                    self.seed(symbol, interval, klines)
+                    self._archive_closed(symbol, interval, klines)
+                    repaired += 1
+                    self.stats['gap_repairs'] += 1
+
+            if repaired:
+                gap_seconds = max(0.0, self.clock() - disconnected_at)
+                print(f"🩹 KlineStream: {repaired} séries reparadas após {gap_seconds:.0f}s desconectado")
+
+        except Exception as e:
+            print(f"❌ KlineStream: erro ao reparar lacunas: {e}")
+            traceback.print_exc()
+        finally:
+            self._repair_lock.release()
+
+        return repaired
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Retorna estatísticas do stream"""
+        with self.lock:
+            return {
+                **self.stats,
+                'symbols': len(self.symbols),
+                'series': len(self.candles),
+                'connections': self._expected_connections,
+                'connected': self.is_connected()
+            }
@@ -4,33 +4,154 @@ Klines Cache - Sistema de Cache para Dados Históricos
 Reduz chamadas à API Binance cachando DataFrames de klines
 """
 
+import numpy as np
 import pandas as pd
 import time
 import threading
-from typing import Dict, Optional, Tuple
+from typing import Dict, List, Optional, Tuple
 from datetime import datetime
 
+class CandleRingBuffer:
+    """
+    Buffer circular colunar de candles (open_time, open, high, low, close, volume)
+    
+    Cada candle é gravado em duas posições (i e i + capacity), de modo que
+    qualquer janela de até `capacity` candles é contígua na memória e pode ser
+    servida como view, sem cópia.
+    """
+    
+    COLUMNS = ('open_time', 'open', 'high', 'low', 'close', 'volume')
+    
+    def __init__(self, capacity: int = 500):
+        """Inicializa o buffer
+        
+        Args:
+            capacity: Número máximo de candles mantidos
+        """
+        self.capacity = capacity
+        # open_time em ms cabe exatamente em float64 (< 2^53)
+        self.data = np.full((len(self.COLUMNS), 2 * capacity), np.nan, dtype=np.float64)
+        self.head = 0   # Próxima posição de escrita (0..capacity-1)
+        self.count = 0  # Candles válidos no buffer
+    
+    def __len__(self) -> int:
+        return self.count
+    
+    @property
+    def nbytes(self) -> int:
+        """Memória ocupada pelos arrays"""
+        return self.data.nbytes
+    
+    def last_open_time(self) -> Optional[int]:
+        """open_time do candle mais recente"""
+        if self.count == 0:
+            return None
+        value = self.data[0, (self.head - 1) % self.capacity]
+        return None if np.isnan(value) else int(value)
+    
+    def append(self, rows: np.ndarray) -> None:
+        """Anexa candles no lugar (rows: shape (n, 6) na ordem de COLUMNS)"""
+        if len(rows) == 0:
+            return
+        if len(rows) > self.capacity:
+            rows = rows[-self.capacity:]
+        
+        positions = (self.head + np.arange(len(rows))) % self.capacity
+        self.data[:, positions] = rows.T
+        self.data[:, positions + self.capacity] = rows.T
+        
+        self.head = (self.head + len(rows)) % self.capacity
+        self.count = min(self.count + len(rows), self.capacity)
+    
+    def truncate(self, keep: int) -> None:
+        """Descarta os candles mais recentes, mantendo os `keep` mais antigos"""
+        keep = max(0, min(keep, self.count))
+        self.head = (self.head - (self.count - keep)) % self.capacity
+        self.count = keep
+    
+    def clear(self) -> None:
+        """Esvazia o buffer sem liberar os arrays"""
+        self.head = 0
+        self.count = 0
+    
+    def view(self, limit: Optional[int] = None) -> np.ndarray:
+        """Retorna view somente leitura dos últimos `limit` candles (shape (6, limit))
+        
+        A view compartilha memória com o buffer: o candle em formação pode ser
+        atualizado no lugar e janelas antigas são sobrescritas após
+        `capacity - limit` novos candles.
+        """
+        limit = self.count if limit is None else max(0, min(limit, self.count))
+        end = self.head + self.capacity
+        window = self.data[:, end - limit:end]
+        window.flags.writeable = False
+        return window
+    
+    def merge(self, open_times: np.ndarray, rows: np.ndarray) -> None:
+        """Incorpora candles ordenados por open_time
+        
+        Candles já presentes são sobrescritos a partir do primeiro open_time
+        recebido e os novos são anexados. Se os dados não se encaixam no buffer
+        (lacuna ou série anterior), o buffer é reiniciado com eles.
+        """
+        if len(rows) == 0:
+            return
+        
+        if self.count > 0:
+            stored_times = self.view()[0]
+            position = int(np.searchsorted(stored_times, open_times[0]))
+            last_time = stored_times[-1]
+            interval_ms = stored_times[-1] - stored_times[-2] if self.count >= 2 else None
+            
+            if position < self.count and stored_times[position] == open_times[0]:
+                # Sobreposição: reescrever a partir do primeiro candle recebido
+                self.truncate(position)
+                self.append(rows)
+                return
+            if position == self.count and interval_ms and open_times[0] - last_time == interval_ms:
+                # Continuação imediata do último candle
+                self.append(rows)
+                return
+        
+        self.clear()
+        self.append(rows)
+
+
 class KlinesCache:
     """
     Cache thread-safe para dados de klines (candlesticks)
     Reduz significativamente as chamadas à API Binance
+    
+    Mantém um CandleRingBuffer por (symbol, interval); qualquer `limit` é
+    servido a partir do mesmo buffer como cópia da janela (independente de
+    atualizações posteriores do buffer).
     """
     
-    def __init__(self, default_ttl: int = 300):
+    def __init__(self, default_ttl: int = 300, capacity: int = 500):
         """Inicializa o cache de klines
         
         Args:
             default_ttl: Tempo de vida padrão em segundos (5 minutos)
+            capacity: Candles mantidos por (symbol, interval)
         """
         self.default_ttl = default_ttl
+        self.capacity = capacity
         self.cache: Dict[str, Dict] = {}
         self.lock = threading.RLock()  # Lock para thread safety
         
         print(f"🗄️ KlinesCache inicializado com TTL padrão: {default_ttl}s")
     
-    def _generate_key(self, symbol: str, interval: str, limit: int) -> str:
+    def _generate_key(self, symbol: str, interval: str) -> str:
         """Gera chave única para o cache"""
-        return f"{symbol}_{interval}_{limit}"
+        return f"{symbol}_{interval}"
+    
+    @staticmethod
+    def _to_dataframe(window: np.ndarray) -> pd.DataFrame:
+        """Copia uma janela do buffer para um DataFrame próprio do chamador
+        
+        A view seria sobrescrita pelo próximo set()/merge() do mesmo par.
+        """
+        return pd.DataFrame(window.T, columns=list(CandleRingBuffer.COLUMNS), copy=True)
     
     def get(self, symbol: str, interval: str, limit: int = 100) -> Optional[pd.DataFrame]:
         """Obtém dados do cache se válidos
@@ -41,9 +162,9 @@ class KlinesCache:
             limit: Número de períodos
             
         Returns:
-            DataFrame se encontrado e válido, None caso contrário
+            DataFrame (cópia) se encontrado e válido, None caso contrário
         """
-        key = self._generate_key(symbol, interval, limit)
+        key = self._generate_key(symbol, interval)
         
         with self.lock:
             if key not in self.cache:
@@ -54,12 +175,15 @@ class KlinesCache:
             
             # Verificar se ainda é válido
             if current_time - cache_entry['timestamp'] > cache_entry['ttl']:
-                # Cache expirado, remover
-                del self.cache[key]
                 return None
             
-            # Cache válido, retornar cópia do DataFrame
-            return cache_entry['data'].copy()
+            buffer = cache_entry['buffer']
+            # Histórico insuficiente, a menos que a API já tenha retornado tudo o que existe
+            if len(buffer) < limit and not cache_entry['complete']:
+                return None
+            
+            # Cache válido, retornar os últimos `limit` candles
+            return self._to_dataframe(buffer.view(limit))
     
     def set(self, symbol: str, interval: str, data: pd.DataFrame, 
             limit: int = 100, ttl: Optional[int] = None) -> None:
@@ -68,25 +192,46 @@ class KlinesCache:
         Args:
             symbol: Símbolo do par
             interval: Intervalo
-            data: DataFrame com dados de klines
-            limit: Número de períodos
+            data: DataFrame com dados de klines (com open_time para anexar no lugar)
+            limit: Número de períodos solicitados
             ttl: Tempo de vida customizado (usa default se None)
         """
         if data is None or data.empty:
             return
         
-        key = self._generate_key(symbol, interval, limit)
+        key = self._generate_key(symbol, interval)
         cache_ttl = ttl or self.default_ttl
         
+        columns = [col for col in CandleRingBuffer.COLUMNS if col in data.columns]
+        if len(columns) < len(CandleRingBuffer.COLUMNS) - 1 or 'close' not in columns:
+            return
+        
+        rows = np.empty((len(data), len(CandleRingBuffer.COLUMNS)), dtype=np.float64)
+        for index, col in enumerate(CandleRingBuffer.COLUMNS):
+            rows[:, index] = data[col].to_numpy(dtype=np.float64) if col in data.columns else np.nan
+        
         with self.lock:
-            self.cache[key] = {
-                'data': data.copy(),
-                'timestamp': time.time(),
-                'ttl': cache_ttl,
-                'symbol': symbol,
-                'interval': interval,
-                'limit': limit
-            }
+            cache_entry = self.cache.get(key)
+            if cache_entry is None:
+                cache_entry = {
+                    'buffer': CandleRingBuffer(self.capacity),
+                    'symbol': symbol,
+                    'interval': interval,
+                    'complete': False
+                }
+                self.cache[key] = cache_entry
+            
+            buffer = cache_entry['buffer']
+            if 'open_time' in data.columns:
+                buffer.merge(rows[:, 0], rows)
+            else:
+                # Sem open_time não há como alinhar: substituir o conteúdo
+                buffer.clear()
+                buffer.append(rows)
+            
+            cache_entry['timestamp'] = time.time()
+            cache_entry['ttl'] = cache_ttl
+            cache_entry['complete'] = cache_entry['complete'] or len(data) < limit
     
     def invalidate(self, symbol: Optional[str] = None, interval: Optional[str] = None) -> int:
         """Invalida entradas do cache
@@ -143,6 +288,11 @@ class KlinesCache:
         
         return removed_count
     
+    def get_memory_usage(self) -> int:
+        """Retorna a memória ocupada pelos buffers em bytes"""
+        with self.lock:
+            return sum(entry['buffer'].nbytes for entry in self.cache.values())
+    
     def get_stats(self) -> Dict[str, any]:
         """Retorna estatísticas do cache
         
@@ -156,6 +306,7 @@ class KlinesCache:
             
             intervals = {}
             symbols = set()
+            total_candles = 0
             
             for entry in self.cache.values():
                 # Contar expirados
@@ -168,6 +319,7 @@ class KlinesCache:
                 
                 # Contar símbolos únicos
                 symbols.add(entry['symbol'])
+                total_candles += len(entry['buffer'])
             
             return {
                 'total_entries': total_entries,
@@ -175,6 +327,8 @@ class KlinesCache:
                 'valid_entries': total_entries - expired_entries,
                 'unique_symbols': len(symbols),
                 'intervals': intervals,
+                'total_candles': total_candles,
+                'memory_bytes': self.get_memory_usage(),
                 'cache_efficiency': (
                     (total_entries - expired_entries) / total_entries * 100 
                     if total_entries > 0 else 0
@@ -203,7 +357,7 @@ class KlinesCache:
         Returns:
             Dict com informações de cache
         """
-        key = self._generate_key(symbol, interval, limit)
+        key = self._generate_key(symbol, interval)
         
         with self.lock:
             if key not in self.cache:
@@ -226,6 +380,15 @@ class KlinesCache:
                     'ttl': cache_entry['ttl']
                 }
             
+            if len(cache_entry['buffer']) < limit and not cache_entry['complete']:
+                return {
+                    'status': 'MISS',
+                    'reason': 'INSUFFICIENT_HISTORY',
+                    'key': key,
+                    'available': len(cache_entry['buffer']),
+                    'limit': limit
+                }
+            
             return {
                 'status': 'HIT',
                 'key': key,
@@ -253,17 +416,24 @@ class CacheManager:
             'cache_misses': 0,
             'api_calls_saved': 0
         }
+        # Acertos/falhas por cache (1h, 4h, 1d) para a razão de acerto em /metrics
+        self.cache_stats = {name: {'hits': 0, 'misses': 0} for name in ('1h', '4h', '1d')}
         
         print("🗄️ CacheManager inicializado com múltiplos caches")
     
-    def get_cache_for_interval(self, interval: str) -> KlinesCache:
-        """Retorna o cache apropriado para o intervalo"""
+    @staticmethod
+    def _cache_name(interval: str) -> str:
+        """Nome do cache que atende o intervalo (1h, 4h ou 1d)"""
         if interval in ['1h', '2h', '3h']:
-            return self.klines_1h
+            return '1h'
         elif interval in ['4h', '6h', '8h', '12h']:
-            return self.klines_4h
+            return '4h'
         else:
-            return self.klines_1d
+            return '1d'
+    
+    def get_cache_for_interval(self, interval: str) -> KlinesCache:
+        """Retorna o cache apropriado para o intervalo"""
+        return getattr(self, f"klines_{self._cache_name(interval)}")
     
     def get_klines(self, symbol: str, interval: str, limit: int = 100) -> Tuple[Optional[pd.DataFrame], bool]:
         """Obtém klines do cache apropriado
@@ -273,15 +443,17 @@ class CacheManager:
         """
         self.stats['total_requests'] += 1
         
-        cache = self.get_cache_for_interval(interval)
-        data = cache.get(symbol, interval, limit)
+        name = self._cache_name(interval)
+        data = getattr(self, f"klines_{name}").get(symbol, interval, limit)
         
         if data is not None:
             self.stats['cache_hits'] += 1
             self.stats['api_calls_saved'] += 1
+            self.cache_stats[name]['hits'] += 1
             return data, True
         else:
             self.stats['cache_misses'] += 1
+            self.cache_stats[name]['misses'] += 1
             return None, False
     
     def set_klines(self, symbol: str, interval: str, data: pd.DataFrame, limit: int = 100) -> None:
@@ -297,10 +469,18 @@ class CacheManager:
             if total_requests > 0 else 0
         )
         
+        memory_bytes = (
+            self.klines_1h.get_memory_usage() +
+            self.klines_4h.get_memory_usage() +
+            self.klines_1d.get_memory_usage()
+        )
+        
         return {
             **self.stats,
             'cache_hit_rate': cache_hit_rate,
             'cache_efficiency': cache_hit_rate,
+            'memory_bytes': memory_bytes,
+            'memory_mb': round(memory_bytes / (1024 * 1024), 3),
             'individual_caches': {
                 '1h': self.klines_1h.get_stats(),
                 '4h': self.klines_4h.get_stats(),
@@ -308,6 +488,26 @@ class CacheManager:
             }
         }
     
+    def collect_metrics(self) -> List[Tuple[str, str, str, List]]:
+        """Famílias para o registro de métricas (core/metrics.py), calculadas na leitura"""
+        requests, ratios, entries, memory = [], [], [], []
+        for name, counts in self.cache_stats.items():
+            hits, misses = counts['hits'], counts['misses']
+            requests.append(({'cache': name, 'result': 'hit'}, hits))
+            requests.append(({'cache': name, 'result': 'miss'}, misses))
+            ratios.append(({'cache': name}, hits / (hits + misses) if hits + misses else 0.0))
+            cache = getattr(self, f"klines_{name}")
+            entries.append(({'cache': name}, len(cache.cache)))
+            memory.append(({'cache': name}, cache.get_memory_usage()))
+        total = self.stats['total_requests']
+        ratios.append(({'cache': 'all'}, self.stats['cache_hits'] / total if total else 0.0))
+        return [
+            ('klines_cache_requests_total', 'counter', 'Consultas ao cache de klines por resultado', requests),
+            ('klines_cache_hit_ratio', 'gauge', 'Razão de acertos do cache de klines (0-1)', ratios),
+            ('klines_cache_entries', 'gauge', 'Séries (symbol, interval) no cache', entries),
+            ('klines_cache_memory_bytes', 'gauge', 'Memória dos buffers de candles', memory),
+        ]
+    
     def cleanup_all_expired(self) -> int:
         """Limpa entradas expiradas de todos os caches"""
         total_removed = 0
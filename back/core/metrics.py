@@ -0,0 +1,339 @@
+# -*- coding: utf-8 -*-
+"""
+Metrics - Instrumentação de baixo custo no formato de texto do Prometheus
+Contadores, gauges e histogramas com buckets fixos (uma busca binária e um
+incremento por observação, sob um lock por métrica) e coletores chamados só
+no momento da leitura para expor estatísticas já mantidas pelos módulos
+(caches, pools, filas). Exportado em /metrics (api_routes/metrics.py).
+"""
+
+import functools
+import os
+import threading
+import time
+from bisect import bisect_left
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'true').lower() == 'true'
+METRIC_PREFIX = 'crypten_'
+
+# Segundos: de 1ms (leituras de cache) a 5min (varreduras e ciclos completos)
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0,
+                   60.0, 120.0, 300.0)
+
+# Amostra de um coletor: (labels, valor)
+Sample = Tuple[Dict[str, str], float]
+# Família de um coletor: (nome, tipo, ajuda, amostras)
+CollectedFamily = Tuple[str, str, str, List[Sample]]
+
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    if value != value:
+        return 'NaN'
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(labels: Dict[str, Any]) -> str:
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + '}'
+
+
+class _Metric:
+    """Base das métricas: valores por combinação de labels"""
+
+    kind = ''
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.lock = threading.Lock()
+        self.values: Dict[Tuple[str, ...], Any] = {}
+
+    def _key(self, labels: Dict[str, Any]) -> Tuple[str, ...]:
+        if len(labels) != len(self.labelnames):
+            raise ValueError(f"{self.name}: labels esperados {self.labelnames}, recebidos {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _labels(self, key: Tuple[str, ...]) -> Dict[str, str]:
+        return dict(zip(self.labelnames, key))
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        with self.lock:
+            items = sorted(self.values.items())
+            lines.extend(self._render_items(items))
+        return lines
+
+    def _render_items(self, items: List[Tuple[Tuple[str, ...], Any]]) -> List[str]:
+        return [f"{self.name}{_format_labels(self._labels(key))} {_format_value(value)}" for key, value in items]
+
+
+class Counter(_Metric):
+    """Valor que só cresce (requisições, erros)"""
+
+    kind = 'counter'
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        if not METRICS_ENABLED:
+            return
+        key = self._key(labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0.0) + amount
+
+    def get(self, **labels: Any) -> float:
+        with self.lock:
+            return self.values.get(self._key(labels), 0.0)
+
+
+class Gauge(_Metric):
+    """Valor instantâneo (pendentes, tamanho de fila)"""
+
+    kind = 'gauge'
+
+    def set(self, value: float, **labels: Any) -> None:
+        if not METRICS_ENABLED:
+            return
+        key = self._key(labels)
+        with self.lock:
+            self.values[key] = float(value)
+
+    def get(self, **labels: Any) -> float:
+        with self.lock:
+            return self.values.get(self._key(labels), 0.0)
+
+
+class _Timer:
+    """Context manager que observa a duração do bloco em um histograma"""
+
+    __slots__ = ('histogram', 'labels', 'start')
+
+    def __init__(self, histogram: 'Histogram', labels: Dict[str, Any]):
+        self.histogram = histogram
+        self.labels = labels
+        self.start = 0.0
+
+    def __enter__(self) -> '_Timer':
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.histogram.observe(time.perf_counter() - self.start, **self.labels)
+
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self) -> '_NullTimer':
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        return None
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class Histogram(_Metric):
+    """Distribuição de durações em buckets fixos (contagens por bucket, soma e total)"""
+
+    kind = 'histogram'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels: Any) -> None:
+        if not METRICS_ENABLED:
+            return
+        key = self._key(labels)
+        index = bisect_left(self.buckets, value)  # Primeiro bucket com limite >= valor
+        with self.lock:
+            state = self.values.get(key)
+            if state is None:
+                state = self.values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+
+    def time(self, **labels: Any) -> Any:
+        """with histogram.time(stage='x'): ... observa a duração do bloco"""
+        return _Timer(self, labels) if METRICS_ENABLED else _NULL_TIMER
+
+    def snapshot(self, **labels: Any) -> Dict[str, Any]:
+        """{'count', 'sum', 'buckets': {limite: contagem acumulada}} de uma combinação de labels"""
+        with self.lock:
+            state = self.values.get(self._key(labels))
+            if state is None:
+                return {'count': 0, 'sum': 0.0, 'buckets': {}}
+            counts, total, count = list(state[0]), state[1], state[2]
+        cumulative, buckets = 0, {}
+        for bound, bucket_count in zip(self.buckets + (float('inf'),), counts):
+            cumulative += bucket_count
+            buckets[bound] = cumulative
+        return {'count': count, 'sum': total, 'buckets': buckets}
+
+    def _render_items(self, items: List[Tuple[Tuple[str, ...], Any]]) -> List[str]:
+        lines = []
+        for key, (counts, total, count) in items:
+            labels = self._labels(key)
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += bucket_count
+                lines.append(f"{self.name}_bucket{_format_labels({**labels, 'le': _format_value(bound)})} "
+                             f"{cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(labels)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(labels)} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    """
+    Registro das métricas do processo
+
+    Métricas são criadas uma vez (get-or-create pelo nome); coletores são
+    funções chamadas em render() que devolvem famílias calculadas na hora,
+    para expor contadores que os módulos já mantêm sem custo no caminho quente.
+    """
+
+    def __init__(self, prefix: str = METRIC_PREFIX):
+        self.prefix = prefix
+        self.lock = threading.Lock()
+        self.metrics: Dict[str, _Metric] = {}
+        self.collectors: Dict[str, Callable[[], Iterable[CollectedFamily]]] = {}
+
+    def _get_or_create(self, cls: type, name: str, documentation: str, labelnames: Sequence[str],
+                       **kwargs: Any) -> Any:
+        full_name = self.prefix + name
+        with self.lock:
+            metric = self.metrics.get(full_name)
+            if metric is None:
+                metric = self.metrics[full_name] = cls(full_name, documentation, labelnames, **kwargs)
+            elif not isinstance(metric, cls) or metric.labelnames != tuple(labelnames):
+                raise ValueError(f"Métrica {full_name} já registrada com outro tipo ou labels")
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._get_or_create(Counter, name, documentation, labelnames)
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._get_or_create(Gauge, name, documentation, labelnames)
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._get_or_create(Histogram, name, documentation, labelnames, buckets=buckets)
+
+    def register_collector(self, name: str, collector: Callable[[], Iterable[CollectedFamily]]) -> None:
+        """Registra (ou substitui) um coletor chamado a cada leitura de /metrics"""
+        with self.lock:
+            self.collectors[name] = collector
+
+    def unregister_collector(self, name: str) -> None:
+        with self.lock:
+            self.collectors.pop(name, None)
+
+    def render(self) -> str:
+        """Todas as métricas no formato de texto do Prometheus (versão 0.0.4)"""
+        with self.lock:
+            metrics = sorted(self.metrics.values(), key=lambda metric: metric.name)
+            collectors = list(self.collectors.items())
+
+        lines: List[str] = []
+        for metric in metrics:
+            lines.extend(metric.render())
+
+        families: Dict[str, Tuple[str, str, List[Sample]]] = {}
+        for collector_name, collector in collectors:
+            try:
+                for name, kind, documentation, samples in collector():
+                    family = families.setdefault(self.prefix + name, (kind, documentation, []))
+                    family[2].extend(samples)
+            except Exception as e:
+                print(f"⚠️ Coletor de métricas '{collector_name}' falhou: {e}")
+
+        for name in sorted(families):
+            kind, documentation, samples = families[name]
+            lines.append(f"# HELP {name} {documentation}")
+            lines.append(f"# TYPE {name} {kind}")
+            lines.extend(f"{name}{_format_labels(labels)} {_format_value(value)}" for labels, value in samples)
+        return '\n'.join(lines) + '\n'
+
+
+def stats_collector(name: str, kind: str, documentation: str, get_stats: Callable[[], Dict[str, Any]],
+                    fields: Dict[str, str], labels: Optional[Dict[str, str]] = None) -> Callable[[], List[CollectedFamily]]:
+    """Coletor que expõe campos numéricos de um get_stats() existente
+
+    Args:
+        name: Prefixo das métricas (ex.: 'persistence_queue')
+        kind: 'gauge' ou 'counter' para todos os campos
+        fields: campo de get_stats → descrição
+        labels: Labels fixos das amostras
+    """
+    def collect() -> List[CollectedFamily]:
+        stats = get_stats()
+        return [
+            (f"{name}_{field}", kind, documentation_field, [(dict(labels or {}), float(stats[field]))])
+            for field, documentation_field in fields.items()
+            if isinstance(stats.get(field), (int, float))
+        ]
+    collect.__doc__ = documentation
+    return collect
+
+
+# Instância global para uso em outros módulos
+metrics = MetricsRegistry()
+
+# Varredura de mercado
+SCAN_STAGE_SECONDS = metrics.histogram(
+    'scan_stage_seconds', 'Duração de cada estágio de uma varredura (pair_selection, kline_fetch, '
+    'indicators, scoring, total)', ('stage',))
+SCAN_STEP_SECONDS = metrics.histogram(
+    'scan_symbol_step_seconds', 'Duração por símbolo/candidato (kline_fetch, indicators, scoring, '
+    'btc_correlation, add_pending_signal)', ('step',))
+SCAN_PAIRS = metrics.counter('scan_pairs_total', 'Pares processados pelas varreduras', ('result',))
+
+# Binance
+BINANCE_REQUEST_SECONDS = metrics.histogram(
+    'binance_request_seconds', 'Latência HTTP das requisições à Binance por endpoint', ('endpoint', 'client'))
+BINANCE_REQUEST_ERRORS = metrics.counter(
+    'binance_request_errors_total', 'Tentativas com erro por endpoint e motivo', ('endpoint', 'reason'))
+BINANCE_WEIGHT_WAIT_SECONDS = metrics.histogram(
+    'binance_weight_wait_seconds', 'Espera pelo orçamento de peso antes de cada requisição', ('client',))
+
+# Confirmação BTC e monitoramento
+CONFIRMATION_CYCLE_SECONDS = metrics.histogram(
+    'confirmation_cycle_seconds', 'Duração de um ciclo do loop de confirmação BTC')
+CONFIRMATION_PENDING = metrics.gauge('confirmation_pending_signals', 'Sinais aguardando confirmação BTC')
+MONITORING_CYCLE_SECONDS = metrics.histogram(
+    'monitoring_cycle_seconds', 'Duração de um ciclo do loop de monitoramento de sinais')
+MONITORING_LAG_SECONDS = metrics.histogram(
+    'monitoring_loop_lag_seconds', 'Atraso do início de cada ciclo de monitoramento em relação ao agendado',
+    buckets=(0.01, 0.1, 0.5, 1.0, 5.0, 15.0, 30.0, 60.0, 120.0, 300.0, 600.0))
+
+# Banco de dados
+DB_WRITE_SECONDS = metrics.histogram('db_write_seconds', 'Latência das gravações no banco por operação',
+                                     ('operation',))
+
+
+def timed(histogram: Histogram, **labels: Any) -> Callable:
+    """Decorator: observa a duração de cada chamada da função"""
+    def decorator(function: Callable) -> Callable:
+        @functools.wraps(function)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            if not METRICS_ENABLED:
+                return function(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                histogram.observe(time.perf_counter() - start, **labels)
+        return wrapper
+    return decorator
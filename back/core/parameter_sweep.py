@@ -0,0 +1,309 @@
+# -*- coding: utf-8 -*-
+"""
+Parameter Sweep - Varredura de parâmetros do pipeline sobre o replay histórico
+Os candles e a pontuação de cada hora fechada (BacktestEngine.score_symbol)
+são calculados uma única vez e gravados em arquivos .npy; os processos da
+varredura abrem esses arquivos com mmap (as páginas são compartilhadas pelo
+sistema operacional, sem cópia por processo) e executam um replay completo
+por combinação de limites de qualidade, alvo e confirmação.
+"""
+
+import argparse
+import itertools
+import json
+import multiprocessing
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from .backtest_engine import CANDLE_FIELDS, BacktestEngine, CandleSeries, _parse_date, load_source
+from .fast_json import dumps_bytes
+
+# Parâmetro → configuração do engine onde é aplicado
+PARAMETER_TARGETS = {
+    'quality_score_minimum': 'analysis',    # TechnicalAnalysis.SCORING_CONFIG
+    'target_percentage_min': 'analysis',
+    'min_breakout_percentage': 'confirmation',  # BTCSignalManager.DEFAULT_CONFIG
+    'min_volume_increase': 'confirmation',
+    'btc_alignment_threshold': 'confirmation',
+    'check_interval': 'confirmation'
+}
+
+DEFAULT_GRID = {
+    'quality_score_minimum': [60.0, 65.0, 70.0, 75.0],
+    'target_percentage_min': [4.0, 6.0, 8.0],
+    'min_breakout_percentage': [0.3, 0.5, 0.8],
+    'min_volume_increase': [1.1, 1.2, 1.5]
+}
+
+# Métricas do relatório em que o menor valor é o melhor
+LOWER_IS_BETTER = ('max_drawdown_usd', 'average_days_to_target')
+
+MANIFEST_FILE = 'manifest.json'
+
+# Espaço de busca: lista de valores ou intervalo (mínimo, máximo) para a busca aleatória
+ParameterSpace = Dict[str, Union[List[Any], Tuple[float, float]]]
+
+_worker_dataset: Optional[Tuple[Dict[str, Dict[str, CandleSeries]], Dict[str, np.ndarray], Dict[str, Any]]] = None
+_worker_btc_cache: Dict[Tuple[str, int], Dict[str, Any]] = {}  # Análise BTC independe dos parâmetros
+
+
+# ----------------------------------------------------------------------
+# Combinações
+# ----------------------------------------------------------------------
+
+def grid_combinations(grid: Dict[str, Sequence[Any]]) -> List[Dict[str, Any]]:
+    """Produto cartesiano dos valores de cada parâmetro"""
+    _validate_parameters(grid)
+    names = list(grid)
+    return [dict(zip(names, values)) for values in itertools.product(*(grid[name] for name in names))]
+
+
+def random_combinations(space: ParameterSpace, count: int, seed: Optional[int] = None) -> List[Dict[str, Any]]:
+    """Sorteia `count` combinações (listas: um dos valores; tuplas: uniforme no intervalo)"""
+    _validate_parameters(space)
+    rng = random.Random(seed)
+    combinations = []
+    for _ in range(count):
+        combination = {}
+        for name, values in space.items():
+            if isinstance(values, tuple):
+                combination[name] = round(rng.uniform(*values), 4)
+            else:
+                combination[name] = rng.choice(list(values))
+        combinations.append(combination)
+    return combinations
+
+
+def _validate_parameters(space: Dict[str, Any]) -> None:
+    unknown = sorted(set(space) - set(PARAMETER_TARGETS))
+    if unknown:
+        raise ValueError(f"Parâmetros desconhecidos: {', '.join(unknown)}")
+
+
+def split_parameters(params: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """Separa uma combinação nas configurações analysis/confirmation do BacktestEngine"""
+    configs: Dict[str, Dict[str, Any]] = {'analysis': {}, 'confirmation': {}}
+    for name, value in params.items():
+        configs[PARAMETER_TARGETS[name]][name] = value
+    return configs
+
+
+# ----------------------------------------------------------------------
+# Dataset compartilhado (.npy + mmap)
+# ----------------------------------------------------------------------
+
+def prepare_dataset(candles: Dict[str, Dict[str, CandleSeries]], directory: str, window: int = 100,
+                    btc_symbol: str = 'BTCUSDT') -> Dict[str, Any]:
+    """Grava candles e pontuações em `directory` para os processos da varredura
+
+    Arquivos:
+        <SYMBOL>_<interval>.npy: matriz (CANDLE_FIELDS × candles), uma coluna por linha
+        <SYMBOL>_scored.npy: BacktestEngine.score_symbol (horas × SCORE_FIELDS)
+        manifest.json: símbolos, intervalos e parâmetros do dataset
+    """
+    os.makedirs(directory, exist_ok=True)
+    started = time.time()
+    engine = BacktestEngine(candles, window=window, btc_symbol=btc_symbol)
+
+    intervals: Dict[str, List[str]] = {}
+    for symbol in sorted(candles):
+        for interval, series in candles[symbol].items():
+            matrix = np.stack([np.asarray(series[field], dtype=np.float64) for field in CANDLE_FIELDS])
+            np.save(os.path.join(directory, f"{symbol}_{interval}.npy"), matrix)
+            intervals.setdefault(symbol, []).append(interval)
+        with engine._output():
+            np.save(os.path.join(directory, f"{symbol}_scored.npy"), engine.score_symbol(symbol))
+
+    manifest = {
+        'symbols': intervals,
+        'window': window,
+        'btc_symbol': btc_symbol,
+        'prepared_seconds': round(time.time() - started, 3)
+    }
+    with open(os.path.join(directory, MANIFEST_FILE), 'w') as file:
+        json.dump(manifest, file, indent=2)
+    return manifest
+
+
+def load_dataset(directory: str) -> Tuple[Dict[str, Dict[str, CandleSeries]], Dict[str, np.ndarray], Dict[str, Any]]:
+    """Abre o dataset com mmap (somente leitura)
+
+    Returns:
+        Tuple (candles no formato de load_candles, pontuações por símbolo, manifest)
+    """
+    with open(os.path.join(directory, MANIFEST_FILE)) as file:
+        manifest = json.load(file)
+
+    candles: Dict[str, Dict[str, CandleSeries]] = {}
+    scored: Dict[str, np.ndarray] = {}
+    for symbol, intervals in manifest['symbols'].items():
+        for interval in intervals:
+            matrix = np.load(os.path.join(directory, f"{symbol}_{interval}.npy"), mmap_mode='r')
+            series = {field: matrix[index] for index, field in enumerate(CANDLE_FIELDS)}
+            series['open_time'] = series['open_time'].astype(np.int64)
+            candles.setdefault(symbol, {})[interval] = series
+        scored[symbol] = np.load(os.path.join(directory, f"{symbol}_scored.npy"), mmap_mode='r')
+    return candles, scored, manifest
+
+
+def _init_worker(directory: str) -> None:
+    """Abre o dataset uma vez por processo"""
+    global _worker_dataset
+    _worker_dataset = load_dataset(directory)
+    _worker_btc_cache.clear()
+
+
+def run_combination(params: Dict[str, Any], start_ms: Optional[int] = None, end_ms: Optional[int] = None,
+                    monitoring_config: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Ponto de entrada dos processos: um replay completo com os parâmetros dados
+
+    Returns:
+        Linha do relatório (parâmetros + taxa de acerto, dias até o alvo, drawdown e P&L)
+    """
+    candles, scored, manifest = _worker_dataset
+    configs = split_parameters(params)
+    engine = BacktestEngine(candles, analysis_config=configs['analysis'],
+                            confirmation_config=configs['confirmation'], monitoring_config=monitoring_config,
+                            window=manifest['window'], btc_symbol=manifest['btc_symbol'], scored=scored,
+                            btc_cache=_worker_btc_cache)
+    result = engine.run(start_ms, end_ms)
+
+    signals, statistics, performance = result['signals'], result['monitoring'], result['performance']
+    return {
+        'params': dict(params),
+        'candidates': signals['candidates'],
+        'confirmed': signals['confirmed'],
+        'rejected': signals['rejected'],
+        'expired': signals['expired'],
+        'evaluated': statistics.get('total_evaluated_signals', 0),
+        'successful': statistics.get('successful_signals', 0),
+        'success_rate': statistics.get('overall_success_rate', 0.0),
+        'average_days_to_target': statistics.get('average_days_to_success', 0.0),
+        'total_pnl_usd': performance['total_pnl_usd'],
+        'max_drawdown_usd': performance['max_drawdown_usd'],
+        'elapsed_seconds': result['replay']['elapsed_seconds']
+    }
+
+
+# ----------------------------------------------------------------------
+# Execução
+# ----------------------------------------------------------------------
+
+def run_sweep(directory: str, combinations: List[Dict[str, Any]], start_ms: Optional[int] = None,
+              end_ms: Optional[int] = None, monitoring_config: Optional[Dict[str, Any]] = None,
+              max_workers: Optional[int] = None, start_method: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Executa as combinações em processos sobre o dataset de prepare_dataset
+
+    Args:
+        directory: Pasta gravada por prepare_dataset
+        combinations: Saída de grid_combinations/random_combinations
+        max_workers: Processos (padrão: SWEEP_WORKERS ou núcleos da máquina); 1 executa no próprio processo
+        start_method: Método de criação dos processos (padrão: SWEEP_START_METHOD ou forkserver quando disponível)
+
+    Returns:
+        Linhas de run_combination na ordem das combinações
+    """
+    max_workers = max_workers or int(os.getenv('SWEEP_WORKERS', str(os.cpu_count() or 1)))
+    max_workers = max(1, min(max_workers, len(combinations)))
+    arguments = [(params, start_ms, end_ms, monitoring_config) for params in combinations]
+
+    if max_workers == 1:
+        _init_worker(directory)
+        return [run_combination(*args) for args in arguments]
+
+    available = multiprocessing.get_all_start_methods()
+    start_method = start_method or os.getenv(
+        'SWEEP_START_METHOD', 'forkserver' if 'forkserver' in available else 'spawn'
+    )
+    context = multiprocessing.get_context(start_method)
+    if start_method == 'forkserver':
+        context.set_forkserver_preload(['numpy', 'pandas', 'core.parameter_sweep'])
+
+    print(f"🧵 Varredura: {len(combinations)} combinações em {max_workers} processos ({start_method})")
+    with ProcessPoolExecutor(max_workers=max_workers, mp_context=context,
+                             initializer=_init_worker, initargs=(directory,)) as executor:
+        futures = [executor.submit(run_combination, *args) for args in arguments]
+        return [future.result() for future in futures]
+
+
+def rank_results(rows: List[Dict[str, Any]], key: str = 'success_rate') -> List[Dict[str, Any]]:
+    """Ordena o relatório pela métrica (melhor primeiro), desempate pelo maior P&L"""
+    sign = -1 if key in LOWER_IS_BETTER else 1
+    return sorted(rows, key=lambda row: (sign * row[key], row['total_pnl_usd']), reverse=True)
+
+
+def _parse_values(text: str) -> Union[List[float], Tuple[float, float]]:
+    """'60,65,70' → lista de valores; '60:80' → intervalo (busca aleatória)"""
+    if ':' in text:
+        low, high = text.split(':', 1)
+        return (float(low), float(high))
+    return [float(value) for value in text.split(',') if value]
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Linha de comando: python -m core.parameter_sweep --data <pasta de candles> --workdir <pasta .npy>"""
+    parser = argparse.ArgumentParser(description='Varredura de parâmetros sobre o replay histórico')
+    parser.add_argument('--data', help='Pasta com <SYMBOL>_<interval>.csv (prepara o dataset)')
+    parser.add_argument('--archive', help='Pasta do arquivo de candles (prepara o dataset)')
+    parser.add_argument('--workdir', required=True, help='Pasta do dataset .npy (reutilizada se já existir)')
+    parser.add_argument('--symbols', nargs='*', help='Pares a incluir (padrão: todos)')
+    parser.add_argument('--param', action='append', default=[],
+                        help='nome=v1,v2,... ou nome=mín:máx (busca aleatória); padrão: DEFAULT_GRID')
+    parser.add_argument('--random', type=int, default=0, help='Número de combinações sorteadas (0 = grade)')
+    parser.add_argument('--seed', type=int, help='Semente da busca aleatória')
+    parser.add_argument('--workers', type=int, help='Processos (padrão: SWEEP_WORKERS ou núcleos)')
+    parser.add_argument('--start', help='Data inicial dd/mm/aaaa (horário de São Paulo)')
+    parser.add_argument('--end', help='Data final dd/mm/aaaa (horário de São Paulo)')
+    parser.add_argument('--rank', default='success_rate',
+                        choices=['success_rate', 'average_days_to_target', 'max_drawdown_usd', 'total_pnl_usd'])
+    parser.add_argument('--output', help='Arquivo JSON com o relatório completo')
+    args = parser.parse_args(argv)
+
+    if args.data or args.archive:
+        print(f"📂 Preparando dataset de {args.data or args.archive} em {args.workdir}...")
+        candles = load_source(args.data, args.archive, args.symbols)
+        if not candles:
+            print("❌ Nenhum arquivo de candles encontrado")
+            return 1
+        manifest = prepare_dataset(candles, args.workdir)
+        print(f"✅ {len(manifest['symbols'])} pares pontuados em {manifest['prepared_seconds']:.1f}s")
+    elif not os.path.exists(os.path.join(args.workdir, MANIFEST_FILE)):
+        print(f"❌ Dataset não encontrado em {args.workdir} (use --data ou --archive)")
+        return 1
+
+    try:
+        space = {name: _parse_values(values) for name, _, values in (p.partition('=') for p in args.param)}
+        if args.random:
+            combinations = random_combinations(space or DEFAULT_GRID, args.random, args.seed)
+        else:
+            if any(isinstance(values, tuple) for values in space.values()):
+                raise ValueError("Intervalos mín:máx exigem --random")
+            combinations = grid_combinations(space or DEFAULT_GRID)
+    except ValueError as e:
+        print(f"❌ Erro nos parâmetros: {e}")
+        return 1
+
+    started = time.time()
+    rows = rank_results(run_sweep(args.workdir, combinations, _parse_date(args.start), _parse_date(args.end),
+                                  max_workers=args.workers), args.rank)
+    print(f"⏱️ {len(rows)} combinações em {time.time() - started:.1f}s")
+    for row in rows[:10]:
+        print(f"   {row['params']} → {row['success_rate']}% ({row['successful']}/{row['evaluated']}), "
+              f"{row['average_days_to_target']} dias, drawdown ${row['max_drawdown_usd']:.2f}, "
+              f"P&L ${row['total_pnl_usd']:.2f}")
+
+    if args.output:
+        with open(args.output, 'wb') as file:
+            file.write(dumps_bytes({'rank': args.rank, 'results': rows}, indent=True))
+        print(f"💾 Relatório salvo em {args.output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,392 @@
+# -*- coding: utf-8 -*-
+"""
+Persistence Queue - Fila write-behind para gravações fora do loop de confirmação
+Quem produz (confirmação de sinais) só enfileira; uma thread dedicada agrupa os
+itens por tipo, chama o handler registrado com o lote inteiro (um insert em
+massa no Supabase, por exemplo) e refaz com backoff exponencial em caso de
+falha. O backoff é por tipo: um destino fora do ar não segura os outros.
+Cada item é registrado em um journal local (JSONL) até ser confirmado,
+então nada se perde entre reinícios nem quando a fila em memória está cheia;
+itens que esgotam as tentativas vão para um arquivo de dead-letter.
+"""
+
+import json
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Set, Tuple
+
+from .metrics import DB_WRITE_SECONDS, metrics, stats_collector
+
+# Handler de um tipo de item: recebe o lote e levanta exceção para refazer
+BatchHandler = Callable[[List[Dict[str, Any]]], None]
+
+
+class WriteBehindQueue:
+    """
+    Fila limitada com flusher dedicado, retry com backoff e journal em disco
+
+    O journal recebe uma linha 'put' por item enfileirado e uma linha 'ack' por
+    lote gravado; na inicialização os itens sem ack voltam para a fila. Itens
+    que não cabem na fila em memória ficam só no journal e são recarregados
+    quando houver espaço.
+
+    Cada falha dobra a espera do tipo e divide o lote seguinte pela metade até
+    isolar um item problemático (o lote volta a crescer a cada sucesso). Só
+    falhas de um item sozinho contam tentativas; ao chegar em max_attempts ele
+    sai da fila (linha 'dead' no journal + arquivo de dead-letter).
+    """
+
+    def __init__(self, spill_path: Optional[str] = None, max_size: Optional[int] = None,
+                 batch_size: Optional[int] = None, flush_interval: Optional[float] = None,
+                 base_backoff: float = 1.0, max_backoff: float = 60.0,
+                 max_attempts: Optional[int] = None, clock: Callable[[], float] = time.time):
+        """Inicializa a fila (o flusher é iniciado no primeiro handler registrado)
+
+        Args:
+            spill_path: Journal JSONL (None = sem persistência)
+            max_size: Itens mantidos em memória (padrão: PERSISTENCE_QUEUE_SIZE ou 1000)
+            batch_size: Itens por lote (padrão: PERSISTENCE_BATCH_SIZE ou 50)
+            flush_interval: Espera máxima para juntar um lote em segundos
+                            (padrão: PERSISTENCE_FLUSH_INTERVAL ou 0.5)
+            base_backoff: Primeira espera após uma falha
+            max_backoff: Espera máxima entre tentativas
+            max_attempts: Tentativas por item antes do dead-letter
+                          (padrão: PERSISTENCE_MAX_ATTEMPTS ou 10)
+            clock: Função de tempo (injetável para testes)
+        """
+        self.spill_path = spill_path
+        self.max_size = max_size or int(os.getenv('PERSISTENCE_QUEUE_SIZE', '1000'))
+        self.batch_size = batch_size or int(os.getenv('PERSISTENCE_BATCH_SIZE', '50'))
+        self.flush_interval = (flush_interval if flush_interval is not None
+                               else float(os.getenv('PERSISTENCE_FLUSH_INTERVAL', '0.5')))
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.max_attempts = max_attempts or int(os.getenv('PERSISTENCE_MAX_ATTEMPTS', '10'))
+        self.dead_letter_path = f"{os.path.splitext(spill_path)[0]}.dead.jsonl" if spill_path else None
+        self.clock = clock
+
+        self.handlers: Dict[str, BatchHandler] = {}
+        self.queue: Deque[Dict[str, Any]] = deque()
+        self.spilled_ids: Set[int] = set()
+        self.next_id = 1
+        # Backoff por tipo: {'failures', 'retry_at', 'limit'} (limit = tamanho do próximo lote)
+        self.backoff: Dict[str, Dict[str, Any]] = {}
+        self.dead_letters: Deque[Dict[str, Any]] = deque(maxlen=1000)
+
+        self.condition = threading.Condition()
+        self.journal_lock = threading.Lock()
+        self.is_running = False
+        self._thread: Optional[threading.Thread] = None
+        self._loaded = False
+
+        self.stats = {
+            'enqueued': 0,
+            'flushed': 0,
+            'batches': 0,
+            'failed_batches': 0,
+            'dead_lettered': 0,
+            'spilled': 0,
+            'recovered': 0,
+            'last_flush_ms': 0.0,
+            'total_flush_ms': 0.0,
+            'max_flush_ms': 0.0
+        }
+
+    # ------------------------------------------------------------------
+    # Journal
+    # ------------------------------------------------------------------
+
+    def _write_journal(self, entries: List[Dict[str, Any]]) -> None:
+        if not self.spill_path or not entries:
+            return
+        lines = ''.join(json.dumps(entry, ensure_ascii=False, default=str) + '\n' for entry in entries)
+        with self.journal_lock:
+            os.makedirs(os.path.dirname(os.path.abspath(self.spill_path)), exist_ok=True)
+            with open(self.spill_path, 'a', encoding='utf-8') as f:
+                f.write(lines)
+
+    def _read_journal(self) -> List[Dict[str, Any]]:
+        """Itens com 'put' e sem 'ack'/'dead', na ordem de entrada"""
+        if not self.spill_path or not os.path.exists(self.spill_path):
+            return []
+        pending: Dict[int, Dict[str, Any]] = {}
+        with self.journal_lock:
+            with open(self.spill_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue  # Linha parcial de uma escrita interrompida
+                    if entry.get('op') == 'put':
+                        pending[entry['id']] = entry
+                    elif entry.get('op') in ('ack', 'dead'):
+                        for item_id in entry.get('ids', []):
+                            pending.pop(item_id, None)
+        return list(pending.values())
+
+    def _write_dead_letters(self, items: List[Dict[str, Any]], error: str) -> None:
+        """Tira do journal itens que esgotaram as tentativas e os guarda à parte"""
+        now = self.clock()
+        letters = [{'id': item['id'], 'kind': item['kind'], 'payload': item['payload'],
+                    'attempts': item['attempts'], 'error': error, 'ts': now} for item in items]
+        self.dead_letters.extend(letters)
+        if self.dead_letter_path:
+            with self.journal_lock:
+                with open(self.dead_letter_path, 'a', encoding='utf-8') as f:
+                    f.write(''.join(json.dumps(letter, ensure_ascii=False, default=str) + '\n' for letter in letters))
+        self._write_journal([{'op': 'dead', 'ids': [item['id'] for item in items]}])
+
+    def _truncate_journal(self) -> None:
+        if self.spill_path and os.path.exists(self.spill_path):
+            with self.journal_lock:
+                open(self.spill_path, 'w', encoding='utf-8').close()
+
+    def _load_journal(self) -> None:
+        """Recupera itens não gravados de execuções anteriores (chamar com condition)"""
+        if self._loaded:
+            return
+        self._loaded = True
+        for entry in self._read_journal():
+            self.next_id = max(self.next_id, entry['id'] + 1)
+            item = {'id': entry['id'], 'kind': entry['kind'], 'payload': entry['payload'],
+                    'enqueued_at': entry.get('ts', self.clock())}
+            if len(self.queue) < self.max_size:
+                self.queue.append(item)
+            else:
+                self.spilled_ids.add(entry['id'])
+            self.stats['recovered'] += 1
+        if self.stats['recovered']:
+            print(f"💾 Fila de persistência: {self.stats['recovered']} itens recuperados do journal")
+
+    def _reload_spilled(self) -> None:
+        """Traz de volta para a memória itens que só estavam no journal (chamar com condition)"""
+        if not self.spilled_ids:
+            return
+        for entry in self._read_journal():
+            if len(self.queue) >= self.max_size:
+                break
+            if entry['id'] in self.spilled_ids:
+                self.spilled_ids.discard(entry['id'])
+                self.queue.append({'id': entry['id'], 'kind': entry['kind'], 'payload': entry['payload'],
+                                   'enqueued_at': entry.get('ts', self.clock())})
+
+    # ------------------------------------------------------------------
+    # Produção
+    # ------------------------------------------------------------------
+
+    def register_handler(self, kind: str, handler: BatchHandler) -> None:
+        """Registra o handler de um tipo de item e inicia o flusher"""
+        with self.condition:
+            self.handlers[kind] = handler
+            self._load_journal()
+            self.condition.notify()
+        self.start()
+
+    def enqueue(self, kind: str, payload: Dict[str, Any]) -> int:
+        """Enfileira um item sem bloquear; retorna seu id"""
+        return self.enqueue_many(kind, [payload])[0] if payload is not None else 0
+
+    def enqueue_many(self, kind: str, payloads: List[Dict[str, Any]]) -> List[int]:
+        """Enfileira vários itens do mesmo tipo"""
+        if not payloads:
+            return []
+        now = self.clock()
+        with self.condition:
+            self._load_journal()
+            items = []
+            for payload in payloads:
+                items.append({'id': self.next_id, 'kind': kind, 'payload': payload, 'enqueued_at': now})
+                self.next_id += 1
+            self._write_journal([{'op': 'put', 'id': item['id'], 'kind': kind, 'payload': item['payload'], 'ts': now}
+                                 for item in items])
+            for item in items:
+                if len(self.queue) < self.max_size:
+                    self.queue.append(item)
+                else:
+                    # Fila cheia: o item fica só no journal até haver espaço
+                    self.spilled_ids.add(item['id'])
+                    self.stats['spilled'] += 1
+            self.stats['enqueued'] += len(items)
+            self.condition.notify()
+        return [item['id'] for item in items]
+
+    # ------------------------------------------------------------------
+    # Flush
+    # ------------------------------------------------------------------
+
+    def _ready(self, kind: str, now: float) -> bool:
+        """Tipo com handler e fora do backoff"""
+        return kind in self.handlers and self.backoff.get(kind, {}).get('retry_at', 0.0) <= now
+
+    def _take_batch(self) -> Tuple[Optional[str], List[Dict[str, Any]]]:
+        """Retira um lote do primeiro tipo pronto, na ordem da fila (chamar com condition)
+
+        Tipos em backoff são pulados, então um lote que falhou e voltou para a
+        frente da fila não bloqueia os itens dos outros tipos.
+        """
+        now = self.clock()
+        kind = next((item['kind'] for item in self.queue if self._ready(item['kind'], now)), None)
+        if kind is None:
+            return None, []
+        limit = self.backoff.get(kind, {}).get('limit', self.batch_size)
+        batch, kept = [], deque()
+        while self.queue and len(batch) < limit:
+            item = self.queue.popleft()
+            (batch if item['kind'] == kind else kept).append(item)
+        self.queue.extendleft(reversed(kept))
+        return kind, batch
+
+    def flush_once(self) -> int:
+        """Grava um lote; retorna quantos itens foram gravados (0 se nada ou falha)"""
+        with self.condition:
+            self._reload_spilled()
+            kind, batch = self._take_batch()
+            handler = self.handlers.get(kind) if kind else None
+        if not batch or handler is None:
+            return 0
+
+        start = time.perf_counter()
+        try:
+            handler([item['payload'] for item in batch])
+        except Exception as e:
+            with self.condition:
+                if len(batch) == 1:
+                    # Falha isolada: conta como tentativa do item
+                    batch[0]['attempts'] = batch[0].get('attempts', 0) + 1
+                dead = [item for item in batch if item.get('attempts', 0) >= self.max_attempts]
+                retry = [item for item in batch if item.get('attempts', 0) < self.max_attempts]
+                # Devolver o restante para a frente da fila, na mesma ordem
+                self.queue.extendleft(reversed(retry))
+                state = self.backoff.setdefault(kind, {'failures': 0, 'retry_at': 0.0, 'limit': self.batch_size})
+                state['failures'] += 1
+                state['limit'] = max(1, len(batch) // 2)
+                delay = min(self.base_backoff * (2 ** (state['failures'] - 1)), self.max_backoff)
+                state['retry_at'] = self.clock() + delay
+                self.stats['failed_batches'] += 1
+                if dead:
+                    self._write_dead_letters(dead, str(e))
+                    self.stats['dead_lettered'] += len(dead)
+                self.condition.notify_all()
+            print(f"⚠️ Fila de persistência: falha ao gravar {len(batch)} itens '{kind}' ({e}) - nova tentativa em {delay:.0f}s")
+            if dead:
+                print(f"❌ Fila de persistência: {len(dead)} itens '{kind}' descartados após {self.max_attempts} tentativas")
+            return 0
+
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        DB_WRITE_SECONDS.observe(elapsed_ms / 1000, operation=f"batch_{kind}")
+        self._write_journal([{'op': 'ack', 'ids': [item['id'] for item in batch]}])
+        with self.condition:
+            state = self.backoff.get(kind)
+            if state is not None:
+                # Sucesso: sai do backoff e o lote volta a crescer até batch_size
+                if state['limit'] * 2 >= self.batch_size:
+                    del self.backoff[kind]
+                else:
+                    state.update(failures=0, retry_at=0.0, limit=state['limit'] * 2)
+            self.stats['flushed'] += len(batch)
+            self.stats['batches'] += 1
+            self.stats['last_flush_ms'] = elapsed_ms
+            self.stats['total_flush_ms'] += elapsed_ms
+            self.stats['max_flush_ms'] = max(self.stats['max_flush_ms'], elapsed_ms)
+            if not self.queue and not self.spilled_ids:
+                self._truncate_journal()
+            self.condition.notify_all()
+        return len(batch)
+
+    def _has_work(self) -> bool:
+        """Há itens de algum tipo pronto (ou itens só no journal que cabem na memória)"""
+        now = self.clock()
+        return (any(self._ready(item['kind'], now) for item in self.queue)
+                or (bool(self.spilled_ids) and len(self.queue) < self.max_size))
+
+    def _next_retry_at(self) -> float:
+        """Fim do backoff mais próximo entre os tipos com itens na fila (0 se nenhum)"""
+        pending = {item['kind'] for item in self.queue}
+        waits = [state['retry_at'] for kind, state in self.backoff.items() if kind in pending]
+        return min(waits) if waits else 0.0
+
+    def _flush_loop(self) -> None:
+        while self.is_running:
+            with self.condition:
+                # Esperar itens prontos ou o fim de algum backoff
+                while self.is_running and not self._has_work():
+                    retry_at = self._next_retry_at()
+                    timeout = max(retry_at - self.clock(), 0.05) if retry_at else self.flush_interval
+                    self.condition.wait(timeout)
+                if not self.is_running:
+                    break
+                # Juntar um lote maior se ainda não estiver cheio
+                if len(self.queue) < self.batch_size and self.flush_interval > 0:
+                    self.condition.wait(self.flush_interval)
+            self.flush_once()
+
+    def start(self) -> None:
+        """Inicia a thread de flush"""
+        with self.condition:
+            if self.is_running:
+                return
+            self.is_running = True
+        self._thread = threading.Thread(target=self._flush_loop, name="PersistenceQueue", daemon=True)
+        self._thread.start()
+
+    def stop(self, drain_timeout: float = 5.0) -> None:
+        """Para o flusher após tentar esvaziar a fila (o restante fica no journal)"""
+        deadline = time.time() + drain_timeout
+        while time.time() < deadline:
+            with self.condition:
+                if not self._has_work():
+                    break
+            if not self.flush_once():
+                break
+        with self.condition:
+            self.is_running = False
+            self.condition.notify_all()
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join(timeout=5)
+        self._thread = None
+
+    def wait_empty(self, timeout: float = 10.0) -> bool:
+        """Aguarda a fila esvaziar (usado em testes e no desligamento)"""
+        deadline = time.time() + timeout
+        with self.condition:
+            while self.queue or self.spilled_ids:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    return False
+                self.condition.wait(remaining)
+        return True
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Profundidade da fila, latência de flush e contadores"""
+        with self.condition:
+            batches = self.stats['batches']
+            oldest = self.queue[0]['enqueued_at'] if self.queue else None
+            return {
+                **self.stats,
+                'depth': len(self.queue) + len(self.spilled_ids),
+                'in_memory': len(self.queue),
+                'spilled_pending': len(self.spilled_ids),
+                'max_size': self.max_size,
+                'consecutive_failures': max((state['failures'] for state in self.backoff.values()), default=0),
+                'backoff_kinds': {kind: state['failures'] for kind, state in self.backoff.items() if state['failures']},
+                'avg_flush_ms': self.stats['total_flush_ms'] / batches if batches else 0.0,
+                'oldest_item_age_seconds': self.clock() - oldest if oldest is not None else 0.0,
+                'running': self.is_running
+            }
+
+
+# Instância global para uso em outros módulos
+persistence_queue = WriteBehindQueue(
+    spill_path=os.getenv(
+        'PERSISTENCE_SPILL_PATH',
+        os.path.join(os.path.dirname(__file__), '..', 'data', 'persistence_queue.jsonl')
+    )
+)
+metrics.register_collector('persistence_queue', stats_collector(
+    'persistence_queue', 'gauge', 'Fila de gravação em segundo plano', persistence_queue.get_stats,
+    {'depth': 'Itens aguardando gravação', 'oldest_item_age_seconds': 'Idade do item mais antigo da fila',
+     'consecutive_failures': 'Falhas seguidas de gravação',
+     'dead_lettered': 'Itens descartados após esgotar as tentativas'}
+))
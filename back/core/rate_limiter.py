@@ -0,0 +1,248 @@
+# -*- coding: utf-8 -*-
+"""
+Rate Limiter - Orçamento global de peso de requisições da Binance
+Token bucket único por processo, compartilhado por todas as instâncias de
+BinanceClient, com peso por endpoint, sincronização pelo header
+X-MBX-USED-WEIGHT-1M e filas de prioridade (confirmação > scan > dashboard).
+"""
+
+import heapq
+import itertools
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Mapping, Optional
+from urllib.parse import parse_qs, urlparse
+
+# Filas de prioridade (menor valor = atendida primeiro)
+PRIORITY_LANES = {
+    'confirmation': 0,  # Confirmação e monitoramento de sinais
+    'scan': 1,          # Varredura de mercado
+    'dashboard': 2      # Rotas consultadas pelo frontend
+}
+
+# Pesos de REQUEST_WEIGHT dos endpoints da Binance Futures
+ENDPOINT_WEIGHTS = {
+    '/fapi/v1/time': 1,
+    '/fapi/v1/exchangeInfo': 1,
+    '/fapi/v1/leverageBracket': 1,
+    '/fapi/v1/ticker/price': (1, 2),    # (com symbol, sem symbol)
+    '/fapi/v1/ticker/24hr': (1, 40),
+    '/fapi/v1/ticker/bookTicker': (2, 5),
+    '/fapi/v1/premiumIndex': 1,
+}
+
+
+def endpoint_weight(endpoint: str, params: Optional[Dict[str, Any]] = None) -> int:
+    """Calcula o peso de uma requisição (endpoint pode conter query string)"""
+    parsed = urlparse(endpoint)
+    path = parsed.path
+    query = {key: values[0] for key, values in parse_qs(parsed.query).items()}
+    query.update(params or {})
+
+    if path in ('/fapi/v1/klines', '/fapi/v1/continuousKlines', '/fapi/v1/indexPriceKlines'):
+        limit = int(query.get('limit', 500))
+        if limit < 100:
+            return 1
+        if limit < 500:
+            return 2
+        if limit <= 1000:
+            return 5
+        return 10
+
+    weight = ENDPOINT_WEIGHTS.get(path, 1)
+    if isinstance(weight, tuple):
+        return weight[0] if 'symbol' in query else weight[1]
+    return weight
+
+
+class WeightRateLimiter:
+    """
+    Token bucket de peso por minuto com filas de prioridade
+
+    A taxa de reposição é `weight_limit * safety_factor` por janela e o bucket
+    comporta no máximo `burst_fraction` do limite, de forma que nenhuma janela
+    ultrapassa o limite da exchange. O peso informado pela Binance em cada
+    resposta corrige a estimativa local (outras fontes de consumo, reinícios).
+    """
+
+    def __init__(self, weight_limit: int = 2400, safety_factor: float = 0.85,
+                 burst_fraction: float = 0.1, window_seconds: float = 60.0,
+                 clock: Callable[[], float] = time.time):
+        """Inicializa o limitador
+
+        Args:
+            weight_limit: Limite de REQUEST_WEIGHT por janela da exchange
+            safety_factor: Fração do limite usada em regime contínuo
+            burst_fraction: Fração do limite disponível em rajada
+            window_seconds: Duração da janela (60s na Binance)
+            clock: Função de tempo (injetável para testes)
+        """
+        self.weight_limit = weight_limit
+        self.window_seconds = window_seconds
+        self.clock = clock
+        self.refill_rate = weight_limit * safety_factor / window_seconds
+        self.capacity = max(1.0, weight_limit * burst_fraction)
+        self.server_budget = weight_limit * (safety_factor + burst_fraction)
+
+        self.tokens = self.capacity
+        self.last_refill = clock()
+        self.blocked_until = 0.0
+
+        self.condition = threading.Condition()
+        self.waiting: list = []  # heap de (prioridade, sequência)
+        self.sequence = itertools.count()
+
+        self.stats = {
+            'requests': 0,
+            'weight_consumed': 0,
+            'throttled_requests': 0,
+            'total_wait_seconds': 0.0,
+            'rate_limit_hits': 0,
+            'server_used_weight': 0,
+            'requests_by_lane': {lane: 0 for lane in PRIORITY_LANES}
+        }
+
+    def _refill(self, now: float) -> None:
+        elapsed = max(0.0, now - self.last_refill)
+        self.tokens = min(self.capacity, self.tokens + elapsed * self.refill_rate)
+        self.last_refill = now
+
+    def _wait_time(self, weight: int, now: float) -> float:
+        """Segundos até haver peso disponível (0 se puder seguir agora)"""
+        if now < self.blocked_until:
+            return self.blocked_until - now
+        # Requisições mais pesadas que o bucket seguem quando ele estiver cheio
+        needed = min(weight, self.capacity)
+        if self.tokens >= needed:
+            return 0.0
+        return (needed - self.tokens) / self.refill_rate
+
+    def acquire(self, weight: int = 1, priority: str = 'scan') -> float:
+        """Bloqueia até que a requisição caiba no orçamento
+
+        Requisições de filas mais prioritárias são sempre atendidas antes;
+        dentro da mesma fila a ordem é de chegada.
+
+        Returns:
+            Segundos aguardados
+        """
+        rank = PRIORITY_LANES.get(priority, PRIORITY_LANES['scan'])
+        ticket = (rank, next(self.sequence))
+        start = self.clock()
+
+        with self.condition:
+            heapq.heappush(self.waiting, ticket)
+            try:
+                while True:
+                    now = self.clock()
+                    self._refill(now)
+                    if self.waiting[0] == ticket:
+                        wait = self._wait_time(weight, now)
+                        if wait <= 0:
+                            break
+                    else:
+                        wait = None  # Aguardar a vez na fila
+                    self.condition.wait(wait)
+            finally:
+                self._discard(ticket)
+                self.condition.notify_all()
+
+            waited = self.clock() - start
+            self._consume(weight, priority, waited)
+
+        return waited
+
+    def try_acquire(self, weight: int = 1, priority: str = 'scan') -> float:
+        """Versão não bloqueante de acquire (para clientes asyncio)
+
+        Só reserva o peso se não houver requisições bloqueadas de prioridade
+        igual ou maior aguardando.
+
+        Returns:
+            0 se o peso foi reservado; senão, segundos sugeridos até tentar de novo
+        """
+        rank = PRIORITY_LANES.get(priority, PRIORITY_LANES['scan'])
+
+        with self.condition:
+            now = self.clock()
+            self._refill(now)
+            wait = self._wait_time(weight, now)
+            if self.waiting and self.waiting[0][0] <= rank:
+                return max(wait, 0.01)
+            if wait > 0:
+                return wait
+
+            self._consume(weight, priority, 0.0)
+            return 0.0
+
+    def _consume(self, weight: int, priority: str, waited: float) -> None:
+        """Debita o peso e atualiza estatísticas (chamado com o lock)"""
+        self.tokens -= weight
+        self.stats['requests'] += 1
+        self.stats['weight_consumed'] += weight
+        self.stats['requests_by_lane'][priority if priority in PRIORITY_LANES else 'scan'] += 1
+        if waited > 0:
+            self.stats['throttled_requests'] += 1
+            self.stats['total_wait_seconds'] += waited
+
+    def _discard(self, ticket: tuple) -> None:
+        """Remove o ticket da fila de espera"""
+        if self.waiting[0] == ticket:
+            heapq.heappop(self.waiting)
+        else:
+            self.waiting.remove(ticket)
+            heapq.heapify(self.waiting)
+
+    def update_from_headers(self, headers: Mapping[str, str]) -> None:
+        """Ajusta o orçamento com o peso usado informado pela Binance"""
+        used = headers.get('X-MBX-USED-WEIGHT-1M') or headers.get('x-mbx-used-weight-1m')
+        if used is None:
+            return
+
+        try:
+            used_weight = int(used)
+        except (TypeError, ValueError):
+            return
+
+        with self.condition:
+            now = self.clock()
+            self._refill(now)
+            self.stats['server_used_weight'] = used_weight
+
+            remaining = self.server_budget - used_weight
+            if remaining <= 0:
+                # Janela da exchange esgotada: aguardar o próximo minuto
+                next_window = (now // self.window_seconds + 1) * self.window_seconds
+                self.blocked_until = max(self.blocked_until, next_window)
+                self.tokens = min(self.tokens, 0.0)
+            elif remaining < self.tokens:
+                self.tokens = remaining
+            self.condition.notify_all()
+
+    def penalize(self, retry_after: float) -> None:
+        """Suspende todas as requisições após um 429/418 da exchange"""
+        with self.condition:
+            self.stats['rate_limit_hits'] += 1
+            self.blocked_until = max(self.blocked_until, self.clock() + retry_after)
+            self.tokens = min(self.tokens, 0.0)
+            self.condition.notify_all()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Retorna estatísticas do limitador"""
+        with self.condition:
+            self._refill(self.clock())
+            return {
+                **self.stats,
+                'requests_by_lane': dict(self.stats['requests_by_lane']),
+                'available_weight': round(self.tokens, 2),
+                'weight_limit': self.weight_limit,
+                'waiting_requests': len(self.waiting),
+                'blocked': self.clock() < self.blocked_until
+            }
+
+
+# Instância global compartilhada por todos os BinanceClient do processo
+binance_rate_limiter = WeightRateLimiter(
+    weight_limit=int(os.getenv('BINANCE_WEIGHT_LIMIT', '2400'))
+)
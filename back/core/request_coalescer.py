@@ -0,0 +1,183 @@
+# -*- coding: utf-8 -*-
+"""
+Request Coalescer - Agrupamento de requisições idênticas (single-flight)
+Requisições GET públicas simultâneas para o mesmo (endpoint, params) compartilham
+uma única chamada HTTP em andamento; por alguns segundos após a conclusão o
+resultado ainda é servido a quem pedir o mesmo dado (ex.: ticker/24hr completo
+consultado para cada sinal pendente, klines do BTC para cada correlação).
+"""
+
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+from urllib.parse import parse_qsl, urlparse
+
+# Segundos em que um resultado concluído ainda é compartilhado, por endpoint
+DEFAULT_LINGER = {
+    '/fapi/v1/klines': 10.0,
+    '/fapi/v1/ticker/24hr': 5.0,
+    '/fapi/v1/ticker/price': 1.0,
+    '/fapi/v1/premiumIndex': 1.0,
+    '/fapi/v1/exchangeInfo': 60.0
+}
+
+# Parâmetros que não identificam o dado pedido
+IGNORED_PARAMS = ('timestamp', 'signature', 'recvWindow')
+
+
+class _Call:
+    """Chamada em andamento ou concluída recentemente"""
+
+    __slots__ = ('event', 'result', 'error', 'finished_at')
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.finished_at: Optional[float] = None
+
+
+class RequestCoalescer:
+    """
+    Single-flight por chave com janela curta de reaproveitamento
+
+    Falhas (exceção ou resultado None) são entregues às requisições que estavam
+    aguardando, mas não são reaproveitadas depois. O resultado é compartilhado
+    entre os chamadores e não deve ser modificado.
+    """
+
+    def __init__(self, linger: Optional[Dict[str, float]] = None,
+                 clock: Callable[[], float] = time.monotonic, max_entries: int = 2000):
+        """Inicializa o agrupador
+
+        Args:
+            linger: Janela de reaproveitamento por endpoint (segundos)
+            clock: Função de tempo (injetável para testes)
+            max_entries: Entradas concluídas mantidas antes de uma limpeza
+        """
+        self.linger = dict(DEFAULT_LINGER if linger is None else linger)
+        self.clock = clock
+        self.max_entries = max_entries
+        self.calls: Dict[Tuple, _Call] = {}
+        self.lock = threading.Lock()
+
+        self.stats = {
+            'requests': 0,
+            'executed': 0,
+            'coalesced_in_flight': 0,
+            'served_recent': 0
+        }
+
+    @staticmethod
+    def make_key(endpoint: str, params: Optional[Dict[str, Any]] = None) -> Tuple:
+        """Chave canônica de (endpoint, params), incluindo query string do endpoint"""
+        parsed = urlparse(endpoint)
+        items = dict(parse_qsl(parsed.query))
+        items.update({key: str(value) for key, value in (params or {}).items()})
+        for name in IGNORED_PARAMS:
+            items.pop(name, None)
+        return (parsed.path, tuple(sorted(items.items())))
+
+    def linger_for(self, endpoint: str) -> float:
+        """Janela de reaproveitamento do endpoint"""
+        return self.linger.get(urlparse(endpoint).path, 0.0)
+
+    def _cleanup(self, now: float) -> None:
+        """Remove resultados fora da janela (chamado com o lock)"""
+        expired = [
+            key for key, call in self.calls.items()
+            if call.finished_at is not None and now - call.finished_at > self.linger.get(key[0], 0.0)
+        ]
+        for key in expired:
+            del self.calls[key]
+
+    def peek(self, key: Tuple) -> Tuple[bool, Any]:
+        """Consulta resultado recente sem executar nada
+
+        Returns:
+            Tuple (encontrado, resultado)
+        """
+        with self.lock:
+            call = self.calls.get(key)
+            if call is None or call.finished_at is None:
+                return False, None
+            if self.clock() - call.finished_at > self.linger.get(key[0], 0.0):
+                return False, None
+            self.stats['requests'] += 1
+            self.stats['served_recent'] += 1
+            return True, call.result
+
+    def remember(self, key: Tuple, result: Any) -> None:
+        """Registra um resultado obtido por outro caminho (ex.: cliente asyncio)"""
+        if result is None or self.linger.get(key[0], 0.0) <= 0:
+            return
+        with self.lock:
+            current = self.calls.get(key)
+            if current is not None and current.finished_at is None:
+                return  # Há uma chamada em andamento; ela publicará o resultado
+            call = _Call()
+            call.result = result
+            call.finished_at = self.clock()
+            call.event.set()
+            self.calls[key] = call
+
+    def do(self, key: Tuple, fn: Callable[[], Any]) -> Any:
+        """Executa `fn` uma única vez por chave entre chamadas simultâneas"""
+        with self.lock:
+            self.stats['requests'] += 1
+            now = self.clock()
+            if len(self.calls) > self.max_entries:
+                self._cleanup(now)
+
+            call = self.calls.get(key)
+            if call is not None and call.finished_at is not None:
+                if now - call.finished_at <= self.linger.get(key[0], 0.0):
+                    self.stats['served_recent'] += 1
+                    return call.result
+                call = None
+
+            owner = call is None
+            if owner:
+                call = _Call()
+                self.calls[key] = call
+                self.stats['executed'] += 1
+            else:
+                self.stats['coalesced_in_flight'] += 1
+
+        if not owner:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self.lock:
+                call.finished_at = self.clock()
+                failed = call.error is not None or call.result is None
+                if failed or self.linger.get(key[0], 0.0) <= 0:
+                    if self.calls.get(key) is call:
+                        del self.calls[key]
+            call.event.set()
+
+        return call.result
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Retorna contadores de deduplicação"""
+        with self.lock:
+            saved = self.stats['coalesced_in_flight'] + self.stats['served_recent']
+            requests = self.stats['requests']
+            return {
+                **self.stats,
+                'requests_saved': saved,
+                'dedup_rate': saved / requests * 100 if requests > 0 else 0,
+                'tracked_keys': len(self.calls)
+            }
+
+
+# Instância global compartilhada por todos os clientes Binance do processo
+request_coalescer = RequestCoalescer()
@@ -0,0 +1,251 @@
+# -*- coding: utf-8 -*-
+"""
+Response Cache - Cache de respostas HTTP com ETag/304 para rotas do dashboard
+Cada resposta é guardada já serializada (e já comprimida em gzip) por rota +
+query string, junto com as versões dos dados de que depende. Os gerenciadores
+incrementam um contador de versão quando seu estado muda; enquanto as versões
+não mudam, todos os clientes recebem os mesmos bytes, e quem envia
+If-None-Match com o ETag atual recebe 304 sem corpo.
+"""
+
+import gzip
+import hashlib
+import os
+import threading
+import time
+from dataclasses import dataclass
+from functools import wraps
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple, Union
+
+# Dependência de uma rota: nome de contador global ou função que retorna a versão
+Dependency = Union[str, Callable[[], Any]]
+
+GZIP_MIN_SIZE = 512
+MAX_ENTRIES = 256
+
+
+class VersionCounters:
+    """Contadores de versão por tipo de dado (incrementados a cada mudança)"""
+
+    def __init__(self):
+        self.counters: Dict[str, int] = {}
+        self.lock = threading.Lock()
+
+    def bump(self, name: str) -> int:
+        """Marca o dado como alterado; retorna a nova versão"""
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + 1
+            return self.counters[name]
+
+    def get(self, name: str) -> int:
+        return self.counters.get(name, 0)
+
+    def snapshot(self) -> Dict[str, int]:
+        with self.lock:
+            return dict(self.counters)
+
+
+@dataclass
+class CachedResponse:
+    """Resposta pronta para ser enviada"""
+    body: bytes
+    gzipped: Optional[bytes]
+    etag: str
+    versions: Tuple
+    created_at: float
+    status: int
+    mimetype: str
+    headers: Dict[str, str]
+
+
+class ResponseCache:
+    """
+    Cache de respostas por (rota, query string)
+
+    Uma entrada vale enquanto as versões das dependências forem as mesmas e,
+    se a rota tiver ttl (dados que mudam sem contador, como preço do BTC),
+    enquanto não passar do ttl. Só respostas 200 são guardadas. Em uma falta,
+    apenas uma requisição por chave monta a resposta; as concorrentes esperam
+    e reaproveitam o resultado.
+    """
+
+    def __init__(self, versions: Optional[VersionCounters] = None, max_entries: int = MAX_ENTRIES,
+                 gzip_min_size: int = GZIP_MIN_SIZE, clock: Callable[[], float] = time.time):
+        """Inicializa o cache
+
+        Args:
+            versions: Contadores de versão usados pelas dependências nomeadas
+            max_entries: Entradas mantidas (as mais antigas saem primeiro)
+            gzip_min_size: Tamanho mínimo do corpo para pré-comprimir
+            clock: Função de tempo (injetável para testes)
+        """
+        self.versions = versions or VersionCounters()
+        self.max_entries = max_entries
+        self.gzip_min_size = gzip_min_size
+        self.clock = clock
+        self.enabled = os.getenv('RESPONSE_CACHE_ENABLED', 'true').lower() == 'true'
+
+        self.entries: Dict[Tuple, CachedResponse] = {}
+        self.key_locks: Dict[Tuple, threading.Lock] = {}
+        self.lock = threading.Lock()
+
+        self.stats = {
+            'hits': 0,
+            'misses': 0,
+            'not_modified': 0,
+            'gzip_responses': 0,
+            'bytes_sent': 0,
+            'bytes_saved': 0
+        }
+
+    # ------------------------------------------------------------------
+    # Entradas
+    # ------------------------------------------------------------------
+
+    def current_versions(self, dependencies: Iterable[Dependency]) -> Tuple:
+        """Versões atuais das dependências, na ordem dada"""
+        return tuple(dep() if callable(dep) else self.versions.get(dep) for dep in dependencies)
+
+    def lookup(self, key: Tuple, versions: Tuple, ttl: Optional[float] = None) -> Optional[CachedResponse]:
+        """Retorna a entrada se ainda válida para as versões informadas"""
+        with self.lock:
+            entry = self.entries.get(key)
+        if entry is None or entry.versions != versions:
+            return None
+        if ttl is not None and self.clock() - entry.created_at >= ttl:
+            return None
+        return entry
+
+    def store(self, key: Tuple, body: bytes, versions: Tuple, status: int = 200,
+              mimetype: str = 'application/json', headers: Optional[Dict[str, str]] = None) -> CachedResponse:
+        """Guarda o corpo já serializado (e comprimido, se valer a pena)"""
+        gzipped = None
+        if len(body) >= self.gzip_min_size:
+            gzipped = gzip.compress(body, compresslevel=6)
+            if len(gzipped) >= len(body):
+                gzipped = None
+        entry = CachedResponse(
+            body=body,
+            gzipped=gzipped,
+            etag='"%s"' % hashlib.sha1(body).hexdigest()[:20],
+            versions=versions,
+            created_at=self.clock(),
+            status=status,
+            mimetype=mimetype,
+            headers=dict(headers or {})
+        )
+        with self.lock:
+            if key not in self.entries and len(self.entries) >= self.max_entries:
+                self.entries.pop(next(iter(self.entries)))
+            self.entries[key] = entry
+        return entry
+
+    def key_lock(self, key: Tuple) -> threading.Lock:
+        with self.lock:
+            lock = self.key_locks.get(key)
+            if lock is None:
+                if len(self.key_locks) >= self.max_entries * 2:
+                    self.key_locks.clear()
+                lock = self.key_locks[key] = threading.Lock()
+            return lock
+
+    def clear(self) -> None:
+        with self.lock:
+            self.entries.clear()
+
+    def record(self, stat: str, amount: Union[int, float] = 1) -> None:
+        with self.lock:
+            self.stats[stat] += amount
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Retorna estatísticas do cache"""
+        with self.lock:
+            served = self.stats['hits'] + self.stats['misses']
+            return {
+                **self.stats,
+                'entries': len(self.entries),
+                'enabled': self.enabled,
+                'hit_rate': self.stats['hits'] / served * 100 if served > 0 else 0,
+                'versions': self.versions.snapshot()
+            }
+
+
+# Instâncias globais para uso em outros módulos
+data_versions = VersionCounters()
+response_cache = ResponseCache(data_versions)
+
+
+def _etag_matches(header: Optional[str], etag: str) -> bool:
+    if not header:
+        return False
+    candidates = [value.strip() for value in header.split(',')]
+    return '*' in candidates or etag in candidates or f'W/{etag}' in candidates
+
+
+def cached_response(*dependencies: Dependency, ttl: Optional[float] = None,
+                    cache: Optional[ResponseCache] = None):
+    """Decorator de rota Flask que serve a resposta do cache com ETag/304
+
+    Requisições com Authorization não passam pelo cache, para que a rota
+    continue validando o token a cada chamada.
+
+    Args:
+        dependencies: Contadores (nome) ou funções de versão de que a resposta depende
+        ttl: Validade máxima em segundos para dados sem contador de versão
+        cache: Cache usado (padrão: response_cache)
+    """
+    def decorator(view: Callable):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            from flask import current_app, request
+
+            target = cache or response_cache
+            if not target.enabled or request.method != 'GET' or request.headers.get('Authorization'):
+                return view(*args, **kwargs)
+
+            key = (request.path, tuple(sorted(request.args.items(multi=True))))
+            versions = target.current_versions(dependencies)
+            entry = target.lookup(key, versions, ttl)
+
+            if entry is not None:
+                target.record('hits')
+            else:
+                # Uma montagem por chave; as requisições concorrentes reaproveitam
+                with target.key_lock(key):
+                    versions = target.current_versions(dependencies)
+                    entry = target.lookup(key, versions, ttl)
+                    if entry is not None:
+                        target.record('hits')
+                    else:
+                        target.record('misses')
+                        response = current_app.make_response(view(*args, **kwargs))
+                        if response.status_code != 200 or response.direct_passthrough:
+                            return response
+                        # Headers próprios da rota (ex.: X-Next-Cursor) vão junto com o corpo
+                        extra_headers = {name: value for name, value in response.headers.items()
+                                         if name.startswith('X-')}
+                        entry = target.store(key, response.get_data(), versions, response.status_code,
+                                             response.mimetype, extra_headers)
+
+            return _build_response(target, entry)
+        return wrapper
+    return decorator
+
+
+def _build_response(target: ResponseCache, entry: CachedResponse):
+    from flask import current_app, request
+
+    headers = {**entry.headers, 'ETag': entry.etag, 'Cache-Control': 'no-cache', 'Vary': 'Accept-Encoding'}
+    if _etag_matches(request.headers.get('If-None-Match'), entry.etag):
+        target.record('not_modified')
+        target.record('bytes_saved', len(entry.body))
+        return current_app.response_class(status=304, headers=headers)
+
+    body = entry.body
+    if entry.gzipped is not None and 'gzip' in request.headers.get('Accept-Encoding', '').lower():
+        body = entry.gzipped
+        headers['Content-Encoding'] = 'gzip'
+        target.record('gzip_responses')
+        target.record('bytes_saved', len(entry.body) - len(body))
+    target.record('bytes_sent', len(body))
+    return current_app.response_class(body, status=entry.status, mimetype=entry.mimetype, headers=headers)
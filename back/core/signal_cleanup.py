@@ -11,7 +11,8 @@ from datetime import datetime, timedelta
 import pytz
 import os
 from typing import Optional
-from supabase import create_client, Client
+from supabase import Client
+from .http_pool import get_supabase_client
 
 class SignalCleanup:
     """Sistema de limpeza automática de sinais baseado no horário de São Paulo"""
@@ -88,7 +89,7 @@ class SignalCleanup:
                 print("⚠️ Supabase não configurado para limpeza")
                 return
             
-            supabase: Client = create_client(self.supabase_url, self.supabase_key)
+            supabase: Client = get_supabase_client(self.supabase_url, self.supabase_key)
             now_sp = datetime.now(self.sao_paulo_tz)
             
             # Definir horário de corte para sinais pendentes/rejeitados (24h atrás)
@@ -4,6 +4,7 @@ from datetime import datetime, timedelta
 import pandas as pd
 import numpy as np
 from .binance_client import BinanceClient
+from .ticker_snapshot import ticker_snapshot
 from .btc_correlation_analyzer import BTCCorrelationAnalyzer
 import traceback
 
@@ -107,9 +108,9 @@ class SignalConfirmationSystem:
             if not klines_1h or not klines_4h:
                 return None
             
-            # Obter dados de ticker 24h
-            ticker_data = self.binance.get_24h_ticker_data([symbol])
-            if not ticker_data or symbol not in ticker_data:
+            # Obter dados de ticker 24h do snapshot compartilhado
+            ticker = ticker_snapshot.get_ticker(symbol)
+            if not ticker:
                 return None
             
             # Converter para DataFrames
@@ -125,7 +126,7 @@ class SignalConfirmationSystem:
             return {
                 'klines_1h': df_1h,
                 'klines_4h': df_4h,
-                'ticker_24h': ticker_data[symbol],
+                'ticker_24h': ticker,
                 'current_price': float(df_1h['close'].iloc[-1]),
                 'current_volume': float(df_1h['volume'].iloc[-1])
             }
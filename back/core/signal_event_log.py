@@ -0,0 +1,484 @@
+# -*- coding: utf-8 -*-
+"""
+Signal Event Log - Log de eventos append-only dos sinais do GerenciadorSinais
+Cada mudança (created, confirmed, updated, closed, purged) vira uma linha JSON
+acrescentada ao log; o estado atual fica materializado em memória com índices
+por horário de entrada e por símbolo. Uma thread de compactação grava o estado
+como snapshot em sinais_lista.csv e trunca o log.
+
+Vários processos (workers do gunicorn) podem compartilhar o mesmo arquivo:
+escritas e compactações acontecem sob um lock de arquivo (fcntl), e antes de
+cada operação o processo aplica os eventos que os outros acrescentaram (ou
+recarrega tudo se outro processo compactou).
+"""
+
+import bisect
+import contextlib
+import csv
+import json
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows: sem lock entre processos (um processo por arquivo)
+    fcntl = None
+
+from .response_cache import data_versions
+
+EVENT_TYPES = ('created', 'confirmed', 'updated', 'closed', 'purged')
+
+# Colunas do snapshot na ordem usada pelo sinais_lista.csv
+SNAPSHOT_COLUMNS = [
+    'symbol', 'type', 'entry_price', 'entry_time',
+    'target_price', 'projection_percentage', 'signal_class', 'status',
+    'confirmed_at', 'confirmation_reasons', 'confirmation_attempts',
+    'quality_score', 'btc_correlation', 'btc_trend'
+]
+
+
+def signal_key(symbol: Any, entry_time: Any) -> str:
+    """Chave de um sinal no log (símbolo + horário de entrada)"""
+    return f"{symbol}|{entry_time}"
+
+
+def split_signal_key(key: str) -> Tuple[str, str]:
+    """Inverso de signal_key: (símbolo, horário de entrada)"""
+    symbol, entry_time = key.split('|', 1)
+    return symbol, entry_time
+
+
+def _parse_cell(value: str) -> Any:
+    # Números como o pandas leria; vazio → None
+    if value == '':
+        return None
+    try:
+        number = float(value)
+    except ValueError:
+        return value
+    return int(number) if number.is_integer() and value.lstrip('-').isdigit() else number
+
+
+def _csv_cell(value: Any) -> Any:
+    # Mesmo formato gravado pelo pandas (listas como repr, None como vazio)
+    if value is None:
+        return ''
+    if isinstance(value, (list, tuple, dict)):
+        return str(value)
+    return value
+
+
+class SignalEventLog:
+    """
+    Estado dos sinais materializado a partir de um log append-only
+
+    Escritas são O(1) (uma linha no log + atualização dos índices). As limpezas
+    por horário usam o índice ordenado de entry_time (strings 'YYYY-mm-dd
+    HH:MM:SS' ordenam cronologicamente), sem reler nem converter o arquivo.
+
+    Toda operação passa por locked(): lock da thread + lock do arquivo e estado
+    alinhado com o disco (só o trecho do log ainda não lido é aplicado).
+    """
+
+    def __init__(self, snapshot_path: str, log_path: Optional[str] = None,
+                 compact_interval: Optional[float] = None, compact_threshold: Optional[int] = None,
+                 clock: Callable[[], float] = time.time):
+        """Inicializa o log (o estado é carregado no primeiro acesso)
+
+        Args:
+            snapshot_path: CSV com o estado compactado (sinais_lista.csv)
+            log_path: Arquivo JSONL de eventos (padrão: <snapshot>.events.jsonl)
+            compact_interval: Segundos entre compactações (padrão: SIGNAL_LOG_COMPACT_INTERVAL ou 30)
+            compact_threshold: Eventos que disparam compactação antecipada
+                               (padrão: SIGNAL_LOG_COMPACT_EVENTS ou 500)
+            clock: Função de tempo (injetável para testes)
+        """
+        self.snapshot_path = snapshot_path
+        self.log_path = log_path or f"{os.path.splitext(snapshot_path)[0]}.events.jsonl"
+        self.lock_path = f"{os.path.splitext(self.log_path)[0]}.lock"
+        self.compact_interval = (compact_interval if compact_interval is not None
+                                 else float(os.getenv('SIGNAL_LOG_COMPACT_INTERVAL', '30')))
+        self.compact_threshold = (compact_threshold if compact_threshold is not None
+                                  else int(os.getenv('SIGNAL_LOG_COMPACT_EVENTS', '500')))
+        self.clock = clock
+
+        self.signals: Dict[str, Dict[str, Any]] = {}
+        self.time_index: List[Tuple[str, str]] = []
+        self.symbol_index: Dict[str, set] = {}
+        self.columns: List[str] = list(SNAPSHOT_COLUMNS)
+
+        self.loaded = False
+        self.pending_events = 0
+        # Posição já aplicada do log e identidade do snapshot carregado
+        self.log_offset = 0
+        self.snapshot_id: Optional[Tuple[int, int, int]] = None
+        self._log_needs_newline = False
+        self.lock = threading.RLock()
+        self._lock_file = None
+        self._lock_pid: Optional[int] = None
+        self._lock_depth = 0
+        self._wakeup = threading.Event()
+        self._compactor: Optional[threading.Thread] = None
+
+        self.stats = {
+            'events_appended': 0,
+            'events_replayed': 0,
+            'compactions': 0,
+            'last_compaction': None
+        }
+
+    # ------------------------------------------------------------------
+    # Carga e aplicação de eventos
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _file_id(path: str) -> Optional[Tuple[int, int, int]]:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+    @contextlib.contextmanager
+    def locked(self) -> Iterator[None]:
+        """Lock entre threads e processos, com o estado alinhado ao disco
+
+        Reentrante: o arquivo de lock só é travado (e o disco relido) na
+        entrada mais externa.
+        """
+        with self.lock:
+            outer = self._lock_depth == 0
+            if outer:
+                self._acquire_file_lock()
+            self._lock_depth += 1
+            try:
+                if outer:
+                    self._sync()
+                yield
+            finally:
+                self._lock_depth -= 1
+                if outer:
+                    self._release_file_lock()
+
+    def _acquire_file_lock(self) -> None:
+        if fcntl is None:
+            return
+        if self._lock_file is None or self._lock_pid != os.getpid():
+            # Após um fork o descritor herdado dividiria o lock com o processo pai
+            os.makedirs(os.path.dirname(os.path.abspath(self.lock_path)), exist_ok=True)
+            self._lock_file = open(self.lock_path, 'a')
+            self._lock_pid = os.getpid()
+        fcntl.flock(self._lock_file.fileno(), fcntl.LOCK_EX)
+
+    def _release_file_lock(self) -> None:
+        if fcntl is not None and self._lock_file is not None:
+            fcntl.flock(self._lock_file.fileno(), fcntl.LOCK_UN)
+
+    def _sync(self) -> None:
+        """Aplica o que outros processos gravaram desde a última operação (chamar com os locks)"""
+        snapshot_id = self._file_id(self.snapshot_path)
+        log_size = os.path.getsize(self.log_path) if os.path.exists(self.log_path) else 0
+        if not self.loaded or snapshot_id != self.snapshot_id or log_size < self.log_offset:
+            # Primeira carga ou outro processo compactou: recarregar snapshot + log
+            was_loaded = self.loaded
+            self._reload(snapshot_id)
+            if was_loaded:
+                data_versions.bump('signals')
+        elif log_size > self.log_offset and self._replay_tail():
+            data_versions.bump('signals')
+
+    def _reload(self, snapshot_id: Optional[Tuple[int, int, int]]) -> None:
+        self.signals = {}
+        self.time_index = []
+        self.symbol_index = {}
+        self.columns = list(SNAPSHOT_COLUMNS)
+        self.pending_events = 0
+        self.log_offset = 0
+        if snapshot_id is not None and snapshot_id[2] > 0:
+            with open(self.snapshot_path, 'r', newline='', encoding='utf-8') as f:
+                reader = csv.DictReader(f)
+                for column in reader.fieldnames or []:
+                    if column and column not in self.columns:
+                        self.columns.append(column)
+                for row in reader:
+                    record = {key: _parse_cell(value) for key, value in row.items() if key}
+                    self._apply('created', signal_key(record.get('symbol'), record.get('entry_time')), record)
+        self.snapshot_id = snapshot_id
+        # Eventos posteriores ao último snapshot (todos idempotentes)
+        self._replay_tail()
+        self.loaded = True
+
+    def _replay_tail(self) -> int:
+        """Aplica as linhas do log a partir de log_offset; retorna quantos eventos"""
+        if not os.path.exists(self.log_path):
+            return 0
+        with open(self.log_path, 'rb') as f:
+            f.seek(self.log_offset)
+            data = f.read()
+        if not data:
+            return 0
+        self.log_offset += len(data)
+        # Linha parcial de uma escrita interrompida: a próxima escrita começa em linha nova
+        self._log_needs_newline = not data.endswith(b'\n')
+        applied = 0
+        for line in data.split(b'\n'):
+            if not line.strip():
+                continue
+            try:
+                event = json.loads(line.decode('utf-8'))
+            except ValueError:
+                continue
+            self._apply(event['event'], event['key'], event.get('data') or {})
+            applied += 1
+        self.stats['events_replayed'] += applied
+        self.pending_events += applied
+        return applied
+
+    def _index(self, key: str, record: Dict[str, Any]) -> None:
+        bisect.insort(self.time_index, (str(record.get('entry_time') or ''), key))
+        self.symbol_index.setdefault(record.get('symbol'), set()).add(key)
+
+    def _unindex(self, key: str, record: Dict[str, Any]) -> None:
+        item = (str(record.get('entry_time') or ''), key)
+        position = bisect.bisect_left(self.time_index, item)
+        if position < len(self.time_index) and self.time_index[position] == item:
+            del self.time_index[position]
+        keys = self.symbol_index.get(record.get('symbol'))
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self.symbol_index[record.get('symbol')]
+
+    def _apply(self, event: str, key: str, data: Dict[str, Any]) -> None:
+        current = self.signals.get(key)
+        if event == 'created':
+            if current is not None:
+                self._unindex(key, current)
+            record = dict(data)
+            self.signals[key] = record
+            self._index(key, record)
+            for column in record:
+                if column not in self.columns:
+                    self.columns.append(column)
+        elif event == 'purged':
+            if current is not None:
+                self._unindex(key, current)
+                del self.signals[key]
+        elif current is not None:  # confirmed / updated / closed
+            current.update(data)
+            for column in data:
+                if column not in self.columns:
+                    self.columns.append(column)
+
+    def _append(self, events: List[Tuple[str, str, Dict[str, Any]]]) -> None:
+        """Grava os eventos no log e aplica no estado (chamar dentro de locked())"""
+        if not events:
+            return
+        now = self.clock()
+        lines = ''.join(
+            json.dumps({'ts': now, 'event': event, 'key': key, 'data': data}, ensure_ascii=False, default=str) + '\n'
+            for event, key, data in events
+        )
+        payload = ('\n' if self._log_needs_newline else '') + lines
+        payload_bytes = payload.encode('utf-8')
+        with open(self.log_path, 'ab') as f:
+            f.write(payload_bytes)
+        self.log_offset += len(payload_bytes)
+        self._log_needs_newline = False
+        for event, key, data in events:
+            self._apply(event, key, data)
+
+        self.pending_events += len(events)
+        self.stats['events_appended'] += len(events)
+        data_versions.bump('signals')
+        self._start_compactor()
+        if self.pending_events >= self.compact_threshold:
+            self._wakeup.set()
+
+    # ------------------------------------------------------------------
+    # Escrita
+    # ------------------------------------------------------------------
+
+    def create(self, record: Dict[str, Any]) -> str:
+        """Registra um sinal novo e retorna sua chave"""
+        key = signal_key(record.get('symbol'), record.get('entry_time'))
+        with self.locked():
+            self._append([('created', key, dict(record))])
+        return key
+
+    def update(self, key: str, fields: Dict[str, Any], event: str = 'updated') -> bool:
+        """Atualiza campos de um sinal ('confirmed', 'updated' ou 'closed')"""
+        if event not in EVENT_TYPES or event in ('created', 'purged'):
+            raise ValueError(f"Evento inválido para atualização: {event}")
+        with self.locked():
+            if key not in self.signals:
+                return False
+            self._append([(event, key, dict(fields))])
+        return True
+
+    def close_open(self, symbol: str, fields: Dict[str, Any]) -> int:
+        """Fecha todos os sinais OPEN de um símbolo (status CLOSED + campos de saída)"""
+        with self.locked():
+            keys = self.open_keys(symbol)
+            self._append([('closed', key, {**fields, 'status': 'CLOSED'}) for key in keys])
+        return len(keys)
+
+    def purge(self, keys: Iterable[str]) -> int:
+        """Remove sinais do estado"""
+        with self.locked():
+            events = [('purged', key, {}) for key in keys if key in self.signals]
+            self._append(events)
+        if events:
+            self._wakeup.set()  # Limpezas aparecem logo no snapshot
+        return len(events)
+
+    def purge_before(self, cutoff: str, status: Optional[str] = 'OPEN') -> int:
+        """Remove sinais (do status informado) com entry_time anterior ao corte"""
+        with self.locked():
+            return self.purge(self.keys_before(cutoff, status))
+
+    def purge_after(self, cutoff: str) -> int:
+        """Remove sinais com entry_time posterior ao corte"""
+        with self.locked():
+            return self.purge(self.keys_after(cutoff))
+
+    def purge_where(self, predicate: Callable[[Dict[str, Any]], bool]) -> int:
+        """Remove sinais que satisfazem o predicado (varredura em memória)"""
+        with self.locked():
+            return self.purge(self.keys_where(predicate))
+
+    # ------------------------------------------------------------------
+    # Seleção de chaves (mesmas faixas das limpezas)
+    # ------------------------------------------------------------------
+
+    def open_keys(self, symbol: str) -> List[str]:
+        """Chaves dos sinais OPEN de um símbolo"""
+        with self.locked():
+            return sorted(key for key in self.symbol_index.get(symbol, ()) if self.signals[key].get('status') == 'OPEN')
+
+    def keys_before(self, cutoff: str, status: Optional[str] = 'OPEN') -> List[str]:
+        """Chaves dos sinais (do status informado) com entry_time anterior ao corte"""
+        with self.locked():
+            end = bisect.bisect_left(self.time_index, (cutoff, ''))
+            return [key for _, key in self.time_index[:end]
+                    if status is None or self.signals[key].get('status') == status]
+
+    def keys_after(self, cutoff: str) -> List[str]:
+        """Chaves dos sinais com entry_time posterior ao corte"""
+        with self.locked():
+            start = bisect.bisect_right(self.time_index, (cutoff, '\uffff'))
+            return [key for _, key in self.time_index[start:]]
+
+    def keys_where(self, predicate: Callable[[Dict[str, Any]], bool]) -> List[str]:
+        """Chaves dos sinais que satisfazem o predicado"""
+        with self.locked():
+            return [key for key, record in self.signals.items() if predicate(record)]
+
+    # ------------------------------------------------------------------
+    # Leitura
+    # ------------------------------------------------------------------
+
+    def records(self) -> List[Dict[str, Any]]:
+        """Cópia de todos os sinais na ordem de criação"""
+        with self.locked():
+            return [dict(record) for record in self.signals.values()]
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Cópia de um sinal pela chave (None se não existir)"""
+        with self.locked():
+            record = self.signals.get(key)
+            return dict(record) if record is not None else None
+
+    def records_between(self, start: Optional[str] = None, end: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Sinais com start <= entry_time < end, em ordem de horário"""
+        with self.locked():
+            low = bisect.bisect_left(self.time_index, (start, '')) if start is not None else 0
+            high = bisect.bisect_left(self.time_index, (end, '')) if end is not None else len(self.time_index)
+            return [dict(self.signals[key]) for _, key in self.time_index[low:high]]
+
+    def snapshot_rows(self) -> List[Dict[str, str]]:
+        """Sinais no formato em que o snapshot CSV seria lido (todas as colunas como texto)
+
+        Rotas que liam sinais_lista.csv direto usam isto para ver sinais ainda
+        não compactados, com as mesmas strings do arquivo.
+        """
+        with self.locked():
+            return [{column: str(_csv_cell(record.get(column))) for column in self.columns}
+                    for record in self.signals.values()]
+
+    def version(self) -> int:
+        """Versão do estado para o cache de respostas (contador 'signals', após alinhar com o disco)"""
+        with self.locked():
+            return data_versions.get('signals')
+
+    # ------------------------------------------------------------------
+    # Compactação
+    # ------------------------------------------------------------------
+
+    def compact(self) -> bool:
+        """Grava o estado atual no snapshot CSV e trunca o log"""
+        with self.locked():
+            if self.pending_events == 0 and os.path.exists(self.snapshot_path):
+                return False
+            temp_path = f"{self.snapshot_path}.tmp"
+            try:
+                with open(temp_path, 'w', newline='', encoding='utf-8') as f:
+                    writer = csv.DictWriter(f, fieldnames=self.columns, extrasaction='ignore')
+                    writer.writeheader()
+                    for record in self.signals.values():
+                        writer.writerow({key: _csv_cell(value) for key, value in record.items()})
+                os.replace(temp_path, self.snapshot_path)
+                # Snapshot gravado: eventos anteriores não são mais necessários
+                open(self.log_path, 'w', encoding='utf-8').close()
+            except Exception as e:
+                print(f"❌ Erro ao compactar log de sinais: {e}")
+                return False
+
+            self.snapshot_id = self._file_id(self.snapshot_path)
+            self.log_offset = 0
+            self._log_needs_newline = False
+            self.pending_events = 0
+            self.stats['compactions'] += 1
+            self.stats['last_compaction'] = self.clock()
+            return True
+
+    def request_compaction(self) -> None:
+        """Pede à thread de compactação para rodar agora"""
+        self._wakeup.set()
+
+    def _start_compactor(self) -> None:
+        if self._compactor is None or not self._compactor.is_alive():
+            self._compactor = threading.Thread(target=self._compaction_loop, name="SignalLogCompactor", daemon=True)
+            self._compactor.start()
+
+    def _compaction_loop(self) -> None:
+        while True:
+            self._wakeup.wait(self.compact_interval)
+            self._wakeup.clear()
+            if self.pending_events:
+                self.compact()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Retorna estatísticas do log"""
+        with self.locked():
+            return {
+                **self.stats,
+                'signals': len(self.signals),
+                'pending_events': self.pending_events,
+                'log_size_bytes': os.path.getsize(self.log_path) if os.path.exists(self.log_path) else 0
+            }
+
+
+_logs: Dict[str, SignalEventLog] = {}
+_logs_lock = threading.Lock()
+
+
+def get_signal_event_log(snapshot_path: str) -> SignalEventLog:
+    """Log compartilhado por arquivo (várias instâncias de GerenciadorSinais usam o mesmo estado)"""
+    path = os.path.abspath(snapshot_path)
+    with _logs_lock:
+        if path not in _logs:
+            _logs[path] = SignalEventLog(path)
+        return _logs[path]
@@ -9,13 +9,26 @@ import time
 import threading
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Any
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass
 from .leverage_detector import LeverageDetector
 from .binance_client import BinanceClient
+from .ticker_snapshot import ticker_snapshot
 from .database import Database
+from .response_cache import data_versions
+from .event_bus import publish_event
+from .metrics import MONITORING_CYCLE_SECONDS, MONITORING_LAG_SECONDS
+from .signal_table import SignalRow, SignalTable, STATUS_COMPLETED, STATUS_EXPIRED
+import numpy as np
 import json
 import traceback
 
+# Campos enviados ao frontend quando mudam (deltas do canal de eventos)
+DELTA_FIELDS = (
+    'current_price', 'current_percentage', 'current_profit', 'max_profit_reached',
+    'days_monitored', 'status', 'simulation_current_value', 'simulation_pnl_usd',
+    'simulation_pnl_percentage', 'simulation_max_value_reached'
+)
+
 @dataclass
 class MonitoredSignal:
     """
@@ -69,7 +82,7 @@ class SignalMonitoringSystem:
             if binance_client is None:
                 # Criar cliente Binance se não fornecido
                 from .binance_client import BinanceClient
-                binance_client = BinanceClient()
+                binance_client = BinanceClient(priority='confirmation')
             cls._instance = cls(binance_client, database)
         return cls._instance
     
@@ -85,9 +98,11 @@ class SignalMonitoringSystem:
         self.db = database
         self.leverage_detector = LeverageDetector(binance_client)
         
-        # Armazenamento em memória dos sinais monitorados
-        self.monitored_signals: Dict[str, MonitoredSignal] = {}
-        self.expired_signals: Dict[str, MonitoredSignal] = {}
+        # Armazenamento em memória dos sinais monitorados: tabela colunar com
+        # visões id → sinal dos ativos e dos encerrados (expirados/concluídos)
+        self.table = SignalTable()
+        self.monitored_signals = self.table.view(closed=False)
+        self.expired_signals = self.table.view(closed=True)
         
         # Controle de thread
         self.is_monitoring = False
@@ -166,17 +181,19 @@ class SignalMonitoringSystem:
                 required_percentage=leverage_info['required_percentage']
             )
             
-            # Obter preço atual
+            # Adicionar ao monitoramento e aplicar o preço atual
+            row = self.table.add(monitored_signal)
             current_price = self._get_current_price(symbol)
             if current_price:
-                monitored_signal.current_price = current_price
-                self._update_signal_metrics(monitored_signal)
-            
-            # Adicionar ao monitoramento
-            self.monitored_signals[signal_id] = monitored_signal
+                self.table.update_prices(np.array([row]), np.array([current_price]))
+            data_versions.bump('monitored_signals')
+            snapshot = self.table.records(np.array([row]))[0]
+            del snapshot['price_history']
+            self.table.changed_values(np.array([row]), DELTA_FIELDS)  # Estado inicial já enviado
+            publish_event('monitoring', 'signal_added', snapshot, key=signal_id)
             
             # Salvar no banco
-            self._save_signal_to_database(monitored_signal)
+            self._save_signal_to_database(self.monitored_signals[signal_id])
             
             print(f"✅ Sinal {symbol} adicionado ao monitoramento quantitativo")
             print(f"   Alavancagem: {leverage_info['max_leverage']}x")
@@ -231,10 +248,14 @@ class SignalMonitoringSystem:
         Loop principal de monitoramento
         """
         print("🔄 Loop de monitoramento iniciado")
+        scheduled_start = None  # Início previsto do próximo ciclo (fim da espera)
         
         while self.is_monitoring:
             try:
                 cycle_start = time.time()
+                if scheduled_start is not None:
+                    # Atraso do loop: sleep acordando tarde ou GIL/CPU ocupados
+                    MONITORING_LAG_SECONDS.observe(max(0.0, cycle_start - scheduled_start))
                 
                 # Atualizar preços e métricas de todos os sinais
                 self._update_all_signals()
@@ -247,10 +268,13 @@ class SignalMonitoringSystem:
                 
                 # Salvar estado atual
                 self._save_monitoring_state()
+                data_versions.bump('monitored_signals')
                 
                 # Aguardar próximo ciclo
                 cycle_duration = time.time() - cycle_start
+                MONITORING_CYCLE_SECONDS.observe(cycle_duration)
                 sleep_time = max(0, self.config['update_interval'] - cycle_duration)
+                scheduled_start = time.time() + sleep_time
                 
                 if sleep_time > 0:
                     time.sleep(sleep_time)
@@ -258,89 +282,79 @@ class SignalMonitoringSystem:
             except Exception as e:
                 print(f"❌ Erro no loop de monitoramento: {e}")
                 traceback.print_exc()
+                scheduled_start = time.time() + 60
                 time.sleep(60)  # Aguardar 1 minuto antes de tentar novamente
     
     def _update_all_signals(self):
         """
-        Atualiza preços e métricas de todos os sinais monitorados
+        Atualiza preços e métricas de todos os sinais monitorados de uma vez
         """
-        if not self.monitored_signals:
+        rows = self.table.active_rows()
+        if len(rows) == 0:
             return
         
-        print(f"🔄 Atualizando {len(self.monitored_signals)} sinais monitorados...")
+        print(f"🔄 Atualizando {len(rows)} sinais monitorados...")
         
-        for signal_id, signal in self.monitored_signals.items():
-            try:
-                # Obter preço atual
-                current_price = self._get_current_price(signal.symbol)
-                if current_price:
-                    signal.current_price = current_price
-                    self._update_signal_metrics(signal)
-                    
-                    # Adicionar ao histórico de preços
-                    self._add_price_to_history(signal, current_price)
-                    
-                    # Atualizar timestamp
-                    signal.last_updated = datetime.now().strftime('%d/%m/%Y %H:%M:%S')
-                    
-            except Exception as e:
-                print(f"❌ Erro ao atualizar sinal {signal.symbol}: {e}")
+        try:
+            symbols = [self.table.objects['symbol'][row] for row in rows.tolist()]
+            updated = self.table.update_prices(rows, self._get_current_prices(symbols))
+            if len(updated) == 0:
+                return
+            
+            # Adicionar ao histórico de preços e atualizar timestamp
+            self.table.append_price_history(updated, datetime.now().strftime('%d/%m/%Y %H:%M:%S'))
+            self._publish_signal_deltas(updated)
+            
+        except Exception as e:
+            print(f"❌ Erro ao atualizar sinais monitorados: {e}")
+            traceback.print_exc()
     
-    def _update_signal_metrics(self, signal: MonitoredSignal):
+    def _publish_signal_deltas(self, rows: np.ndarray):
         """
-        Atualiza as métricas de um sinal específico incluindo simulação financeira de $1.000 USD
+        Publica no canal de eventos apenas os campos que mudaram em cada sinal
         
         Args:
-            signal: Sinal a ser atualizado
+            rows: Linhas da tabela atualizadas neste ciclo
         """
-        try:
-            entry_price = signal.entry_price
-            current_price = signal.current_price
-            
-            # Calcular percentual de movimento
-            if signal.signal_type == 'COMPRA':
-                percentage_change = ((current_price - entry_price) / entry_price) * 100
-            else:  # VENDA
-                percentage_change = ((entry_price - current_price) / entry_price) * 100
-            
-            signal.current_percentage = round(percentage_change, 2)
-            
-            # Calcular lucro com alavancagem
-            leveraged_profit = percentage_change * signal.max_leverage
-            signal.current_profit = round(leveraged_profit, 2)
-            
-            # Atualizar máximo lucro atingido
-            if signal.current_profit > signal.max_profit_reached:
-                signal.max_profit_reached = signal.current_profit
-            
-            # === SIMULAÇÃO FINANCEIRA COM $1.000 USD ===
-            
-            # Calcular tamanho da posição (quantidade de moedas com $1.000)
-            if signal.simulation_position_size == 0.0:
-                # Primeira vez - calcular posição inicial
-                signal.simulation_position_size = signal.simulation_investment / entry_price
-            
-            # Calcular valor atual da posição
-            signal.simulation_current_value = signal.simulation_position_size * current_price
-            
-            # Calcular P&L em dólares
-            signal.simulation_pnl_usd = signal.simulation_current_value - signal.simulation_investment
-            
-            # Calcular P&L em percentual
-            signal.simulation_pnl_percentage = (signal.simulation_pnl_usd / signal.simulation_investment) * 100
-            
-            # Atualizar maior valor atingido
-            if signal.simulation_current_value > signal.simulation_max_value_reached:
-                signal.simulation_max_value_reached = signal.simulation_current_value
-            
-            # Calcular dias monitorados
-            if signal.confirmed_at:
-                confirmed_date = datetime.strptime(signal.confirmed_at, '%d/%m/%Y %H:%M:%S')
-                days_diff = (datetime.now() - confirmed_date).days
-                signal.days_monitored = days_diff
+        ids = self.table.objects['id']
+        symbols = self.table.objects['symbol']
+        for row, changed in self.table.changed_values(rows, DELTA_FIELDS):
+            publish_event('monitoring', 'signal_update', {'id': ids[row], 'symbol': symbols[row], **changed},
+                          key=ids[row])
+    
+    def _publish_signal_closed(self, signal: SignalRow):
+        """
+        Publica o encerramento do monitoramento (expirado ou objetivo atingido)
+        
+        Args:
+            signal: Sinal que saiu do monitoramento
+        """
+        publish_event('monitoring', 'signal_closed', {
+            'id': signal.id,
+            'symbol': signal.symbol,
+            'status': signal.status,
+            'days_monitored': signal.days_monitored,
+            'max_profit_reached': signal.max_profit_reached,
+            'simulation_pnl_usd': signal.simulation_pnl_usd
+        }, key=signal.id)
+    
+    def _get_current_prices(self, symbols: List[str]) -> np.ndarray:
+        """
+        Obtém o preço atual de vários símbolos (NaN para os que falharem)
+        
+        Args:
+            symbols: Símbolos na ordem das linhas
             
-        except Exception as e:
-            print(f"❌ Erro ao calcular métricas para {signal.symbol}: {e}")
+        Returns:
+            np.ndarray: Preços na mesma ordem
+        """
+        prices = ticker_snapshot.get_last_prices(symbols)
+        for position in np.flatnonzero(np.isnan(prices)).tolist():
+            # Símbolo fora do snapshot: consultar diretamente
+            price = self._get_current_price(symbols[position])
+            if price is not None:
+                prices[position] = price
+        return prices
     
     def _get_current_price(self, symbol: str) -> Optional[float]:
         """
@@ -353,81 +367,53 @@ class SignalMonitoringSystem:
             Optional[float]: Preço atual ou None se erro
         """
         try:
+            price = ticker_snapshot.get_price(symbol)
+            if price is not None:
+                return price
+            
+            # Símbolo fora do snapshot: consultar diretamente
             ticker = self.binance.client.get_symbol_ticker(symbol=symbol)
             return float(ticker['price'])
         except Exception as e:
             print(f"⚠️ Erro ao obter preço de {symbol}: {e}")
             return None
     
-    def _add_price_to_history(self, signal: MonitoredSignal, price: float):
-        """
-        Adiciona um preço ao histórico do sinal
-        
-        Args:
-            signal: Sinal monitorado
-            price: Preço atual
-        """
-        timestamp = datetime.now().strftime('%d/%m/%Y %H:%M:%S')
-        
-        price_entry = {
-            'timestamp': timestamp,
-            'price': price,
-            'percentage': signal.current_percentage,
-            'profit': signal.current_profit
-        }
-        
-        signal.price_history.append(price_entry)
-        
-        # Manter apenas últimas 100 entradas para economizar memória
-        if len(signal.price_history) > 100:
-            signal.price_history = signal.price_history[-100:]
-    
     def _check_expired_signals(self):
         """
         Verifica e move sinais expirados (15 dias) para lista de expirados
         """
-        expired_ids = []
-        
-        for signal_id, signal in self.monitored_signals.items():
-            if signal.days_monitored >= self.config['monitoring_days']:
-                signal.status = 'EXPIRED'
-                self.expired_signals[signal_id] = signal
-                expired_ids.append(signal_id)
-                
-                print(f"⏰ Sinal {signal.symbol} expirado após {signal.days_monitored} dias")
-                print(f"   Lucro máximo atingido: {signal.max_profit_reached:.2f}%")
+        expired_rows = self.table.expired_rows(self.config['monitoring_days'])
+        if len(expired_rows) == 0:
+            return
         
-        # Remover da lista de monitoramento
-        for signal_id in expired_ids:
-            del self.monitored_signals[signal_id]
+        self.table.close(expired_rows, STATUS_EXPIRED)
+        for row in expired_rows.tolist():
+            signal = SignalRow(self.table, row)
+            print(f"⏰ Sinal {signal.symbol} expirado após {signal.days_monitored} dias")
+            print(f"   Lucro máximo atingido: {signal.max_profit_reached:.2f}%")
+            self._publish_signal_closed(signal)
     
     def _check_completed_signals(self):
         """
         Verifica sinais que atingiram o objetivo de $4.000 (300% de lucro na simulação)
         """
-        completed_ids = []
-        
-        for signal_id, signal in self.monitored_signals.items():
-            # Verificar se atingiu $4.000 na simulação OU 300% de alavancagem (backup)
-            simulation_target_reached = signal.simulation_current_value >= signal.simulation_target_value
-            leverage_target_reached = signal.current_profit >= self.config['target_profit_percentage']
-            
-            if simulation_target_reached or leverage_target_reached:
-                signal.status = 'COMPLETED'
-                completed_ids.append(signal_id)
-                
-                print(f"🎯 Sinal {signal.symbol} atingiu objetivo!")
-                print(f"   💰 Valor da simulação: ${signal.simulation_current_value:.2f}")
-                print(f"   📈 P&L: ${signal.simulation_pnl_usd:.2f} ({signal.simulation_pnl_percentage:.2f}%)")
-                print(f"   ⚡ Lucro alavancado: {signal.current_profit:.2f}%")
-                print(f"   📅 Dias para atingir: {signal.days_monitored}")
+        # Atingiu $4.000 na simulação OU 300% de alavancagem (backup)
+        completed_rows = self.table.completed_rows(self.config['target_profit_percentage'])
+        if len(completed_rows) == 0:
+            return
         
         # Mover para expirados (sinais completados também vão para histórico)
-        for signal_id in completed_ids:
-            self.expired_signals[signal_id] = self.monitored_signals[signal_id]
-            del self.monitored_signals[signal_id]
+        self.table.close(completed_rows, STATUS_COMPLETED)
+        for row in completed_rows.tolist():
+            signal = SignalRow(self.table, row)
+            print(f"🎯 Sinal {signal.symbol} atingiu objetivo!")
+            print(f"   💰 Valor da simulação: ${signal.simulation_current_value:.2f}")
+            print(f"   📈 P&L: ${signal.simulation_pnl_usd:.2f} ({signal.simulation_pnl_percentage:.2f}%)")
+            print(f"   ⚡ Lucro alavancado: {signal.current_profit:.2f}%")
+            print(f"   📅 Dias para atingir: {signal.days_monitored}")
+            self._publish_signal_closed(signal)
     
-    def _save_signal_to_database(self, signal: MonitoredSignal):
+    def _save_signal_to_database(self, signal: SignalRow):
         """
         Salva um sinal no banco de dados
         
@@ -436,7 +422,7 @@ class SignalMonitoringSystem:
         """
         try:
             # Converter para dicionário
-            signal_dict = asdict(signal)
+            signal_dict = self.table.records(np.array([signal._row]))[0]
             signal_dict['price_history'] = json.dumps(signal.price_history)
             
             # Salvar no banco (implementar conforme estrutura do banco)
@@ -491,18 +477,18 @@ class SignalMonitoringSystem:
             total_expired = len(self.expired_signals)
             
             # Estatísticas de lucro
-            profits = [s.current_profit for s in self.monitored_signals.values()]
-            avg_profit = sum(profits) / len(profits) if profits else 0
-            max_profit = max(profits) if profits else 0
+            profits = self.table.column('current_profit')[self.table.active_rows()]
+            avg_profit = float(profits.mean()) if len(profits) else 0
+            max_profit = float(profits.max()) if len(profits) else 0
             
             # Sinais que atingiram objetivo
-            completed_signals = [s for s in self.expired_signals.values() if s.status == 'COMPLETED']
-            success_rate = (len(completed_signals) / total_expired * 100) if total_expired > 0 else 0
+            completed_count = int(np.count_nonzero(self.table.column('status_code') == STATUS_COMPLETED))
+            success_rate = (completed_count / total_expired * 100) if total_expired > 0 else 0
             
             return {
                 'total_monitored': total_monitored,
                 'total_expired': total_expired,
-                'total_completed': len(completed_signals),
+                'total_completed': completed_count,
                 'success_rate': round(success_rate, 2),
                 'average_profit': round(avg_profit, 2),
                 'max_profit': round(max_profit, 2),
@@ -521,7 +507,7 @@ class SignalMonitoringSystem:
         Returns:
             List: Lista de sinais monitorados
         """
-        return [asdict(signal) for signal in self.monitored_signals.values()]
+        return self.table.records(self.table.active_rows())
     
     def get_expired_signals(self) -> List[Dict[str, Any]]:
         """
@@ -530,7 +516,58 @@ class SignalMonitoringSystem:
         Returns:
             List: Lista de sinais expirados
         """
-        return [asdict(signal) for signal in self.expired_signals.values()]
+        return self.table.records(self.table.closed_rows())
+    
+    def _simulation_records(self, rows: np.ndarray, status: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Monta os registros de simulação direto das colunas (sem copiar o histórico de preços)"""
+        table = self.table
+        values = {name: table.column(name)[rows].tolist() for name in (
+            'entry_price', 'current_price', 'days_monitored', 'simulation_investment',
+            'simulation_current_value', 'simulation_pnl_usd', 'simulation_pnl_percentage',
+            'simulation_max_value_reached', 'simulation_target_value', 'simulation_position_size',
+            'max_leverage', 'current_profit', 'max_profit_reached')}
+        records = []
+        for position, row in enumerate(rows.tolist()):
+            records.append({
+                'id': table.objects['id'][row],
+                'symbol': table.objects['symbol'][row],
+                'signal_type': table.objects['signal_type'][row],
+                'status': status or table.get_value(row, 'status'),
+                'entry_price': values['entry_price'][position],
+                'current_price': values['current_price'][position],
+                'days_monitored': values['days_monitored'][position],
+                'simulation': {
+                    'investment': values['simulation_investment'][position],
+                    'current_value': values['simulation_current_value'][position],
+                    'pnl_usd': values['simulation_pnl_usd'][position],
+                    'pnl_percentage': values['simulation_pnl_percentage'][position],
+                    'max_value_reached': values['simulation_max_value_reached'][position],
+                    'target_value': values['simulation_target_value'][position],
+                    'position_size': values['simulation_position_size'][position]
+                },
+                'leverage': {
+                    'max_leverage': values['max_leverage'][position],
+                    'current_profit': values['current_profit'][position],
+                    'max_profit_reached': values['max_profit_reached'][position]
+                }
+            })
+        return records
+    
+    def get_simulation_records(self, expired_limit: int = 50) -> List[Dict[str, Any]]:
+        """
+        Retorna os registros de simulação dos sinais ativos e dos últimos expirados
+        
+        Args:
+            expired_limit: Quantidade de sinais expirados/completados incluídos
+            
+        Returns:
+            List: Registros no formato da rota de simulação
+        """
+        with self.table.lock:
+            records = self._simulation_records(self.table.active_rows(), 'MONITORING')
+            if expired_limit > 0:
+                records.extend(self._simulation_records(self.table.closed_rows()[-expired_limit:]))
+            return records
     
     def get_system_statistics(self) -> Dict[str, Any]:
         """
@@ -540,58 +577,55 @@ class SignalMonitoringSystem:
             Dict: Estatísticas detalhadas para avaliação quantitativa
         """
         try:
-            # Sinais ativos
-            active_signals = list(self.monitored_signals.values())
-            expired_signals = list(self.expired_signals.values())
+            table = self.table
+            closed = table.closed_rows()
+            status = table.column('status_code')[closed]
+            max_profit = table.column('max_profit_reached')[closed]
+            leverage = table.column('max_leverage')[closed]
+            is_buy = table.column('direction')[closed] == 1
             
             # Sinais que atingiram 300% de lucro
-            successful_signals = [s for s in expired_signals if s.status == 'COMPLETED']
-            failed_signals = [s for s in expired_signals if s.status == 'EXPIRED']
+            successful = status == STATUS_COMPLETED
             
             # Cálculos estatísticos
-            total_evaluated = len(expired_signals)
-            success_count = len(successful_signals)
-            failure_count = len(failed_signals)
+            total_evaluated = len(closed)
+            success_count = int(np.count_nonzero(successful))
+            failure_count = int(np.count_nonzero(status == STATUS_EXPIRED))
             
             success_rate = (success_count / total_evaluated * 100) if total_evaluated > 0 else 0
             
             # Lucros médios
-            successful_profits = [s.max_profit_reached for s in successful_signals if s.max_profit_reached > 0]
-            avg_successful_profit = sum(successful_profits) / len(successful_profits) if successful_profits else 0
+            successful_profits = max_profit[successful & (max_profit > 0)]
+            avg_successful_profit = float(successful_profits.mean()) if len(successful_profits) else 0
             
             # Tempo médio para sucesso
-            successful_days = [s.days_monitored for s in successful_signals]
-            avg_days_to_success = sum(successful_days) / len(successful_days) if successful_days else 0
+            successful_days = table.column('days_monitored')[closed][successful]
+            avg_days_to_success = float(successful_days.mean()) if len(successful_days) else 0
             
             # Análise por tipo de sinal
-            buy_signals = [s for s in expired_signals if s.signal_type == 'COMPRA']
-            sell_signals = [s for s in expired_signals if s.signal_type == 'VENDA']
-            
-            buy_success_rate = (len([s for s in buy_signals if s.status == 'COMPLETED']) / len(buy_signals) * 100) if buy_signals else 0
-            sell_success_rate = (len([s for s in sell_signals if s.status == 'COMPLETED']) / len(sell_signals) * 100) if sell_signals else 0
+            buy_count = int(np.count_nonzero(is_buy))
+            sell_count = total_evaluated - buy_count
+            buy_success_rate = (np.count_nonzero(successful & is_buy) / buy_count * 100) if buy_count else 0
+            sell_success_rate = (np.count_nonzero(successful & ~is_buy) / sell_count * 100) if sell_count else 0
             
-            # Análise por alavancagem
+            # Análise por alavancagem (na ordem em que cada alavancagem aparece)
             leverage_analysis = {}
-            for signal in expired_signals:
-                leverage = signal.max_leverage
-                if leverage not in leverage_analysis:
-                    leverage_analysis[leverage] = {'total': 0, 'successful': 0, 'avg_profit': 0, 'profits': []}
-                
-                leverage_analysis[leverage]['total'] += 1
-                if signal.status == 'COMPLETED':
-                    leverage_analysis[leverage]['successful'] += 1
-                leverage_analysis[leverage]['profits'].append(signal.max_profit_reached)
-            
-            # Calcular médias por alavancagem
-            for leverage, data in leverage_analysis.items():
-                if data['profits']:
-                    data['avg_profit'] = sum(data['profits']) / len(data['profits'])
-                data['success_rate'] = (data['successful'] / data['total'] * 100) if data['total'] > 0 else 0
-                del data['profits']  # Remover lista para economizar espaço
+            levels, first_seen, groups = np.unique(leverage, return_index=True, return_inverse=True)
+            totals = np.bincount(groups, minlength=len(levels))
+            successes = np.bincount(groups, weights=successful, minlength=len(levels))
+            profit_sums = np.bincount(groups, weights=max_profit, minlength=len(levels))
+            for position in np.argsort(first_seen).tolist():
+                total = int(totals[position])
+                leverage_analysis[int(levels[position])] = {
+                    'total': total,
+                    'successful': int(successes[position]),
+                    'avg_profit': float(profit_sums[position] / total),
+                    'success_rate': float(successes[position] / total * 100)
+                }
             
             return {
                 # Estatísticas gerais
-                'total_active_signals': len(active_signals),
+                'total_active_signals': len(self.monitored_signals),
                 'total_evaluated_signals': total_evaluated,
                 'successful_signals': success_count,
                 'failed_signals': failure_count,
@@ -600,13 +634,13 @@ class SignalMonitoringSystem:
                 # Análise de performance
                 'average_successful_profit': round(avg_successful_profit, 2),
                 'average_days_to_success': round(avg_days_to_success, 1),
-                'max_profit_achieved': max([s.max_profit_reached for s in expired_signals], default=0),
+                'max_profit_achieved': float(max_profit.max()) if total_evaluated else 0,
                 
                 # Análise por tipo
-                'buy_signals_success_rate': round(buy_success_rate, 2),
-                'sell_signals_success_rate': round(sell_success_rate, 2),
-                'buy_signals_count': len(buy_signals),
-                'sell_signals_count': len(sell_signals),
+                'buy_signals_success_rate': round(float(buy_success_rate), 2),
+                'sell_signals_success_rate': round(float(sell_success_rate), 2),
+                'buy_signals_count': buy_count,
+                'sell_signals_count': sell_count,
                 
                 # Análise por alavancagem
                 'leverage_analysis': leverage_analysis,
@@ -0,0 +1,404 @@
+# -*- coding: utf-8 -*-
+"""
+Signal Table - Tabela colunar (struct-of-arrays) dos sinais monitorados
+Cada campo numérico do MonitoredSignal é uma coluna NumPy e cada sinal uma
+linha, com índice id → linha. Preços, P&L, expiração e conclusão de todos os
+sinais são calculados por expressões vetorizadas em vez de um laço por sinal,
+e as estatísticas saem de reduções sobre as colunas.
+"""
+
+import threading
+from collections.abc import Mapping
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+STATUS_MONITORING = 0
+STATUS_COMPLETED = 1
+STATUS_EXPIRED = 2
+STATUS_REMOVED = -1
+
+STATUS_NAMES = {STATUS_MONITORING: 'MONITORING', STATUS_COMPLETED: 'COMPLETED', STATUS_EXPIRED: 'EXPIRED'}
+STATUS_CODES = {name: code for code, name in STATUS_NAMES.items()}
+
+FLOAT_COLUMNS = (
+    'entry_price', 'target_price', 'required_percentage', 'current_price', 'current_percentage',
+    'current_profit', 'max_profit_reached', 'simulation_investment', 'simulation_current_value',
+    'simulation_pnl_usd', 'simulation_pnl_percentage', 'simulation_max_value_reached',
+    'simulation_target_value', 'simulation_position_size', 'confirmed_ts'
+)
+INT_COLUMNS = ('max_leverage', 'days_monitored', 'status_code', 'direction', 'closed_seq')
+OBJECT_FIELDS = ('id', 'symbol', 'signal_type', 'created_at', 'confirmed_at', 'last_updated', 'price_history')
+
+# Ordem dos campos do MonitoredSignal (mesmo formato de asdict)
+RECORD_FIELDS = (
+    'id', 'symbol', 'signal_type', 'entry_price', 'target_price', 'created_at', 'confirmed_at',
+    'max_leverage', 'required_percentage', 'current_price', 'current_percentage', 'current_profit',
+    'max_profit_reached', 'status', 'last_updated', 'days_monitored', 'price_history',
+    'simulation_investment', 'simulation_current_value', 'simulation_pnl_usd',
+    'simulation_pnl_percentage', 'simulation_max_value_reached', 'simulation_target_value',
+    'simulation_position_size'
+)
+
+DATETIME_FORMAT = '%d/%m/%Y %H:%M:%S'
+PRICE_HISTORY_SIZE = 100
+_EPOCH = datetime(1970, 1, 1)
+
+
+def naive_timestamp(moment: datetime) -> float:
+    """Segundos desde 1970 de um datetime sem fuso (mesma base de datetime.now())"""
+    return (moment - _EPOCH).total_seconds()
+
+
+def parse_confirmed_ts(value: Optional[str]) -> float:
+    try:
+        return naive_timestamp(datetime.strptime(value, DATETIME_FORMAT))
+    except (TypeError, ValueError):
+        return np.nan
+
+
+class SignalRow:
+    """Acesso por atributo a uma linha da tabela (compatível com MonitoredSignal)"""
+
+    __slots__ = ('_table', '_row')
+
+    def __init__(self, table: 'SignalTable', row: int):
+        object.__setattr__(self, '_table', table)
+        object.__setattr__(self, '_row', row)
+
+    def __getattr__(self, name: str) -> Any:
+        return self._table.get_value(self._row, name)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        self._table.set_value(self._row, name, value)
+
+    def __repr__(self) -> str:
+        return f"SignalRow({self.id!r}, {self.symbol!r}, {self.status})"
+
+
+class SignalTableView(Mapping):
+    """Visão id → SignalRow dos sinais ativos ou encerrados (como os dicts antigos)"""
+
+    def __init__(self, table: 'SignalTable', closed: bool):
+        self.table = table
+        self.closed = closed
+
+    def _ids(self) -> List[str]:
+        return self.table.ids(closed=self.closed)
+
+    def _index(self) -> Dict[str, int]:
+        return self.table.closed_index if self.closed else self.table.index
+
+    def __getitem__(self, signal_id: str) -> SignalRow:
+        row = self._index().get(signal_id)
+        if row is None:
+            raise KeyError(signal_id)
+        return SignalRow(self.table, row)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._ids())
+
+    def __len__(self) -> int:
+        return self.table.count(closed=self.closed)
+
+    def __contains__(self, signal_id: object) -> bool:
+        return signal_id in self._index()
+
+    def clear(self) -> None:
+        self.table.remove(self._ids(), closed=self.closed)
+
+
+class SignalTable:
+    """
+    Sinais monitorados em colunas NumPy
+
+    Sinais encerrados (expirados ou concluídos) continuam na tabela com o
+    status correspondente, na ordem de encerramento (closed_seq), e têm um
+    índice próprio: um sinal encerrado pode voltar a ser monitorado com o
+    mesmo id. O histórico de preços de cada linha fica em uma lista Python,
+    pois é lido só por sinal.
+    """
+
+    def __init__(self, capacity: int = 64):
+        self.capacity = max(1, capacity)
+        self.size = 0
+        self.columns: Dict[str, np.ndarray] = {name: np.zeros(self.capacity, dtype=np.float64) for name in FLOAT_COLUMNS}
+        self.columns.update({name: np.zeros(self.capacity, dtype=np.int64) for name in INT_COLUMNS})
+        self.objects: Dict[str, List[Any]] = {name: [] for name in OBJECT_FIELDS}
+        self.index: Dict[str, int] = {}
+        self.closed_index: Dict[str, int] = {}
+        self.next_closed_seq = 1
+        self.removed = 0
+        # Cópia das colunas no último envio de deltas (ver changed_values)
+        self.published: Dict[str, np.ndarray] = {}
+        self.lock = threading.RLock()
+
+    # ------------------------------------------------------------------
+    # Linhas
+    # ------------------------------------------------------------------
+
+    def _grow(self) -> None:
+        self.capacity *= 2
+        for name, column in self.columns.items():
+            grown = np.zeros(self.capacity, dtype=column.dtype)
+            grown[:self.size] = column[:self.size]
+            self.columns[name] = grown
+
+    def add(self, signal: Any) -> int:
+        """Inclui um MonitoredSignal (ou objeto com os mesmos atributos); retorna a linha"""
+        with self.lock:
+            if self.size == self.capacity:
+                self._grow()
+            row = self.size
+            self.size += 1
+            for name in OBJECT_FIELDS:
+                value = getattr(signal, name, None)
+                self.objects[name].append(list(value or []) if name == 'price_history' else value)
+            for name in FLOAT_COLUMNS + INT_COLUMNS:
+                if name in ('status_code', 'direction', 'confirmed_ts', 'closed_seq'):
+                    continue
+                self.columns[name][row] = getattr(signal, name)
+            self.columns['direction'][row] = 1 if signal.signal_type == 'COMPRA' else -1
+            self.columns['confirmed_ts'][row] = parse_confirmed_ts(signal.confirmed_at)
+            status = STATUS_CODES.get(signal.status, STATUS_MONITORING)
+            self.columns['status_code'][row] = STATUS_MONITORING
+            self.columns['closed_seq'][row] = 0
+            self.index[signal.id] = row
+            if status != STATUS_MONITORING:
+                self.close(np.array([row]), status)
+            return row
+
+    def remove(self, signal_ids: Sequence[str], closed: bool = False) -> int:
+        """Remove sinais ativos (ou encerrados) da tabela; as linhas saem na compactação"""
+        with self.lock:
+            index = self.closed_index if closed else self.index
+            removed = 0
+            for signal_id in list(signal_ids):
+                row = index.pop(signal_id, None)
+                if row is not None:
+                    self.columns['status_code'][row] = STATUS_REMOVED
+                    removed += 1
+            self.removed += removed
+            if self.removed > 32 and self.removed * 2 > self.size:
+                self.compact()
+            return removed
+
+    def compact(self) -> None:
+        """Descarta as linhas removidas e reconstrói o índice"""
+        with self.lock:
+            keep = np.flatnonzero(self.columns['status_code'][:self.size] != STATUS_REMOVED)
+            for name, column in self.columns.items():
+                column[:len(keep)] = column[keep]
+            for name, values in self.objects.items():
+                self.objects[name] = [values[row] for row in keep.tolist()]
+            self.size = len(keep)
+            self.removed = 0
+            closed = self.status_mask(STATUS_COMPLETED, STATUS_EXPIRED).tolist()
+            self.index = {signal_id: row for row, signal_id in enumerate(self.objects['id']) if not closed[row]}
+            self.closed_index = {signal_id: row for row, signal_id in enumerate(self.objects['id']) if closed[row]}
+            self.published.clear()  # Linhas mudaram de posição: próximo envio é completo
+
+    def close(self, rows: np.ndarray, status: int) -> None:
+        """Marca linhas ativas como encerradas (EXPIRED/COMPLETED) na ordem dada"""
+        with self.lock:
+            rows = np.asarray(rows, dtype=np.int64)
+            self.columns['status_code'][rows] = status
+            self.columns['closed_seq'][rows] = np.arange(self.next_closed_seq, self.next_closed_seq + len(rows))
+            self.next_closed_seq += len(rows)
+            signal_ids = self.objects['id']
+            for row in rows.tolist():
+                signal_id = signal_ids[row]
+                if self.index.get(signal_id) == row:
+                    del self.index[signal_id]
+                previous = self.closed_index.get(signal_id)
+                if previous is not None and previous != row:
+                    # Encerrado de novo: a linha anterior sai do histórico (como no dict)
+                    self.columns['status_code'][previous] = STATUS_REMOVED
+                    self.removed += 1
+                self.closed_index[signal_id] = row
+
+    # ------------------------------------------------------------------
+    # Valores
+    # ------------------------------------------------------------------
+
+    def get_value(self, row: int, name: str) -> Any:
+        if name == 'status':
+            return STATUS_NAMES.get(int(self.columns['status_code'][row]), 'REMOVED')
+        if name in self.objects:
+            return self.objects[name][row]
+        column = self.columns.get(name)
+        if column is None:
+            raise AttributeError(name)
+        return column[row].item()
+
+    def set_value(self, row: int, name: str, value: Any) -> None:
+        with self.lock:
+            if name == 'status':
+                code = STATUS_CODES[value]
+                if code != STATUS_MONITORING and not self.is_closed(row):
+                    self.close(np.array([row]), code)
+                else:
+                    self.columns['status_code'][row] = code
+            elif name in self.objects:
+                self.objects[name][row] = value
+                if name == 'confirmed_at':
+                    self.columns['confirmed_ts'][row] = parse_confirmed_ts(value)
+            elif name in self.columns:
+                self.columns[name][row] = value
+            else:
+                raise AttributeError(name)
+
+    def column(self, name: str) -> np.ndarray:
+        """Coluna com as linhas ocupadas (visão, sem cópia)"""
+        return self.columns[name][:self.size]
+
+    def status_mask(self, *statuses: int) -> np.ndarray:
+        return np.isin(self.column('status_code'), statuses)
+
+    def active_rows(self) -> np.ndarray:
+        return np.flatnonzero(self.column('status_code') == STATUS_MONITORING)
+
+    def closed_rows(self) -> np.ndarray:
+        """Linhas encerradas na ordem de encerramento"""
+        rows = np.flatnonzero(self.status_mask(STATUS_COMPLETED, STATUS_EXPIRED))
+        return rows[np.argsort(self.column('closed_seq')[rows], kind='stable')]
+
+    def is_closed(self, row: int) -> bool:
+        return int(self.columns['status_code'][row]) in (STATUS_COMPLETED, STATUS_EXPIRED)
+
+    def count(self, closed: bool = False) -> int:
+        if closed:
+            return int(np.count_nonzero(self.status_mask(STATUS_COMPLETED, STATUS_EXPIRED)))
+        return int(np.count_nonzero(self.column('status_code') == STATUS_MONITORING))
+
+    def ids(self, closed: bool = False, rows: Optional[np.ndarray] = None) -> List[str]:
+        if rows is None:
+            rows = self.closed_rows() if closed else self.active_rows()
+        signal_ids = self.objects['id']
+        return [signal_ids[row] for row in rows.tolist()]
+
+    def view(self, closed: bool = False) -> SignalTableView:
+        return SignalTableView(self, closed)
+
+    def records(self, rows: np.ndarray) -> List[Dict[str, Any]]:
+        """Linhas no formato de asdict(MonitoredSignal)"""
+        columns = {name: self.column(name)[rows].tolist() for name in FLOAT_COLUMNS + INT_COLUMNS}
+        statuses = [STATUS_NAMES.get(code, 'REMOVED') for code in columns['status_code']]
+        records = []
+        for position, row in enumerate(rows.tolist()):
+            record = {}
+            for name in RECORD_FIELDS:
+                if name == 'status':
+                    record[name] = statuses[position]
+                elif name == 'price_history':
+                    record[name] = [dict(entry) for entry in self.objects[name][row]]
+                elif name in self.objects:
+                    record[name] = self.objects[name][row]
+                else:
+                    record[name] = columns[name][position]
+            records.append(record)
+        return records
+
+    # ------------------------------------------------------------------
+    # Atualização vetorizada
+    # ------------------------------------------------------------------
+
+    def update_prices(self, rows: np.ndarray, prices: np.ndarray, now: Optional[datetime] = None) -> np.ndarray:
+        """Aplica os preços às linhas e recalcula métricas e simulação de todas de uma vez
+
+        Args:
+            rows: Linhas a atualizar
+            prices: Preço atual de cada linha (NaN = sem preço, linha não é alterada)
+            now: Momento da atualização (padrão: datetime.now())
+
+        Returns:
+            Linhas efetivamente atualizadas
+        """
+        with self.lock:
+            rows = np.asarray(rows, dtype=np.int64)
+            prices = np.asarray(prices, dtype=np.float64)
+            valid = ~np.isnan(prices) & (prices > 0)
+            rows, prices = rows[valid], prices[valid]
+            if len(rows) == 0:
+                return rows
+            now = now or datetime.now()
+            c = self.columns
+
+            entry = c['entry_price'][rows]
+            percentage_change = c['direction'][rows] * (prices - entry) / entry * 100
+            profit = np.round(percentage_change * c['max_leverage'][rows], 2)
+
+            c['current_price'][rows] = prices
+            c['current_percentage'][rows] = np.round(percentage_change, 2)
+            c['current_profit'][rows] = profit
+            c['max_profit_reached'][rows] = np.maximum(c['max_profit_reached'][rows], profit)
+
+            # Simulação financeira com $1.000 USD (posição calculada na primeira atualização)
+            position = c['simulation_position_size'][rows]
+            position = np.where(position == 0.0, c['simulation_investment'][rows] / entry, position)
+            value = position * prices
+            pnl = value - c['simulation_investment'][rows]
+            c['simulation_position_size'][rows] = position
+            c['simulation_current_value'][rows] = value
+            c['simulation_pnl_usd'][rows] = pnl
+            c['simulation_pnl_percentage'][rows] = pnl / c['simulation_investment'][rows] * 100
+            c['simulation_max_value_reached'][rows] = np.maximum(c['simulation_max_value_reached'][rows], value)
+
+            # Dias completos desde a confirmação
+            confirmed = c['confirmed_ts'][rows]
+            known = ~np.isnan(confirmed)
+            days = np.floor((naive_timestamp(now) - confirmed[known]) / 86400).astype(np.int64)
+            c['days_monitored'][rows[known]] = days
+            return rows
+
+    def append_price_history(self, rows: np.ndarray, timestamp: str) -> None:
+        """Registra preço, percentual e lucro atuais no histórico de cada linha"""
+        with self.lock:
+            histories = self.objects['price_history']
+            last_updated = self.objects['last_updated']
+            rows_list = rows.tolist()
+            prices = self.columns['current_price'][rows].tolist()
+            percentages = self.columns['current_percentage'][rows].tolist()
+            profits = self.columns['current_profit'][rows].tolist()
+            for row, price, percentage, profit in zip(rows_list, prices, percentages, profits):
+                history = histories[row]
+                history.append({'timestamp': timestamp, 'price': price, 'percentage': percentage, 'profit': profit})
+                if len(history) > PRICE_HISTORY_SIZE:
+                    del history[:-PRICE_HISTORY_SIZE]
+                last_updated[row] = timestamp
+
+    def expired_rows(self, monitoring_days: int) -> np.ndarray:
+        """Linhas ativas que já passaram do período de monitoramento"""
+        return np.flatnonzero((self.column('status_code') == STATUS_MONITORING)
+                              & (self.column('days_monitored') >= monitoring_days))
+
+    def completed_rows(self, target_profit_percentage: float) -> np.ndarray:
+        """Linhas ativas que atingiram a meta da simulação ou o lucro alavancado"""
+        return np.flatnonzero((self.column('status_code') == STATUS_MONITORING)
+                              & ((self.column('simulation_current_value') >= self.column('simulation_target_value'))
+                                 | (self.column('current_profit') >= target_profit_percentage)))
+
+    def changed_values(self, rows: np.ndarray, fields: Tuple[str, ...]) -> List[Tuple[int, Dict[str, Any]]]:
+        """Retorna (linha, campos alterados desde o último envio) e marca os valores como enviados"""
+        with self.lock:
+            changes: Dict[int, Dict[str, Any]] = {}
+            for name in fields:
+                current = self.column('status_code' if name == 'status' else name)
+                shadow = self.published.get(name)
+                if shadow is None or len(shadow) < self.size:
+                    grown = np.full(self.size, np.nan if current.dtype.kind == 'f' else -1, dtype=current.dtype)
+                    if shadow is not None:
+                        grown[:len(shadow)] = shadow
+                    shadow = self.published[name] = grown
+                differs = rows[current[rows] != shadow[rows]]
+                if len(differs) == 0:
+                    continue
+                values = current[differs].tolist()
+                for row, value in zip(differs.tolist(), values):
+                    changes.setdefault(row, {})[name] = STATUS_NAMES.get(value) if name == 'status' else value
+                shadow[differs] = current[differs]
+            return sorted(changes.items())
+
+    def __len__(self) -> int:
+        return len(self.index) + len(self.closed_index)
@@ -0,0 +1,576 @@
+# -*- coding: utf-8 -*-
+"""
+SQLite Storage - Backend SQLite (WAL) da classe Database
+Cada tabela dos antigos CSVs vira uma tabela indexada; escritas são transações
+curtas (O(log n)) em vez de reescrever o arquivo inteiro, e leitores não
+bloqueiam escritores (modo WAL). Colunas fora do esquema são preservadas em uma
+coluna JSON `extra`, como o CSV fazia ao acrescentar colunas novas.
+"""
+
+import csv
+import json
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+# Colunas dos sinais ativos e do histórico (demais campos vão para `extra`)
+SIGNAL_COLUMNS = (
+    'symbol', 'type', 'entry_price', 'entry_time', 'target_price', 'projection_percentage',
+    'signal_class', 'status', 'confirmed_at', 'confirmation_reasons', 'confirmation_attempts',
+    'quality_score', 'btc_correlation', 'btc_trend', 'exit_price', 'variation', 'result'
+)
+USER_COLUMNS = ('id', 'username', 'email', 'password', 'is_admin', 'status')
+TICKER_COLUMNS = ('symbol', 'baseAsset', 'quoteAsset')
+
+_SIGNAL_DDL = ', '.join(
+    f'{col} REAL' if col in ('entry_price', 'target_price', 'projection_percentage', 'quality_score',
+                             'btc_correlation', 'exit_price', 'variation') else f'{col} TEXT'
+    for col in SIGNAL_COLUMNS
+)
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS signals (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    {_SIGNAL_DDL},
+    entry_date TEXT,
+    extra TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_signals_symbol_entry ON signals(symbol, entry_time);
+CREATE INDEX IF NOT EXISTS idx_signals_symbol_date ON signals(symbol, entry_date);
+CREATE INDEX IF NOT EXISTS idx_signals_status ON signals(status);
+
+CREATE TABLE IF NOT EXISTS signals_history (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    {_SIGNAL_DDL},
+    entry_date TEXT,
+    extra TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_history_symbol_entry ON signals_history(symbol, entry_time);
+CREATE INDEX IF NOT EXISTS idx_history_status ON signals_history(status);
+
+CREATE TABLE IF NOT EXISTS users (
+    id TEXT PRIMARY KEY,
+    username TEXT UNIQUE,
+    email TEXT,
+    password TEXT,
+    is_admin INTEGER DEFAULT 0,
+    status TEXT,
+    extra TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_users_email ON users(email);
+
+CREATE TABLE IF NOT EXISTS auth_tokens (
+    token TEXT PRIMARY KEY,
+    user_id TEXT,
+    created_at TEXT,
+    expires_at TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_auth_tokens_user ON auth_tokens(user_id);
+CREATE INDEX IF NOT EXISTS idx_auth_tokens_expires ON auth_tokens(expires_at);
+
+CREATE TABLE IF NOT EXISTS password_reset_tokens (
+    token TEXT PRIMARY KEY,
+    user_id TEXT,
+    expiration_time TEXT,
+    used INTEGER DEFAULT 0
+);
+
+CREATE TABLE IF NOT EXISTS tickers (
+    symbol TEXT PRIMARY KEY,
+    baseAsset TEXT,
+    quoteAsset TEXT,
+    extra TEXT
+);
+
+CREATE TABLE IF NOT EXISTS config (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+
+def _to_sql_value(value: Any) -> Any:
+    """Converte valores Python/pandas para tipos aceitos pelo SQLite"""
+    if value is None:
+        return None
+    if isinstance(value, float) and value != value:  # NaN
+        return None
+    if isinstance(value, bool):
+        return str(value)
+    if isinstance(value, (list, tuple, dict)):
+        return json.dumps(value, ensure_ascii=False, default=str)
+    if isinstance(value, datetime):
+        return value.strftime('%Y-%m-%d %H:%M:%S')
+    if hasattr(value, 'item'):  # escalares numpy
+        return value.item()
+    if isinstance(value, (int, float, str)):
+        return value
+    return str(value)
+
+
+def _csv_value(value: Optional[str]) -> Any:
+    """Interpreta um campo de CSV como o pandas faria (número, vazio → None)"""
+    if value is None or value == '':
+        return None
+    try:
+        number = float(value)
+    except ValueError:
+        return value
+    if number.is_integer() and '.' not in value and 'e' not in value.lower():
+        return int(number)
+    return number
+
+
+class SQLiteStorage:
+    """
+    Armazenamento SQLite com uma conexão por thread
+
+    O modo WAL permite que o scanner, o loop de confirmação e os handlers do
+    Flask leiam enquanto outro escreve; escritores aguardam até `busy_timeout`.
+    """
+
+    def __init__(self, db_path: str, busy_timeout_ms: int = 5000):
+        """Abre (ou cria) o banco
+
+        Args:
+            db_path: Caminho do arquivo SQLite
+            busy_timeout_ms: Espera máxima por um lock de escrita
+        """
+        self.db_path = db_path
+        self.busy_timeout_ms = busy_timeout_ms
+        self._local = threading.local()
+
+        directory = os.path.dirname(os.path.abspath(db_path))
+        os.makedirs(directory, exist_ok=True)
+        # executescript faz o próprio COMMIT; não usar dentro de _transaction
+        self._connection().executescript(SCHEMA)
+
+    # ------------------------------------------------------------------
+    # Conexões e transações
+    # ------------------------------------------------------------------
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=self.busy_timeout_ms / 1000, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.execute(f'PRAGMA busy_timeout={int(self.busy_timeout_ms)}')
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        """Transação de escrita (BEGIN IMMEDIATE: verificação + escrita atômicas)"""
+        conn = self._connection()
+        if conn.in_transaction:
+            yield conn  # Transação externa já aberta nesta thread
+            return
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            yield conn
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        else:
+            conn.execute('COMMIT')
+
+    def close(self) -> None:
+        """Fecha a conexão da thread atual"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    # ------------------------------------------------------------------
+    # Conversão de linhas
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _split_columns(data: Dict[str, Any], columns: Tuple[str, ...]) -> Tuple[Dict[str, Any], Optional[str]]:
+        """Separa colunas do esquema e campos extras (JSON)"""
+        known = {col: _to_sql_value(data.get(col)) for col in columns if col in data}
+        extra = {key: _to_sql_value(value) for key, value in data.items() if key not in columns}
+        return known, json.dumps(extra, ensure_ascii=False) if extra else None
+
+    @staticmethod
+    def _record(row: sqlite3.Row, hidden: Tuple[str, ...] = ('id', 'entry_date')) -> Dict[str, Any]:
+        record = {key: row[key] for key in row.keys() if key not in hidden and key != 'extra'}
+        if 'extra' in row.keys() and row['extra']:
+            record.update(json.loads(row['extra']))
+        return record
+
+    @staticmethod
+    def _user_record(row: sqlite3.Row) -> Dict[str, Any]:
+        record = SQLiteStorage._record(row, hidden=())
+        record['id'] = str(record['id'])
+        record['is_admin'] = str(record.get('is_admin')).lower() in ('1', 'true')
+        return record
+
+    @staticmethod
+    def _entry_date(entry_time: Any) -> Optional[str]:
+        if entry_time is None:
+            return None
+        return str(entry_time)[:10]
+
+    # ------------------------------------------------------------------
+    # Sinais
+    # ------------------------------------------------------------------
+
+    def insert_signal(self, signal: Dict[str, Any]) -> bool:
+        """Insere um sinal se não houver outro do mesmo símbolo no mesmo dia
+
+        Returns:
+            False se o sinal for duplicado
+        """
+        known, extra = self._split_columns(signal, SIGNAL_COLUMNS)
+        entry_date = self._entry_date(known.get('entry_time'))
+
+        with self._transaction() as conn:
+            duplicate = conn.execute(
+                'SELECT 1 FROM signals WHERE symbol = ? AND entry_date = ? LIMIT 1',
+                (known.get('symbol'), entry_date)
+            ).fetchone()
+            if duplicate:
+                return False
+
+            columns = list(known) + ['entry_date', 'extra']
+            conn.execute(
+                f"INSERT INTO signals ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})",
+                list(known.values()) + [entry_date, extra]
+            )
+        return True
+
+    def get_signals(self) -> List[Dict[str, Any]]:
+        rows = self._connection().execute('SELECT * FROM signals ORDER BY id').fetchall()
+        return [self._record(row) for row in rows]
+
+    def get_signal_by_symbol(self, symbol: str) -> Optional[Dict[str, Any]]:
+        row = self._connection().execute(
+            'SELECT * FROM signals WHERE symbol = ? ORDER BY id LIMIT 1', (symbol,)
+        ).fetchone()
+        return self._record(row) if row else None
+
+    def get_signals_by_status(self, status: str) -> List[Dict[str, Any]]:
+        rows = self._connection().execute(
+            'SELECT * FROM signals WHERE status = ? ORDER BY id', (status,)
+        ).fetchall()
+        return [self._record(row) for row in rows]
+
+    def update_signal_status(self, symbol: str, entry_time: str, status: str,
+                             fields: Dict[str, Any], archive: bool = True) -> bool:
+        """Atualiza status/campos de um sinal; sinais CLOSED vão para o histórico
+
+        Args:
+            archive: Com False, um sinal CLOSED fica em signals (mantendo o
+                índice único (symbol, entry_date) como o log de eventos faz)
+
+        Returns:
+            False se o sinal não existir
+        """
+        updates = {'status': status, **{key: value for key, value in fields.items() if value is not None}}
+
+        with self._transaction() as conn:
+            rows = conn.execute(
+                'SELECT * FROM signals WHERE symbol = ? AND entry_time = ?', (symbol, entry_time)
+            ).fetchall()
+            if not rows:
+                return False
+
+            for row in rows:
+                record = self._record(row)
+                record.update(updates)
+                known, extra = self._split_columns(record, SIGNAL_COLUMNS)
+
+                if status == 'CLOSED' and archive:
+                    columns = list(known) + ['entry_date', 'extra']
+                    conn.execute(
+                        f"INSERT INTO signals_history ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})",
+                        list(known.values()) + [row['entry_date'], extra]
+                    )
+                    conn.execute('DELETE FROM signals WHERE id = ?', (row['id'],))
+                else:
+                    assignments = ', '.join(f'{col} = ?' for col in known)
+                    conn.execute(
+                        f'UPDATE signals SET {assignments}, extra = ? WHERE id = ?',
+                        list(known.values()) + [extra, row['id']]
+                    )
+        return True
+
+    def delete_signals(self, keys: List[Tuple[str, str]]) -> int:
+        """Remove sinais ativos por (symbol, entry_time) e retorna a quantidade removida"""
+        if not keys:
+            return 0
+        with self._transaction() as conn:
+            cursor = conn.executemany('DELETE FROM signals WHERE symbol = ? AND entry_time = ?', keys)
+            return cursor.rowcount
+
+    def get_signal_history(self, symbol: Optional[str] = None) -> List[Dict[str, Any]]:
+        if symbol is None:
+            rows = self._connection().execute('SELECT * FROM signals_history ORDER BY id').fetchall()
+        else:
+            rows = self._connection().execute(
+                'SELECT * FROM signals_history WHERE symbol = ? ORDER BY id', (symbol,)
+            ).fetchall()
+        return [self._record(row) for row in rows]
+
+    # ------------------------------------------------------------------
+    # Usuários
+    # ------------------------------------------------------------------
+
+    def get_users(self) -> List[Dict[str, Any]]:
+        rows = self._connection().execute('SELECT * FROM users ORDER BY rowid').fetchall()
+        return [self._user_record(row) for row in rows]
+
+    def get_user(self, field: str, value: Any) -> Optional[Dict[str, Any]]:
+        """Busca usuário por id, username ou email (colunas indexadas)"""
+        if field not in ('id', 'username', 'email'):
+            raise ValueError(f"Campo de busca inválido: {field}")
+        row = self._connection().execute(
+            f'SELECT * FROM users WHERE {field} = ? LIMIT 1', (str(value),)
+        ).fetchone()
+        return self._user_record(row) if row else None
+
+    def insert_user(self, user: Dict[str, Any]) -> Optional[str]:
+        """Insere um usuário
+
+        Returns:
+            None se inserido; 'username' ou 'id' se já existir
+        """
+        known, extra = self._split_columns(user, USER_COLUMNS)
+        known['id'] = str(known.get('id'))
+        known['is_admin'] = 1 if str(user.get('is_admin')).lower() in ('1', 'true') else 0
+
+        with self._transaction() as conn:
+            if conn.execute('SELECT 1 FROM users WHERE username = ?', (known.get('username'),)).fetchone():
+                return 'username'
+            if conn.execute('SELECT 1 FROM users WHERE id = ?', (known['id'],)).fetchone():
+                return 'id'
+            columns = list(known) + ['extra']
+            conn.execute(
+                f"INSERT INTO users ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})",
+                list(known.values()) + [extra]
+            )
+        return None
+
+    def update_user_password(self, user_id: str, password_hash: str) -> bool:
+        with self._transaction() as conn:
+            cursor = conn.execute('UPDATE users SET password = ? WHERE id = ?', (password_hash, str(user_id)))
+        return cursor.rowcount > 0
+
+    # ------------------------------------------------------------------
+    # Tokens de autenticação e de redefinição de senha
+    # ------------------------------------------------------------------
+
+    def save_auth_token(self, token: str, user_id: Any, created_at: str, expires_at: str) -> None:
+        """Salva o token mantendo apenas um token ativo por usuário"""
+        with self._transaction() as conn:
+            conn.execute('DELETE FROM auth_tokens WHERE user_id = ?', (str(user_id),))
+            conn.execute(
+                'INSERT OR REPLACE INTO auth_tokens (token, user_id, created_at, expires_at) VALUES (?, ?, ?, ?)',
+                (token, str(user_id), created_at, expires_at)
+            )
+
+    def get_auth_tokens(self) -> List[Dict[str, Any]]:
+        rows = self._connection().execute('SELECT * FROM auth_tokens').fetchall()
+        return [dict(row) for row in rows]
+
+    def get_auth_token(self, token: str) -> Optional[Dict[str, Any]]:
+        row = self._connection().execute('SELECT * FROM auth_tokens WHERE token = ?', (token,)).fetchone()
+        return dict(row) if row else None
+
+    def delete_auth_token(self, token: str) -> bool:
+        with self._transaction() as conn:
+            cursor = conn.execute('DELETE FROM auth_tokens WHERE token = ?', (token,))
+        return cursor.rowcount > 0
+
+    def delete_expired_auth_tokens(self, now: str) -> int:
+        """Remove tokens com expires_at (ISO) anterior a `now`"""
+        with self._transaction() as conn:
+            cursor = conn.execute('DELETE FROM auth_tokens WHERE expires_at <= ?', (now,))
+        return cursor.rowcount
+
+    def insert_reset_token(self, user_id: Any, token: str, expiration_time: str) -> None:
+        with self._transaction() as conn:
+            conn.execute(
+                'INSERT INTO password_reset_tokens (token, user_id, expiration_time, used) VALUES (?, ?, ?, 0)',
+                (token, str(user_id), expiration_time)
+            )
+
+    def get_unused_reset_token(self, token: str) -> Optional[Dict[str, Any]]:
+        row = self._connection().execute(
+            'SELECT * FROM password_reset_tokens WHERE token = ? AND used = 0', (token,)
+        ).fetchone()
+        if not row:
+            return None
+        record = dict(row)
+        record['user_id'] = str(record['user_id'])
+        record['used'] = bool(record['used'])
+        return record
+
+    def mark_reset_token_used(self, token: str) -> bool:
+        with self._transaction() as conn:
+            cursor = conn.execute('UPDATE password_reset_tokens SET used = 1 WHERE token = ?', (token,))
+        return cursor.rowcount > 0
+
+    # ------------------------------------------------------------------
+    # Tickers e configurações
+    # ------------------------------------------------------------------
+
+    def get_tickers(self) -> List[Dict[str, Any]]:
+        rows = self._connection().execute('SELECT * FROM tickers ORDER BY rowid').fetchall()
+        return [self._record(row, hidden=()) for row in rows]
+
+    def insert_ticker(self, ticker: Dict[str, Any]) -> bool:
+        """Returns: False se o ticker já existir"""
+        known, extra = self._split_columns(ticker, TICKER_COLUMNS)
+        with self._transaction() as conn:
+            if conn.execute('SELECT 1 FROM tickers WHERE symbol = ?', (known.get('symbol'),)).fetchone():
+                return False
+            columns = list(known) + ['extra']
+            conn.execute(
+                f"INSERT INTO tickers ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})",
+                list(known.values()) + [extra]
+            )
+        return True
+
+    def delete_ticker(self, symbol: str) -> bool:
+        with self._transaction() as conn:
+            cursor = conn.execute('DELETE FROM tickers WHERE symbol = ?', (symbol,))
+        return cursor.rowcount > 0
+
+    def get_config(self) -> Dict[str, str]:
+        rows = self._connection().execute('SELECT key, value FROM config').fetchall()
+        return {row['key']: row['value'] for row in rows}
+
+    def set_config(self, key: str, value: Any) -> None:
+        with self._transaction() as conn:
+            conn.execute(
+                'INSERT INTO config (key, value) VALUES (?, ?) ON CONFLICT(key) DO UPDATE SET value = excluded.value',
+                (key, None if value is None else str(value))
+            )
+
+    # ------------------------------------------------------------------
+    # Migração dos CSVs
+    # ------------------------------------------------------------------
+
+    def get_meta(self, key: str) -> Optional[str]:
+        row = self._connection().execute('SELECT value FROM meta WHERE key = ?', (key,)).fetchone()
+        return row['value'] if row else None
+
+    def is_migrated(self) -> bool:
+        return self.get_meta('csv_migrated_at') is not None
+
+    @staticmethod
+    def _read_csv(path: str) -> List[Dict[str, Any]]:
+        if not path or not os.path.exists(path) or os.path.getsize(path) == 0:
+            return []
+        with open(path, 'r', newline='', encoding='utf-8') as f:
+            return [
+                {key: _csv_value(value) for key, value in row.items() if key}
+                for row in csv.DictReader(f)
+            ]
+
+    def migrate_from_csv(self, csv_files: Dict[str, str], force: bool = False) -> Dict[str, int]:
+        """Importa os CSVs legados uma única vez (registros já existentes são ignorados)
+
+        Args:
+            csv_files: {tabela: caminho do CSV} para signals, signals_history, users,
+                       auth_tokens, password_reset_tokens, tickers e config
+            force: Importar mesmo se a migração já foi registrada
+
+        Returns:
+            Registros importados por tabela
+        """
+        if self.is_migrated() and not force:
+            return {}
+
+        imported: Dict[str, int] = {}
+        with self._transaction() as conn:
+            for table in ('signals', 'signals_history'):
+                count = 0
+                for row in self._read_csv(csv_files.get(table)):
+                    known, extra = self._split_columns(row, SIGNAL_COLUMNS)
+                    if conn.execute(
+                        f'SELECT 1 FROM {table} WHERE symbol IS ? AND entry_time IS ? LIMIT 1',
+                        (known.get('symbol'), known.get('entry_time'))
+                    ).fetchone():
+                        continue
+                    columns = list(known) + ['entry_date', 'extra']
+                    conn.execute(
+                        f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})",
+                        list(known.values()) + [self._entry_date(known.get('entry_time')), extra]
+                    )
+                    count += 1
+                imported[table] = count
+
+            imported['users'] = sum(
+                1 for row in self._read_csv(csv_files.get('users'))
+                if row.get('id') is not None and self.insert_user(row) is None
+            )
+            imported['tickers'] = sum(
+                1 for row in self._read_csv(csv_files.get('tickers'))
+                if row.get('symbol') and self.insert_ticker(row)
+            )
+
+            count = 0
+            for row in self._read_csv(csv_files.get('auth_tokens')):
+                if not row.get('token'):
+                    continue
+                cursor = conn.execute(
+                    'INSERT OR IGNORE INTO auth_tokens (token, user_id, created_at, expires_at) VALUES (?, ?, ?, ?)',
+                    (str(row['token']), str(row.get('user_id')), row.get('created_at'), row.get('expires_at'))
+                )
+                count += cursor.rowcount
+            imported['auth_tokens'] = count
+
+            count = 0
+            for row in self._read_csv(csv_files.get('password_reset_tokens')):
+                if not row.get('token'):
+                    continue
+                cursor = conn.execute(
+                    'INSERT OR IGNORE INTO password_reset_tokens (token, user_id, expiration_time, used) VALUES (?, ?, ?, ?)',
+                    (str(row['token']), str(row.get('user_id')), row.get('expiration_time'),
+                     1 if str(row.get('used')).lower() in ('1', 'true') else 0)
+                )
+                count += cursor.rowcount
+            imported['password_reset_tokens'] = count
+
+            count = 0
+            for row in self._read_csv(csv_files.get('config')):
+                if row.get('key') is None:
+                    continue
+                cursor = conn.execute(
+                    'INSERT OR IGNORE INTO config (key, value) VALUES (?, ?)',
+                    (str(row['key']), None if row.get('value') is None else str(row['value']))
+                )
+                count += cursor.rowcount
+            imported['config'] = count
+
+            conn.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES ('csv_migrated_at', ?)",
+                (datetime.now().isoformat(),)
+            )
+
+        return imported
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Contagem de registros por tabela e tamanho do arquivo"""
+        conn = self._connection()
+        tables = ('signals', 'signals_history', 'users', 'auth_tokens', 'password_reset_tokens', 'tickers', 'config')
+        return {
+            'path': self.db_path,
+            'size_bytes': os.path.getsize(self.db_path) if os.path.exists(self.db_path) else 0,
+            'journal_mode': conn.execute('PRAGMA journal_mode').fetchone()[0],
+            'rows': {table: conn.execute(f'SELECT COUNT(*) FROM {table}').fetchone()[0] for table in tables},
+            'csv_migrated_at': self.get_meta('csv_migrated_at')
+        }
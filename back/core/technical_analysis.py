@@ -4,14 +4,13 @@ from binance.exceptions import BinanceAPIException
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
-from typing import Dict, Optional, List, Any, TypedDict
-from ta.trend import EMAIndicator, MACD
-from ta.momentum import RSIIndicator
-from ta.volatility import AverageTrueRange
+from typing import Callable, Dict, Optional, List, Any, Tuple, TypedDict, Union
 from config import server
+import os
 import time
 import traceback
 import threading
+import asyncio
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from .database import Database
 from colorama import Fore, Style, init
@@ -20,6 +19,17 @@ from .gerenciar_sinais import GerenciadorSinais
 from .telegram_notifier import TelegramNotifier
 from .btc_correlation_analyzer import BTCCorrelationAnalyzer
 from .klines_cache import CacheManager
+from .kline_stream import KlineStream
+from .candle_archive import CandleArchive, candle_archive
+from .http_pool import http_pool
+from .request_coalescer import request_coalescer
+from .ticker_snapshot import ticker_snapshot
+from .async_binance_client import AsyncBinanceClient, AIOHTTP_AVAILABLE
+from .incremental_indicators import indicator_engine
+from .batch_indicators import batch_calculator
+from .analysis_pool import analysis_pool
+from .event_bus import publish_event
+from .metrics import SCAN_PAIRS, SCAN_STAGE_SECONDS, SCAN_STEP_SECONDS, metrics
 # from .coin_ranking import coin_ranking  # Removido - sistema de ranking desabilitado
 
 # Initialize colorama
@@ -35,6 +45,14 @@ class TechnicalAnalysisConfig(TypedDict):
 class TechnicalAnalysis:
     """Sistema principal de análise técnica e monitoramento de mercado"""
     
+    # Parâmetros de pontuação e alvo (também usados pelo backtest)
+    SCORING_CONFIG = {
+        'trend_timeframe': '4h',
+        'entry_timeframe': '1h',
+        'quality_score_minimum': 65.0,  # Mínimo 65 pontos para sinais de qualidade
+        'target_percentage_min': 6.0
+    }
+    
     def __init__(self, db_instance: Database):
         """Inicializa o sistema de análise técnica"""
         print("📊 Inicializando TechnicalAnalysis...")
@@ -46,13 +64,19 @@ class TechnicalAnalysis:
         
         # Configurações do sistema
         self.config = {
-            'trend_timeframe': '4h',
-            'entry_timeframe': '1h',
-            'quality_score_minimum': 65.0,  # Mínimo 65 pontos para sinais de qualidade
+            **self.SCORING_CONFIG,
             'scan_interval': 60,  # 60 segundos
             'pairs_update_interval': 1200,  # 20 minutos
-            'target_percentage_min': 6.0,
-            'max_pairs': 100
+            'max_pairs': 100,
+            # Análise vetorizada de todos os pares (matrizes símbolos × candles)
+            'batch_analysis': os.getenv('USE_BATCH_ANALYSIS', 'true').lower() == 'true',
+            # Busca de klines do modo em lote via asyncio (um único gather)
+            'async_fetch': os.getenv('USE_ASYNC_FETCH', 'true').lower() == 'true' and AIOHTTP_AVAILABLE,
+            'async_max_concurrency': 20,
+            # Estágio de análise em processos (memória compartilhada) alimentado pela busca
+            'process_pool_analysis': (os.getenv('USE_PROCESS_POOL_ANALYSIS', 'true').lower() == 'true'
+                                      and (os.cpu_count() or 1) > 1),
+            'analysis_chunk_size': int(os.getenv('ANALYSIS_CHUNK_SIZE', '10'))
         }
         
         # Estado do sistema
@@ -67,6 +91,15 @@ class TechnicalAnalysis:
         
         # Inicializar sistema de cache
         self.cache_manager = CacheManager()
+        metrics.register_collector('klines_cache', self.cache_manager.collect_metrics)
+        
+        # Arquivo local de candles fechados (warm-start sem baixar o histórico)
+        self.candle_archive: Optional[CandleArchive] = (
+            candle_archive if os.getenv('USE_CANDLE_ARCHIVE', 'true').lower() == 'true' else None
+        )
+        
+        # Stream WebSocket de klines (REST apenas para backfill e reparo de lacunas)
+        self.kline_stream = self._setup_kline_stream()
         
         # Inicializar sistema de confirmação BTC
         from .btc_signal_manager import BTCSignalManager
@@ -92,6 +125,23 @@ class TechnicalAnalysis:
             print(f"⚠️ Erro ao configurar Telegram: {e}")
             return None
     
+    def _setup_kline_stream(self) -> Optional[KlineStream]:
+        """Configura o stream WebSocket de klines (opcional)"""
+        try:
+            use_stream = os.getenv('USE_KLINE_STREAM', 'true').lower() == 'true'
+            if not use_stream or not getattr(self.binance, 'use_binance_api', False):
+                print("⚠️ Stream de klines desabilitado - usando apenas REST")
+                return None
+            
+            return KlineStream(
+                self.binance,
+                intervals=[self.config['entry_timeframe'], self.config['trend_timeframe']],
+                archive=self.candle_archive
+            )
+        except Exception as e:
+            print(f"⚠️ Erro ao configurar stream de klines: {e}")
+            return None
+    
     def start_monitoring(self) -> bool:
         """Inicia o monitoramento contínuo do mercado"""
         if self.is_monitoring:
@@ -104,6 +154,13 @@ class TechnicalAnalysis:
         # Iniciar monitoramento do BTCSignalManager
         self.btc_signal_manager.start_monitoring()
         
+        # Iniciar stream de klines (assinaturas são definidas ao carregar os pares)
+        if self.kline_stream:
+            self.kline_stream.start()
+        
+        # Snapshot do ticker 24h de todo o mercado (stream !ticker@arr ou REST periódico)
+        ticker_snapshot.start()
+        
         # Pular inicialização de pares para permitir Flask iniciar rapidamente
         # Os pares serão carregados no primeiro ciclo do monitoring_loop
         
@@ -127,6 +184,12 @@ class TechnicalAnalysis:
         # Parar monitoramento do BTCSignalManager
         self.btc_signal_manager.stop_monitoring()
         
+        if self.kline_stream:
+            self.kline_stream.stop()
+        
+        ticker_snapshot.stop()
+        analysis_pool.shutdown()
+        
         if self.monitoring_thread and self.monitoring_thread.is_alive():
             self.monitoring_thread.join(timeout=5)
         
@@ -272,7 +335,7 @@ class TechnicalAnalysis:
             
             # Obter dados de ticker 24h
             print("📊 Analisando volume e volatilidade...")
-            ticker_data = self.binance.get_24h_ticker_data(valid_pairs)
+            ticker_data = ticker_snapshot.get_ticker_data(valid_pairs)
             if not ticker_data:
                 return False
             
@@ -303,6 +366,15 @@ class TechnicalAnalysis:
             print(f"✅ Top {len(self.top_pairs)} pares selecionados")
             self.pairs_last_update = time.time()
             
+            # Atualizar assinaturas do stream de klines
+            if self.kline_stream:
+                self.kline_stream.set_symbols(self.top_pairs)
+            
+            # Liberar o estado incremental dos pares que saíram da lista (BTC é sempre analisado)
+            evicted = indicator_engine.retain(self.top_pairs + [self.btc_signal_manager.btc_analyzer.btc_symbol])
+            if evicted:
+                print(f"🧹 Estado de indicadores liberado: {evicted} séries fora dos top pares")
+            
             return True
             
         except Exception as e:
@@ -314,6 +386,7 @@ class TechnicalAnalysis:
         """Executa varredura completa do mercado com processamento paralelo"""
         try:
             scan_start_time = time.time()
+            scan_start = time.perf_counter()
             current_time = datetime.now().strftime('%d/%m/%Y %H:%M:%S')
             
             print(f"\n{'='*80}")
@@ -324,18 +397,26 @@ class TechnicalAnalysis:
             if not self.top_pairs:
                 print("🔄 Carregando pares iniciais...")
                 print(f"🔍 Estado atual: top_pairs={len(self.top_pairs)}, all_usdt_pairs={len(self.all_usdt_pairs)}")
-                if not self._initialize_pairs():
+                with SCAN_STAGE_SECONDS.time(stage='pair_selection'):
+                    initialized = self._initialize_pairs()
+                if not initialized:
                     print("❌ Falha ao carregar pares iniciais")
                     return []
                 print(f"✅ Pares carregados: {len(self.top_pairs)} pares disponíveis")
             
             print(f"📊 Analisando {len(self.top_pairs)} pares de criptomoedas...")
-            print(f"⚡ Processamento paralelo: Máximo 10 threads")
+            if self.config['process_pool_analysis']:
+                print(f"⚡ Scan em pipeline: busca de klines → {analysis_pool.max_workers} processos de análise")
+            elif self.config['batch_analysis']:
+                print("⚡ Análise vetorizada em lote (busca de klines com até 10 threads)")
+            else:
+                print(f"⚡ Processamento paralelo: Máximo 10 threads")
             
             # Verificar se precisa atualizar lista de pares
             if time.time() - self.pairs_last_update >= self.config['pairs_update_interval']:
                 print("🔄 Atualizando lista de pares top 100...")
-                self._create_top_pairs()
+                with SCAN_STAGE_SECONDS.time(stage='pair_selection'):
+                    self._create_top_pairs()
             
             # Processamento paralelo com ThreadPoolExecutor
             signals = []
@@ -343,41 +424,49 @@ class TechnicalAnalysis:
             rejected_pairs = []
             max_workers = min(10, len(self.top_pairs))  # Máximo 10 threads
             
-            with ThreadPoolExecutor(max_workers=max_workers) as executor:
-                # Submeter todas as análises para execução paralela
-                future_to_symbol = {
-                    executor.submit(self._analyze_symbol_safe, symbol): symbol 
-                    for symbol in self.top_pairs
-                }
+            if self.config['process_pool_analysis']:
+                analyzed_pairs, rejected_pairs = self._scan_market_pipelined()
+            elif self.config['batch_analysis']:
+                analyzed_pairs, rejected_pairs = self._scan_market_batch()
+            else:
+                with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                    # Submeter todas as análises para execução paralela
+                    future_to_symbol = {
+                        executor.submit(self._analyze_symbol_safe, symbol): symbol 
+                        for symbol in self.top_pairs
+                    }
                 
-                # Processar resultados conforme completam
-                completed = 0
-                for future in as_completed(future_to_symbol):
-                    symbol = future_to_symbol[future]
-                    completed += 1
+                    # Processar resultados conforme completam
+                    completed = 0
+                    for future in as_completed(future_to_symbol):
+                        symbol = future_to_symbol[future]
+                        completed += 1
                     
-                    try:
-                        signal = future.result()
-                        analyzed_pairs.append(symbol)
+                        try:
+                            signal = future.result()
+                            analyzed_pairs.append(symbol)
                         
-                        if signal:
-                            # Sinal foi enviado para confirmação BTC
-                            print(f"⏳ PRÉ-SINAL DETECTADO: {symbol} - {signal['type']} - Score: {signal['quality_score']:.1f} - Classe: {signal['signal_class']} (Aguardando confirmação BTC)")
-                            # Não adicionar à lista de sinais - será processado pelo BTCSignalManager
-                        else:
+                            if signal:
+                                # Sinal foi enviado para confirmação BTC
+                                print(f"⏳ PRÉ-SINAL DETECTADO: {symbol} - {signal['type']} - Score: {signal['quality_score']:.1f} - Classe: {signal['signal_class']} (Aguardando confirmação BTC)")
+                                # Não adicionar à lista de sinais - será processado pelo BTCSignalManager
+                            else:
+                                rejected_pairs.append(symbol)
+                                
+                            # Mostrar progresso a cada 25 pares
+                            if completed % 25 == 0:
+                                print(f"📈 Progresso: {completed}/{len(self.top_pairs)} pares analisados ({(completed/len(self.top_pairs)*100):.1f}%)")
+                                    
+                        except Exception as e:
+                            print(f"❌ Erro ao analisar {symbol}: {e}")
                             rejected_pairs.append(symbol)
-                        
-                        # Mostrar progresso a cada 25 pares
-                        if completed % 25 == 0:
-                            print(f"📈 Progresso: {completed}/{len(self.top_pairs)} pares analisados ({(completed/len(self.top_pairs)*100):.1f}%)")
-                            
-                    except Exception as e:
-                        print(f"❌ Erro ao analisar {symbol}: {e}")
-                        rejected_pairs.append(symbol)
-                        continue
+                            continue
             
             # Estatísticas finais
             scan_duration = time.time() - scan_start_time
+            SCAN_STAGE_SECONDS.observe(time.perf_counter() - scan_start, stage='total')
+            SCAN_PAIRS.inc(len(analyzed_pairs) - len(rejected_pairs), result='candidate')
+            SCAN_PAIRS.inc(len(rejected_pairs), result='rejected')
             cache_stats = self.cache_manager.get_performance_stats()
             
             print(f"\n{'='*80}")
@@ -390,8 +479,38 @@ class TechnicalAnalysis:
             print(f"⚡ Threads utilizadas: {max_workers}")
             print(f"🗄️ Cache Hit Rate: {cache_stats['cache_hit_rate']:.1f}%")
             print(f"💾 API Calls Saved: {cache_stats['api_calls_saved']}")
+            print(f"🧮 Memória do cache de candles: {cache_stats['memory_mb']:.2f} MB")
+            limiter_stats = self.binance.rate_limiter.get_stats()
+            print(f"⚖️ Peso Binance usado (1m): {limiter_stats['server_used_weight']}/{limiter_stats['weight_limit']} | "
+                  f"Requisições aguardando orçamento: {limiter_stats['throttled_requests']}")
+            http_stats = http_pool.get_stats()
+            print(f"🔌 Conexões HTTP: {http_stats['connections_reused']} reutilizadas | "
+                  f"{http_stats['connections_opened']} abertas (handshakes) | "
+                  f"Reuso: {http_stats['reuse_rate']:.1f}%")
+            dedup_stats = request_coalescer.get_stats()
+            print(f"🔗 Requisições deduplicadas: {dedup_stats['requests_saved']} "
+                  f"(em andamento: {dedup_stats['coalesced_in_flight']} | "
+                  f"recentes: {dedup_stats['served_recent']}) | "
+                  f"Taxa: {dedup_stats['dedup_rate']:.1f}%")
+            snapshot_stats = ticker_snapshot.get_stats()
+            print(f"📈 Snapshot de ticker: {snapshot_stats['symbols']} pares | "
+                  f"Consultas: {snapshot_stats['lookups']} | "
+                  f"Downloads do mercado: {snapshot_stats['rest_refreshes']} | "
+                  f"Fonte: {snapshot_stats['source']}")
+            if self.config['process_pool_analysis']:
+                pool_stats = analysis_pool.get_stats()
+                print(f"🧵 Processos de análise: {pool_stats['max_workers']} | "
+                      f"CPU nos processos: {pool_stats['worker_cpu_seconds']:.2f}s | "
+                      f"Lotes: {pool_stats['chunks_submitted']} | "
+                      f"Fallback local: {pool_stats['local_fallbacks']}")
             print(f"🚀 Performance: {len(self.top_pairs)/scan_duration:.1f} pares/segundo")
             
+            if self.kline_stream:
+                stream_stats = self.kline_stream.get_stats()
+                print(f"📡 Klines via WebSocket: {stream_stats['served_from_memory']} | "
+                      f"Fallback REST: {stream_stats['memory_misses']} | "
+                      f"Conectado: {'sim' if stream_stats['connected'] else 'não'}")
+            
             # Obter estatísticas do BTCSignalManager
             btc_stats = self.btc_signal_manager.get_confirmation_metrics()
             
@@ -405,6 +524,14 @@ class TechnicalAnalysis:
             
             print(f"{'='*80}\n")
             
+            publish_event('scan', 'scan_completed', {
+                'pairs_scanned': len(self.top_pairs),
+                'signals_found': len(signals),
+                'symbols': [signal.get('symbol') for signal in signals],
+                'duration_seconds': round(scan_duration, 2),
+                'finished_at': datetime.now().strftime('%d/%m/%Y %H:%M:%S')
+            })
+            
             return signals
             
         except Exception as e:
@@ -420,69 +547,381 @@ class TechnicalAnalysis:
             print(f"❌ Erro thread-safe ao analisar {symbol}: {e}")
             return None
     
+    def _fetch_symbol_frames(self, symbol: str) -> Optional[Tuple[pd.DataFrame, pd.DataFrame]]:
+        """Obtém os DataFrames de tendência e entrada de um símbolo (None se insuficientes)"""
+        trend_df = self.get_klines(symbol, self.config['trend_timeframe'])
+        if trend_df is None or len(trend_df) < 50:
+            return None
+            
+        entry_df = self.get_klines(symbol, self.config['entry_timeframe'])
+        if entry_df is None or len(entry_df) < 50:
+            return None
+            
+        return trend_df, entry_df
+        
+    def _scan_market_batch(self) -> Tuple[List[str], List[str]]:
+        """Varredura em lote: klines buscadas em paralelo (I/O) e indicadores de
+        todos os pares calculados de uma vez em matrizes (símbolos × candles)
+            
+        Returns:
+            Tuple (pares analisados, pares rejeitados)
+        """
+        analyzed_pairs = []
+        rejected_pairs = []
+        frames: Dict[str, Tuple[pd.DataFrame, pd.DataFrame]] = {}
+            
+        # 1. Buscar klines (rede/cache - não depende do GIL)
+        fetch_start = time.time()
+        if self._can_fetch_async():
+            fetched = self._fetch_all_frames_async(self.top_pairs)
+            for symbol in self.top_pairs:
+                result = fetched.get(symbol)
+                if result is None:
+                    analyzed_pairs.append(symbol)
+                    rejected_pairs.append(symbol)
+                else:
+                    frames[symbol] = result
+        else:
+            max_workers = min(10, len(self.top_pairs))
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                future_to_symbol = {
+                    executor.submit(self._fetch_symbol_frames, symbol): symbol
+                    for symbol in self.top_pairs
+                }
+            
+                for future in as_completed(future_to_symbol):
+                    symbol = future_to_symbol[future]
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        print(f"❌ Erro ao obter klines de {symbol}: {e}")
+                        result = None
+                
+                    if result is None:
+                        analyzed_pairs.append(symbol)
+                        rejected_pairs.append(symbol)
+                    else:
+                        frames[symbol] = result
+        
+        # 2. Agrupar por número de candles (matrizes exigem o mesmo tamanho)
+        analysis_start = time.time()
+        SCAN_STAGE_SECONDS.observe(analysis_start - fetch_start, stage='kline_fetch')
+        indicators_seconds = scoring_seconds = 0.0
+        groups: Dict[Tuple[int, int], List[str]] = {}
+        for symbol in self.top_pairs:
+            if symbol in frames:
+                trend_df, entry_df = frames[symbol]
+                groups.setdefault((len(trend_df), len(entry_df)), []).append(symbol)
+        
+        # 3. Indicadores (estado incremental por símbolo) e entradas da pontuação
+        # de todo o grupo em poucas passadas
+        for symbols in groups.values():
+            step_start = time.perf_counter()
+            try:
+                indicators = [self._series_indicators(symbol, frames[symbol]) for symbol in symbols]
+                trend_analyses = self.analyze_trend_batch([frames[symbol][0] for symbol in symbols],
+                                                          [values[0] for values in indicators])
+                entry_analyses, patterns = self.analyze_entry_batch([frames[symbol][1] for symbol in symbols],
+                                                                    [values[1] for values in indicators])
+            except Exception as e:
+                print(f"❌ Erro na análise em lote ({len(symbols)} pares): {e}")
+                analyzed_pairs.extend(symbols)
+                rejected_pairs.extend(symbols)
+                continue
+            finally:
+                indicators_seconds += time.perf_counter() - step_start
+            
+            step_start = time.perf_counter()
+            for index, symbol in enumerate(symbols):
+                analyzed_pairs.append(symbol)
+                signal = self._evaluate_signal(
+                    symbol, trend_analyses[index], entry_analyses[index],
+                    frames[symbol][1], patterns[index]
+                )
+                
+                if signal:
+                    print(f"⏳ PRÉ-SINAL DETECTADO: {symbol} - {signal['type']} - Score: {signal['quality_score']:.1f} - Classe: {signal['signal_class']} (Aguardando confirmação BTC)")
+                else:
+                    rejected_pairs.append(symbol)
+            scoring_seconds += time.perf_counter() - step_start
+        
+        SCAN_STAGE_SECONDS.observe(indicators_seconds, stage='indicators')
+        SCAN_STAGE_SECONDS.observe(scoring_seconds, stage='scoring')
+        print(f"📦 Lote: {len(frames)} pares em {len(groups)} grupo(s) | "
+              f"Klines: {analysis_start - fetch_start:.2f}s | Análise: {time.time() - analysis_start:.2f}s")
+        
+        return analyzed_pairs, rejected_pairs
+    
+    def _scan_market_pipelined(self) -> Tuple[List[str], List[str]]:
+        """Varredura em pipeline: a busca de klines (threads/asyncio) envia lotes de
+        símbolos para processos de análise assim que ficam prontos; a pontuação e o
+        envio para confirmação BTC ficam no processo principal
+        
+        Returns:
+            Tuple (pares analisados, pares rejeitados)
+        """
+        analyzed_pairs = []
+        rejected_pairs = []
+        frames: Dict[str, Tuple[pd.DataFrame, pd.DataFrame]] = {}
+        chunk: Dict[str, Tuple[pd.DataFrame, pd.DataFrame]] = {}
+        futures = []
+        chunk_size = max(1, self.config['analysis_chunk_size'])
+        vectorized = self.config['batch_analysis']
+        trend_interval, entry_interval = self.config['trend_timeframe'], self.config['entry_timeframe']
+        
+        def submit_chunk() -> None:
+            # Só o estado incremental atual (objetos pequenos) segue com o lote: os
+            # processos semeiam/avançam EMA/MACD/RSI/ATR e devolvem o novo estado
+            states = {symbol: (indicator_engine.get_state(symbol, trend_interval),
+                               indicator_engine.get_state(symbol, entry_interval)) for symbol in chunk}
+            futures.append(analysis_pool.submit(dict(chunk), vectorized, states=states))
+            chunk.clear()
+        
+        def collect(symbol: str, result: Optional[Tuple[pd.DataFrame, pd.DataFrame]]) -> None:
+            if result is None:
+                analyzed_pairs.append(symbol)
+                rejected_pairs.append(symbol)
+                return
+            frames[symbol] = result
+            chunk[symbol] = result
+            if len(chunk) >= chunk_size:
+                submit_chunk()
+        
+        # 1. Busca (I/O) alimentando o estágio de análise (CPU): cada símbolo
+        # completo entra no lote atual, enviado aos processos ao encher
+        fetch_start = time.time()
+        if self._can_fetch_async():
+            self._fetch_all_frames_async(self.top_pairs, on_frames=collect)
+        else:
+            max_workers = min(10, len(self.top_pairs))
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                future_to_symbol = {
+                    executor.submit(self._fetch_symbol_frames, symbol): symbol
+                    for symbol in self.top_pairs
+                }
+                
+                for future in as_completed(future_to_symbol):
+                    symbol = future_to_symbol[future]
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        print(f"❌ Erro ao obter klines de {symbol}: {e}")
+                        result = None
+                    collect(symbol, result)
+        
+        if chunk:
+            submit_chunk()
+        fetch_duration = time.time() - fetch_start
+        SCAN_STAGE_SECONDS.observe(fetch_duration, stage='kline_fetch')
+        
+        # 2. Pontuação dos registros devolvidos pelos processos
+        # (indicadores rodam nos processos em paralelo à busca: o estágio
+        # 'analysis' é a espera pelos lotes restantes somada à pontuação e à
+        # gravação dos estados incrementais devolvidos)
+        analysis_start = time.perf_counter()
+        for future in as_completed(futures):
+            try:
+                records = future.result()
+            except Exception as e:
+                print(f"❌ Erro no lote de análise: {e}")
+                continue
+            
+            for record in records:
+                symbol = record['symbol']
+                analyzed_pairs.append(symbol)
+                trend_state, entry_state = record.get('indicator_states', (None, None))
+                indicator_engine.install(symbol, trend_interval, trend_state)
+                indicator_engine.install(symbol, entry_interval, entry_state)
+                if record['trend_analysis'] is None:
+                    rejected_pairs.append(symbol)
+                    continue
+                
+                signal = self._evaluate_signal(
+                    symbol, record['trend_analysis'], record['entry_analysis'],
+                    frames[symbol][1], record['patterns']
+                )
+                
+                if signal:
+                    print(f"⏳ PRÉ-SINAL DETECTADO: {symbol} - {signal['type']} - Score: {signal['quality_score']:.1f} - Classe: {signal['signal_class']} (Aguardando confirmação BTC)")
+                else:
+                    rejected_pairs.append(symbol)
+        
+        SCAN_STAGE_SECONDS.observe(time.perf_counter() - analysis_start, stage='analysis')
+        
+        # Lotes que falharam por inteiro contam como rejeitados
+        analyzed = set(analyzed_pairs)
+        missing = [symbol for symbol in frames if symbol not in analyzed]
+        analyzed_pairs.extend(missing)
+        rejected_pairs.extend(missing)
+        
+        print(f"📦 Pipeline: {len(frames)} pares em {len(futures)} lote(s) | "
+              f"Klines: {fetch_duration:.2f}s | Total: {time.time() - fetch_start:.2f}s")
+        
+        return analyzed_pairs, rejected_pairs
+    
+    def _can_fetch_async(self) -> bool:
+        """Verifica se a busca assíncrona pode ser usada (fora de um event loop ativo)"""
+        if not self.config['async_fetch'] or not getattr(self.binance, 'use_binance_api', False):
+            return False
+        try:
+            asyncio.get_running_loop()
+            return False
+        except RuntimeError:
+            return True
+    
+    def _fetch_all_frames_async(self, symbols: List[str],
+                                on_frames: Optional[Callable[[str, Optional[Tuple[pd.DataFrame, pd.DataFrame]]], None]] = None
+                                ) -> Dict[str, Tuple[pd.DataFrame, pd.DataFrame]]:
+        """Busca os DataFrames de tendência e entrada de todos os símbolos em uma única sessão asyncio
+        
+        `on_frames(symbol, frames)` é chamado assim que cada símbolo fica
+        completo (frames=None se os dados forem insuficientes).
+        """
+        return asyncio.run(self._gather_symbol_frames(symbols, on_frames=on_frames))
+    
+    async def _gather_symbol_frames(self, symbols: List[str], limit: int = 100,
+                                    on_frames: Optional[Callable[[str, Optional[Tuple[pd.DataFrame, pd.DataFrame]]], None]] = None
+                                    ) -> Dict[str, Tuple[pd.DataFrame, pd.DataFrame]]:
+        """Stream/cache primeiro; apenas as séries ausentes vão para a API, todas de uma vez
+        
+        Símbolos servidos da memória são entregues antes da primeira requisição;
+        os demais, na ordem em que suas séries chegam.
+        """
+        intervals = [self.config['trend_timeframe'], self.config['entry_timeframe']]
+        series: Dict[Tuple[str, str], Optional[pd.DataFrame]] = {}
+        remaining: Dict[str, int] = {}
+        pending = []
+        frames = {}
+        
+        def complete(symbol: str) -> None:
+            trend_df = series.get((symbol, intervals[0]))
+            entry_df = series.get((symbol, intervals[1]))
+            result = None
+            if trend_df is not None and len(trend_df) >= 50 and entry_df is not None and len(entry_df) >= 50:
+                result = frames[symbol] = (trend_df, entry_df)
+            if on_frames:
+                on_frames(symbol, result)
+        
+        for symbol in symbols:
+            for interval in intervals:
+                df = self._get_klines_from_memory(symbol, interval, limit)
+                if df is not None:
+                    series[(symbol, interval)] = df
+                else:
+                    pending.append((symbol, interval, limit))
+                    remaining[symbol] = remaining.get(symbol, 0) + 1
+            if symbol not in remaining:
+                complete(symbol)
+        
+        if pending:
+            async with AsyncBinanceClient(self.binance, max_concurrency=self.config['async_max_concurrency']) as client:
+                async for (symbol, interval), klines_data in client.iter_klines_many(pending):
+                    series[(symbol, interval)] = self._store_fetched_klines(symbol, interval, limit, klines_data)
+                    remaining[symbol] -= 1
+                    if remaining[symbol] == 0:
+                        complete(symbol)
+        return frames
+    
     def analyze_symbol(self, symbol: str) -> Optional[Dict[str, Any]]:
         """Analisa um símbolo específico e retorna sinal se qualificado"""
         try:
             # 1. Análise de Tendência (4H)
-            trend_df = self.get_klines(symbol, self.config['trend_timeframe'])
+            with SCAN_STEP_SECONDS.time(step='kline_fetch'):
+                trend_df = self.get_klines(symbol, self.config['trend_timeframe'])
             if trend_df is None or len(trend_df) < 50:
                 return None
             
-            trend_analysis = self.analyze_trend_df(trend_df)
+            with SCAN_STEP_SECONDS.time(step='indicators'):
+                trend_analysis = self.analyze_trend_df(trend_df, symbol, self.config['trend_timeframe'])
             if trend_analysis is None:
                 return None
             
             # 2. Análise de Entrada (1H)
-            entry_df = self.get_klines(symbol, self.config['entry_timeframe'])
+            with SCAN_STEP_SECONDS.time(step='kline_fetch'):
+                entry_df = self.get_klines(symbol, self.config['entry_timeframe'])
             if entry_df is None or len(entry_df) < 50:
                 return None
             
-            entry_analysis = self.analyze_entry_df(entry_df)
+            with SCAN_STEP_SECONDS.time(step='indicators'):
+                entry_analysis = self.analyze_entry_df(entry_df, symbol, self.config['entry_timeframe'])
             
-            # 3. Determinar tipo de sinal
-            signal_type = 'COMPRA' if trend_analysis['is_uptrend'] else 'VENDA'
-            entry_price = float(entry_df['close'].iloc[-1])
+            return self._evaluate_signal(symbol, trend_analysis, entry_analysis, entry_df)
             
-            # 4. Sistema de Pontuação (100 pontos total - sem BTC)
-            scores = self._calculate_signal_scores(
-                trend_analysis, entry_analysis, signal_type, entry_df
-            )
+        except Exception as e:
+            print(f"❌ Erro ao analisar {symbol}: {e}")
+            return None
+    
+    def _score_candidate(self, trend_analysis: Dict, entry_analysis: Dict, entry_price: float,
+                         entry_df: Optional[pd.DataFrame] = None,
+                         patterns: Optional[Dict[str, float]] = None) -> Optional[Dict[str, Any]]:
+        """Pontua um candidato e calcula classe e alvo (None se abaixo do mínimo de qualidade)
+        
+        Usado pela varredura ao vivo e pelo replay histórico (core/backtest_engine.py).
+        """
+        # 3. Determinar tipo de sinal
+        signal_type = 'COMPRA' if trend_analysis['is_uptrend'] else 'VENDA'
+        
+        # 4. Sistema de Pontuação (100 pontos total - sem BTC)
+        scores = self._calculate_signal_scores(
+            trend_analysis, entry_analysis, signal_type, entry_df, patterns
+        )
+        return self._build_candidate(signal_type, scores, entry_price, trend_analysis, entry_analysis)
+    
+    def _build_candidate(self, signal_type: str, scores: Dict[str, float], entry_price: float,
+                         trend_analysis: Dict, entry_analysis: Dict) -> Optional[Dict[str, Any]]:
+        """Aplica o mínimo de qualidade e calcula classe, alvo e projeção de pontuações já calculadas"""
+        quality_score = sum(scores.values())
+        
+        # 5. Filtro de qualidade básico (AJUSTADO PARA EQUILIBRIO)
+        if quality_score < self.config['quality_score_minimum']:
+            return None
+        
+        # 6. Classificação (ajustada para maior rigor)
+        signal_class = self._get_signal_classification(quality_score)
+        
+        # 7. Calcular alvo
+        target_price = self.calculate_target_price(
+            entry_price, signal_type, trend_analysis, entry_analysis, quality_score
+        )
+        
+        # 8. Calcular projeção
+        if signal_type == 'COMPRA':
+            projection = ((target_price - entry_price) / entry_price) * 100
+        else:
+            projection = ((entry_price - target_price) / entry_price) * 100
+        
+        return {
+            'type': signal_type,
+            'scores': scores,
+            'quality_score': quality_score,
+            'signal_class': signal_class,
+            'target_price': target_price,
+            'projection_percentage': projection
+        }
+    
+    def _evaluate_signal(self, symbol: str, trend_analysis: Dict, entry_analysis: Dict,
+                         entry_df: pd.DataFrame, patterns: Optional[Dict[str, float]] = None) -> Optional[Dict[str, Any]]:
+        """Pontua as análises de um símbolo e envia o pré-sinal para confirmação BTC"""
+        try:
+            entry_price = float(entry_df['close'].iloc[-1])
+            with SCAN_STEP_SECONDS.time(step='scoring'):
+                candidate = self._score_candidate(trend_analysis, entry_analysis, entry_price, entry_df, patterns)
+            if candidate is None:
+                return None
             
-            quality_score = sum(scores.values())
+            signal_type = candidate['type']
+            scores = candidate['scores']
+            quality_score = candidate['quality_score']
             
             # 4.5. Sistema de ranking removido - todas as moedas são elegíveis
             # Mantendo apenas a pontuação base da análise técnica
             print(f"   📊 {symbol}: Pontuação base: {quality_score:.1f} pts (sem filtro de ranking)")
             
-            # 5. Filtro de qualidade básico (AJUSTADO PARA EQUILIBRIO)
-            if quality_score < 65.0:  # Threshold ajustado para 65 pontos
-                return None
-            
-            # 6. Classificação (ajustada para maior rigor)
-            if quality_score >= 90:
-                signal_class = 'ELITE'
-            elif quality_score >= 85:
-                signal_class = 'PREMIUM+'
-            elif quality_score >= 80:
-                signal_class = 'PREMIUM'
-            else:
-                signal_class = 'STANDARD'
-            
-            # 7. Calcular alvo
-            target_price = self.calculate_target_price(
-                entry_price, signal_type, trend_analysis, entry_analysis, quality_score
-            )
-            
-            # 8. Calcular projeção
-            if signal_type == 'COMPRA':
-                projection = ((target_price - entry_price) / entry_price) * 100
-            else:
-                projection = ((entry_price - target_price) / entry_price) * 100
-            
             # 9. Calcular correlação e tendência BTC
             btc_analyzer = self.btc_signal_manager.btc_analyzer
-            btc_correlation = btc_analyzer.calculate_symbol_btc_correlation(symbol)
-            btc_analysis = btc_analyzer.get_current_btc_analysis()
+            with SCAN_STEP_SECONDS.time(step='btc_correlation'):
+                btc_correlation = btc_analyzer.calculate_symbol_btc_correlation(symbol)
+                btc_analysis = btc_analyzer.get_current_btc_analysis()
             btc_trend = btc_analysis.get('trend', 'NEUTRAL')
             
             # 10. Capturar motivos detalhados de geração
@@ -495,10 +934,10 @@ class TechnicalAnalysis:
                 'symbol': symbol,
                 'type': signal_type,
                 'entry_price': entry_price,
-                'target_price': target_price,
-                'projection_percentage': projection,
+                'target_price': candidate['target_price'],
+                'projection_percentage': candidate['projection_percentage'],
                 'quality_score': quality_score,
-                'signal_class': signal_class,
+                'signal_class': candidate['signal_class'],
                 'rsi': entry_analysis.get('rsi', 50),
                 'trend_score': scores['trend'],
                 'entry_score': scores['entry'],
@@ -515,7 +954,8 @@ class TechnicalAnalysis:
             }
             
             # 12. Enviar para sistema de confirmação BTC
-            signal_id = self.btc_signal_manager.add_pending_signal(signal)
+            with SCAN_STEP_SECONDS.time(step='add_pending_signal'):
+                signal_id = self.btc_signal_manager.add_pending_signal(signal)
             
             # Não retornar sinal diretamente - será confirmado pelo BTCSignalManager
             return None
@@ -668,8 +1108,13 @@ class TechnicalAnalysis:
             return 'Americana'
     
     def _calculate_signal_scores(self, trend_analysis: Dict, entry_analysis: Dict, 
-                           signal_type: str, entry_df: pd.DataFrame) -> Dict[str, float]:
-        """Calcula pontuação detalhada do sinal (100 pontos total - sem BTC)"""
+                           signal_type: str, entry_df: pd.DataFrame,
+                           patterns: Optional[Dict[str, float]] = None) -> Dict[str, float]:
+        """Calcula pontuação detalhada do sinal (100 pontos total - sem BTC)
+        
+        `patterns` permite informar distâncias de suporte/resistência e a pontuação
+        de candle já calculadas em lote (ver analyze_entry_batch).
+        """
         scores = {'trend': 0.0, 'entry': 0.0, 'rsi': 0.0, 'pattern': 0.0}  # Usar float
         
         # 1. TENDÊNCIA 4H (35 pontos)
@@ -720,9 +1165,12 @@ class TechnicalAnalysis:
         
         # 4. PADRÕES TÉCNICOS (20 pontos)
         # Suporte/Resistência (10 pts)
-        support_resistance = self.calculate_support_resistance_levels(
-            entry_df, float(entry_df['close'].iloc[-1])
-        )
+        if patterns is not None:
+            support_resistance = patterns
+        else:
+            support_resistance = self.calculate_support_resistance_levels(
+                entry_df, float(entry_df['close'].iloc[-1])
+            )
         
         if signal_type == 'COMPRA':
             distance = support_resistance.get('support_distance', 0)
@@ -735,7 +1183,9 @@ class TechnicalAnalysis:
             scores['pattern'] += 5.0
         
         # Padrões de candlestick (10 pts)
-        if len(entry_df) >= 3:
+        if patterns is not None:
+            scores['pattern'] += float(patterns['candle_scores'][signal_type])
+        elif len(entry_df) >= 3:
             candle_score = self._analyze_candlestick_patterns(entry_df, signal_type)
             scores['pattern'] += float(candle_score)  # Garantir que é float
         
@@ -904,17 +1354,67 @@ class TechnicalAnalysis:
     def get_klines(self, symbol: str, interval: str, limit: int = 100) -> Optional[pd.DataFrame]:
         """Obtém dados de klines (candlesticks) com cache inteligente"""
         try:
-            # Tentar obter do cache primeiro
-            cached_data, is_cache_hit = self.cache_manager.get_klines(symbol, interval, limit)
-            
-            if is_cache_hit:
-                return cached_data
+            result = self._get_klines_from_memory(symbol, interval, limit)
+            if result is not None:
+                return result
             
             # Cache miss - buscar da API
             klines_data = self.binance.get_klines(symbol, interval, limit)
+            return self._store_fetched_klines(symbol, interval, limit, klines_data)
+            
+        except Exception as e:
+            print(f"❌ Erro ao obter klines para {symbol}: {e}")
+            return None
+    
+    def _get_klines_from_memory(self, symbol: str, interval: str, limit: int = 100) -> Optional[pd.DataFrame]:
+        """Obtém klines do stream WebSocket ou do cache (None se for preciso ir à API)"""
+        # Stream WebSocket em memória - sem chamadas REST
+        if self.kline_stream:
+            stream_klines = self.kline_stream.get_klines(symbol, interval, limit)
+            if stream_klines:
+                return self._klines_to_dataframe(stream_klines)
+        
+        # Tentar obter do cache
+        cached_data, is_cache_hit = self.cache_manager.get_klines(symbol, interval, limit)
+        return cached_data if is_cache_hit else None
+    
+    def _store_fetched_klines(self, symbol: str, interval: str, limit: int,
+                              klines_data: List[Dict[str, Any]]) -> Optional[pd.DataFrame]:
+        """Converte klines obtidas da API, alimenta stream e cache"""
+        try:
             if not klines_data:
                 return None
                 
+            # Alimentar o stream com o histórico obtido via REST
+            if self.kline_stream:
+                self.kline_stream.seed(symbol, interval, klines_data)
+            
+            self._archive_klines(symbol, interval, klines_data)
+            
+            result = self._klines_to_dataframe(klines_data)
+            if result is not None:
+                # Armazenar no cache para próximas consultas
+                self.cache_manager.set_klines(symbol, interval, result, limit)
+            
+            return result
+            
+        except Exception as e:
+            print(f"❌ Erro ao armazenar klines para {symbol}: {e}")
+            return None
+    
+    def _archive_klines(self, symbol: str, interval: str, klines_data: List[Dict[str, Any]]) -> None:
+        """Grava no arquivo local os candles já fechados (apenas os mais novos que o arquivo)"""
+        archive = getattr(self, 'candle_archive', None)
+        if archive is None:
+            return
+        try:
+            archive.append(symbol, interval, klines_data, closed_before_ms=int(time.time() * 1000))
+        except Exception as e:
+            print(f"❌ Erro ao arquivar klines de {symbol}: {e}")
+    
+    def _klines_to_dataframe(self, klines_data: List[Dict[str, Any]]) -> Optional[pd.DataFrame]:
+        """Converte lista de klines em DataFrame OHLCV"""
+        try:
             # Converter para DataFrame
             df = pd.DataFrame(klines_data)
             
@@ -926,36 +1426,55 @@ class TechnicalAnalysis:
             
             # Garantir que retornamos apenas DataFrame ou None
             if all(col in df.columns for col in numeric_columns):
+                # Manter open_time para o estado incremental dos indicadores
+                columns = (['open_time'] if 'open_time' in df.columns else []) + numeric_columns
                 # Usar to_frame() se for Series, senão usar copy() diretamente
-                result = df[numeric_columns].copy()
+                result = df[columns].copy()
                 # Garantir que é sempre DataFrame
                 if isinstance(result, pd.Series):
                     result = result.to_frame().T
                 
-                # Armazenar no cache para próximas consultas
-                self.cache_manager.set_klines(symbol, interval, result, limit)
-                
                 return result
             else:
                 return None
             
         except Exception as e:
-            print(f"❌ Erro ao obter klines para {symbol}: {e}")
+            print(f"❌ Erro ao converter klines: {e}")
             return None
     
-    def analyze_trend_df(self, df: pd.DataFrame) -> Optional[Dict]:
-        """Analisa tendência do DataFrame"""
+    def _get_indicators(self, df: pd.DataFrame, symbol: Optional[str] = None,
+                        interval: Optional[str] = None) -> Dict[str, float]:
+        """Obtém EMA/MACD/RSI/ATR do motor incremental (estado por símbolo/intervalo)"""
+        if symbol and interval:
+            return indicator_engine.update(symbol, interval, df)
+        return indicator_engine.compute(df)
+    
+    def _series_indicators(self, symbol: str,
+                           frames: Tuple[pd.DataFrame, pd.DataFrame]) -> Tuple[Dict[str, float], Dict[str, float]]:
+        """Indicadores de tendência e entrada de um símbolo pelo motor incremental
+        
+        Fonte única de EMA/MACD/RSI/ATR da varredura: os modos em lote e em
+        pipeline recebem estes valores em vez de recalcular sobre a janela.
+        """
+        trend_df, entry_df = frames
+        return (self._get_indicators(trend_df, symbol, self.config['trend_timeframe']),
+                self._get_indicators(entry_df, symbol, self.config['entry_timeframe']))
+    
+    def analyze_trend_df(self, df: pd.DataFrame, symbol: Optional[str] = None,
+                         interval: Optional[str] = None,
+                         indicators: Optional[Dict[str, float]] = None) -> Optional[Dict]:
+        """Analisa tendência do DataFrame
+        
+        `indicators` permite informar EMA/MACD/RSI/ATR já calculados (ver _series_indicators).
+        """
         try:
             # Calcular indicadores
-            close_series = pd.Series(df['close'].values, dtype=float)
-            ema20 = EMAIndicator(close=close_series, window=20).ema_indicator()
-            ema50 = EMAIndicator(close=close_series, window=50).ema_indicator()
-            macd_line = MACD(close=close_series).macd()
-            macd_signal = MACD(close=close_series).macd_signal()
+            if indicators is None:
+                indicators = self._get_indicators(df, symbol, interval)
             
             current_price = df['close'].iloc[-1]
-            current_ema20 = ema20.iloc[-1]
-            current_ema50 = ema50.iloc[-1]
+            current_ema20 = indicators['ema20']
+            current_ema50 = indicators['ema50']
             
             # Detectar tendências
             is_uptrend = (
@@ -978,31 +1497,30 @@ class TechnicalAnalysis:
                 'close': current_price,
                 'ema20': current_ema20,
                 'ema50': current_ema50,
-                'macd_signal': macd_line.iloc[-1] - macd_signal.iloc[-1]
+                'macd_signal': indicators['macd'] - indicators['macd_signal']
             }
             
         except Exception as e:
             print(f"❌ Erro na análise de tendência: {e}")
             return None
     
-    def analyze_entry_df(self, df: pd.DataFrame) -> Dict[str, Any]:
-        """Analisa condições de entrada no timeframe menor"""
+    def analyze_entry_df(self, df: pd.DataFrame, symbol: Optional[str] = None,
+                         interval: Optional[str] = None,
+                         indicators: Optional[Dict[str, float]] = None) -> Dict[str, Any]:
+        """Analisa condições de entrada no timeframe menor
+        
+        `indicators` permite informar EMA/MACD/RSI/ATR já calculados (ver _series_indicators).
+        """
         try:
             # Calcular indicadores
-            close_series = pd.Series(df['close'].values, dtype=float)
-            high_series = pd.Series(df['high'].values, dtype=float)
-            low_series = pd.Series(df['low'].values, dtype=float)
-            
-            ema20 = EMAIndicator(close=close_series, window=20).ema_indicator()
-            ema50 = EMAIndicator(close=close_series, window=50).ema_indicator()
-            rsi = RSIIndicator(close=close_series, window=14).rsi()
-            atr = AverageTrueRange(high=high_series, low=low_series, close=close_series, window=14).average_true_range()
+            if indicators is None:
+                indicators = self._get_indicators(df, symbol, interval)
             
             current_price = df['close'].iloc[-1]
-            current_ema20 = ema20.iloc[-1]
-            current_ema50 = ema50.iloc[-1]
-            current_rsi = rsi.iloc[-1]
-            current_atr = atr.iloc[-1]
+            current_ema20 = indicators['ema20']
+            current_ema50 = indicators['ema50']
+            current_rsi = indicators['rsi']
+            current_atr = indicators['atr']
             
             # Calcular ATR ratio para volatilidade
             atr_ratio = current_atr / current_price if current_price > 0 else 0.02
@@ -1037,4 +1555,101 @@ class TechnicalAnalysis:
                 'price_change': 0.0,
                 'momentum_positive': False,
                 'volume_ratio': 1.0
-            }
\ No newline at end of file
+            }
+    
+    @staticmethod
+    def _indicator_arrays(arrays: Dict[str, np.ndarray],
+                          indicators: Optional[Union[List[Dict[str, float]], Dict[str, np.ndarray]]] = None) -> Dict[str, np.ndarray]:
+        """Indicadores do último candle de cada linha: informados (um dict por linha ou
+        colunas, ex.: IncrementalIndicatorEngine.replay) ou calculados em lote"""
+        if indicators is None:
+            return batch_calculator.indicators(arrays)
+        if isinstance(indicators, dict):
+            values = {name: np.asarray(column, dtype=np.float64) for name, column in indicators.items()}
+        else:
+            values = {name: np.array([row[name] for row in indicators], dtype=np.float64) for name in indicators[0]}
+        values['close'] = arrays['close'][:, -1].copy()
+        return values
+    
+    def analyze_trend_batch(self, frames: List[pd.DataFrame],
+                            indicators: Optional[List[Dict[str, float]]] = None) -> List[Dict[str, Any]]:
+        """Versão vetorizada de analyze_trend_df para DataFrames de mesmo tamanho"""
+        return self.analyze_trend_arrays(batch_calculator.stack(frames), indicators)
+    
+    def analyze_trend_arrays(self, arrays: Dict[str, np.ndarray],
+                             indicators: Optional[Union[List[Dict[str, float]], Dict[str, np.ndarray]]] = None) -> List[Dict[str, Any]]:
+        """analyze_trend_batch sobre matrizes OHLCV (uma linha por janela de candles)"""
+        indicators = self._indicator_arrays(arrays, indicators)
+        
+        current_price = indicators['close']
+        ema20 = indicators['ema20']
+        ema50 = indicators['ema50']
+        macd_signal = indicators['macd'] - indicators['macd_signal']
+        
+        # Mesmos critérios de analyze_trend_df
+        is_uptrend = (current_price > ema20 * 0.995) & (ema20 > ema50 * 1.005)
+        is_downtrend = (current_price < ema20 * 1.005) & (ema20 < ema50 * 0.995)
+        trend_strength = np.abs(current_price - ema20) / current_price
+        
+        return [
+            {
+                'is_uptrend': bool(is_uptrend[i]),
+                'is_downtrend': bool(is_downtrend[i]),
+                'trend_strength': float(trend_strength[i]),
+                'close': float(current_price[i]),
+                'ema20': float(ema20[i]),
+                'ema50': float(ema50[i]),
+                'macd_signal': float(macd_signal[i])
+            }
+            for i in range(len(current_price))
+        ]
+    
+    def analyze_entry_batch(self, frames: List[pd.DataFrame],
+                            indicators: Optional[List[Dict[str, float]]] = None) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """Versão vetorizada de analyze_entry_df para DataFrames de mesmo tamanho
+        
+        Returns:
+            Tuple (análises de entrada, padrões para _calculate_signal_scores)
+        """
+        return self.analyze_entry_arrays(batch_calculator.stack(frames), indicators)
+    
+    def analyze_entry_arrays(self, arrays: Dict[str, np.ndarray],
+                             indicators: Optional[Union[List[Dict[str, float]], Dict[str, np.ndarray]]] = None) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """analyze_entry_batch sobre matrizes OHLCV (uma linha por janela de candles)"""
+        indicators = self._indicator_arrays(arrays, indicators)
+        momentum = batch_calculator.momentum(arrays)
+        levels = batch_calculator.support_resistance(arrays)
+        candle_scores = batch_calculator.candlestick_scores(arrays)
+        
+        current_price = indicators['close']
+        ema20 = indicators['ema20']
+        ema50 = indicators['ema50']
+        
+        # Mesmos critérios de analyze_entry_df
+        with np.errstate(divide='ignore', invalid='ignore'):
+            atr_ratio = np.where(current_price > 0, indicators['atr'] / current_price, 0.02)
+        is_uptrend = (current_price > ema20 * 0.99) & (ema20 > ema50 * 1.002)
+        is_downtrend = (current_price < ema20 * 1.01) & (ema20 < ema50 * 0.998)
+        
+        analyses = []
+        patterns = []
+        for i in range(len(current_price)):
+            analyses.append({
+                'is_uptrend': bool(is_uptrend[i]),
+                'is_downtrend': bool(is_downtrend[i]),
+                'rsi': float(indicators['rsi'][i]),
+                'price_change': float(momentum['price_change'][i]),
+                'momentum_positive': bool(momentum['price_change'][i] > 0),
+                'volume_ratio': float(momentum['volume_ratio'][i]),
+                'atr_ratio': float(atr_ratio[i])
+            })
+            patterns.append({
+                'support_distance': float(levels['support_distance'][i]),
+                'resistance_distance': float(levels['resistance_distance'][i]),
+                'candle_scores': {
+                    'COMPRA': float(candle_scores['COMPRA'][i]),
+                    'VENDA': float(candle_scores['VENDA'][i])
+                }
+            })
+        
+        return analyses, patterns
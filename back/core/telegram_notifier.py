@@ -1,9 +1,9 @@
-import requests
 import json
 import os
 from typing import Optional
 from datetime import datetime
 from .database import Database
+from .http_pool import http_pool
 
 class TelegramNotifier:
     def __init__(self, token: Optional[str] = None, chat_id: Optional[str] = None):
@@ -55,7 +55,7 @@ class TelegramNotifier:
             }
             
             print(f"📤 Tentando enviar mensagem para {self.chat_id}")
-            response = requests.post(url, json=data)
+            response = http_pool.post(url, json=data, timeout=30)
             
             if response.status_code == 200:
                 print("✅ Mensagem enviada com sucesso")
@@ -0,0 +1,323 @@
+# -*- coding: utf-8 -*-
+"""
+Ticker Snapshot - Foto do ticker 24h de todo o mercado compartilhada pelo processo
+Uma única requisição /fapi/v1/ticker/24hr (ou o stream !ticker@arr) atualiza uma
+matriz NumPy indexada por símbolo; scanner, confirmação de sinais, monitoramento e
+rotas de preço consultam o mesmo snapshot em O(1) em vez de baixar o mercado
+inteiro a cada sinal.
+"""
+
+import json
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+try:
+    import websocket
+    WEBSOCKET_AVAILABLE = True
+except ImportError:
+    websocket = None
+    WEBSOCKET_AVAILABLE = False
+
+# Colunas da matriz do snapshot (uma linha por símbolo)
+TICKER_FIELDS = ('last_price', 'open_price', 'high_price', 'low_price',
+                 'volume', 'quote_volume', 'price_change_percent', 'updated_at')
+_COL = {name: i for i, name in enumerate(TICKER_FIELDS)}
+
+# Campos REST (/fapi/v1/ticker/24hr) e do stream (!ticker@arr) de cada coluna
+_REST_FIELDS = ('lastPrice', 'openPrice', 'highPrice', 'lowPrice', 'volume', 'quoteVolume', 'priceChangePercent')
+_STREAM_FIELDS = ('c', 'o', 'h', 'l', 'v', 'q', 'P')
+
+
+class TickerSnapshotService:
+    """
+    Snapshot do ticker 24h de todos os pares
+
+    Leituras usam um dicionário símbolo → linha e uma matriz float64; a atualização
+    via REST troca a matriz inteira e o stream escreve só as linhas alteradas.
+    Sem thread de fundo ativa, o snapshot é atualizado na leitura quando passa
+    de `refresh_interval` segundos (uma única requisição mesmo com várias threads).
+    """
+
+    def __init__(self, rest_client: Any = None, refresh_interval: Optional[float] = None,
+                 use_stream: Optional[bool] = None, ws_url: Optional[str] = None,
+                 stream_stale_after: float = 30.0, clock: Callable[[], float] = time.time):
+        """Inicializa o serviço
+
+        Args:
+            rest_client: Cliente com make_request (cria BinanceClient na primeira atualização se None)
+            refresh_interval: Idade máxima do snapshot em segundos (padrão: TICKER_SNAPSHOT_INTERVAL ou 5)
+            use_stream: Usar o stream !ticker@arr em start() (padrão: USE_TICKER_STREAM)
+            ws_url: URL base do WebSocket (padrão: ws_base_url do cliente REST)
+            stream_stale_after: Segundos sem mensagens para considerar o stream parado
+            clock: Função de tempo (injetável para testes)
+        """
+        self._rest_client = rest_client
+        self.refresh_interval = (refresh_interval if refresh_interval is not None
+                                 else float(os.getenv('TICKER_SNAPSHOT_INTERVAL', '5')))
+        self.use_stream = (use_stream if use_stream is not None
+                           else os.getenv('USE_TICKER_STREAM', 'true').lower() == 'true')
+        self.ws_url = ws_url
+        self.stream_stale_after = stream_stale_after
+        self.clock = clock
+
+        self.index: Dict[str, int] = {}
+        self.data = np.empty((0, len(TICKER_FIELDS)), dtype=np.float64)
+        self.updated_at = 0.0
+        self.last_attempt = 0.0
+        self.last_stream_message = 0.0
+
+        self.lock = threading.Lock()
+        self.refresh_lock = threading.Lock()
+        self.is_running = False
+        self._thread: Optional[threading.Thread] = None
+        self._ws_app = None
+
+        self.stats = {
+            'rest_refreshes': 0,
+            'refresh_errors': 0,
+            'stream_messages': 0,
+            'lookups': 0,
+            'misses': 0
+        }
+
+    @property
+    def rest_client(self):
+        if self._rest_client is None:
+            from .binance_client import BinanceClient
+            self._rest_client = BinanceClient(priority='confirmation')
+        return self._rest_client
+
+    # ------------------------------------------------------------------
+    # Atualização
+    # ------------------------------------------------------------------
+
+    def refresh(self) -> bool:
+        """Baixa o ticker 24h de todo o mercado em uma requisição e troca o snapshot"""
+        try:
+            response = self.rest_client.make_request('/fapi/v1/ticker/24hr')
+            if not response or not isinstance(response, list):
+                self.stats['refresh_errors'] += 1
+                return False
+
+            now = self.clock()
+            index: Dict[str, int] = {}
+            rows = []
+            for item in response:
+                try:
+                    row = [float(item[field]) for field in _REST_FIELDS]
+                except (KeyError, TypeError, ValueError):
+                    continue
+                index[item['symbol']] = len(rows)
+                rows.append(row + [now])
+
+            data = np.array(rows, dtype=np.float64).reshape(len(rows), len(TICKER_FIELDS))
+            with self.lock:
+                self.index = index
+                self.data = data
+                self.updated_at = now
+                self.stats['rest_refreshes'] += 1
+            return True
+
+        except Exception as e:
+            self.stats['refresh_errors'] += 1
+            print(f"❌ Erro ao atualizar snapshot de ticker: {e}")
+            return False
+
+    def handle_message(self, message: str) -> None:
+        """Aplica uma mensagem do stream !ticker@arr (só os pares alterados)"""
+        try:
+            payload = json.loads(message)
+            events = payload.get('data', payload) if isinstance(payload, dict) else payload
+            if isinstance(events, dict):
+                events = [events]
+
+            now = self.clock()
+            with self.lock:
+                new_rows = []
+                for event in events:
+                    if event.get('e') != '24hrTicker':
+                        continue
+                    try:
+                        row = [float(event[field]) for field in _STREAM_FIELDS] + [now]
+                    except (KeyError, TypeError, ValueError):
+                        continue
+                    position = self.index.get(event['s'])
+                    if position is None:
+                        new_rows.append((event['s'], row))
+                    else:
+                        self.data[position] = row
+
+                if new_rows:
+                    # Par novo: crescer a matriz (raro; o REST inicial traz o mercado todo)
+                    start = len(self.data)
+                    self.data = np.vstack([self.data, np.array([row for _, row in new_rows])])
+                    for offset, (symbol, _) in enumerate(new_rows):
+                        self.index[symbol] = start + offset
+
+                self.updated_at = now
+                self.last_stream_message = now
+                self.stats['stream_messages'] += 1
+
+        except Exception as e:
+            print(f"❌ TickerSnapshot: erro ao processar mensagem: {e}")
+
+    def is_stream_live(self) -> bool:
+        """Indica se o stream entregou mensagens recentemente"""
+        return self.is_running and self.clock() - self.last_stream_message <= self.stream_stale_after
+
+    def ensure_fresh(self) -> None:
+        """Atualiza via REST se o snapshot passou da idade máxima"""
+        if self._is_recent() or self.is_stream_live():
+            return
+        with self.refresh_lock:
+            # Outra thread pode ter atualizado enquanto esperávamos
+            if not self._is_recent():
+                self.last_attempt = self.clock()
+                self.refresh()
+
+    def _is_recent(self) -> bool:
+        # Falhas também contam como tentativa para não repetir o download a cada leitura
+        return self.clock() - max(self.updated_at, self.last_attempt) <= self.refresh_interval
+
+    # ------------------------------------------------------------------
+    # Ciclo de vida (stream ou atualização periódica em segundo plano)
+    # ------------------------------------------------------------------
+
+    def start(self) -> bool:
+        """Inicia o stream !ticker@arr (ou a atualização periódica via REST)"""
+        if self.is_running:
+            return False
+        if not getattr(self.rest_client, 'use_binance_api', False):
+            print("⚠️ Snapshot de ticker: API Binance desabilitada")
+            return False
+
+        self.is_running = True
+        self.refresh()
+
+        streaming = self.use_stream and WEBSOCKET_AVAILABLE
+        target = self._stream_loop if streaming else self._poll_loop
+        self._thread = threading.Thread(target=target, name="TickerSnapshot", daemon=True)
+        self._thread.start()
+        print(f"✅ Snapshot de ticker iniciado ({'stream !ticker@arr' if streaming else f'REST a cada {self.refresh_interval:.0f}s'})")
+        return True
+
+    def stop(self) -> None:
+        """Para o stream/atualização periódica"""
+        self.is_running = False
+        if self._ws_app is not None:
+            try:
+                self._ws_app.close()
+            except Exception:
+                pass
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join(timeout=5)
+        self._thread = None
+
+    def _poll_loop(self) -> None:
+        while self.is_running:
+            time.sleep(self.refresh_interval)
+            if self.is_running:
+                self.refresh()
+
+    def _stream_loop(self) -> None:
+        base_url = (self.ws_url or getattr(self.rest_client, 'ws_base_url', None)
+                    or 'wss://fstream.binance.com').rstrip('/')
+        url = f"{base_url}/ws/!ticker@arr"
+
+        while self.is_running:
+            self._ws_app = websocket.WebSocketApp(
+                url,
+                on_message=lambda ws, message: self.handle_message(message),
+                on_error=lambda ws, error: print(f"⚠️ TickerSnapshot erro: {error}")
+            )
+            try:
+                self._ws_app.run_forever(ping_interval=180, ping_timeout=10)
+            except Exception as e:
+                print(f"❌ TickerSnapshot falha na conexão: {e}")
+            if self.is_running:
+                # Leituras voltam a usar REST enquanto o stream está fora
+                time.sleep(5)
+
+    # ------------------------------------------------------------------
+    # Consultas
+    # ------------------------------------------------------------------
+
+    def _row(self, symbol: str) -> Optional[np.ndarray]:
+        self.ensure_fresh()
+        with self.lock:
+            self.stats['lookups'] += 1
+            position = self.index.get(symbol)
+            if position is None:
+                self.stats['misses'] += 1
+                return None
+            return self.data[position].copy()
+
+    @staticmethod
+    def _as_ticker(row: np.ndarray) -> Dict[str, float]:
+        """Mesmo formato de BinanceClient.get_24h_ticker_data (+ lastPrice)"""
+        last_price = float(row[_COL['last_price']])
+        return {
+            'volume': float(row[_COL['volume']]) * last_price,
+            'priceChangePercent': float(row[_COL['price_change_percent']]),
+            'volatility': (abs(float(row[_COL['high_price']]) - float(row[_COL['low_price']])) / last_price * 100
+                           if last_price else 0.0),
+            'lastPrice': last_price
+        }
+
+    def get_ticker(self, symbol: str) -> Optional[Dict[str, float]]:
+        """Ticker 24h de um símbolo"""
+        row = self._row(symbol)
+        return self._as_ticker(row) if row is not None else None
+
+    def get_ticker_data(self, symbols: List[str]) -> Dict[str, Dict[str, float]]:
+        """Substituto de BinanceClient.get_24h_ticker_data sem nova requisição"""
+        self.ensure_fresh()
+        with self.lock:
+            rows = {symbol: self.data[self.index[symbol]].copy() for symbol in symbols if symbol in self.index}
+            self.stats['lookups'] += len(symbols)
+            self.stats['misses'] += len(symbols) - len(rows)
+        return {symbol: self._as_ticker(row) for symbol, row in rows.items()}
+
+    def get_price(self, symbol: str) -> Optional[float]:
+        """Último preço de um símbolo"""
+        row = self._row(symbol)
+        return float(row[_COL['last_price']]) if row is not None else None
+
+    def get_prices(self) -> Dict[str, float]:
+        """Último preço de todos os símbolos"""
+        self.ensure_fresh()
+        with self.lock:
+            prices = self.data[:, _COL['last_price']].tolist()
+            return {symbol: prices[position] for symbol, position in self.index.items()}
+
+    def get_last_prices(self, symbols: List[str]) -> np.ndarray:
+        """Último preço de cada símbolo da lista, na mesma ordem (NaN se ausente)"""
+        self.ensure_fresh()
+        with self.lock:
+            positions = np.array([self.index.get(symbol, -1) for symbol in symbols], dtype=np.int64)
+            prices = np.full(len(symbols), np.nan)
+            found = positions >= 0
+            prices[found] = self.data[positions[found], _COL['last_price']]
+            self.stats['lookups'] += len(symbols)
+            self.stats['misses'] += int(len(symbols) - np.count_nonzero(found))
+        return prices
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Retorna estatísticas do snapshot"""
+        with self.lock:
+            lookups = self.stats['lookups']
+            return {
+                **self.stats,
+                'symbols': len(self.index),
+                'age_seconds': self.clock() - self.updated_at if self.updated_at else None,
+                'source': 'stream' if self.is_stream_live() else 'rest',
+                'hit_rate': (lookups - self.stats['misses']) / lookups * 100 if lookups > 0 else 0
+            }
+
+
+# Instância global para uso em outros módulos
+ticker_snapshot = TickerSnapshotService()
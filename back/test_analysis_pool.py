@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Teste do AnalysisProcessPool
+Valida o transporte dos candles por memória compartilhada, que a análise nos
+processos é idêntica à feita no processo principal e que o scan em pipeline envia
+lotes enquanto a busca assíncrona ainda está em andamento
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import asyncio
+import math
+from concurrent.futures import Future
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+
+from core import technical_analysis as technical_analysis_module
+from core.analysis_pool import AnalysisProcessPool, analyze_frames, pack_frames, unpack_frames
+from core.incremental_indicators import IncrementalIndicatorEngine
+from core.technical_analysis import TechnicalAnalysis
+
+
+def _make_frames(n_symbols: int, seed: int = 7, open_time: bool = False):
+    """Gera pares (tendência, entrada) sintéticos com tamanhos variados"""
+    rng = np.random.default_rng(seed)
+    frames = {}
+    for s in range(n_symbols):
+        pair = []
+        for length in (100 - (s % 3), 100):
+            closes = 20.0 * np.exp(np.cumsum(rng.normal(0.001, 0.012, length)))
+            opens = np.concatenate([[closes[0]], closes[:-1]])
+            pair.append(pd.DataFrame({
+                'open': opens,
+                'high': np.maximum(opens, closes) * (1 + rng.uniform(0, 0.01, length)),
+                'low': np.minimum(opens, closes) * (1 - rng.uniform(0, 0.01, length)),
+                'close': closes,
+                'volume': rng.uniform(100, 1000, length)
+            }))
+            if open_time:
+                pair[-1].insert(0, 'open_time', 1_700_000_000_000 + np.arange(length, dtype=np.int64) * 3_600_000)
+        frames[f"SYM{s}USDT"] = (pair[0], pair[1])
+    return frames
+
+
+def _assert_records_equal(actual, expected):
+    assert [r['symbol'] for r in actual] == [r['symbol'] for r in expected]
+    for got, want in zip(actual, expected):
+        for section in ('trend_analysis', 'entry_analysis', 'patterns'):
+            for key, value in want[section].items():
+                if isinstance(value, dict):
+                    assert got[section][key] == value
+                elif isinstance(value, (bool, np.bool_)):
+                    assert bool(got[section][key]) == bool(value)
+                else:
+                    assert math.isclose(float(got[section][key]), float(value), rel_tol=1e-12), (section, key)
+
+
+def test_shared_memory_round_trip():
+    """Candles copiados para o bloco compartilhado voltam idênticos (com e sem open_time)"""
+    frames = {**_make_frames(3), **{f"T{symbol}": pair for symbol, pair in _make_frames(3, open_time=True).items()}}
+    shm, layout = pack_frames(frames)
+    try:
+        block = np.ndarray((shm.size // 8,), dtype=np.float64, buffer=shm.buf)
+        restored = unpack_frames(block, layout)
+        del block
+    finally:
+        shm.close()
+        shm.unlink()
+
+    for symbol, (trend_df, entry_df) in frames.items():
+        pd.testing.assert_frame_equal(restored[symbol][0], trend_df)
+        pd.testing.assert_frame_equal(restored[symbol][1], entry_df)
+
+
+def test_process_pool_matches_local_analysis():
+    """Registros dos processos iguais aos calculados localmente (lote e por símbolo)"""
+    frames = _make_frames(12)
+    chunks = [dict(list(frames.items())[:6]), dict(list(frames.items())[6:])]
+    pool = AnalysisProcessPool(max_workers=2)
+    engine = IncrementalIndicatorEngine()
+    try:
+        for vectorized in (True, False):
+            futures = [pool.submit(chunk, vectorized) for chunk in chunks]
+            for chunk, future in zip(chunks, futures):
+                _assert_records_equal(future.result(timeout=120), analyze_frames(chunk, vectorized))
+
+        # Indicadores do estado incremental seguem com o lote e substituem os da janela
+        indicators = {symbol: ({**engine.compute(trend_df), 'ema20': 1.0}, engine.compute(entry_df))
+                      for symbol, (trend_df, entry_df) in chunks[0].items()}
+        records = pool.submit(chunks[0], True, indicators).result(timeout=120)
+        _assert_records_equal(records, analyze_frames(chunks[0], True, indicators))
+        assert all(record['trend_analysis']['ema20'] == 1.0 for record in records)
+
+        # Estado incremental: os processos semeiam (1ª passada) e avançam (2ª) o
+        # estado do processo principal e o devolvem para ser guardado
+        timed = _make_frames(6, seed=11, open_time=True)
+        reference = IncrementalIndicatorEngine()
+        stale = None
+        for cut in (5, 0):
+            window = {symbol: (trend_df.iloc[:len(trend_df) - cut], entry_df.iloc[:len(entry_df) - cut])
+                      for symbol, (trend_df, entry_df) in timed.items()}
+            states = {symbol: (engine.get_state(symbol, '4h'), engine.get_state(symbol, '1h')) for symbol in window}
+            records = pool.submit(window, True, states=states).result(timeout=120)
+            expected = {symbol: (reference.update(symbol, '4h', trend_df), reference.update(symbol, '1h', entry_df))
+                        for symbol, (trend_df, entry_df) in window.items()}
+            _assert_records_equal(records, analyze_frames(window, True, expected))
+            for record in records:
+                for interval, state in zip(('4h', '1h'), record['indicator_states']):
+                    assert engine.install(record['symbol'], interval, state)
+            stale = stale or engine.get_state('SYM0USDT', '1h')
+        assert engine.get_stats()['tracked_series'] == 12
+        assert engine.get_state('SYM0USDT', '1h').last_open_time == int(timed['SYM0USDT'][1]['open_time'].iloc[-2])
+        assert not engine.install('SYM0USDT', '1h', stale)
+
+        stats = pool.get_stats()
+        assert stats['chunks_submitted'] == 7
+        assert stats['symbols_analyzed'] == 42
+        assert stats['local_fallbacks'] == 0
+    finally:
+        pool.shutdown()
+
+
+class FakeAsyncClient:
+    """AsyncBinanceClient falso: entrega as séries uma a uma, com latência, registrando a ordem"""
+
+    def __init__(self, series, events):
+        self.series = series
+        self.events = events
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        return None
+
+    async def iter_klines_many(self, requests):
+        for symbol, interval, _ in requests:
+            await asyncio.sleep(0.002)
+            self.events.append(('fetched', symbol))
+            yield (symbol, interval), self.series[(symbol, interval)]
+
+
+class RecordingPool:
+    """Pool que analisa no próprio processo e registra quando cada lote foi enviado"""
+
+    max_workers = 1
+
+    def __init__(self, events):
+        self.events = events
+
+    def submit(self, frames, vectorized=True, indicators=None, states=None):
+        self.events.append(('submitted', list(frames)))
+        assert set(states) == set(frames)
+        future = Future()
+        future.set_result(analyze_frames(frames, vectorized, indicators, states))
+        return future
+
+
+def test_pipelined_scan_overlaps_async_fetch(monkeypatch):
+    """Lotes vão para a análise enquanto a busca assíncrona continua; todos os pares são pontuados"""
+    frames = _make_frames(10)
+    frames['SHORTUSDT'] = (frames['SYM0USDT'][0].iloc[:30], frames['SYM0USDT'][1])  # Histórico insuficiente
+    series = {}
+    for symbol, (trend_df, entry_df) in frames.items():
+        series[(symbol, '4h')], series[(symbol, '1h')] = trend_df, entry_df
+    events = []
+    monkeypatch.setattr(technical_analysis_module, 'AsyncBinanceClient',
+                        lambda binance, max_concurrency=20: FakeAsyncClient(series, events))
+    monkeypatch.setattr(technical_analysis_module, 'analysis_pool', RecordingPool(events))
+    monkeypatch.setattr(technical_analysis_module, 'indicator_engine', IncrementalIndicatorEngine())
+
+    scanner = TechnicalAnalysis.__new__(TechnicalAnalysis)
+    scanner.config = {'trend_timeframe': '4h', 'entry_timeframe': '1h', 'batch_analysis': True,
+                      'async_fetch': True, 'async_max_concurrency': 5, 'analysis_chunk_size': 3}
+    scanner.binance = SimpleNamespace(use_binance_api=True)
+    scanner.top_pairs = list(frames)
+    scanner._get_klines_from_memory = lambda symbol, interval, limit=100: None
+    scanner._store_fetched_klines = lambda symbol, interval, limit, data: data
+    scored = {}
+    scanner._evaluate_signal = lambda symbol, trend, entry, entry_df, patterns=None: scored.update({symbol: trend})
+
+    analyzed, rejected = scanner._scan_market_pipelined()
+
+    submitted = [index for index, event in enumerate(events) if event[0] == 'submitted']
+    last_fetch = max(index for index, event in enumerate(events) if event[0] == 'fetched')
+    assert len(submitted) == 4 and submitted[0] < last_fetch
+    assert [len(events[index][1]) for index in submitted] == [3, 3, 3, 1]
+    assert sorted(analyzed) == sorted(frames) and 'SHORTUSDT' in rejected
+    assert set(scored) == set(frames) - {'SHORTUSDT'}
+
+
+if __name__ == '__main__':
+    print("🧪 === TESTE DO POOL DE ANÁLISE ===")
+    test_shared_memory_round_trip()
+    print("✅ Memória compartilhada preserva os candles")
+    test_process_pool_matches_local_analysis()
+    print("✅ Análise nos processos idêntica à local")
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Teste do AsyncBinanceClient
+Valida a busca concorrente limitada contra um servidor local que imita a Binance Futures
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import asyncio
+import logging
+import time
+
+from aiohttp import web
+
+from core.async_binance_client import AsyncBinanceClient
+from core.rate_limiter import WeightRateLimiter
+
+HOUR_MS = 3_600_000
+LATENCY = 0.05
+
+
+class FakeSyncClient:
+    """Substitui o BinanceClient (credenciais e assinatura) apontando para o servidor local"""
+
+    def __init__(self, base_url: str):
+        self.base_url = base_url
+        self.api_key = 'test-key'
+        self.priority = 'scan'
+        self.use_binance_api = True
+        self.logger = logging.getLogger('AsyncBinanceClientTest')
+
+    def get_timestamp(self) -> int:
+        return int(time.time() * 1000)
+
+    def _generate_signature(self, params) -> str:
+        return 'signature'
+
+
+def _make_app(state: dict) -> web.Application:
+    async def klines(request):
+        state['in_flight'] += 1
+        state['max_in_flight'] = max(state['max_in_flight'], state['in_flight'])
+        await asyncio.sleep(LATENCY)
+        state['in_flight'] -= 1
+        limit = int(request.query['limit'])
+        rows = [[i * HOUR_MS, '1.0', '2.0', '0.5', str(1.0 + i), '10.0', (i + 1) * HOUR_MS - 1]
+                for i in range(limit)]
+        return web.json_response(rows, headers={'X-MBX-USED-WEIGHT-1M': '12'})
+
+    async def ticker(request):
+        return web.json_response([
+            {'symbol': 'BTCUSDT', 'volume': '10', 'lastPrice': '100', 'priceChangePercent': '1.5',
+             'highPrice': '110', 'lowPrice': '90'},
+            {'symbol': 'ETHUSDT', 'volume': '5', 'lastPrice': '10', 'priceChangePercent': '-2',
+             'highPrice': '11', 'lowPrice': '9'}
+        ])
+
+    async def leverage(request):
+        state['auth_headers'].append(request.headers.get('X-MBX-APIKEY'))
+        return web.json_response([{'symbol': 'BTCUSDT', 'brackets': [{'initialLeverage': 125}]}])
+
+    app = web.Application()
+    app.router.add_get('/fapi/v1/klines', klines)
+    app.router.add_get('/fapi/v1/ticker/24hr', ticker)
+    app.router.add_get('/fapi/v1/leverageBracket', leverage)
+    return app
+
+
+async def _run_scenario():
+    state = {'in_flight': 0, 'max_in_flight': 0, 'auth_headers': []}
+    runner = web.AppRunner(_make_app(state))
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+
+    try:
+        client = AsyncBinanceClient(FakeSyncClient(f"http://127.0.0.1:{port}"), max_concurrency=10)
+        client.rate_limiter = WeightRateLimiter()
+
+        async with client:
+            requests = [(f"SYM{i}USDT", interval, 60) for i in range(40) for interval in ['1h', '4h']]
+            start = time.perf_counter()
+            results = await client.get_klines_many(requests)
+            elapsed = time.perf_counter() - start
+
+            # Entrega em ordem de conclusão: a primeira série chega antes de as demais terminarem
+            streamed = []
+            start = time.perf_counter()
+            async for key, series in client.iter_klines_many([(symbol, interval, 50)
+                                                              for symbol, interval, _ in requests[:30]]):
+                streamed.append((key, len(series), time.perf_counter() - start))
+
+            ticker = await client.get_24h_ticker_data(['BTCUSDT'])
+            brackets = await client.get_leverage_brackets()
+
+        return state, client, results, elapsed, streamed, ticker, brackets
+    finally:
+        await runner.cleanup()
+
+
+def test_gather_with_bounded_concurrency():
+    """80 séries buscadas em ~8 rodadas de latência com no máximo 10 em voo"""
+    state, client, results, elapsed, streamed, ticker, brackets = asyncio.run(_run_scenario())
+
+    assert len(results) == 80
+    klines = results[('SYM0USDT', '1h')]
+    assert len(klines) == 60
+    assert klines[1] == {'open_time': HOUR_MS, 'open': 1.0, 'high': 2.0, 'low': 0.5,
+                         'close': 2.0, 'volume': 10.0, 'close_time': 2 * HOUR_MS - 1}
+
+    assert state['max_in_flight'] <= 10
+    assert client.get_stats()['max_in_flight'] == 10
+    assert elapsed < 80 * LATENCY / 3  # Muito abaixo da busca sequencial
+
+    assert {key for key, _, _ in streamed} == {(f"SYM{i}USDT", interval) for i in range(15)
+                                               for interval in ['1h', '4h']}
+    assert all(length == 50 for _, length, _ in streamed)
+    assert streamed[0][2] < streamed[-1][2] - LATENCY  # 30 séries, 10 em voo: 3 rodadas
+
+    assert ticker == {'BTCUSDT': {'volume': 1000.0, 'priceChangePercent': 1.5, 'volatility': 20.0}}
+    assert brackets == {'BTCUSDT': [{'initialLeverage': 125}]}
+    assert state['auth_headers'] == ['test-key']
+
+    limiter_stats = client.rate_limiter.get_stats()
+    assert limiter_stats['requests'] == 112
+    assert limiter_stats['server_used_weight'] == 12
+
+
+if __name__ == '__main__':
+    print("🧪 === TESTE DO CLIENTE ASSÍNCRONO ===")
+    test_gather_with_bounded_concurrency()
+    print("✅ Busca concorrente limitada funcionando")
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Teste do AuthTokenIndex
+Valida a busca O(1), a expiração pelo heap e a integração com Database
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import tempfile
+from datetime import datetime, timedelta
+
+from core.auth_token_index import AuthTokenIndex
+
+
+class _FakeClock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def __call__(self):
+        return self.now
+
+
+class _FakeRedis:
+    def __init__(self):
+        self.values = {}
+
+    def setex(self, key, ttl, value):
+        self.values[key] = value.encode('utf-8')
+
+    def set(self, key, value, ex=None, nx=False):
+        if not (nx and key in self.values):
+            self.values[key] = value.encode('utf-8')
+
+    def get(self, key):
+        return self.values.get(key)
+
+    def delete(self, key):
+        return self.values.pop(key, None) is not None
+
+
+def test_lookup_expiry_and_user_replacement():
+    """Tokens expiram pelo heap e um novo login substitui o token anterior do usuário"""
+    clock = _FakeClock()
+    index = AuthTokenIndex(clock=clock)
+    index.load([
+        {'token': 'old', 'user_id': 7, 'expires_at': clock.now - 10},
+        {'token': 'a', 'user_id': 1, 'expires_at': clock.now + 60},
+        {'token': 'b', 'user_id': 2, 'expires_at': datetime.fromtimestamp(clock.now + 600).isoformat()}
+    ])
+    assert index.get_stats()['tokens'] == 2
+    assert index.lookup('a') == '1' and index.lookup('b') == '2'
+    assert index.lookup('old') is None
+
+    index.put('a2', 1, clock.now + 600)
+    assert index.lookup('a') is None and index.lookup('a2') == '1'
+
+    clock.now += 601
+    assert sorted(index.pop_expired()) == ['a2', 'b']
+    assert index.lookup('b') is None
+    assert index.get_stats()['users'] == 0
+
+    index.put('c', 3, clock.now + 60)
+    index.remove('c')
+    assert index.lookup('c') is None
+
+
+def test_redis_backed_index():
+    """Com Redis, tokens carregados e novos ficam visíveis para outros processos"""
+    clock = _FakeClock()
+    redis = _FakeRedis()
+    index = AuthTokenIndex(redis_client=redis, clock=clock)
+    index.load([{'token': 'a', 'user_id': '1', 'expires_at': clock.now + 60}])
+    index.put('b', '2', clock.now + 60)
+
+    other_process = AuthTokenIndex(redis_client=redis, clock=clock)
+    assert other_process.lookup('a') == '1' and other_process.lookup('b') == '2'
+    index.remove('b')
+    assert other_process.lookup('b') is None
+
+
+def test_database_uses_index():
+    """Database.get_user_by_token valida pelo índice e enxerga tokens de outro processo"""
+    with tempfile.TemporaryDirectory() as tmp:
+        previous = os.environ.get('SQLITE_DB_PATH')
+        os.environ['SQLITE_DB_PATH'] = os.path.join(tmp, 'storage.db')
+        try:
+            from core.database import Database
+            db = Database()
+            db.storage.insert_user({'id': 'u-1', 'username': 'idx_user', 'email': 'idx@example.com',
+                                    'password': 'hash', 'is_admin': False, 'status': 'active'})
+            db.save_auth_token('tok-1', 'u-1', datetime.now() + timedelta(hours=1))
+            assert db.get_user_by_token('tok-1')['username'] == 'idx_user'
+            assert db.verify_auth_token('tok-1') == 'u-1'
+
+            # Outro processo salvou um token direto no SQLite
+            db.storage.save_auth_token('tok-2', 'u-1', datetime.now().isoformat(),
+                                       (datetime.now() + timedelta(hours=1)).isoformat())
+            assert db.get_user_by_token('tok-2')['id'] == 'u-1'
+
+            db.remove_auth_token('tok-2')
+            assert db.get_user_by_token('tok-2') is None
+            assert db.get_user_by_token('missing') is None
+        finally:
+            if previous is None:
+                os.environ.pop('SQLITE_DB_PATH', None)
+            else:
+                os.environ['SQLITE_DB_PATH'] = previous
+
+
+def test_logout_visible_to_other_workers():
+    """Logout/novo login em um worker invalida o token nos outros (SQLite e CSV)"""
+    from core.database import Database
+    previous = os.environ.get('DATABASE_BACKEND')
+    try:
+        for backend in ('sqlite', 'csv'):
+            os.environ['DATABASE_BACKEND'] = backend
+            with tempfile.TemporaryDirectory() as tmp:
+                worker_a, worker_b = Database(base_dir=tmp), Database(base_dir=tmp)
+                worker_a.save_auth_token('tok1', 7, datetime.now() + timedelta(hours=1))
+                assert worker_b.verify_auth_token('tok1') == '7'
+
+                worker_a.remove_auth_token('tok1')
+                assert worker_b.verify_auth_token('tok1') is None, backend
+
+                # Novo login substitui o token anterior do usuário
+                worker_a.save_auth_token('tok2', 7, datetime.now() + timedelta(hours=1))
+                assert worker_b.verify_auth_token('tok2') == '7'
+                worker_a.save_auth_token('tok3', 7, datetime.now() + timedelta(hours=1))
+                assert worker_b.verify_auth_token('tok2') is None, backend
+                assert worker_b.verify_auth_token('tok3') == '7'
+    finally:
+        if previous is None:
+            os.environ.pop('DATABASE_BACKEND', None)
+        else:
+            os.environ['DATABASE_BACKEND'] = previous
+
+
+if __name__ == '__main__':
+    print("🧪 === TESTE DO ÍNDICE DE TOKENS ===")
+    test_lookup_expiry_and_user_replacement()
+    print("✅ Busca e expiração de tokens funcionando")
+    test_redis_backed_index()
+    print("✅ Índice compartilhado via Redis funcionando")
+    test_database_uses_index()
+    print("✅ Database usa o índice de tokens")
+    test_logout_visible_to_other_workers()
+    print("✅ Logout em um worker vale para os outros")
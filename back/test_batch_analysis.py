@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Teste da Análise Vetorizada em Lote
+Compara analyze_trend_batch/analyze_entry_batch com a análise por símbolo e
+os modos de varredura (threads, lote e pipeline) entre si ao longo de vários scans
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import math
+import time
+from concurrent.futures import Future
+
+import numpy as np
+import pandas as pd
+
+from core import technical_analysis as technical_analysis_module
+from core.analysis_pool import analyze_frames
+from core.incremental_indicators import IncrementalIndicatorEngine
+from core.technical_analysis import TechnicalAnalysis
+
+HOUR_MS = 3_600_000
+
+
+def _make_frames(n_symbols: int, length: int = 100, seed: int = 21):
+    """Gera candles sintéticos para vários símbolos"""
+    rng = np.random.default_rng(seed)
+    frames = []
+    for s in range(n_symbols):
+        drift = rng.normal(0, 0.004)
+        closes = 50.0 * np.exp(np.cumsum(rng.normal(drift, 0.012, length)))
+        opens = np.concatenate([[closes[0]], closes[:-1]])
+        highs = np.maximum(opens, closes) * (1 + rng.uniform(0, 0.01, length))
+        lows = np.minimum(opens, closes) * (1 - rng.uniform(0, 0.01, length))
+        frames.append(pd.DataFrame({
+            'open_time': np.arange(length, dtype=np.int64) * HOUR_MS,
+            'open': opens, 'high': highs, 'low': lows, 'close': closes,
+            'volume': rng.uniform(100, 1000, length)
+        }))
+    return frames
+
+
+def _make_analyzer() -> TechnicalAnalysis:
+    """TechnicalAnalysis sem dependências externas (apenas métodos de análise)"""
+    analyzer = TechnicalAnalysis.__new__(TechnicalAnalysis)
+    analyzer.config = {'trend_timeframe': '4h', 'entry_timeframe': '1h'}
+    return analyzer
+
+
+def _assert_same(batch: dict, single: dict) -> None:
+    for key, expected in single.items():
+        actual = batch[key]
+        if isinstance(expected, (bool, np.bool_)):
+            assert bool(actual) == bool(expected), f"{key}: {actual} != {expected}"
+        else:
+            assert math.isclose(actual, float(expected), rel_tol=1e-9, abs_tol=1e-12), \
+                f"{key}: {actual} != {expected}"
+
+
+def test_batch_matches_per_symbol_analysis():
+    """Análises e pontuações em lote idênticas às calculadas símbolo a símbolo"""
+    analyzer = _make_analyzer()
+    frames = _make_frames(40)
+
+    trend_batch = analyzer.analyze_trend_batch(frames)
+    entry_batch, patterns = analyzer.analyze_entry_batch(frames)
+
+    for i, df in enumerate(frames):
+        trend = analyzer.analyze_trend_df(df)
+        entry = analyzer.analyze_entry_df(df)
+        _assert_same(trend_batch[i], trend)
+        _assert_same(entry_batch[i], entry)
+
+        levels = analyzer.calculate_support_resistance_levels(df, float(df['close'].iloc[-1]))
+        assert math.isclose(patterns[i]['support_distance'], levels['support_distance'], rel_tol=1e-9)
+        assert math.isclose(patterns[i]['resistance_distance'], levels['resistance_distance'], rel_tol=1e-9)
+
+        for signal_type in ['COMPRA', 'VENDA']:
+            assert patterns[i]['candle_scores'][signal_type] == \
+                analyzer._analyze_candlestick_patterns(df, signal_type)
+            assert analyzer._calculate_signal_scores(trend, entry, signal_type, df) == \
+                analyzer._calculate_signal_scores(trend_batch[i], entry_batch[i], signal_type, df, patterns[i])
+
+
+def test_batch_scales_to_full_universe():
+    """500 pares analisados em lote em menos tempo que 100 pares símbolo a símbolo"""
+    analyzer = _make_analyzer()
+    frames = _make_frames(500, seed=4)
+
+    start = time.perf_counter()
+    for df in frames[:100]:
+        analyzer.analyze_trend_df(df)
+        analyzer.analyze_entry_df(df)
+        analyzer.calculate_support_resistance_levels(df, float(df['close'].iloc[-1]))
+    per_symbol_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    analyzer.analyze_trend_batch(frames)
+    analyzer.analyze_entry_batch(frames)
+    batch_time = time.perf_counter() - start
+
+    print(f"\n100 pares (por símbolo): {per_symbol_time:.3f}s | 500 pares (lote): {batch_time:.3f}s")
+    assert batch_time < per_symbol_time
+
+
+class LocalAnalysisPool:
+    """Pool de análise no próprio processo (mesma função executada pelos processos)"""
+
+    max_workers = 1
+
+    def submit(self, frames, vectorized=True, indicators=None, states=None):
+        future = Future()
+        future.set_result(analyze_frames(frames, vectorized, indicators, states))
+        return future
+
+
+def _make_scanner(mode: str, windows: dict, captured: dict) -> TechnicalAnalysis:
+    """Scanner com klines servidas de `windows` e pontuação capturada por símbolo"""
+    analyzer = _make_analyzer()
+    analyzer.config.update({'batch_analysis': mode != 'threads', 'async_fetch': False,
+                            'process_pool_analysis': mode == 'pipelined', 'analysis_chunk_size': 3})
+    analyzer.top_pairs = sorted({symbol for symbol, _ in windows})
+    analyzer.get_klines = lambda symbol, interval, limit=100: windows[(symbol, interval)]
+
+    def evaluate(symbol, trend_analysis, entry_analysis, entry_df, patterns=None):
+        captured[symbol] = (trend_analysis, entry_analysis)
+        return None
+
+    analyzer._evaluate_signal = evaluate
+    return analyzer
+
+
+def test_scan_modes_share_incremental_indicators(monkeypatch):
+    """Threads, lote e pipeline pontuam os mesmos indicadores (estado incremental) a cada scan"""
+    series = {}
+    for index, symbol in enumerate(['AAAUSDT', 'BBBUSDT', 'CCCUSDT', 'DDDUSDT', 'EEEUSDT']):
+        trend, entry = _make_frames(2, length=140, seed=30 + index)
+        series[(symbol, '4h')], series[(symbol, '1h')] = trend, entry
+    monkeypatch.setattr(technical_analysis_module, 'analysis_pool', LocalAnalysisPool())
+
+    results = {}
+    for mode in ('threads', 'batch', 'pipelined'):
+        monkeypatch.setattr(technical_analysis_module, 'indicator_engine', IncrementalIndicatorEngine())
+        results[mode] = []
+        for offset in (0, 1, 2, 10, 25):  # Janela de 100 candles avançando entre scans
+            windows = {key: df.iloc[offset:offset + 100].reset_index(drop=True) for key, df in series.items()}
+            captured = {}
+            scanner = _make_scanner(mode, windows, captured)
+            if mode == 'threads':
+                for symbol in scanner.top_pairs:
+                    scanner.analyze_symbol(symbol)
+            elif mode == 'batch':
+                scanner._scan_market_batch()
+            else:
+                scanner._scan_market_pipelined()
+            results[mode].append((windows, captured))
+
+    for (windows, threads), (_, batch), (_, pipelined) in zip(*results.values()):
+        assert set(threads) == set(batch) == set(pipelined) == {symbol for symbol, _ in windows}
+        for symbol, (trend, entry) in threads.items():
+            for other in (batch, pipelined):
+                _assert_same(other[symbol][0], trend)
+                _assert_same(other[symbol][1], entry)
+
+    # Depois que o estado acumula histórico, a janela isolada daria outros valores
+    windows, captured = results['batch'][-1]
+    stateless = _make_analyzer().analyze_trend_batch([windows[('AAAUSDT', '4h')]])[0]
+    assert not math.isclose(stateless['ema50'], captured['AAAUSDT'][0]['ema50'], rel_tol=1e-9)
+
+
+if __name__ == '__main__':
+    print("🧪 === TESTE DA ANÁLISE EM LOTE ===")
+    test_batch_matches_per_symbol_analysis()
+    print("✅ Paridade com a análise por símbolo")
+    test_batch_scales_to_full_universe()
+    print("✅ Escala para o universo completo")
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Teste da Benchmark Suite
+Valida a exchange falsa (klines por limit/startTime/endTime e contagem de
+requisições), uma execução reduzida dos grupos e a gravação/comparação do JSON
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import copy
+
+import requests
+
+from benchmark_suite import (FakeExchangeServer, compare_results, fixture_candles, load_results, result_key,
+                             run_suite, save_results)
+from core.kline_stream import INTERVAL_MS
+
+
+def test_fake_exchange_serves_fixture_klines():
+    """Klines fatiados como na Binance: últimos `limit` ou a partir de startTime até endTime"""
+    candles = fixture_candles(2, hours=100)
+    symbol = next(s for s in candles if s != 'BTCUSDT')
+    open_times = candles[symbol]['1h']['open_time']
+    exchange = FakeExchangeServer(candles)
+    base_url = exchange.start()
+    try:
+        latest = requests.get(f"{base_url}/fapi/v1/klines",
+                              params={'symbol': symbol, 'interval': '1h', 'limit': 5}, timeout=5).json()
+        assert [k[0] for k in latest] == [int(t) for t in open_times[-5:]]
+        assert latest[-1][6] == int(open_times[-1]) + INTERVAL_MS['1h'] - 1
+
+        window = exchange.klines(symbol, '1h', 3, start_time=int(open_times[10]), end_time=int(open_times[40]))
+        assert [k[0] for k in window] == [int(t) for t in open_times[10:13]]
+        assert exchange.klines('XYZUSDT', '1h', 10) == []
+
+        tickers = requests.get(f"{base_url}/fapi/v1/ticker/24hr", timeout=5).json()
+        assert {t['symbol'] for t in tickers} == set(candles)
+        assert requests.get(f"{base_url}/fapi/v1/order", timeout=5).status_code == 404
+        assert exchange.total_requests() == 3
+    finally:
+        exchange.stop()
+
+
+def test_quick_suite_runs_offline():
+    """Execução reduzida produz estatísticas por benchmark e o scan (lote e pipeline) consulta só a exchange falsa"""
+    document = run_suite(['scan', 'cache', 'database'], quick=True, repeat=1, scan_pairs=[5])
+    names = {result['name'] for result in document['results']}
+    assert names == {'scan_market', 'klines_cache', 'database'}
+    for result in document['results']:
+        stats = result['stats']
+        assert stats['rounds'] == 1 and 0 < stats['min'] <= stats['median'] <= stats['max']
+
+    scans = {(r['params']['mode'], r['params']['cache']): r for r in document['results'] if r['name'] == 'scan_market'}
+    assert set(scans) == {(mode, cache) for mode in ('batch', 'pipelined') for cache in ('cold', 'warm')}
+    for mode in ('batch', 'pipelined'):
+        cold, warm = scans[(mode, 'cold')], scans[(mode, 'warm')]
+        assert cold['params']['pairs'] == 5 and cold['extra']['exchange_requests'] > 0
+        assert warm['extra']['exchange_requests'] < cold['extra']['exchange_requests']
+    backends = {r['params']['backend'] for r in document['results'] if r['name'] == 'database'}
+    assert backends == {'csv', 'sqlite'}
+    assert document['meta']['fixture']['source'] == 'synthetic'
+
+
+def test_save_load_and_compare(tmp_path):
+    """JSON de ida e volta; comparação marca regressão, melhoria, estável, novo e removido"""
+    stats = {'min': 0.1, 'max': 0.1, 'mean': 0.1, 'median': 0.1, 'stdev': 0.0, 'rounds': 3}
+    baseline = {'meta': {'commit': 'abc1234'}, 'results': [
+        {'name': name, 'params': {'size': 10}, 'stats': dict(stats), 'extra': {}}
+        for name in ('slow', 'fast', 'same', 'gone')
+    ]}
+    path = save_results(baseline, str(tmp_path / 'baseline.json'))
+    assert load_results(path) == baseline
+
+    current = copy.deepcopy(baseline)
+    current['results'] = [r for r in current['results'] if r['name'] != 'gone']
+    current['results'][0]['stats']['median'] = 0.2
+    current['results'][1]['stats']['median'] = 0.05
+    current['results'][2]['stats']['median'] = 0.105
+    current['results'].append({'name': 'added', 'params': {}, 'stats': dict(stats), 'extra': {}})
+
+    statuses = {row['key']: row['status'] for row in compare_results(baseline, current)}
+    assert statuses == {'slow[size=10]': 'regression', 'fast[size=10]': 'improvement',
+                        'same[size=10]': 'stable', 'added[]': 'new', 'gone[size=10]': 'removed'}
+    assert result_key(current['results'][0]) == 'slow[size=10]'
+
+
+if __name__ == '__main__':
+    print("🧪 === TESTE DA BENCHMARK SUITE ===")
+    document = run_suite(['cache', 'indicators'], quick=True)
+    for result in document['results']:
+        print(f"⚡ {result_key(result)}: {result['stats']['median'] * 1000:.2f}ms")
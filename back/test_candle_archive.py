@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Teste do Candle Archive
+Valida o formato de registros fixos (append, leitura sem cópia, merge),
+o backfill paginado e o reparo de lacunas contra um cliente REST falso e o
+warm-start do KlineStream e do backtest a partir do disco
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import time
+
+import numpy as np
+
+from core.backtest_engine import BacktestEngine
+from core.candle_archive import (RECORD_SIZE, CandleArchive, backfill, load_archive, records_to_klines,
+                                 repair_gaps, to_records)
+from core.kline_stream import INTERVAL_MS, KlineStream
+
+HOUR_MS = INTERVAL_MS['1h']
+
+
+def make_klines(start_ms, count, interval='1h'):
+    interval_ms = INTERVAL_MS[interval]
+    return [
+        {'open_time': start_ms + i * interval_ms, 'open': 100.0 + i, 'high': 101.0 + i, 'low': 99.0 + i,
+         'close': 100.5 + i, 'volume': 10.0 * (i + 1), 'close_time': start_ms + (i + 1) * interval_ms - 1}
+        for i in range(count)
+    ]
+
+
+class FakeRestClient:
+    """/fapi/v1/klines com startTime/endTime sobre um histórico fixo"""
+
+    def __init__(self, history, missing=()):
+        self.history = [k for k in history if k['open_time'] not in set(missing)]
+        self.calls = []
+
+    def get_klines(self, symbol, interval='1h', limit=100, start_time=None, end_time=None):
+        self.calls.append((symbol, interval, limit, start_time, end_time))
+        selected = [k for k in self.history
+                    if (start_time is None or k['open_time'] >= start_time)
+                    and (end_time is None or k['open_time'] <= end_time)]
+        return [dict(k) for k in (selected[:limit] if start_time is not None else selected[-limit:])]
+
+
+def test_append_read_and_integrity(tmp_path):
+    """Append O(1) só de candles novos, leitura por visão do mmap, lacunas e merge"""
+    archive = CandleArchive(str(tmp_path))
+    start = 1_735_689_600_000  # 01/01/2025 00:00 UTC
+    klines = make_klines(start, 48)
+
+    assert archive.append('btcusdt', '1h', klines[:24]) == 24
+    assert archive.append('BTCUSDT', '1h', klines[10:30]) == 6  # Só os mais novos que o arquivo
+    assert archive.append('BTCUSDT', '1h', klines[35:48], closed_before_ms=start + 40 * HOUR_MS) == 5
+    assert os.path.getsize(archive.path('BTCUSDT', '1h')) == 35 * RECORD_SIZE
+
+    records = archive.read('BTCUSDT', '1h', start + 5 * HOUR_MS, start + 9 * HOUR_MS)
+    assert records['open_time'].tolist() == [start + i * HOUR_MS for i in range(5, 10)]
+    assert isinstance(records.base, np.memmap) or isinstance(records, np.memmap)
+    assert records_to_klines(archive.tail('BTCUSDT', '1h', 1), HOUR_MS) == [klines[39]]
+    assert archive.klines('BTCUSDT', '1h', 3) == klines[37:40]
+
+    gaps = archive.find_gaps('BTCUSDT', '1h')
+    assert gaps == [{'start': start + 30 * HOUR_MS, 'end': start + 34 * HOUR_MS, 'missing': 5}]
+    report = archive.check()['BTCUSDT_1h']
+    assert report['records'] == 35 and report['gaps'] == 1 and not report['ok']
+
+    # Merge preenche a lacuna sem alterar registros existentes
+    changed = [dict(k, close=0.0) for k in klines[28:36]]
+    assert archive.merge('BTCUSDT', '1h', to_records(changed)) == 5
+    assert archive.check()['BTCUSDT_1h']['ok'] and archive.count('BTCUSDT', '1h') == 40
+    closes = archive.series('BTCUSDT', '1h')['close']
+    assert closes[29] == klines[29]['close'] and closes[30] == 0.0
+
+    # Registro parcial de uma escrita interrompida é ignorado e descartado no próximo append
+    with open(archive.path('BTCUSDT', '1h'), 'ab') as file:
+        file.write(b'\x00' * 10)
+    assert archive.count('BTCUSDT', '1h') == 40
+    assert archive.append('BTCUSDT', '1h', klines[40:42]) == 2
+    assert archive.check()['BTCUSDT_1h']['ok'] and archive.count('BTCUSDT', '1h') == 42
+
+
+def test_backfill_paging_and_gap_repair(tmp_path):
+    """Backfill pagina startTime/endTime, só grava fechados e reparo busca apenas as lacunas"""
+    interval_ms = HOUR_MS
+    now_ms = int(time.time() * 1000)
+    current = now_ms - now_ms % interval_ms
+    history = make_klines(current - 999 * interval_ms, 1000)  # Último = candle em formação
+    archive = CandleArchive(str(tmp_path))
+
+    # Histórico recente primeiro, depois o passado (merge antes do primeiro registro)
+    rest = FakeRestClient(history, missing=[history[500]['open_time'], history[501]['open_time']])
+    assert backfill(rest, archive, 'ETHUSDT', '1h', history[600]['open_time'], page_limit=150) == 399
+    assert len(rest.calls) == 3 and all(call[3] is not None for call in rest.calls)
+    assert archive.last_open_time('ETHUSDT', '1h') == history[-2]['open_time']
+    assert archive.is_current('ETHUSDT', '1h', now_ms)
+
+    assert backfill(rest, archive, 'ETHUSDT', '1h', history[0]['open_time'], page_limit=250) == 598
+    assert archive.find_gaps('ETHUSDT', '1h') == [
+        {'start': history[500]['open_time'], 'end': history[501]['open_time'], 'missing': 2}
+    ]
+
+    # Exchange ainda sem os candles → lacuna continua; com os candles → reparada
+    assert repair_gaps(rest, archive, 'ETHUSDT', '1h') == {'gaps': 1, 'filled': 0, 'remaining': 1}
+    rest = FakeRestClient(history)
+    assert repair_gaps(rest, archive, 'ETHUSDT', '1h') == {'gaps': 1, 'filled': 2, 'remaining': 0}
+    assert rest.calls == [('ETHUSDT', '1h', 1500, history[500]['open_time'], history[501]['open_time'])]
+    assert archive.count('ETHUSDT', '1h') == 999 and backfill(rest, archive, 'ETHUSDT', '1h', 0) == 0
+
+
+def test_warm_start_from_archive(tmp_path):
+    """KlineStream e backtest iniciam do disco: sem REST quando o arquivo está em dia"""
+    now = [time.time()]
+    now_ms = int(now[0] * 1000)
+    archive = CandleArchive(str(tmp_path))
+    history = {}
+    for interval in ('1h', '4h'):
+        interval_ms = INTERVAL_MS[interval]
+        current = now_ms - now_ms % interval_ms
+        history[interval] = make_klines(current - 299 * interval_ms, 300, interval)
+        archive.append('BTCUSDT', interval, history[interval][:-1])
+        archive.append('ETHUSDT', interval, history[interval][:-1])
+    os.truncate(archive.path('ETHUSDT', '1h'), 294 * RECORD_SIZE)  # 5 candles fechados atrasado
+
+    rest = FakeRestClient(history['1h'])
+    stream = KlineStream(rest, intervals=['1h', '4h'], archive=archive, clock=lambda: now[0])
+    stream.set_symbols(['BTCUSDT', 'ETHUSDT'])
+    stream.is_running = True
+    assert stream.backfill() == 4 and stream.stats['archive_warm_starts'] == 4
+    # Só ETHUSDT 1h vai ao REST, e apenas para os candles depois do último arquivado
+    assert rest.calls == [('ETHUSDT', '1h', 7, None, None)]
+    assert [c['open_time'] for c in stream.candles[('ETHUSDT', '1h')]][-3:] == \
+        [k['open_time'] for k in history['1h'][-3:]]
+    assert archive.last_open_time('ETHUSDT', '1h') == history['1h'][-2]['open_time']
+    assert stream.stats['candles_archived'] == 5
+    stream.is_running = False
+
+    # Candle fechado recebido pelo stream é anexado ao arquivo
+    last = history['1h'][-1]
+    now[0] += 3600
+    stream.handle_message(
+        '{"data": {"e": "kline", "k": {"s": "ETHUSDT", "i": "1h", "t": %d, "T": %d, "o": "1", "h": "2", '
+        '"l": "0.5", "c": "1.5", "v": "10", "x": true}}}' % (last['open_time'], last['close_time'])
+    )
+    assert stream.stats['candles_archived'] == 6
+    assert archive.last_open_time('ETHUSDT', '1h') == last['open_time']
+
+    candles = load_archive(archive, ['BTCUSDT'])
+    assert list(candles) == ['BTCUSDT'] and np.shares_memory(candles['BTCUSDT']['1h']['close'],
+                                                             archive.read('BTCUSDT', '1h'))
+    engine = BacktestEngine(candles)
+    assert len(engine.score_symbol('BTCUSDT')) > 0
+
+
+if __name__ == '__main__':
+    import tempfile
+
+    print("🧪 === TESTE DO CANDLE ARCHIVE ===")
+    with tempfile.TemporaryDirectory() as directory:
+        archive = CandleArchive(directory)
+        klines = make_klines(1_735_689_600_000, 24 * 365 * 2)
+        start = time.perf_counter()
+        archive.append('BTCUSDT', '1h', klines)
+        written = time.perf_counter() - start
+        start = time.perf_counter()
+        for _ in range(1000):
+            archive.tail('BTCUSDT', '1h', 100)['close'].sum()
+        read = (time.perf_counter() - start) / 1000
+        print(f"💾 {len(klines)} candles gravados em {written * 1000:.1f}ms")
+        print(f"⚡ Leitura dos últimos 100 candles: {read * 1e6:.1f}µs")
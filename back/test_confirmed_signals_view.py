@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Teste da ConfirmedSignalsView
+Valida a deduplicação por (símbolo, tipo), a atualização incremental pela
+marca d'água, a paginação por cursor e o cache do JSON por versão
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import json
+
+from core.confirmed_signals_view import ConfirmedSignalsView
+
+
+class _FakeClock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def __call__(self):
+        return self.now
+
+
+def _confirmed(symbol, confirmed_at, signal_type='COMPRA', **extra):
+    return {'symbol': symbol, 'type': signal_type, 'entry_price': 1.0, 'target_price': 1.1,
+            'confirmed_at': confirmed_at, **extra}
+
+
+class _FakeDatabase:
+    def __init__(self, rows):
+        self.rows = rows
+        self.queries = []
+
+    def fetch(self, since):
+        self.queries.append(since)
+        # Supabase compara confirmed_at (ISO) no servidor
+        return [row for row in self.rows if since is None or row['confirmed_at'] > since]
+
+
+def test_incremental_refresh_and_dedup():
+    """Só linhas novas são buscadas e o par (símbolo, tipo) mantém a confirmação mais recente"""
+    clock = _FakeClock()
+    db = _FakeDatabase([_confirmed('AAAUSDT', '2025-01-01T12:00:00+00:00', source='db'),
+                        _confirmed('BBBUSDT', '2025-01-01T13:00:00+00:00')])
+    view = ConfirmedSignalsView(fetcher=db.fetch, refresh_interval=30, full_refresh_interval=3600, clock=clock)
+
+    # Sinal confirmado agora (horário de São Paulo, formato brasileiro) entra na hora
+    view.upsert(_confirmed('CCCUSDT', '01/01/2025 11:00:00'))
+    signals, _, version = view.page()
+    assert [s['symbol'] for s in signals] == ['CCCUSDT', 'BBBUSDT', 'AAAUSDT']
+    assert db.queries == [None]
+
+    # A mesma confirmação vinda da memória não sobrescreve a do banco
+    assert not view.upsert(_confirmed('AAAUSDT', '01/01/2025 09:00:00', source='memory'))
+    assert view.page(refresh=False)[0][2]['source'] == 'db'
+
+    view.page()
+    assert db.queries == [None]  # Dentro do intervalo: sem consulta
+
+    db.rows.append(_confirmed('AAAUSDT', '2025-01-01T15:00:00+00:00', source='db-new'))
+    clock.now += 31
+    signals, _, new_version = view.page()
+    assert db.queries == [None, '2025-01-01T13:00:00+00:00']
+    assert new_version > version
+    assert [s['symbol'] for s in signals] == ['AAAUSDT', 'CCCUSDT', 'BBBUSDT']
+    assert signals[0]['source'] == 'db-new' and len(view) == 3
+
+    # Recarga completa remove linhas apagadas no banco, mas não as da memória
+    db.rows = [row for row in db.rows if row['symbol'] != 'BBBUSDT']
+    clock.now += 3600
+    assert [s['symbol'] for s in view.page()[0]] == ['AAAUSDT', 'CCCUSDT']
+    assert view.get_stats()['full_refreshes'] == 2
+
+
+def test_cursor_pages_and_serialized_cache():
+    """Cursores continuam de onde pararam e o JSON é reaproveitado até mudar a versão"""
+    view = ConfirmedSignalsView()
+    view.load([_confirmed(f'S{i}USDT', f'2025-01-01T10:{i:02d}:00+00:00') for i in range(5)])
+
+    first, cursor, _ = view.page(limit=2)
+    assert [s['symbol'] for s in first] == ['S4USDT', 'S3USDT']
+    view.upsert(_confirmed('NEWUSDT', '2025-01-01T11:00:00+00:00'))  # Entra no topo
+    second, cursor, _ = view.page(limit=2, cursor=cursor)
+    assert [s['symbol'] for s in second] == ['S2USDT', 'S1USDT']
+    last, cursor, _ = view.page(limit=2, cursor=cursor)
+    assert [s['symbol'] for s in last] == ['S0USDT'] and cursor is None
+
+    builds = []
+
+    def build(signals, next_cursor, version):
+        builds.append(version)
+        return {'symbols': [s['symbol'] for s in signals], 'next': next_cursor}
+
+    body, version, next_cursor = view.serialized_page('test', build, limit=3)
+    assert view.serialized_page('test', build, limit=3) == (body, version, next_cursor)
+    assert json.loads(body)['symbols'] == ['NEWUSDT', 'S4USDT', 'S3USDT'] and next_cursor
+    assert len(builds) == 1
+
+    view.remove('NEWUSDT', 'COMPRA')
+    body, new_version, _ = view.serialized_page('test', build, limit=3)
+    assert new_version == version + 1 and json.loads(body)['symbols'][0] == 'S4USDT'
+    assert view.get_stats()['serialized_hits'] == 1
+
+
+if __name__ == '__main__':
+    print("🧪 === TESTE DA VISÃO DE SINAIS CONFIRMADOS ===")
+    test_incremental_refresh_and_dedup()
+    print("✅ Atualização incremental e deduplicação funcionando")
+    test_cursor_pages_and_serialized_cache()
+    print("✅ Cursores e cache do JSON funcionando")
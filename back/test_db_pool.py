@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Teste do pool de conexões e do registro de clientes Supabase
+Usa sqlite3 como banco local (ou o Postgres de TEST_DATABASE_URL, se definido)
+e um cliente Supabase falso no lugar do HTTP
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import sqlite3
+import tempfile
+import threading
+
+import pytest
+
+from core.db_pool import ConnectionPool, PoolTimeoutError
+from core.http_pool import SupabaseClientRegistry
+
+
+class _FakeClock:
+    def __init__(self):
+        self.now = 1_000.0
+
+    def __call__(self):
+        return self.now
+
+
+def _sqlite_pool(tmp, **kwargs):
+    path = os.path.join(tmp, 'pool.db')
+    return ConnectionPool(lambda: sqlite3.connect(path, check_same_thread=False), **kwargs)
+
+
+def test_reuse_and_checkout_timeout():
+    """Conexões são reutilizadas e o pool cheio espera até o timeout"""
+    with tempfile.TemporaryDirectory() as tmp:
+        pool = _sqlite_pool(tmp, min_size=1, max_size=2, checkout_timeout=0.1, health_check_interval=60)
+        assert pool.warm_up() == 1
+        with pool.connection() as conn:
+            conn.execute('CREATE TABLE t (v INTEGER)')
+            conn.execute('INSERT INTO t VALUES (1)')
+            conn.commit()
+        for _ in range(5):
+            with pool.connection() as conn:
+                assert conn.execute('SELECT COUNT(*) FROM t').fetchone()[0] == 1
+
+        first, second = pool.getconn(), pool.getconn()
+        with pytest.raises(PoolTimeoutError):
+            pool.getconn()
+
+        # Uma devolução libera quem está esperando
+        released = threading.Timer(0.05, pool.putconn, args=(first,))
+        released.start()
+        pool.checkout_timeout = 2
+        third = pool.getconn()
+        pool.putconn(second)
+        pool.putconn(third)
+
+        stats = pool.get_stats()
+        assert stats['connections_created'] == 2
+        assert stats['timeouts'] == 1 and stats['in_use'] == 0 and stats['idle'] == 2
+        pool.close_all()
+
+
+def test_health_check_replaces_broken_connections():
+    """Conexão ociosa que falha no teste é trocada; erro sem rollback descarta a conexão"""
+    with tempfile.TemporaryDirectory() as tmp:
+        clock = _FakeClock()
+        pool = _sqlite_pool(tmp, max_size=2, health_check_interval=30, clock=clock)
+        with pool.connection() as conn:
+            broken = conn
+        broken.close()  # Conexão derrubada enquanto ociosa
+
+        clock.now += 31
+        with pool.connection() as conn:
+            assert conn is not broken
+            conn.execute('SELECT 1')
+        stats = pool.get_stats()
+        assert stats['health_check_failures'] == 1 and stats['connections_discarded'] == 1
+
+        with pytest.raises(sqlite3.ProgrammingError):
+            with pool.connection() as conn:
+                conn.close()
+                conn.execute('SELECT 1')
+        assert pool.get_stats()['idle'] == 0
+        assert pool.health_check()['healthy']
+
+
+@pytest.mark.skipif(not os.getenv('TEST_DATABASE_URL'), reason='TEST_DATABASE_URL não definida')
+def test_postgres_pool():
+    """Pool contra um Postgres local"""
+    psycopg2 = pytest.importorskip('psycopg2')
+    pool = ConnectionPool(lambda: psycopg2.connect(os.environ['TEST_DATABASE_URL']), max_size=3)
+    for _ in range(3):
+        assert pool.health_check()['healthy']
+    assert pool.get_stats()['connections_created'] == 1
+    pool.close_all()
+
+
+def test_supabase_registry_health():
+    """Cliente Supabase é único por projeto e recriado após falha no teste de saúde"""
+    created = []
+
+    class _FakeQuery:
+        def __init__(self, client):
+            self.client = client
+
+        def select(self, *args):
+            return self
+
+        def limit(self, n):
+            return self
+
+        def execute(self):
+            if self.client.down:
+                raise ConnectionError('offline')
+            return type('Response', (), {'data': []})()
+
+    class _FakeClient:
+        def __init__(self, url, key):
+            self.down = False
+            created.append(self)
+
+        def table(self, name):
+            return _FakeQuery(self)
+
+    registry = SupabaseClientRegistry(factory=_FakeClient)
+    client = registry.get_client('http://localhost:54321', 'anon')
+    assert registry.get_client('http://localhost:54321', 'anon') is client
+    assert registry.health_check('http://localhost:54321', 'anon')['healthy']
+
+    client.down = True
+    assert not registry.health_check('http://localhost:54321', 'anon')['healthy']
+    assert registry.get_client('http://localhost:54321', 'anon') is not client
+    stats = registry.get_stats()
+    assert stats['clients_created'] == 2 and stats['health_check_failures'] == 1 and stats['clients'] == 1
+
+
+if __name__ == '__main__':
+    print("🧪 === TESTE DO POOL DE CONEXÕES ===")
+    test_reuse_and_checkout_timeout()
+    print("✅ Reuso e timeout de checkout funcionando")
+    test_health_check_replaces_broken_connections()
+    print("✅ Teste de saúde e descarte de conexões funcionando")
+    test_supabase_registry_health()
+    print("✅ Registro de clientes Supabase funcionando")
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Teste do EventBus
+Valida a mesclagem de deltas por chave e tipo, o resync de clientes lentos, a
+retomada por Last-Event-ID e o canal SSE servido pelo Flask
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import json
+
+from flask import Flask
+
+from core.event_bus import EventBus, RESYNC_EVENT
+import api_routes.stream as stream_routes
+
+
+def test_coalescing_and_backpressure():
+    """Deltas da mesma chave são mesclados e um cliente lento recebe só um resync"""
+    bus = EventBus(history_size=100, max_pending=3)
+    fast = bus.subscribe(['monitoring'])
+    other_topic = bus.subscribe(['signals'])
+
+    bus.publish('monitoring', 'signal_update', {'id': 'a', 'current_price': 1.0, 'status': 'MONITORING'}, key='a')
+    bus.publish('monitoring', 'signal_update', {'id': 'a', 'current_price': 1.5}, key='a')
+    bus.publish('monitoring', 'signal_update', {'id': 'b', 'current_price': 7.0}, key='b')
+
+    events = fast.drain()
+    assert [event.data for event in events] == [
+        {'id': 'a', 'current_price': 1.5, 'status': 'MONITORING'},
+        {'id': 'b', 'current_price': 7.0}
+    ]
+    assert events[0].seq == 2 and other_topic.drain() == []
+
+    # Fila cheia: pendentes descartados e um único resync, sem bloquear o publicador
+    for i in range(10):
+        bus.publish('monitoring', 'signal_added', {'id': f's{i}'})
+    resync = fast.drain()
+    assert [event.type for event in resync] == [RESYNC_EVENT]
+    bus.publish('monitoring', 'signal_added', {'id': 'next'})
+    assert [event.data['id'] for event in fast.drain()] == ['next']
+
+    stats = bus.get_stats()
+    assert stats['published'] == 14 and stats['coalesced'] == 1 and stats['resyncs'] == 1
+
+
+def test_coalescing_keeps_event_types():
+    """Só deltas do mesmo tipo são mesclados: adição e fechamento de um sinal não se perdem"""
+    bus = EventBus(history_size=100, max_pending=10)
+    client = bus.subscribe(['monitoring'])
+
+    bus.publish('monitoring', 'signal_added', {'id': 'a', 'status': 'MONITORING'}, key='a')
+    bus.publish('monitoring', 'signal_update', {'id': 'a', 'current_price': 1.0}, key='a')
+    bus.publish('monitoring', 'signal_update', {'id': 'a', 'current_price': 1.2}, key='a')
+    bus.publish('monitoring', 'signal_closed', {'id': 'a', 'status': 'HIT_TARGET'}, key='a')
+    bus.publish('monitoring', 'signal_update', {'id': 'a', 'current_price': 1.3}, key='a')
+
+    events = client.drain()
+    assert [event.type for event in events] == ['signal_added', 'signal_update', 'signal_closed', 'signal_update']
+    assert events[1].data == {'id': 'a', 'current_price': 1.2}
+    assert client.stats['coalesced'] == 1
+
+
+def test_last_event_id_replay():
+    """Reconexão recebe o que perdeu; se o histórico não cobre a lacuna, pede resync"""
+    bus = EventBus(history_size=5, max_pending=50)
+    for i in range(4):
+        bus.publish('signals', 'pending_added', {'id': i})
+
+    replay = bus.subscribe(['signals'], last_event_id=2)
+    assert [event.seq for event in replay.drain()] == [3, 4]
+
+    for i in range(10):
+        bus.publish('signals', 'pending_added', {'id': i})
+    too_old = bus.subscribe(['signals'], last_event_id=3)
+    assert [event.type for event in too_old.drain()] == [RESYNC_EVENT]
+
+    frame = bus.publish('signals', 'signal_confirmed', {'symbol': 'BTCUSDT'}).to_sse()
+    assert frame.startswith('id: 15\nevent: signal_confirmed\ndata: ') and frame.endswith('\n\n')
+    assert json.loads(frame.split('data: ', 1)[1])['data'] == {'symbol': 'BTCUSDT'}
+
+
+def test_flask_sse_route():
+    """A rota /api/stream entrega frames SSE e libera a vaga ao fechar"""
+    bus = EventBus(history_size=10, max_pending=10)
+    original_bus = stream_routes.event_bus
+    stream_routes.event_bus = bus
+    try:
+        app = Flask(__name__)
+        app.register_blueprint(stream_routes.stream_bp, url_prefix='/api')
+        bus.publish('signals', 'pending_added', {'id': 'x'})
+
+        with app.test_client() as client:
+            response = client.get('/api/stream?topics=signals', headers={'Last-Event-ID': '0'},
+                                  buffered=False)
+            assert response.mimetype == 'text/event-stream'
+            chunks = iter(response.response)
+            assert next(chunks).startswith(b'retry: 5000')
+            assert b'event: pending_added' in next(chunks)
+            assert bus.get_stats()['subscribers'] == 1
+            response.close()
+
+        assert bus.get_stats()['subscribers'] == 0
+        assert stream_routes._active_clients == 0
+    finally:
+        stream_routes.event_bus = original_bus
+
+
+if __name__ == '__main__':
+    print("🧪 === TESTE DO BARRAMENTO DE EVENTOS ===")
+    test_coalescing_and_backpressure()
+    print("✅ Mesclagem de deltas e backpressure funcionando")
+    test_coalescing_keeps_event_types()
+    print("✅ Mesclagem preserva os tipos de evento")
+    test_last_event_id_replay()
+    print("✅ Retomada por Last-Event-ID funcionando")
+    test_flask_sse_route()
+    print("✅ Canal SSE do Flask funcionando")
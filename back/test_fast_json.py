@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Teste e benchmark do Fast JSON
+Valida a conversão de NumPy/pandas/datetimes, o fallback para a biblioteca
+padrão e o provedor do Flask; executado direto, mede o tempo de
+serialização por 1.000 sinais antes (limpeza recursiva + jsonify) e depois
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import json
+import time
+from datetime import datetime
+from decimal import Decimal
+
+import numpy as np
+import pandas as pd
+import pytest
+from flask import Flask, jsonify
+from flask.json.provider import DefaultJSONProvider
+
+import core.fast_json as fast_json
+from core.fast_json import BR_DATETIME_FORMAT, dumps_bytes, install_json_provider
+
+
+def _make_serializable(obj):
+    """Limpeza recursiva usada antes pela rota /api/btc-signals/metrics"""
+    if isinstance(obj, dict):
+        return {k: _make_serializable(v) for k, v in obj.items()}
+    elif isinstance(obj, (list, tuple)):
+        return [_make_serializable(item) for item in obj]
+    elif isinstance(obj, (np.integer, np.floating)):
+        return obj.item()
+    elif isinstance(obj, np.ndarray):
+        return obj.tolist()
+    elif isinstance(obj, (np.bool_, bool)):
+        return bool(obj)
+    elif isinstance(obj, (pd.Timestamp, datetime)):
+        return obj.strftime(BR_DATETIME_FORMAT)
+    elif isinstance(obj, (int, float, str, type(None))):
+        return obj
+    return str(obj)
+
+
+def _signal_records(count):
+    """Registros no formato da rota de simulação, com escalares NumPy como vêm dos indicadores"""
+    confirmed = datetime(2025, 1, 1, 12, 0, 0)
+    return [{
+        'id': f'sig-{i}',
+        'symbol': f'COIN{i}USDT',
+        'signal_type': 'COMPRA' if i % 2 else 'VENDA',
+        'status': 'MONITORING',
+        'entry_price': np.float64(1.0 + i / 1000),
+        'current_price': np.float64(1.1 + i / 1000),
+        'days_monitored': np.int64(i % 15),
+        'confirmed_at': pd.Timestamp(confirmed),
+        'is_valid': np.bool_(i % 3 == 0),
+        'indicators': {'rsi': np.float32(0.5), 'macd': np.array([0.1, 0.2, 0.3])},
+        'simulation': {'investment': 1000, 'current_value': np.float64(1000 + i), 'pnl_usd': np.float64(i)},
+        'leverage': {'max_leverage': np.int32(20), 'current_profit': 12.5, 'max_profit_reached': 30.0}
+    } for i in range(count)]
+
+
+def test_numpy_datetimes_and_stdlib_fallback(monkeypatch):
+    """Mesma saída com orjson e com a biblioteca padrão, igual à limpeza recursiva"""
+    payload = {'signals': _signal_records(3), 'total': np.int64(3), 'ratio': Decimal('1.50'),
+               'window': (1, 2), 'created': datetime(2025, 1, 2, 3, 4, 5)}
+    expected = _make_serializable({**payload, 'ratio': '1.50'})
+
+    fast = json.loads(dumps_bytes(payload, datetime_format=BR_DATETIME_FORMAT))
+    assert fast == expected
+    assert fast['created'] == '02/01/2025 03:04:05'
+
+    monkeypatch.setattr(fast_json, 'ORJSON_AVAILABLE', False)
+    assert json.loads(dumps_bytes(payload, datetime_format=BR_DATETIME_FORMAT)) == expected
+
+    with pytest.raises(TypeError):
+        dumps_bytes({'obj': object()})
+    assert json.loads(dumps_bytes({'obj': object()}, strict=False))['obj'].startswith('<object')
+
+
+def test_flask_provider_matches_default():
+    """jsonify com o provedor rápido decodifica igual ao provedor padrão do Flask"""
+    payload = {'b': 1, 'a': [1.5, 'ç'], 'when': datetime(2025, 1, 1, 0, 0, 0), 'n': np.int64(7)}
+
+    app = Flask(__name__)
+    install_json_provider(app)
+    with app.app_context():
+        response = jsonify(payload)
+        assert response.mimetype == 'application/json'
+        decoded = json.loads(response.get_data())
+        assert list(decoded) == ['b', 'a', 'when', 'n']  # Ordem em que a rota montou
+
+    default = json.loads(DefaultJSONProvider(Flask(__name__)).dumps({**payload, 'n': 7}))
+    assert decoded == default
+
+
+def benchmark_serialization(count=1000, rounds=20):
+    """Tempo médio (ms) para serializar `count` sinais: antes e depois"""
+    records = _signal_records(count)
+    payload = {'success': True, 'data': {'signals': records, 'count': count}}
+    provider = DefaultJSONProvider(Flask(__name__))
+
+    def before():
+        return provider.dumps(_make_serializable(payload)).encode('utf-8')
+
+    def after():
+        return dumps_bytes(payload, datetime_format=BR_DATETIME_FORMAT)
+
+    results = {}
+    for name, function in (('antes (limpeza + json)', before), ('depois (fast_json)', after)):
+        function()
+        start = time.perf_counter()
+        for _ in range(rounds):
+            body = function()
+        results[name] = {'ms': (time.perf_counter() - start) / rounds * 1000, 'bytes': len(body)}
+    return results
+
+
+def test_benchmark_runs():
+    """O benchmark roda em tamanho reduzido e os dois caminhos produzem o mesmo conteúdo"""
+    results = benchmark_serialization(count=50, rounds=2)
+    assert len(results) == 2 and all(r['ms'] > 0 for r in results.values())
+
+    records = _signal_records(50)
+    before = json.loads(DefaultJSONProvider(Flask(__name__)).dumps(_make_serializable(records)))
+    assert json.loads(dumps_bytes(records, datetime_format=BR_DATETIME_FORMAT)) == before
+
+
+if __name__ == '__main__':
+    print("🧪 === TESTE DO FAST JSON ===")
+    print(f"⚙️ Backend: {'orjson' if fast_json.ORJSON_AVAILABLE else 'json (biblioteca padrão)'}")
+    test_flask_provider_matches_default()
+    print("✅ Provedor do Flask funcionando")
+    for name, result in benchmark_serialization().items():
+        print(f"⏱️ {name}: {result['ms']:.2f} ms por 1.000 sinais ({result['bytes']} bytes)")
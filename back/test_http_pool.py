@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Teste do HTTPSessionPool
+Valida reutilização de conexões keep-alive e a política de retry do adaptador
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from core.http_pool import HTTPSessionPool
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # keep-alive
+    failures_left = 0
+    lock = threading.Lock()
+
+    def do_GET(self):
+        with _Handler.lock:
+            fail = _Handler.failures_left > 0
+            if fail:
+                _Handler.failures_left -= 1
+
+        status = 503 if fail else 200
+        body = json.dumps({'path': self.path}).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def _start_server():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), _Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def test_connections_are_reused():
+    """Requisições sequenciais e paralelas reutilizam o pool do host"""
+    server, base_url = _start_server()
+    pool = HTTPSessionPool(host_limits={f"127.0.0.1:{server.server_address[1]}": 4})
+    try:
+        for i in range(20):
+            assert pool.get(f"{base_url}/fapi/v1/klines?i={i}", timeout=5).status_code == 200
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(executor.map(lambda i: pool.get(f"{base_url}/x/{i}", timeout=5).status_code, range(40)))
+        assert results == [200] * 40
+
+        stats = pool.get_stats()
+        assert stats['requests'] == 60
+        assert stats['connections_opened'] <= 4  # Limite por host
+        assert stats['connections_reused'] >= 56
+        assert stats['hosts'] == 1
+    finally:
+        pool.close()
+        server.shutdown()
+
+
+def test_adapter_retries_server_errors():
+    """Respostas 5xx de GET são repetidas pelo adaptador"""
+    server, base_url = _start_server()
+    pool = HTTPSessionPool()
+    try:
+        _Handler.failures_left = 2
+        response = pool.get(f"{base_url}/retry", timeout=5)
+        assert response.status_code == 200
+        assert _Handler.failures_left == 0
+    finally:
+        pool.close()
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    print("🧪 === TESTE DO POOL HTTP ===")
+    test_connections_are_reused()
+    test_adapter_retries_server_errors()
+    print("✅ Conexões keep-alive reutilizadas")
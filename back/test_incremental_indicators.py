@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Teste de Paridade do IncrementalIndicatorEngine
+Compara EMA/MACD/RSI/ATR incrementais com a biblioteca `ta` sobre as mesmas séries
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import math
+
+import numpy as np
+import pandas as pd
+from ta.trend import EMAIndicator, MACD
+from ta.momentum import RSIIndicator
+from ta.volatility import AverageTrueRange
+
+from core.incremental_indicators import IncrementalIndicatorEngine
+
+HOUR_MS = 3_600_000
+RTOL = 1e-9
+
+
+def _make_candles(length: int, seed: int = 7, start_price: float = 100.0) -> pd.DataFrame:
+    """Gera candles sintéticos (passeio aleatório) com open_time contíguo"""
+    rng = np.random.default_rng(seed)
+    closes = start_price * np.exp(np.cumsum(rng.normal(0, 0.01, length)))
+    opens = np.concatenate([[start_price], closes[:-1]])
+    highs = np.maximum(opens, closes) * (1 + rng.uniform(0, 0.01, length))
+    lows = np.minimum(opens, closes) * (1 - rng.uniform(0, 0.01, length))
+    # Alguns candles sem variação para exercitar diff == 0 no RSI
+    closes[10] = closes[9]
+    return pd.DataFrame({
+        'open_time': np.arange(length, dtype=np.int64) * HOUR_MS + 1735689600000,
+        'open': opens, 'high': highs, 'low': lows, 'close': closes,
+        'volume': rng.uniform(100, 1000, length)
+    })
+
+
+def _ta_values(df: pd.DataFrame) -> dict:
+    """Valores do último candle calculados pela biblioteca ta"""
+    close = pd.Series(df['close'].values, dtype=float)
+    high = pd.Series(df['high'].values, dtype=float)
+    low = pd.Series(df['low'].values, dtype=float)
+    macd = MACD(close=close)
+    return {
+        'ema20': EMAIndicator(close=close, window=20).ema_indicator().iloc[-1],
+        'ema50': EMAIndicator(close=close, window=50).ema_indicator().iloc[-1],
+        'macd': macd.macd().iloc[-1],
+        'macd_signal': macd.macd_signal().iloc[-1],
+        'macd_diff': macd.macd_diff().iloc[-1],
+        'rsi': RSIIndicator(close=close, window=14).rsi().iloc[-1],
+        'atr': AverageTrueRange(high=high, low=low, close=close, window=14).average_true_range().iloc[-1],
+    }
+
+
+def _assert_parity(values: dict, expected: dict) -> None:
+    for name, expected_value in expected.items():
+        actual = values[name]
+        if math.isnan(expected_value):
+            assert math.isnan(actual), f"{name}: esperado NaN, obtido {actual}"
+        else:
+            assert math.isclose(actual, expected_value, rel_tol=RTOL, abs_tol=1e-12), \
+                f"{name}: {actual} != {expected_value}"
+
+
+def test_compute_matches_ta_including_warmup():
+    """Cálculo integral bate com a ta em todos os tamanhos (inclusive aquecimento)"""
+    engine = IncrementalIndicatorEngine()
+    df = _make_candles(120)
+    for length in [14, 15, 20, 26, 33, 34, 35, 50, 51, 100, 120]:
+        _assert_parity(engine.compute(df.iloc[:length]), _ta_values(df.iloc[:length]))
+
+
+def test_incremental_updates_match_ta():
+    """Atualizações candle a candle batem com a ta sobre a série completa"""
+    engine = IncrementalIndicatorEngine()
+    df = _make_candles(400, seed=11)
+
+    for end in range(60, 401):
+        values = engine.update('TESTUSDT', '1h', df.iloc[:end])
+        _assert_parity(values, _ta_values(df.iloc[:end]))
+
+    stats = engine.get_stats()
+    assert stats['seeds'] == 1
+    assert stats['candles_committed'] == 400 - 60
+
+
+def test_rolling_window_keeps_state():
+    """Janela deslizante (como no scanner) incorpora apenas o candle novo"""
+    engine = IncrementalIndicatorEngine()
+    df = _make_candles(300, seed=3)
+
+    engine.update('TESTUSDT', '4h', df.iloc[0:100])
+    for start in range(1, 200):
+        values = engine.update('TESTUSDT', '4h', df.iloc[start:start + 100])
+        # Estado acumulado desde o primeiro candle: igual à ta sobre a série inteira
+        _assert_parity(values, _ta_values(df.iloc[:start + 100]))
+
+    assert engine.get_stats()['seeds'] == 1
+
+
+def test_provisional_candle_does_not_change_state():
+    """Atualizações repetidas do candle em formação não alteram o estado fechado"""
+    engine = IncrementalIndicatorEngine()
+    df = _make_candles(150, seed=5)
+
+    engine.update('TESTUSDT', '1h', df)
+    live = df.copy()
+    for close in [df['close'].iloc[-1] * 1.02, df['close'].iloc[-1] * 0.97, df['close'].iloc[-1]]:
+        live.loc[live.index[-1], 'close'] = close
+        live.loc[live.index[-1], 'high'] = max(live['high'].iloc[-1], close)
+        live.loc[live.index[-1], 'low'] = min(live['low'].iloc[-1], close)
+        _assert_parity(engine.update('TESTUSDT', '1h', live), _ta_values(live))
+
+    assert engine.get_stats()['candles_committed'] == 0
+
+
+def test_gap_triggers_reseed():
+    """Dados sem o último candle conhecido forçam reconstrução do estado"""
+    engine = IncrementalIndicatorEngine()
+    df = _make_candles(300, seed=9)
+
+    engine.update('TESTUSDT', '1h', df.iloc[0:100])
+    values = engine.update('TESTUSDT', '1h', df.iloc[150:250])
+    _assert_parity(values, _ta_values(df.iloc[150:250]))
+    assert engine.get_stats()['seeds'] == 2
+
+
+def test_retain_evicts_symbols_out_of_scan():
+    """Pares que saíram da varredura têm o estado e o lock descartados"""
+    engine = IncrementalIndicatorEngine()
+    df = _make_candles(120, seed=3)
+    for symbol in ('AAAUSDT', 'BBBUSDT', 'BTCUSDT'):
+        for interval in ('1h', '4h'):
+            engine.update(symbol, interval, df)
+
+    assert engine.retain(['BBBUSDT', 'BTCUSDT']) == 2
+    assert {key[0] for key in engine.states} == {'BBBUSDT', 'BTCUSDT'}
+    assert set(engine.key_locks) == set(engine.states)
+    assert engine.retain(['BBBUSDT', 'BTCUSDT']) == 0 and engine.get_stats()['tracked_series'] == 4
+
+
+if __name__ == '__main__':
+    print("🧪 === TESTE DE PARIDADE DOS INDICADORES INCREMENTAIS ===")
+    test_compute_matches_ta_including_warmup()
+    test_incremental_updates_match_ta()
+    test_rolling_window_keeps_state()
+    test_provisional_candle_does_not_change_state()
+    test_gap_triggers_reseed()
+    test_retain_evicts_symbols_out_of_scan()
+    print("✅ Indicadores incrementais idênticos à biblioteca ta")
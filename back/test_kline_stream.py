@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Teste do KlineStream
+Valida a ingestão de klines via WebSocket contra um servidor local que
+reproduz frames gravados (test_fixtures/kline_stream_frames.jsonl)
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import base64
+import hashlib
+import json
+import socket
+import struct
+import threading
+import time
+from typing import Dict, List
+
+from core.kline_stream import KlineStream
+
+FIXTURE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                            'test_fixtures', 'kline_stream_frames.jsonl')
+T0 = 1735689600000  # 2025-01-01 00:00 UTC
+HOUR_MS = 3_600_000
+WS_GUID = '258EAFA5-E914-47DA-95CA-C5AB0DC85B11'
+
+
+class FakeBinanceWebSocketServer:
+    """Servidor WebSocket mínimo que reproduz frames gravados por conexão"""
+
+    def __init__(self, frames_by_connection: List[List[str]]):
+        self.frames_by_connection = frames_by_connection
+        self.paths: List[str] = []
+        self.accept_gates = [threading.Event() for _ in frames_by_connection]
+        self.close_events = [threading.Event() for _ in frames_by_connection]
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.sock.bind(('127.0.0.1', 0))
+        self.sock.listen(4)
+        self.url = f"ws://127.0.0.1:{self.sock.getsockname()[1]}"
+        self.accept_gates[0].set()
+        self.thread = threading.Thread(target=self._serve, daemon=True)
+        self.thread.start()
+
+    @staticmethod
+    def _encode_frame(payload: bytes, opcode: int = 0x1) -> bytes:
+        header = bytes([0x80 | opcode])
+        if len(payload) < 126:
+            header += bytes([len(payload)])
+        elif len(payload) < 65536:
+            header += bytes([126]) + struct.pack('>H', len(payload))
+        else:
+            header += bytes([127]) + struct.pack('>Q', len(payload))
+        return header + payload
+
+    def _handshake(self, conn: socket.socket) -> None:
+        request = b''
+        while b'\r\n\r\n' not in request:
+            chunk = conn.recv(4096)
+            if not chunk:
+                return
+            request += chunk
+
+        lines = request.decode().split('\r\n')
+        self.paths.append(lines[0].split(' ')[1])
+        headers = {k.strip().lower(): v.strip()
+                   for k, v in (line.split(':', 1) for line in lines[1:] if ':' in line)}
+        accept = base64.b64encode(
+            hashlib.sha1((headers['sec-websocket-key'] + WS_GUID).encode()).digest()
+        ).decode()
+        conn.sendall((
+            'HTTP/1.1 101 Switching Protocols\r\n'
+            'Upgrade: websocket\r\n'
+            'Connection: Upgrade\r\n'
+            f'Sec-WebSocket-Accept: {accept}\r\n\r\n'
+        ).encode())
+
+    def _serve(self) -> None:
+        for index, frames in enumerate(self.frames_by_connection):
+            conn, _ = self.sock.accept()
+            self.accept_gates[index].wait(10)
+            self._handshake(conn)
+            for frame in frames:
+                conn.sendall(self._encode_frame(frame.encode()))
+
+            # Aguardar o teste derrubar a conexão ou o cliente pedir o fechamento
+            conn.settimeout(0.05)
+            while not self.close_events[index].is_set():
+                try:
+                    data = conn.recv(4096)
+                except socket.timeout:
+                    continue
+                except OSError:
+                    break
+                if not data or data[0] & 0x0F == 0x8:
+                    break
+            try:
+                conn.sendall(self._encode_frame(struct.pack('>H', 1000), opcode=0x8))
+                time.sleep(0.05)
+                conn.close()
+            except OSError:
+                pass
+
+    def shutdown(self) -> None:
+        for event in self.accept_gates + self.close_events:
+            event.set()
+        self.sock.close()
+
+
+class FakeClock:
+    """Relógio controlado pelo teste (segundos)"""
+
+    def __init__(self, now_ms: int):
+        self.now_ms = now_ms
+
+    def __call__(self) -> float:
+        return self.now_ms / 1000
+
+
+class FakeRestClient:
+    """Cliente REST falso com histórico sintético coerente com os frames gravados"""
+
+    def __init__(self, clock: FakeClock):
+        self.clock = clock
+        self.calls: List[Dict] = []
+        self.history = {}
+        price = 90000.0
+        for i in range(-150, 4):
+            open_time = T0 + i * HOUR_MS
+            self.history[open_time] = {
+                'open_time': open_time, 'open': price, 'high': price * 1.002,
+                'low': price * 0.998, 'close': price * 1.001, 'volume': 500.0,
+                'close_time': open_time + HOUR_MS - 1
+            }
+            price *= 1.001
+        # Candles fechados idênticos aos valores finais do stream gravado
+        self.history[T0].update({'open': 93500.0, 'high': 93850.0, 'low': 93410.0,
+                                 'close': 93801.7, 'volume': 845.12})
+        self.history[T0 + 2 * HOUR_MS].update({'close': 94120.0})
+
+    def get_klines(self, symbol, interval='1h', limit=100):
+        self.calls.append({'symbol': symbol, 'interval': interval, 'limit': limit})
+        current_open = self.clock.now_ms // HOUR_MS * HOUR_MS
+        candles = [c for t, c in sorted(self.history.items()) if t <= current_open]
+        return [dict(c) for c in candles[-limit:]]
+
+
+def _load_frames() -> List[List[str]]:
+    frames: Dict[int, List[str]] = {}
+    with open(FIXTURE_FILE, 'r', encoding='utf-8') as f:
+        for line in f:
+            record = json.loads(line)
+            frames.setdefault(record['connection'], []).append(json.dumps(record['frame']))
+    return [frames[i] for i in sorted(frames)]
+
+
+def _wait_for(condition, timeout: float = 10.0) -> bool:
+    end_time = time.time() + timeout
+    while time.time() < end_time:
+        if condition():
+            return True
+        time.sleep(0.02)
+    return False
+
+
+def test_kline_stream_replay_and_gap_repair():
+    """Reproduz frames gravados, derruba a conexão e verifica o reparo via REST"""
+    server = FakeBinanceWebSocketServer(_load_frames())
+    clock = FakeClock(T0 + HOUR_MS + 5 * 60_000)
+    rest = FakeRestClient(clock)
+    stream = KlineStream(rest, intervals=['1h'], ws_url=server.url, history_size=120,
+                         reconnect_delay=0.05, clock=clock)
+
+    try:
+        stream.set_symbols(['BTCUSDT'])
+        stream.start()
+
+        # Backfill REST inicial + 3 frames da primeira conexão
+        assert _wait_for(lambda: stream.stats['messages_received'] == 3 and stream.stats['rest_backfills'] == 1)
+        assert server.paths[0] == '/stream?streams=btcusdt@kline_1h'
+        assert rest.calls[0] == {'symbol': 'BTCUSDT', 'interval': '1h', 'limit': 120}
+
+        klines = stream.get_klines('BTCUSDT', '1h', 100)
+        assert klines is not None and len(klines) == 100
+        assert klines[-1]['open_time'] == T0 + HOUR_MS
+        assert klines[-1]['close'] == 93812.4
+        assert klines[-2]['open_time'] == T0 and klines[-2]['close'] == 93801.7
+
+        # Desconectar e avançar o relógio por dois fechamentos de candle
+        server.close_events[0].set()
+        assert _wait_for(lambda: not stream.is_connected())
+        assert stream.get_klines('BTCUSDT', '1h', 100) is None  # Fallback REST enquanto desconectado
+
+        clock.now_ms = T0 + 3 * HOUR_MS + 5 * 60_000
+        server.accept_gates[1].set()
+
+        assert _wait_for(lambda: stream.stats['messages_received'] == 4 and stream.stats['gap_repairs'] == 1)
+        assert rest.calls[-1]['limit'] == 4  # 2 candles perdidos + margem
+
+        klines = stream.get_klines('BTCUSDT', '1h', 100)
+        assert klines is not None
+        open_times = [k['open_time'] for k in klines]
+        assert open_times[-4:] == [T0, T0 + HOUR_MS, T0 + 2 * HOUR_MS, T0 + 3 * HOUR_MS]
+        assert klines[-2]['close'] == 94120.0  # Candle reparado via REST
+        assert klines[-1]['close'] == 94101.9  # Candle em formação do stream
+        assert stream.stats['reconnections'] >= 1
+
+    finally:
+        stream.stop()
+        server.shutdown()
+
+
+def test_kline_stream_batches_and_gap_detection():
+    """Verifica divisão em conexões e que lacunas não são servidas da memória"""
+    clock = FakeClock(T0 + HOUR_MS + 60_000)
+    stream = KlineStream(FakeRestClient(clock), intervals=['1h', '4h'],
+                         max_streams_per_connection=3, clock=clock)
+    stream.set_symbols(['BTCUSDT', 'ETHUSDT'])
+
+    batches = stream._build_stream_batches()
+    assert [len(b) for b in batches] == [3, 1]
+    assert 'btcusdt@kline_4h' in batches[0]
+
+    klines = FakeRestClient(clock).get_klines('BTCUSDT', '1h', 50)
+    del klines[20]
+    stream.seed('BTCUSDT', '1h', klines)
+
+    # Simular conexão ativa
+    stream.is_running = True
+    stream._expected_connections = 1
+    stream._connected[0] = True
+    assert stream.get_klines('BTCUSDT', '1h', 20) is not None
+    assert stream.get_klines('BTCUSDT', '1h', 40) is None
+    stream.is_running = False
+
+
+if __name__ == '__main__':
+    print("🧪 === TESTE DO KLINE STREAM ===")
+    test_kline_stream_batches_and_gap_detection()
+    print("✅ Divisão de streams e detecção de lacunas")
+    test_kline_stream_replay_and_gap_repair()
+    print("✅ Replay de frames e reparo de lacunas")
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Teste do KlinesCache com buffer circular colunar
+Valida janelas independentes do buffer, anexação no lugar e memória reportada
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+import pandas as pd
+
+from core.klines_cache import CacheManager, CandleRingBuffer, KlinesCache
+
+HOUR_MS = 3_600_000
+T0 = 1735689600000
+
+
+def _make_frame(start: int, length: int) -> pd.DataFrame:
+    """Candles sintéticos com close = índice do candle"""
+    index = np.arange(start, start + length, dtype=float)
+    return pd.DataFrame({
+        'open_time': T0 + np.arange(start, start + length, dtype=np.int64) * HOUR_MS,
+        'open': index, 'high': index + 1, 'low': index - 1, 'close': index,
+        'volume': np.full(length, 10.0)
+    })
+
+
+def test_windows_for_any_limit_are_independent_copies():
+    """Limites diferentes vêm do mesmo buffer; DataFrames entregues não mudam com refreshes"""
+    cache = KlinesCache(default_ttl=60, capacity=200)
+    cache.set('BTCUSDT', '1h', _make_frame(0, 150), limit=150)
+
+    buffer = cache.cache['BTCUSDT_1h']['buffer']
+    for limit in [1, 20, 100, 150]:
+        df = cache.get('BTCUSDT', '1h', limit)
+        assert len(df) == limit
+        assert df['close'].iloc[-1] == 149.0 and df['close'].iloc[0] == 150 - limit
+        assert not np.shares_memory(df['close'].to_numpy(), buffer.data)
+
+    view = buffer.view(50)
+    assert not view.flags.writeable
+
+    # Refresh do candle em formação não altera o DataFrame já entregue
+    df = cache.get('BTCUSDT', '1h', 100)
+    refreshed = _make_frame(149, 1).assign(close=-1.0)
+    cache.set('BTCUSDT', '1h', refreshed, limit=1)
+    assert df['close'].iloc[-1] == 149.0 and cache.get('BTCUSDT', '1h', 100)['close'].iloc[-1] == -1.0
+    df.loc[df.index[-1], 'close'] = 0.0  # Chamador pode escrever no próprio DataFrame
+    assert cache.get('BTCUSDT', '1h', 151) is None  # Histórico insuficiente
+    assert len(cache.cache) == 1
+
+
+def test_append_in_place_and_wraparound():
+    """Novos candles e atualizações do candle em formação são gravados no lugar"""
+    buffer = CandleRingBuffer(capacity=100)
+    frame = _make_frame(0, 80)
+    rows = frame[list(CandleRingBuffer.COLUMNS)].to_numpy(dtype=float)
+    buffer.merge(rows[:, 0], rows)
+    data_id = id(buffer.data)
+
+    for start in range(75, 400, 5):
+        # Janela sobreposta (como um refresh via REST) que avança 5 candles
+        frame = _make_frame(start, 10)
+        rows = frame[list(CandleRingBuffer.COLUMNS)].to_numpy(dtype=float)
+        buffer.merge(rows[:, 0], rows)
+
+        window = buffer.view(100)
+        expected_last = start + 9
+        assert window[4, -1] == expected_last
+        assert np.all(np.diff(window[0]) == HOUR_MS)  # Janela contígua após o wraparound
+        assert window[4, 0] == expected_last - len(buffer) + 1
+
+    assert id(buffer.data) == data_id and len(buffer) == 100
+
+    # Lacuna: buffer reiniciado com os novos dados
+    frame = _make_frame(1000, 30)
+    rows = frame[list(CandleRingBuffer.COLUMNS)].to_numpy(dtype=float)
+    buffer.merge(rows[:, 0], rows)
+    assert len(buffer) == 30 and buffer.last_open_time() == T0 + 1029 * HOUR_MS
+
+
+def test_cache_manager_reports_memory():
+    """CacheManager soma a memória dos buffers de todos os intervalos"""
+    manager = CacheManager()
+    manager.set_klines('BTCUSDT', '1h', _make_frame(0, 100), 100)
+    manager.set_klines('BTCUSDT', '4h', _make_frame(0, 100), 100)
+
+    df, hit = manager.get_klines('BTCUSDT', '1h', 50)
+    assert hit and len(df) == 50
+
+    stats = manager.get_performance_stats()
+    expected = manager.klines_1h.capacity * 2 * len(CandleRingBuffer.COLUMNS) * 8 * 2
+    assert stats['memory_bytes'] == expected
+    assert stats['individual_caches']['1h']['total_candles'] == 100
+
+
+if __name__ == '__main__':
+    print("🧪 === TESTE DO CACHE DE KLINES ===")
+    test_windows_for_any_limit_are_independent_copies()
+    test_append_in_place_and_wraparound()
+    test_cache_manager_reports_memory()
+    print("✅ Buffer circular colunar funcionando")
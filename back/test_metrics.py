@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Teste das Métricas
+Valida o formato de texto do Prometheus (contadores, histogramas, coletores),
+a instrumentação do BinanceClient e do CacheManager e o endpoint /metrics
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import logging
+import time
+
+import pandas as pd
+from flask import Flask
+
+from api_routes.metrics import metrics_bp
+from core import binance_client as binance_module
+from core.klines_cache import CacheManager
+from core.metrics import (BINANCE_REQUEST_ERRORS, BINANCE_REQUEST_SECONDS, MetricsRegistry, metrics,
+                          stats_collector)
+from core.rate_limiter import WeightRateLimiter
+
+
+def parse_samples(text):
+    """{'nome{labels}': valor} das linhas de amostra do formato de texto"""
+    samples = {}
+    for line in text.splitlines():
+        if line and not line.startswith('#'):
+            name, value = line.rsplit(' ', 1)
+            samples[name] = float(value)
+    return samples
+
+
+def test_registry_renders_prometheus_text():
+    """Histograma acumulado com +Inf/_sum/_count, labels escapados e coletor com falha isolado"""
+    registry = MetricsRegistry(prefix='test_')
+    histogram = registry.histogram('stage_seconds', 'Duração', ('stage',), buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 0.5, 3.0):
+        histogram.observe(value, stage='fetch')
+    with histogram.time(stage='score'):
+        pass
+    counter = registry.counter('errors_total', 'Erros', ('reason',))
+    counter.inc(reason='say "hi"')
+    counter.inc(2, reason='say "hi"')
+    assert registry.histogram('stage_seconds', 'Duração', ('stage',)) is histogram
+
+    registry.register_collector('queue', stats_collector(
+        'queue', 'gauge', 'Fila', lambda: {'depth': 7, 'running': True, 'name': 'x'}, {'depth': 'Itens'}))
+    registry.register_collector('broken', lambda: 1 / 0)
+
+    text = registry.render()
+    samples = parse_samples(text)
+    assert '# TYPE test_stage_seconds histogram' in text and '# TYPE test_queue_depth gauge' in text
+    assert samples['test_stage_seconds_bucket{stage="fetch",le="0.1"}'] == 1
+    assert samples['test_stage_seconds_bucket{stage="fetch",le="1"}'] == 3
+    assert samples['test_stage_seconds_bucket{stage="fetch",le="+Inf"}'] == 4
+    assert samples['test_stage_seconds_sum{stage="fetch"}'] == 4.05
+    assert samples['test_stage_seconds_count{stage="score"}'] == 1
+    assert samples['test_errors_total{reason="say \\"hi\\""}'] == 3
+    assert samples['test_queue_depth'] == 7 and 'test_queue_running' not in text
+    assert histogram.snapshot(stage='fetch')['buckets'][1.0] == 3
+
+    try:
+        registry.counter('stage_seconds', 'Outro tipo')
+        assert False, 'tipo diferente deveria falhar'
+    except ValueError:
+        pass
+
+
+class FakeResponse:
+    def __init__(self, status_code, payload=None, headers=None):
+        self.status_code = status_code
+        self.payload = payload
+        self.headers = headers or {}
+        self.text = str(payload)
+
+    def json(self):
+        return self.payload
+
+
+class FakeHttpPool:
+    """Devolve as respostas em sequência, com uma pequena latência"""
+
+    def __init__(self, responses):
+        self.responses = list(responses)
+
+    def get(self, url, **kwargs):
+        time.sleep(0.002)
+        return self.responses.pop(0)
+
+
+def test_binance_and_cache_instrumentation(monkeypatch):
+    """Latência por endpoint sem query string, erros por motivo e razão de acerto do cache"""
+    client = binance_module.BinanceClient.__new__(binance_module.BinanceClient)
+    client.priority = 'scan'
+    client.rate_limiter = WeightRateLimiter()
+    client.base_url = 'http://exchange.test'
+    client.logger = logging.getLogger('MetricsTest')
+    monkeypatch.setattr(binance_module, 'http_pool', FakeHttpPool([
+        FakeResponse(429, headers={'Retry-After': '0'}), FakeResponse(200, {'ok': True})
+    ]))
+
+    endpoint = '/fapi/v1/premiumIndex'
+    latency_before = BINANCE_REQUEST_SECONDS.snapshot(endpoint=endpoint, client='sync')['count']
+    errors_before = BINANCE_REQUEST_ERRORS.get(endpoint=endpoint, reason='429')
+    assert client._send_request(endpoint + '?symbol=BTCUSDT', 'GET', None, False, None) == {'ok': True}
+    latency = BINANCE_REQUEST_SECONDS.snapshot(endpoint=endpoint, client='sync')
+    assert latency['count'] == latency_before + 2 and latency['sum'] > 0
+    assert BINANCE_REQUEST_ERRORS.get(endpoint=endpoint, reason='429') == errors_before + 1
+
+    cache_manager = CacheManager()
+    frame = pd.DataFrame({'open_time': range(100), 'open': 1.0, 'high': 2.0, 'low': 0.5, 'close': 1.5,
+                          'volume': 10.0})
+    cache_manager.set_klines('BTCUSDT', '1h', frame)
+    for _ in range(3):
+        assert cache_manager.get_klines('BTCUSDT', '1h')[1]
+    assert not cache_manager.get_klines('BTCUSDT', '4h')[1]
+
+    families = {name: samples for name, _, _, samples in cache_manager.collect_metrics()}
+    ratios = {labels['cache']: value for labels, value in families['klines_cache_hit_ratio']}
+    assert ratios == {'1h': 1.0, '4h': 0.0, '1d': 0.0, 'all': 0.75}
+    assert ({'cache': '1h'}, 1) in families['klines_cache_entries']
+
+
+def test_metrics_endpoint():
+    """GET /metrics responde texto do Prometheus com as famílias e coletores registrados"""
+    app = Flask(__name__)
+    app.register_blueprint(metrics_bp)
+    metrics.register_collector('test_endpoint', lambda: [('test_endpoint_up', 'gauge', 'Teste', [({}, 1)])])
+    try:
+        response = app.test_client().get('/metrics')
+    finally:
+        metrics.unregister_collector('test_endpoint')
+
+    assert response.status_code == 200
+    assert response.headers['Content-Type'].startswith('text/plain; version=0.0.4')
+    body = response.get_data(as_text=True)
+    assert '# TYPE crypten_scan_stage_seconds histogram' in body
+    assert '# TYPE crypten_binance_request_errors_total counter' in body
+    assert parse_samples(body)['crypten_test_endpoint_up'] == 1
+
+
+if __name__ == '__main__':
+    print("🧪 === TESTE DAS MÉTRICAS ===")
+    registry = MetricsRegistry(prefix='bench_')
+    histogram = registry.histogram('seconds', 'Benchmark', ('stage',))
+    count = 200_000
+    start = time.perf_counter()
+    for _ in range(count):
+        with histogram.time(stage='x'):
+            pass
+    per_call = (time.perf_counter() - start) / count
+    print(f"⚡ Custo por medição (with histogram.time): {per_call * 1e6:.2f}µs")
+    print(registry.render()[:400])
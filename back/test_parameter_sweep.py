@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Teste da Parameter Sweep
+Prepara o dataset .npy de candles sintéticos, confere que o replay sobre as
+pontuações abertas com mmap é idêntico ao replay direto e executa uma grade
+pequena em processos
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import time
+
+import numpy as np
+
+from core.backtest_engine import BacktestEngine
+from core.parameter_sweep import (grid_combinations, load_dataset, prepare_dataset, random_combinations,
+                                  rank_results, run_sweep, split_parameters)
+from test_backtest_engine import synthetic_candles
+
+
+def test_mmap_dataset_matches_direct_replay(tmp_path):
+    """Replay com candles/pontuações do dataset = replay direto com a mesma configuração"""
+    candles = synthetic_candles(symbol_count=4, hours=24 * 60)
+    manifest = prepare_dataset(candles, str(tmp_path))
+    assert sorted(manifest['symbols']) == sorted(candles)
+
+    loaded, scored, _ = load_dataset(str(tmp_path))
+    assert isinstance(scored['C0USDT'], np.memmap) and len(scored['C0USDT']) > 0
+    assert np.array_equal(loaded['C1USDT']['1h']['close'], candles['C1USDT']['1h']['close'])
+    assert loaded['C1USDT']['4h']['open_time'].dtype == np.int64
+
+    params = {'quality_score_minimum': 60.0, 'target_percentage_min': 5.0, 'min_volume_increase': 1.1}
+    configs = split_parameters(params)
+    assert configs == {'analysis': {'quality_score_minimum': 60.0, 'target_percentage_min': 5.0},
+                       'confirmation': {'min_volume_increase': 1.1}}
+
+    direct = BacktestEngine(candles, configs['analysis'], configs['confirmation']).run()
+    replay = BacktestEngine(loaded, configs['analysis'], configs['confirmation'], scored=scored).run()
+    assert replay['signals'] == direct['signals'] and replay['performance'] == direct['performance']
+    assert direct['signals']['confirmed'] > 0
+    assert direct['performance']['max_drawdown_usd'] >= 0
+
+
+def test_sweep_grid_in_processes(tmp_path):
+    """Grade executada no pool: uma linha por combinação, limites mais altos → menos candidatos"""
+    prepare_dataset(synthetic_candles(symbol_count=3, hours=24 * 45), str(tmp_path))
+    combinations = grid_combinations({'quality_score_minimum': [55.0, 70.0], 'check_interval': [300, 900]})
+    assert len(combinations) == 4
+
+    rows = run_sweep(str(tmp_path), combinations, max_workers=2)
+    assert [row['params'] for row in rows] == combinations
+    by_params = {(row['params']['quality_score_minimum'], row['params']['check_interval']): row for row in rows}
+    assert by_params[(55.0, 300)]['candidates'] > by_params[(70.0, 300)]['candidates']
+    assert by_params[(55.0, 300)]['candidates'] == by_params[(55.0, 900)]['candidates']
+    for row in rows:
+        assert row['evaluated'] <= row['confirmed'] <= row['candidates']
+        assert 0.0 <= row['success_rate'] <= 100.0 and row['max_drawdown_usd'] >= 0
+
+    ranked = rank_results(rows, 'max_drawdown_usd')
+    assert ranked[0]['max_drawdown_usd'] == min(row['max_drawdown_usd'] for row in rows)
+    sampled = random_combinations({'quality_score_minimum': (60.0, 80.0), 'check_interval': [300, 600]}, 5, seed=3)
+    assert sampled == random_combinations({'quality_score_minimum': (60.0, 80.0), 'check_interval': [300, 600]},
+                                          5, seed=3)
+    assert all(60.0 <= c['quality_score_minimum'] <= 80.0 for c in sampled)
+
+
+def benchmark_sweep(directory, symbol_count=20, days=180, workers=None):
+    """Tempo de preparação e de uma grade de 8 combinações"""
+    start = time.perf_counter()
+    prepare_dataset(synthetic_candles(symbol_count=symbol_count, hours=24 * days), directory)
+    prepared = time.perf_counter() - start
+    combinations = grid_combinations({'quality_score_minimum': [60.0, 65.0, 70.0, 75.0],
+                                      'min_breakout_percentage': [0.3, 0.8]})
+    start = time.perf_counter()
+    rows = run_sweep(directory, combinations, max_workers=workers)
+    return prepared, time.perf_counter() - start, rows
+
+
+if __name__ == '__main__':
+    import tempfile
+
+    print("🧪 === TESTE DA PARAMETER SWEEP ===")
+    with tempfile.TemporaryDirectory() as directory:
+        prepared, elapsed, rows = benchmark_sweep(directory)
+    print(f"⏱️ Dataset em {prepared:.1f}s, {len(rows)} combinações em {elapsed:.1f}s")
+    for row in rank_results(rows):
+        print(f"   {row['params']} → {row['success_rate']}% | drawdown ${row['max_drawdown_usd']:.2f}")
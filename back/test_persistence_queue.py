@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Teste da WriteBehindQueue
+Valida o agrupamento em lotes, o retry com backoff por tipo, o dead-letter de
+itens problemáticos, a recuperação do journal após reinício e o transbordo
+quando a fila em memória está cheia
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import json
+import tempfile
+import time
+
+from core.persistence_queue import WriteBehindQueue
+
+
+class _FakeClock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_batches_and_backoff():
+    """Itens saem em lotes por tipo e uma falha devolve o lote com backoff exponencial só daquele tipo"""
+    clock = _FakeClock()
+    queue = WriteBehindQueue(batch_size=3, base_backoff=2, max_backoff=5, clock=clock)
+    queue.handlers['a'] = lambda batch: batches.append(('a', batch))
+    failures = [RuntimeError('offline'), RuntimeError('offline')]
+
+    def flaky(batch):
+        if failures:
+            raise failures.pop(0)
+        batches.append(('b', batch))
+
+    queue.handlers['b'] = flaky
+    batches = []
+    queue.enqueue_many('a', [{'n': 1}, {'n': 2}])
+    queue.enqueue('b', {'n': 3})
+    queue.enqueue_many('a', [{'n': 4}, {'n': 5}])
+
+    assert queue.flush_once() == 3
+    assert batches[0] == ('a', [{'n': 1}, {'n': 2}, {'n': 4}])
+
+    assert queue.flush_once() == 0
+    assert queue.backoff['b']['retry_at'] == clock.now + 2
+    # 'b' em backoff não segura o restante de 'a'
+    assert queue.flush_once() == 1
+    assert batches[1] == ('a', [{'n': 5}])
+    assert queue.flush_once() == 0 and queue.get_stats()['depth'] == 1
+
+    clock.now += 2
+    assert queue.flush_once() == 0
+    assert queue.backoff['b']['retry_at'] == clock.now + 4
+    clock.now += 4
+    assert queue.flush_once() == 1
+    assert batches[2] == ('b', [{'n': 3}])
+    stats = queue.get_stats()
+    assert stats['consecutive_failures'] == 0 and stats['backoff_kinds'] == {}
+    assert stats['depth'] == 0 and stats['flushed'] == 5 and stats['failed_batches'] == 2
+
+
+def test_failing_kind_does_not_block_local_saves():
+    """Supabase fora do ar não impede a gravação local dos sinais enfileirados depois"""
+    queue = WriteBehindQueue(batch_size=10, flush_interval=0, base_backoff=60, max_backoff=60)
+    saved = []
+
+    def offline(batch):
+        raise RuntimeError('supabase offline')
+
+    queue.register_handler('supabase_signal', offline)
+    queue.register_handler('signal', saved.extend)
+    queue.enqueue_many('supabase_signal', [{'n': n} for n in range(3)])
+    queue.enqueue_many('signal', [{'n': n} for n in range(5)])
+    try:
+        deadline = time.time() + 5
+        while len(saved) < 5 and time.time() < deadline:
+            time.sleep(0.01)
+        assert [item['n'] for item in saved] == list(range(5))
+        stats = queue.get_stats()
+        assert stats['depth'] == 3 and stats['backoff_kinds'] == {'supabase_signal': 1}
+    finally:
+        queue.stop(drain_timeout=0)
+
+
+def test_poison_item_is_dead_lettered():
+    """Lotes que falham são divididos até isolar o item ruim, que sai da fila após max_attempts"""
+    clock = _FakeClock()
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'queue.jsonl')
+        queue = WriteBehindQueue(spill_path=path, batch_size=4, base_backoff=1, max_backoff=1,
+                                 max_attempts=3, clock=clock)
+        saved = []
+
+        def insert(batch):
+            if any(item.get('poison') for item in batch):
+                raise ValueError('invalid row')
+            saved.extend(batch)
+
+        queue.handlers['signal'] = insert
+        queue.enqueue_many('signal', [{'n': 0}, {'n': 1, 'poison': True}, {'n': 2}, {'n': 3}])
+        for _ in range(10):
+            queue.flush_once()
+            clock.now += 1
+
+        assert sorted(item['n'] for item in saved) == [0, 2, 3]
+        stats = queue.get_stats()
+        assert stats['depth'] == 0 and stats['dead_lettered'] == 1
+        assert [letter['payload']['n'] for letter in queue.dead_letters] == [1]
+        with open(queue.dead_letter_path, encoding='utf-8') as f:
+            assert json.loads(f.readline())['error'] == 'invalid row'
+
+        # Item descartado não volta no reinício
+        restarted = WriteBehindQueue(spill_path=path)
+        restarted._load_journal()
+        assert not restarted.queue
+
+
+def test_journal_recovery_and_spill():
+    """Itens sem ack voltam após reinício e o transbordo é recarregado do journal"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'queue.jsonl')
+        first = WriteBehindQueue(spill_path=path, max_size=2, batch_size=10)
+        first.handlers['signal'] = lambda batch: None
+        first.enqueue_many('signal', [{'n': n} for n in range(4)])
+        assert first.get_stats()['spilled_pending'] == 2
+        assert first.flush_once() == 2
+        first.enqueue('signal', {'n': 4})
+        # Reinício sem gravar o restante
+
+        saved = []
+        second = WriteBehindQueue(spill_path=path, max_size=10, batch_size=10, flush_interval=0)
+        second.register_handler('signal', saved.extend)
+        assert second.wait_empty(timeout=5)
+        second.stop()
+        assert [item['n'] for item in saved] == [2, 3, 4]
+        assert second.get_stats()['recovered'] == 3
+        assert os.path.getsize(path) == 0
+
+
+if __name__ == '__main__':
+    print("🧪 === TESTE DA FILA DE PERSISTÊNCIA ===")
+    test_batches_and_backoff()
+    print("✅ Lotes e backoff funcionando")
+    test_failing_kind_does_not_block_local_saves()
+    print("✅ Tipo com falha não bloqueia os outros")
+    test_poison_item_is_dead_lettered()
+    print("✅ Dead-letter de itens problemáticos funcionando")
+    test_journal_recovery_and_spill()
+    print("✅ Journal e transbordo funcionando")
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Teste do WeightRateLimiter
+Valida pesos por endpoint, filas de prioridade e sincronização com os headers da Binance
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import threading
+import time
+
+from core.rate_limiter import WeightRateLimiter, binance_rate_limiter, endpoint_weight
+
+
+def test_endpoint_weights():
+    """Pesos seguem a tabela da Binance Futures"""
+    assert endpoint_weight('/fapi/v1/klines', {'symbol': 'BTCUSDT', 'limit': 5}) == 1
+    assert endpoint_weight('/fapi/v1/klines', {'symbol': 'BTCUSDT', 'limit': 100}) == 2
+    assert endpoint_weight('/fapi/v1/klines', {'symbol': 'BTCUSDT', 'limit': 1000}) == 5
+    assert endpoint_weight('/fapi/v1/ticker/24hr') == 40
+    assert endpoint_weight('/fapi/v1/ticker/price?symbol=ETHUSDT') == 1
+    assert endpoint_weight('/fapi/v1/ticker/price') == 2
+    assert endpoint_weight('/fapi/v1/exchangeInfo') == 1
+
+
+def test_priority_lanes_order():
+    """Com o orçamento esgotado, confirmação é atendida antes de scan e dashboard"""
+    limiter = WeightRateLimiter(weight_limit=100, window_seconds=1.0)  # ~85 de peso/s
+    limiter.acquire(int(limiter.capacity))  # Esvaziar o bucket
+
+    order = []
+    threads = []
+    for lane in ['dashboard', 'scan', 'confirmation']:
+        thread = threading.Thread(target=lambda lane=lane: (limiter.acquire(5, lane), order.append(lane)))
+        thread.start()
+        threads.append(thread)
+        time.sleep(0.01)  # Garantir ordem de chegada inversa à prioridade
+
+    for thread in threads:
+        thread.join(5)
+
+    assert order == ['confirmation', 'scan', 'dashboard']
+    stats = limiter.get_stats()
+    assert stats['requests_by_lane'] == {'confirmation': 1, 'scan': 2, 'dashboard': 1}
+    assert stats['throttled_requests'] >= 3
+
+
+def test_throughput_stays_under_limit():
+    """Consumo contínuo não ultrapassa o limite da janela"""
+    limiter = WeightRateLimiter(weight_limit=200, window_seconds=0.5)
+    start = time.time()
+    consumed = 0
+    while time.time() - start < 0.5:
+        limiter.acquire(2)
+        consumed += 2
+    assert consumed <= 200
+
+
+def test_used_weight_header_and_penalty():
+    """Peso informado pela exchange e 429 suspendem as requisições"""
+    limiter = WeightRateLimiter(weight_limit=100, window_seconds=0.3)
+    limiter.update_from_headers({'X-MBX-USED-WEIGHT-1M': '99'})
+    assert limiter.get_stats()['blocked']
+    assert limiter.acquire(1) > 0  # Aguarda a próxima janela
+
+    limiter.penalize(0.2)
+    waited = limiter.acquire(1)
+    assert 0.15 < waited < 1.0
+    assert limiter.get_stats()['rate_limit_hits'] == 1
+
+
+def test_clients_share_global_budget():
+    """Todas as instâncias de BinanceClient usam o mesmo limitador"""
+    previous = os.environ.get('USE_BINANCE_API')
+    os.environ['USE_BINANCE_API'] = 'false'
+    try:
+        from core.binance_client import BinanceClient
+        scanner = BinanceClient()
+        dashboard = BinanceClient(priority='dashboard')
+    finally:
+        if previous is None:
+            os.environ.pop('USE_BINANCE_API')
+        else:
+            os.environ['USE_BINANCE_API'] = previous
+
+    assert scanner.rate_limiter is dashboard.rate_limiter is binance_rate_limiter
+    assert dashboard.priority == 'dashboard' and scanner.priority == 'scan'
+
+
+if __name__ == '__main__':
+    print("🧪 === TESTE DO RATE LIMITER ===")
+    test_endpoint_weights()
+    test_priority_lanes_order()
+    test_throughput_stays_under_limit()
+    test_used_weight_header_and_penalty()
+    test_clients_share_global_budget()
+    print("✅ Orçamento global de peso funcionando")
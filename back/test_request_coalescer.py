@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Teste do RequestCoalescer
+Valida que requisições idênticas simultâneas compartilham uma única chamada
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from core.request_coalescer import RequestCoalescer
+
+
+class _FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_concurrent_calls_share_one_execution():
+    """Threads pedindo o mesmo (endpoint, params) disparam uma única chamada"""
+    coalescer = RequestCoalescer(linger={'/fapi/v1/klines': 0.0})
+    calls = []
+    release = threading.Event()
+
+    def fetch():
+        calls.append(1)
+        release.wait(5)
+        return [{'close': 1.0}]
+
+    key = coalescer.make_key('/fapi/v1/klines', {'symbol': 'BTCUSDT', 'interval': '1h', 'limit': 100})
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        futures = [executor.submit(coalescer.do, key, fetch) for _ in range(8)]
+        time.sleep(0.2)
+        release.set()
+        results = [future.result() for future in futures]
+
+    assert len(calls) == 1
+    assert all(result is results[0] for result in results)
+
+    stats = coalescer.get_stats()
+    assert stats['executed'] == 1
+    assert stats['coalesced_in_flight'] == 7
+    assert stats['requests_saved'] == 7
+    assert stats['tracked_keys'] == 0  # Sem janela de reaproveitamento
+
+
+def test_recent_result_reused_within_linger():
+    """Resultado concluído é reaproveitado dentro da janela do endpoint"""
+    clock = _FakeClock()
+    coalescer = RequestCoalescer(linger={'/fapi/v1/ticker/24hr': 5.0}, clock=clock)
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        return [{'symbol': 'BTCUSDT'}]
+
+    key = coalescer.make_key('/fapi/v1/ticker/24hr')
+    coalescer.do(key, fetch)
+    clock.now += 4.0
+    coalescer.do(key, fetch)
+    assert len(calls) == 1
+    assert coalescer.peek(key)[0]
+
+    clock.now += 2.0  # Fora da janela
+    coalescer.do(key, fetch)
+    assert len(calls) == 2
+    assert coalescer.get_stats()['served_recent'] == 2
+
+
+def test_keys_and_failures():
+    """Parâmetros distintos não se misturam e falhas não são reaproveitadas"""
+    coalescer = RequestCoalescer(linger={'/fapi/v1/klines': 10.0})
+
+    key_a = coalescer.make_key('/fapi/v1/klines', {'symbol': 'BTCUSDT', 'limit': 100, 'interval': '1h'})
+    key_b = coalescer.make_key('/fapi/v1/klines?symbol=BTCUSDT&interval=1h&limit=100')
+    key_c = coalescer.make_key('/fapi/v1/klines', {'symbol': 'ETHUSDT', 'interval': '1h', 'limit': 100})
+    assert key_a == key_b
+    assert key_a != key_c
+
+    assert coalescer.do(key_c, lambda: None) is None
+    assert coalescer.do(key_c, lambda: 'ok') == 'ok'
+
+    try:
+        coalescer.do(key_a, lambda: 1 / 0)
+        assert False, "exceção deveria propagar"
+    except ZeroDivisionError:
+        pass
+    assert coalescer.do(key_a, lambda: 'ok') == 'ok'
+    assert coalescer.get_stats()['executed'] == 4
+
+
+if __name__ == '__main__':
+    print("🧪 === TESTE DO AGRUPADOR DE REQUISIÇÕES ===")
+    test_concurrent_calls_share_one_execution()
+    print("✅ Chamadas simultâneas compartilhadas")
+    test_recent_result_reused_within_linger()
+    print("✅ Resultados recentes reaproveitados")
+    test_keys_and_failures()
+    print("✅ Chaves distintas e falhas tratadas")
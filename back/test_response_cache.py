@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Teste do ResponseCache
+Valida ETag/304, corpo pré-comprimido, invalidação por versão e ttl, e a
+montagem única da resposta com muitas requisições simultâneas
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import gzip
+import threading
+import time
+
+from flask import Flask, jsonify
+
+from core.response_cache import ResponseCache, VersionCounters, cached_response
+
+
+class _FakeClock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def __call__(self):
+        return self.now
+
+
+def _app():
+    versions = VersionCounters()
+    clock = _FakeClock()
+    cache = ResponseCache(versions, clock=clock)
+    calls = {'signals': 0, 'market': 0}
+    app = Flask(__name__)
+
+    @app.route('/signals')
+    @cached_response('signals', cache=cache)
+    def signals():
+        calls['signals'] += 1
+        time.sleep(0.05)
+        response = jsonify({'signals': [{'symbol': f'S{i}USDT', 'price': i} for i in range(100)],
+                            'version': versions.get('signals')})
+        response.headers['X-Data-Version'] = str(versions.get('signals'))
+        return response
+
+    @app.route('/market')
+    @cached_response(ttl=5, cache=cache)
+    def market():
+        calls['market'] += 1
+        return jsonify({'price': calls['market']})
+
+    return app, cache, versions, clock, calls
+
+
+def test_etag_gzip_and_versions():
+    """304 com o ETag atual, gzip pré-calculado e nova resposta após bump da versão"""
+    app, cache, versions, clock, calls = _app()
+    client = app.test_client()
+
+    first = client.get('/signals')
+    etag = first.headers['ETag']
+    assert first.status_code == 200 and first.headers['X-Data-Version'] == '0'
+
+    not_modified = client.get('/signals', headers={'If-None-Match': etag})
+    assert not_modified.status_code == 304 and not_modified.data == b''
+
+    zipped = client.get('/signals', headers={'Accept-Encoding': 'gzip, br'})
+    assert zipped.headers['Content-Encoding'] == 'gzip'
+    assert gzip.decompress(zipped.data) == first.data
+    assert calls['signals'] == 1
+
+    # Query string diferente é outra entrada; Authorization não passa pelo cache
+    client.get('/signals?page=2')
+    client.get('/signals', headers={'Authorization': 'Bearer x'})
+    assert calls['signals'] == 3
+
+    versions.bump('signals')
+    changed = client.get('/signals', headers={'If-None-Match': etag})
+    assert changed.status_code == 200 and changed.headers['ETag'] != etag
+    assert changed.get_json()['version'] == 1
+
+    client.get('/market')
+    client.get('/market')
+    clock.now += 5
+    assert client.get('/market').get_json()['price'] == 2
+
+    stats = cache.get_stats()
+    assert stats['not_modified'] == 1 and stats['gzip_responses'] == 1 and stats['bytes_saved'] > 0
+
+
+def test_single_build_under_concurrency():
+    """Muitos clientes simultâneos numa falta montam a resposta uma única vez"""
+    app, cache, versions, clock, calls = _app()
+    bodies = []
+
+    def poll():
+        with app.test_client() as client:
+            bodies.append(client.get('/signals').data)
+
+    threads = [threading.Thread(target=poll) for _ in range(20)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert calls['signals'] == 1
+    assert len(set(bodies)) == 1 and len(bodies) == 20
+    assert cache.get_stats()['hits'] == 19
+
+
+if __name__ == '__main__':
+    print("🧪 === TESTE DO CACHE DE RESPOSTAS ===")
+    test_etag_gzip_and_versions()
+    print("✅ ETag/304, gzip e versões funcionando")
+    test_single_build_under_concurrency()
+    print("✅ Montagem única sob concorrência funcionando")
@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Teste do SignalEventLog
+Valida o estado materializado, as limpezas por faixa de horário, a compactação
+em sinais_lista.csv e a recuperação (snapshot + eventos) após reinício
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import multiprocessing
+import tempfile
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+from core.database import Database
+from core.gerenciar_sinais import GerenciadorSinais
+from core.signal_event_log import SignalEventLog, signal_key
+
+
+def _signal(symbol, entry_time, status='OPEN', **extra):
+    return {'symbol': symbol, 'type': 'COMPRA', 'entry_price': 10.0, 'entry_time': entry_time,
+            'target_price': 11.0, 'status': status, 'confirmation_reasons': ['rsi', 'volume'], **extra}
+
+
+def test_range_purges_and_updates():
+    """Limpezas removem só a faixa pedida e close_open fecha os sinais abertos do símbolo"""
+    with tempfile.TemporaryDirectory() as tmp:
+        log = SignalEventLog(os.path.join(tmp, 'sinais_lista.csv'), compact_interval=3600)
+        log.create(_signal('AAAUSDT', '2025-01-01 09:00:00'))
+        log.create(_signal('BBBUSDT', '2025-01-01 09:30:00', status='CLOSED'))
+        log.create(_signal('CCCUSDT', '2025-01-01 11:00:00'))
+        log.create(_signal('DDDUSDT', '2030-01-01 00:00:00'))
+
+        assert log.purge_before('2025-01-01 10:00:00', status='OPEN') == 1
+        assert [r['symbol'] for r in log.records()] == ['BBBUSDT', 'CCCUSDT', 'DDDUSDT']
+        assert log.purge_after('2025-06-01 00:00:00') == 1
+        assert [r['symbol'] for r in log.records_between(start='2025-01-01 09:45:00')] == ['CCCUSDT']
+
+        assert log.close_open('CCCUSDT', {'exit_price': 10.5, 'result': 'WIN'}) == 1
+        assert log.close_open('CCCUSDT', {'exit_price': 10.5}) == 0
+        closed = log.records_between(start='2025-01-01 11:00:00')[0]
+        assert closed['status'] == 'CLOSED' and closed['result'] == 'WIN'
+        assert log.update(signal_key('BBBUSDT', '2025-01-01 09:30:00'), {'confirmed_at': 'x'}, event='confirmed')
+        assert log.get_stats()['events_appended'] == 8
+
+
+def test_compaction_and_recovery():
+    """O snapshot é um CSV legível pelo pandas e o estado volta igual após reinício"""
+    with tempfile.TemporaryDirectory() as tmp:
+        snapshot = os.path.join(tmp, 'sinais_lista.csv')
+        log = SignalEventLog(snapshot, compact_interval=3600)
+        log.create(_signal('AAAUSDT', '2025-01-01 09:00:00'))
+        log.create(_signal('BBBUSDT', '2025-01-01 10:00:00'))
+        assert log.compact()
+        assert os.path.getsize(log.log_path) == 0
+
+        df = pd.read_csv(snapshot)
+        assert list(df['symbol']) == ['AAAUSDT', 'BBBUSDT']
+        assert df['confirmation_reasons'].iloc[0] == "['rsi', 'volume']"
+
+        # Eventos após o snapshot só existem no log
+        log.update(signal_key('AAAUSDT', '2025-01-01 09:00:00'), {'status': 'CLOSED'}, event='closed')
+        log.create(_signal('CCCUSDT', '2025-01-01 12:00:00', custom='x'))
+        with open(log.log_path, 'a', encoding='utf-8') as f:
+            f.write('{"event": "created", "key"')  # Escrita interrompida
+
+        restarted = SignalEventLog(snapshot, compact_interval=3600)
+        records = restarted.records()
+        assert [r['symbol'] for r in records] == ['AAAUSDT', 'BBBUSDT', 'CCCUSDT']
+        assert records[0]['status'] == 'CLOSED' and records[1]['entry_price'] == 10.0
+        assert records[2]['custom'] == 'x'
+        assert restarted.get_stats()['events_replayed'] == 2
+
+
+def _write_signals(snapshot, prefix, count):
+    # Processo filho: compactações frequentes disputando o mesmo arquivo
+    log = SignalEventLog(snapshot, compact_interval=3600, compact_threshold=10 ** 6)
+    for i in range(count):
+        log.create(_signal(f'{prefix}{i}USDT', f'2025-01-01 10:{i:02d}:00'))
+        if i % 5 == 4:
+            log.compact()
+
+
+def test_shared_file_between_processes():
+    """Dois logs no mesmo arquivo: nenhum perde os sinais do outro ao compactar"""
+    with tempfile.TemporaryDirectory() as tmp:
+        snapshot = os.path.join(tmp, 'sinais_lista.csv')
+        first = SignalEventLog(snapshot, compact_interval=3600)
+        second = SignalEventLog(snapshot, compact_interval=3600)
+        first.create(_signal('XUSDT', '2025-01-01 09:00:00'))
+        second.create(_signal('YUSDT', '2025-01-01 09:30:00'))
+        assert first.compact()
+        assert [r['symbol'] for r in SignalEventLog(snapshot).records()] == ['XUSDT', 'YUSDT']
+
+        # Leitura após escrita de outro processo, inclusive depois de uma compactação
+        version = second.version()
+        first.update(signal_key('YUSDT', '2025-01-01 09:30:00'), {'status': 'CLOSED'}, event='closed')
+        assert second.get(signal_key('YUSDT', '2025-01-01 09:30:00'))['status'] == 'CLOSED'
+        assert second.version() > version
+        second.create(_signal('ZUSDT', '2025-01-01 10:00:00'))
+        assert second.compact()
+        assert [row['symbol'] for row in first.snapshot_rows()] == ['XUSDT', 'YUSDT', 'ZUSDT']
+
+        context = multiprocessing.get_context('spawn')
+        workers = [context.Process(target=_write_signals, args=(snapshot, prefix, 20)) for prefix in ('A', 'B')]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join(60)
+            assert worker.exitcode == 0
+        symbols = [r['symbol'] for r in SignalEventLog(snapshot).records()]
+        assert len(symbols) == 43 and {f'{p}{i}USDT' for p in 'AB' for i in range(20)} <= set(symbols)
+
+
+def test_signals_route_reads_uncompacted_signals():
+    """A rota que lia o CSV vê um sinal novo antes da compactação"""
+    from flask import Flask
+    import api_routes.signals as signals_routes
+
+    with tempfile.TemporaryDirectory() as tmp:
+        log = SignalEventLog(os.path.join(tmp, 'sinais_lista.csv'), compact_interval=3600)
+        original = signals_routes.get_signal_event_log
+        signals_routes.get_signal_event_log = lambda path: log
+        try:
+            log.create(_signal('AAAUSDT', '2025-01-01 09:00:00', signal_class='PREMIUM', projection_percentage=10.0))
+            log.create(_signal('BBBUSDT', '2025-01-01 10:00:00', signal_class='STANDARD', projection_percentage=10.0))
+            with Flask(__name__).app_context():
+                signals = signals_routes.get_signals_from_csv()
+            assert [s['symbol'] for s in signals] == ['AAAUSDT']
+            assert signals[0]['entry_price'] == 10.0 and signals[0]['type'] == 'LONG'
+            assert not os.path.exists(log.snapshot_path)
+        finally:
+            signals_routes.get_signal_event_log = original
+
+
+def test_gerenciador_cleanup_uses_log():
+    """Limpeza das 10h e relatório do GerenciadorSinais operam sobre o log"""
+    with tempfile.TemporaryDirectory() as tmp:
+        gerenciador = GerenciadorSinais(db_instance=None)
+        gerenciador.event_log = SignalEventLog(os.path.join(tmp, 'sinais_lista.csv'), compact_interval=3600)
+
+        now = datetime.now(gerenciador.timezone).replace(tzinfo=None)
+        cutoff = now.replace(hour=10, minute=0, second=0, microsecond=0)
+        fmt = '%Y-%m-%d %H:%M:%S'
+        gerenciador.event_log.create(_signal('OLDUSDT', (cutoff - timedelta(hours=1)).strftime(fmt)))
+        gerenciador.event_log.create(_signal('NEWUSDT', (cutoff + timedelta(minutes=1)).strftime(fmt)))
+        gerenciador.event_log.create(_signal('WINUSDT', (now - timedelta(hours=30)).strftime(fmt), status='CLOSED'))
+
+        gerenciador.limpar_sinais_antes_das_10h()
+        symbols = [r['symbol'] for r in gerenciador.load_signals_from_csv()]
+        assert 'OLDUSDT' not in symbols and 'NEWUSDT' in symbols and 'WINUSDT' in symbols
+
+        assert gerenciador.atualizar_sinal('NEWUSDT', 11.0, 10.0)
+        report = gerenciador.gerar_relatorio()
+        assert report['total_trades'] == 1 and report['win_rate'] == 100.0
+        assert gerenciador.clear_signals('CLOSED') == 2
+
+
+def test_database_writes_signals_through_log():
+    """Database grava sinais_lista.csv só pelo log (SQLite e CSV), e a compactação não apaga sinais"""
+    saved_backend = os.environ.get('DATABASE_BACKEND')
+    try:
+        for backend in ('sqlite', 'csv'):
+            os.environ['DATABASE_BACKEND'] = backend
+            with tempfile.TemporaryDirectory() as tmp:
+                db = Database(base_dir=tmp)
+                assert db.add_signal(_signal('AAAUSDT', '2025-01-01 09:00:00'), save_remote=False)
+                assert db.add_signal(_signal('BBBUSDT', '2025-01-01 10:00:00'), save_remote=False)
+                assert not db.add_signal(_signal('AAAUSDT', '2025-01-01 15:00:00'), save_remote=False)
+
+                db.update_signal_status('BBBUSDT', '2025-01-01 10:00:00', 'CONFIRMED')
+                db.update_signal_status('AAAUSDT', '2025-01-01 09:00:00', 'CLOSED', exit_price=12.0, result='WIN')
+                db.signal_log.compact()
+
+                df = pd.read_csv(db.signals_list_file)
+                assert list(df['symbol']) == ['BBBUSDT'] and list(df['status']) == ['CONFIRMED']
+                assert [s['symbol'] for s in db.get_all_signals()] == ['BBBUSDT']
+                gerenciador = GerenciadorSinais(db)
+                assert gerenciador.event_log is db.signal_log
+                if backend == 'csv':
+                    history = pd.read_csv(db.signals_history_file)
+                    assert list(history['symbol']) == ['AAAUSDT'] and history['result'].iloc[0] == 'WIN'
+                else:
+                    assert db.storage.get_signal_history('AAAUSDT')[0]['exit_price'] == 12.0
+                    db.storage.close()
+    finally:
+        if saved_backend is None:
+            os.environ.pop('DATABASE_BACKEND', None)
+        else:
+            os.environ['DATABASE_BACKEND'] = saved_backend
+
+
+def test_gerenciador_purges_reach_sqlite():
+    """Limpezas também limpam o SQLite; sinais fechados seguem bloqueando o dia nos dois backends"""
+    saved_backend = os.environ.get('DATABASE_BACKEND')
+    try:
+        for backend in ('sqlite', 'csv'):
+            os.environ['DATABASE_BACKEND'] = backend
+            with tempfile.TemporaryDirectory() as tmp:
+                db = Database(base_dir=tmp)
+                gerenciador = GerenciadorSinais(db)
+                signal = {'symbol': 'ETHUSDT', 'type': 'COMPRA', 'entry_price': 100.0, 'target_price': 110.0,
+                          'quality_score': 90}
+
+                assert gerenciador.save_signal(dict(signal), save_remote=False)
+                assert not gerenciador.save_signal(dict(signal), save_remote=False)
+                assert gerenciador.remover_sinais_por_simbolo('ETHUSDT') == 1
+                assert db.get_all_signals() == []
+
+                assert gerenciador.save_signal(dict(signal), save_remote=False)
+                assert [r['symbol'] for r in gerenciador.event_log.records()] == ['ETHUSDT']
+
+                # Fechado continua na lista (como no baseline) e o mesmo dia segue deduplicado
+                assert gerenciador.atualizar_sinal('ETHUSDT', 110.0, 10.0)
+                assert gerenciador.event_log.records()[0]['status'] == 'CLOSED'
+                stored = db.get_all_signals()
+                assert [(r['status'], r['result']) for r in stored] == [('CLOSED', 'WIN')], backend
+                assert not gerenciador.save_signal(dict(signal), save_remote=False), backend
+                assert len(gerenciador.event_log.records()) == 1
+                if db.storage is not None:
+                    assert db.storage.get_signal_history('ETHUSDT') == []
+                    db.storage.close()
+    finally:
+        if saved_backend is None:
+            os.environ.pop('DATABASE_BACKEND', None)
+        else:
+            os.environ['DATABASE_BACKEND'] = saved_backend
+
+def test_write_errors_reach_the_queue():
+    """Falhas de gravação/remoção sobem (fila e rotas veem o erro); duplicata continua False"""
+    saved_backend = os.environ.get('DATABASE_BACKEND')
+    os.environ['DATABASE_BACKEND'] = 'sqlite'
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            db = Database(base_dir=tmp)
+            gerenciador = GerenciadorSinais(db)
+            signal = gerenciador.format_signal({'symbol': 'ETHUSDT', 'type': 'COMPRA', 'entry_price': 100.0,
+                                                'target_price': 110.0, 'quality_score': 90})
+
+            def disk_full(data):
+                raise OSError('disco cheio')
+
+            insert_signal = db.storage.insert_signal
+            db.storage.insert_signal = disk_full
+            assert not gerenciador.save_formatted_signal(dict(signal), save_remote=False)
+            try:
+                gerenciador.save_formatted_signal(dict(signal), save_remote=False, raise_errors=True)
+                assert False, 'falha de gravação deveria subir'
+            except OSError:
+                pass
+
+            db.storage.insert_signal = insert_signal
+            assert gerenciador.save_formatted_signal(dict(signal), save_remote=False, raise_errors=True)
+            assert not gerenciador.save_formatted_signal(dict(signal), save_remote=False, raise_errors=True)
+
+            # Exclusão manual: o erro chega à rota e o log não é limpo sem o SQLite
+            delete_signals = db.storage.delete_signals
+            db.storage.delete_signals = disk_full
+            for remove in (lambda: gerenciador.remover_sinais_por_status('OPEN'),
+                           lambda: gerenciador.remover_sinais_por_simbolo('ETHUSDT'),
+                           gerenciador.clear_signals):
+                try:
+                    remove()
+                    assert False, 'falha ao remover deveria subir'
+                except OSError:
+                    pass
+            assert len(gerenciador.event_log.records()) == 1
+
+            db.storage.delete_signals = delete_signals
+            assert gerenciador.remover_sinais_por_status('OPEN') == 1
+            db.storage.close()
+    finally:
+        if saved_backend is None:
+            os.environ.pop('DATABASE_BACKEND', None)
+        else:
+            os.environ['DATABASE_BACKEND'] = saved_backend
+
+
+if __name__ == '__main__':
+    print("🧪 === TESTE DO LOG DE EVENTOS DE SINAIS ===")
+    test_range_purges_and_updates()
+    print("✅ Limpezas por faixa e atualizações funcionando")
+    test_compaction_and_recovery()
+    print("✅ Compactação e recuperação funcionando")
+    test_shared_file_between_processes()
+    print("✅ Arquivo compartilhado entre processos sem perda de sinais")
+    test_signals_route_reads_uncompacted_signals()
+    print("✅ Rota de sinais lê o log sem esperar a compactação")
+    test_gerenciador_cleanup_uses_log()
+    print("✅ GerenciadorSinais usa o log de eventos")
+    test_database_writes_signals_through_log()
+    print("✅ Database grava sinais pelo log de eventos")
+    test_gerenciador_purges_reach_sqlite()
+    print("✅ Limpezas do GerenciadorSinais chegam ao SQLite")
+    test_write_errors_reach_the_queue()
+    print("✅ Falhas de gravação sobem para a fila de persistência")
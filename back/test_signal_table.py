@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Teste da SignalTable
+Valida o cálculo vetorizado de métricas contra a fórmula por sinal, a
+expiração/conclusão por máscaras e o SignalMonitoringSystem sobre a tabela
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from dataclasses import asdict
+from datetime import datetime, timedelta
+
+import numpy as np
+
+import core.signal_monitoring_system as monitoring_module
+from core.signal_monitoring_system import MonitoredSignal, SignalMonitoringSystem
+from core.signal_table import SignalTable, STATUS_COMPLETED, STATUS_EXPIRED
+
+
+def _reference_metrics(signal, price, now):
+    """Cálculo por sinal usado antes em _update_signal_metrics"""
+    signal.current_price = price
+    if signal.signal_type == 'COMPRA':
+        change = ((price - signal.entry_price) / signal.entry_price) * 100
+    else:
+        change = ((signal.entry_price - price) / signal.entry_price) * 100
+    signal.current_percentage = round(change, 2)
+    signal.current_profit = round(change * signal.max_leverage, 2)
+    signal.max_profit_reached = max(signal.max_profit_reached, signal.current_profit)
+    if signal.simulation_position_size == 0.0:
+        signal.simulation_position_size = signal.simulation_investment / signal.entry_price
+    signal.simulation_current_value = signal.simulation_position_size * price
+    signal.simulation_pnl_usd = signal.simulation_current_value - signal.simulation_investment
+    signal.simulation_pnl_percentage = signal.simulation_pnl_usd / signal.simulation_investment * 100
+    signal.simulation_max_value_reached = max(signal.simulation_max_value_reached, signal.simulation_current_value)
+    signal.days_monitored = (now - datetime.strptime(signal.confirmed_at, '%d/%m/%Y %H:%M:%S')).days
+
+
+def _signal(i, confirmed_at, signal_type=None, leverage=20):
+    return MonitoredSignal(
+        id=f'sig-{i}', symbol=f'C{i}USDT', signal_type=signal_type or ('COMPRA' if i % 2 else 'VENDA'),
+        entry_price=1.0 + i * 0.37, target_price=2.0, created_at=confirmed_at, confirmed_at=confirmed_at,
+        max_leverage=leverage, required_percentage=15.0, last_updated=confirmed_at
+    )
+
+
+def test_vectorized_metrics_match_reference():
+    """Duas rodadas de preços produzem os mesmos campos da fórmula por sinal"""
+    now = datetime(2025, 3, 20, 12, 0, 0)
+    rng = np.random.default_rng(7)
+    reference = [_signal(i, (now - timedelta(days=int(i % 20), hours=3)).strftime('%d/%m/%Y %H:%M:%S'),
+                         leverage=int(rng.integers(5, 75))) for i in range(40)]
+    table = SignalTable(capacity=4)
+    rows = np.array([table.add(signal) for signal in reference])
+
+    for _ in range(2):
+        prices = np.array([s.entry_price for s in reference]) * rng.uniform(0.5, 1.8, len(reference))
+        prices[3] = np.nan  # Sem preço: sinal não muda
+        updated = table.update_prices(rows, prices, now)
+        assert 3 not in updated.tolist() and len(updated) == len(reference) - 1
+        for signal, price in zip(reference, prices):
+            if not np.isnan(price):
+                _reference_metrics(signal, float(price), now)
+
+    expected = [{**asdict(s), 'price_history': []} for s in reference]
+    records = table.records(rows)
+    assert [r['id'] for r in records] == [e['id'] for e in expected]
+    for record, wanted in zip(records, expected):
+        assert record.keys() == wanted.keys()
+        for key, value in wanted.items():
+            if isinstance(value, float):
+                assert abs(record[key] - value) <= 1e-9 * max(1.0, abs(value)), (key, record[key], value)
+            else:
+                assert record[key] == value, key
+
+    # Expiração e conclusão por máscara, na ordem de encerramento
+    expired = table.expired_rows(15)
+    assert sorted(expired.tolist()) == [r for r in rows.tolist() if reference[r].days_monitored >= 15]
+    table.close(expired, STATUS_EXPIRED)
+    completed = table.completed_rows(300.0)
+    table.close(completed, STATUS_COMPLETED)
+    closed_view = table.view(closed=True)
+    assert list(closed_view) == table.ids(rows=np.concatenate([expired, completed]))
+    assert len(table.view()) + len(closed_view) == len(reference)
+    assert closed_view[records[expired[0]]['id']].status == 'EXPIRED'
+
+
+class _FakeSnapshot:
+    def __init__(self, prices):
+        self.prices = prices
+
+    def get_last_prices(self, symbols):
+        return np.array([self.prices.get(symbol, np.nan) for symbol in symbols], dtype=float)
+
+    def get_price(self, symbol):
+        return self.prices.get(symbol)
+
+
+def test_monitoring_system_on_table(monkeypatch):
+    """Ciclo completo: inclusão, atualização, conclusão, expiração e estatísticas"""
+    snapshot = _FakeSnapshot({'AAAUSDT': 10.0, 'BBBUSDT': 20.0, 'CCCUSDT': 5.0})
+    monkeypatch.setattr(monitoring_module, 'ticker_snapshot', snapshot)
+    system = SignalMonitoringSystem(binance_client=None, database=None)
+    monkeypatch.setattr(system.leverage_detector, 'get_leverage_info',
+                        lambda symbol: {'max_leverage': 50, 'required_percentage': 6.0})
+
+    for signal_id, symbol, signal_type in (('a', 'AAAUSDT', 'COMPRA'), ('b', 'BBBUSDT', 'VENDA'),
+                                           ('c', 'CCCUSDT', 'COMPRA')):
+        assert system.add_signal_to_monitoring(signal_data={'id': signal_id, 'symbol': symbol, 'type': signal_type,
+                                                            'entry_price': snapshot.prices[symbol]})
+    assert not system.add_signal_to_monitoring(signal_data={'id': 'a', 'symbol': 'AAAUSDT', 'type': 'COMPRA',
+                                                            'entry_price': 10.0})
+
+    # A sobe 10% (x50 = 500%: concluído); C fica 15 dias sem bater a meta (expirado)
+    snapshot.prices.update({'AAAUSDT': 11.0, 'BBBUSDT': 19.0})
+    system.table.set_value(system.table.index['c'], 'confirmed_at',
+                           (datetime.now() - timedelta(days=16)).strftime('%d/%m/%Y %H:%M:%S'))
+    system._update_all_signals()
+    system._check_expired_signals()
+    system._check_completed_signals()
+
+    assert list(system.monitored_signals) == ['b']
+    assert [s['id'] for s in system.get_expired_signals()] == ['c', 'a']
+    assert system.monitored_signals['b'].current_profit == 250.0
+    assert len(system.monitored_signals['b'].price_history) == 1
+
+    stats = system.get_system_statistics()
+    assert stats['total_evaluated_signals'] == 2 and stats['successful_signals'] == 1
+    assert stats['overall_success_rate'] == 50.0 and stats['buy_signals_count'] == 2
+    assert stats['leverage_analysis'] == {50: {'total': 2, 'successful': 1, 'avg_profit': 250.0,
+                                               'success_rate': 50.0}}
+    assert system.get_monitoring_stats()['total_completed'] == 1
+
+    records = system.get_simulation_records()
+    assert [r['status'] for r in records] == ['MONITORING', 'EXPIRED', 'COMPLETED']
+    assert records[2]['simulation']['current_value'] == 1100.0
+
+
+if __name__ == '__main__':
+    print("🧪 === TESTE DA TABELA COLUNAR DE SINAIS ===")
+    test_vectorized_metrics_match_reference()
+    print("✅ Métricas vetorizadas iguais ao cálculo por sinal")
+    import pytest
+    sys.exit(pytest.main([__file__, '-q']))
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Teste do backend SQLite da Database
+Valida duplicatas por dia, fechamento para o histórico, usuários/tokens e a
+migração única dos CSVs legados
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import csv
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from core.sqlite_storage import SQLiteStorage
+
+
+def _signal(symbol, entry_time, **extra):
+    return {'symbol': symbol, 'type': 'COMPRA', 'entry_price': 10.5, 'entry_time': entry_time,
+            'target_price': 12.0, 'status': 'OPEN', **extra}
+
+
+def _write_csv(path, headers, rows):
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(headers)
+        writer.writerows(rows)
+
+
+def test_signals_duplicates_and_history():
+    """Um sinal por símbolo/dia (mesmo com escritas concorrentes) e CLOSED vai para o histórico"""
+    with tempfile.TemporaryDirectory() as tmp:
+        storage = SQLiteStorage(os.path.join(tmp, 'storage.db'))
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(executor.map(
+                lambda i: storage.insert_signal(_signal('BTCUSDT', f'2025-01-02 10:{i:02d}:00')), range(16)
+            ))
+        assert sum(results) == 1
+        assert storage.insert_signal(_signal('BTCUSDT', '2025-01-03 09:00:00', confirmation_reasons=['rsi', 'volume']))
+        assert storage.insert_signal(_signal('ETHUSDT', '2025-01-02 11:00:00'))
+
+        signal = storage.get_signal_by_symbol('ETHUSDT')
+        assert signal['entry_price'] == 10.5 and signal['status'] == 'OPEN'
+        assert len(storage.get_signals_by_status('OPEN')) == 3
+
+        assert storage.update_signal_status('ETHUSDT', '2025-01-02 11:00:00', 'CLOSED',
+                                            {'exit_price': 11.0, 'result': 'WIN', 'variation': None})
+        assert not storage.update_signal_status('ETHUSDT', '2025-01-02 11:00:00', 'CLOSED', {})
+        assert storage.get_signal_by_symbol('ETHUSDT') is None
+
+        history = storage.get_signal_history('ETHUSDT')
+        assert len(history) == 1
+        assert history[0]['exit_price'] == 11.0 and history[0]['result'] == 'WIN'
+        assert len(storage.get_signals()) == 2
+        assert storage.get_stats()['journal_mode'] == 'wal'
+
+
+def test_users_and_tokens():
+    """Consultas indexadas de usuário e um token de autenticação ativo por usuário"""
+    with tempfile.TemporaryDirectory() as tmp:
+        storage = SQLiteStorage(os.path.join(tmp, 'storage.db'))
+
+        user = {'id': 'u-1', 'username': 'ana', 'email': 'ana@example.com', 'password': 'hash',
+                'is_admin': True, 'status': 'active'}
+        assert storage.insert_user(user) is None
+        assert storage.insert_user({**user, 'id': 'u-2'}) == 'username'
+        assert storage.insert_user({**user, 'username': 'bia'}) == 'id'
+        assert storage.get_user('email', 'ana@example.com')['is_admin'] is True
+        assert storage.update_user_password('u-1', 'new-hash')
+        assert storage.get_user('id', 'u-1')['password'] == 'new-hash'
+
+        expires = (datetime.now() + timedelta(hours=1)).isoformat()
+        storage.save_auth_token('tok-1', 'u-1', datetime.now().isoformat(), expires)
+        storage.save_auth_token('tok-2', 'u-1', datetime.now().isoformat(), expires)
+        assert storage.get_auth_token('tok-1') is None
+        assert storage.get_auth_token('tok-2')['user_id'] == 'u-1'
+        assert storage.delete_auth_token('tok-2')
+
+        storage.insert_reset_token('u-1', 'reset-1', '2099-01-01 00:00:00')
+        assert storage.get_unused_reset_token('reset-1')['used'] is False
+        assert storage.mark_reset_token_used('reset-1')
+        assert storage.get_unused_reset_token('reset-1') is None
+
+
+def test_migration_from_csv_runs_once():
+    """Os CSVs legados são importados uma vez, preservando colunas extras"""
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = {name: os.path.join(tmp, f'{name}.csv') for name in
+                 ('signals', 'signals_history', 'users', 'auth_tokens', 'password_reset_tokens', 'tickers', 'config')}
+        _write_csv(paths['signals'], ['symbol', 'type', 'entry_price', 'entry_time', 'status', 'custom_note'],
+                   [['BTCUSDT', 'COMPRA', '100.5', '2025-01-02 10:00:00', 'OPEN', 'manual'],
+                    ['ETHUSDT', 'VENDA', '50', '2025-01-02 11:00:00', 'OPEN', '']])
+        _write_csv(paths['signals_history'], ['symbol', 'type', 'entry_time', 'tp3', 'status'],
+                   [['XRPUSDT', 'COMPRA', '2024-12-01 08:00:00', '0.7', 'CLOSED']])
+        _write_csv(paths['users'], ['username', 'password', 'email', 'is_admin', 'id', 'status'],
+                   [['ana', 'hash', 'ana@example.com', 'True', '1', 'active']])
+        _write_csv(paths['auth_tokens'], ['token', 'user_id', 'created_at', 'expires_at'],
+                   [['tok', '1', '2025-01-01T00:00:00', '2099-01-01T00:00:00']])
+        _write_csv(paths['password_reset_tokens'], ['user_id', 'token', 'expiration_time', 'used'], [])
+        _write_csv(paths['tickers'], ['symbol', 'baseAsset', 'quoteAsset'], [['BTCUSDT', 'BTC', 'USDT']])
+        _write_csv(paths['config'], ['key', 'value'], [['scan_interval', '300']])
+
+        storage = SQLiteStorage(os.path.join(tmp, 'storage.db'))
+        imported = storage.migrate_from_csv(paths)
+        assert imported['signals'] == 2 and imported['signals_history'] == 1
+        assert imported['users'] == 1 and imported['auth_tokens'] == 1 and imported['config'] == 1
+        assert storage.is_migrated()
+        assert storage.migrate_from_csv(paths) == {}
+        assert storage.migrate_from_csv(paths, force=True)['signals'] == 0
+
+        btc = storage.get_signal_by_symbol('BTCUSDT')
+        assert btc['entry_price'] == 100.5 and btc['custom_note'] == 'manual'
+        assert storage.get_signal_history()[0]['tp3'] == 0.7
+        assert storage.get_user('username', 'ana')['id'] == '1'
+        assert storage.get_auth_token('tok')['user_id'] == '1'
+        assert storage.get_config() == {'scan_interval': '300'}
+        assert not storage.insert_signal(_signal('BTCUSDT', '2025-01-02 23:00:00'))
+
+
+if __name__ == '__main__':
+    print("🧪 === TESTE DO BACKEND SQLITE ===")
+    test_signals_duplicates_and_history()
+    print("✅ Duplicatas por dia e histórico funcionando")
+    test_users_and_tokens()
+    print("✅ Usuários e tokens funcionando")
+    test_migration_from_csv_runs_once()
+    print("✅ Migração dos CSVs executada uma única vez")
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Teste do TickerSnapshotService
+Valida que várias consultas usam um único download do mercado e o stream !ticker@arr
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+from core.binance_client import BinanceClient
+from core.ticker_snapshot import TickerSnapshotService
+
+
+def _ticker(symbol, last, high, low, volume, change):
+    return {
+        'symbol': symbol, 'lastPrice': str(last), 'openPrice': str(last), 'highPrice': str(high),
+        'lowPrice': str(low), 'volume': str(volume), 'quoteVolume': str(volume * last),
+        'priceChangePercent': str(change)
+    }
+
+
+class _FakeRestClient:
+    use_binance_api = True
+
+    def __init__(self):
+        self.calls = 0
+        self.response = [
+            _ticker('BTCUSDT', 100.0, 110.0, 90.0, 10.0, 1.5),
+            _ticker('ETHUSDT', 50.0, 55.0, 45.0, 20.0, -2.0)
+        ]
+
+    def make_request(self, endpoint, method='GET', params=None, auth=False, priority=None):
+        assert endpoint == '/fapi/v1/ticker/24hr'
+        self.calls += 1
+        return self.response
+
+
+class _FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_lookups_share_one_download():
+    """Consultas concorrentes dentro da cadência fazem um único download"""
+    rest = _FakeRestClient()
+    clock = _FakeClock()
+    snapshot = TickerSnapshotService(rest_client=rest, refresh_interval=5.0, clock=clock)
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        prices = list(executor.map(lambda _: snapshot.get_price('BTCUSDT'), range(30)))
+    assert prices == [100.0] * 30
+    assert rest.calls == 1
+
+    # Mesmo formato de BinanceClient.get_24h_ticker_data
+    expected = BinanceClient._parse_24h_ticker(rest.response, ['BTCUSDT', 'ETHUSDT'])
+    data = snapshot.get_ticker_data(['BTCUSDT', 'ETHUSDT', 'XRPUSDT'])
+    for symbol in expected:
+        for field, value in expected[symbol].items():
+            assert abs(data[symbol][field] - value) < 1e-9
+    assert 'XRPUSDT' not in data
+    assert snapshot.get_prices() == {'BTCUSDT': 100.0, 'ETHUSDT': 50.0}
+    assert rest.calls == 1
+
+    clock.now += 6.0  # Snapshot vencido
+    snapshot.get_ticker('ETHUSDT')
+    assert rest.calls == 2
+    assert snapshot.get_stats()['misses'] == 1
+
+
+def test_stream_updates_rows_in_place():
+    """Mensagens !ticker@arr atualizam só as linhas alteradas e adicionam pares novos"""
+    rest = _FakeRestClient()
+    clock = _FakeClock()
+    snapshot = TickerSnapshotService(rest_client=rest, refresh_interval=5.0, clock=clock)
+    snapshot.refresh()
+    snapshot.is_running = True  # Simula o stream ativo sem abrir conexão
+
+    clock.now += 60.0
+    snapshot.handle_message(json.dumps([
+        {'e': '24hrTicker', 's': 'BTCUSDT', 'c': '105', 'o': '100', 'h': '110', 'l': '90',
+         'v': '12', 'q': '1260', 'P': '5.0'},
+        {'e': '24hrTicker', 's': 'SOLUSDT', 'c': '20', 'o': '19', 'h': '21', 'l': '18',
+         'v': '100', 'q': '2000', 'P': '5.2'}
+    ]))
+
+    assert snapshot.get_price('BTCUSDT') == 105.0
+    assert snapshot.get_price('ETHUSDT') == 50.0
+    assert snapshot.get_ticker('SOLUSDT')['priceChangePercent'] == 5.2
+    assert rest.calls == 1  # Stream ativo: nenhuma atualização via REST
+    assert snapshot.get_stats()['source'] == 'stream'
+    snapshot.is_running = False
+
+
+if __name__ == '__main__':
+    print("🧪 === TESTE DO SNAPSHOT DE TICKER ===")
+    test_lookups_share_one_download()
+    print("✅ Consultas compartilham um único download do mercado")
+    test_stream_updates_rows_in_place()
+    print("✅ Stream !ticker@arr atualiza o snapshot")